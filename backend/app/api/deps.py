@@ -0,0 +1,580 @@
+import logging
+import os
+from concurrent.futures import Executor
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+from fastapi import Depends, HTTPException, Query, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from supabase import AsyncClient
+
+from app.core.config import Settings, get_settings
+from app.core.profiling import EventLoopLagMonitor, SamplingProfiler
+from app.core.security import (
+    JWKSCache,
+    TokenVerificationError,
+    TokenVerifier,
+    http_jwks_fetcher,
+)
+from app.db.embedding_store import EmbeddingStore
+from app.db.recognition_log import RecognitionLogStore
+from app.db.supabase import get_async_supabase_client
+from app.models.instructor import ProfileType
+from app.schemas.user import CurrentUser
+from app.services.attendance_service import AttendanceService, AttendanceWriter
+from app.services.auth_service import (
+    AuthService,
+    AuthUserCleanup,
+    ProfileError,
+    ProfileNotFoundError,
+)
+from app.services.class_service import (
+    ClassNotFoundError,
+    ClassQueryError,
+    ClassService,
+)
+from app.services.enrollment_service import (
+    BatchEnrollmentPipeline,
+    EnrollmentService,
+    create_enrollment_executor,
+)
+from app.services.geofence_service import GeofenceIndex, GeofenceService
+from app.services.profile_cache import (
+    ProfileCache,
+    RedisProfileStore,
+    SharedProfileStore,
+)
+from app.services.recognition_log_service import RecognitionLogWriter
+from app.services.recognition_service import (
+    ImageProbe,
+    Match,
+    RecognitionResultCache,
+    RecognitionService,
+)
+from app.services.report_service import EXPORT_MAX_CLASSES, ReportService
+from app.services.storage_service import (
+    LocalStorageBackend,
+    StorageBackend,
+    StorageService,
+    SupabaseStorageBackend,
+)
+from app.services.user_service import UserService
+from app.utils.ann_index import IVFIndex
+from app.utils.batching import MicroBatcher
+from app.utils.face_utils import FaceEngine, create_face_engine
+
+logger = logging.getLogger(__name__)
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+
+async def get_supabase() -> AsyncClient:
+    """Get the worker's shared, lifespan-managed async Supabase client."""
+    return await get_async_supabase_client()
+
+
+@lru_cache
+def get_profile_cache() -> ProfileCache:
+    """Get the worker's profile cache, backed by the configured shared store."""
+    settings = get_settings()
+    shared: SharedProfileStore | None = None
+    if settings.profile_cache_shared_store == "redis":
+        shared = RedisProfileStore(settings.profile_cache_redis_url)
+    return ProfileCache(
+        max_entries=settings.profile_cache_size,
+        ttl_seconds=settings.profile_cache_ttl_seconds,
+        shared=shared,
+    )
+
+
+@lru_cache
+def get_auth_user_cleanup() -> AuthUserCleanup:
+    """Get the worker's queue deleting the auth users of failed signups.
+
+    Uses the shared async client, opened lazily on the first delete.
+    """
+    settings = get_settings()
+    return AuthUserCleanup(
+        max_attempts=settings.signup_cleanup_max_attempts,
+        base_delay_seconds=settings.signup_cleanup_base_delay_seconds,
+        max_delay_seconds=settings.signup_cleanup_max_delay_seconds,
+    )
+
+
+def get_auth_service(
+    client: AsyncClient = Depends(get_supabase),
+    profiles: ProfileCache = Depends(get_profile_cache),
+    cleanup: AuthUserCleanup = Depends(get_auth_user_cleanup),
+) -> AuthService:
+    """Get an AuthService bound to the shared client, caches and queues."""
+    settings = get_settings()
+    return AuthService(
+        client,
+        profiles=profiles,
+        cleanup=cleanup,
+        bulk_batch_size=settings.bulk_signup_batch_size,
+        bulk_auth_concurrency=settings.bulk_signup_auth_concurrency,
+    )
+
+
+@lru_cache
+def get_embedding_store() -> EmbeddingStore:
+    """Get the host's memory-mapped embedding store."""
+    settings = get_settings()
+    return EmbeddingStore(settings.embedding_store_path, settings.face_embedding_dim)
+
+
+def load_institution_index(settings: Settings) -> IVFIndex:
+    """Load the saved institution index, or create an empty one.
+
+    A saved file that cannot be read or was built for another embedding
+    dimension is ignored; the index is then rebuilt from the store.
+    """
+    index_path = settings.institution_index_path
+    if index_path and os.path.exists(index_path):
+        try:
+            index = IVFIndex.load(index_path)
+        except (OSError, KeyError, ValueError):
+            logger.warning("Ignoring unreadable institution index %s", index_path)
+        else:
+            if index.dim == settings.face_embedding_dim:
+                return index
+            logger.warning("Ignoring institution index of dimension %d", index.dim)
+    return IVFIndex(
+        settings.face_embedding_dim,
+        n_lists=settings.institution_index_lists,
+        n_probe=settings.institution_index_probe,
+    )
+
+
+@lru_cache
+def get_recognition_service() -> RecognitionService:
+    """Get the worker's recognition service holding the class galleries.
+
+    The institution index starts from its saved file when configured, so
+    its centroids need not be trained again, and is then reconciled with
+    the embedding store.
+    """
+    settings = get_settings()
+    result_cache = RecognitionResultCache(
+        max_entries=settings.recognition_result_cache_size,
+        ttl_seconds=settings.recognition_result_cache_ttl_seconds,
+        max_bytes=settings.recognition_result_cache_max_bytes,
+    )
+    service = RecognitionService(
+        match_threshold=settings.face_match_threshold,
+        institution_index=load_institution_index(settings),
+        result_cache=result_cache,
+    )
+    service.load_institution_index(get_embedding_store())
+    return service
+
+
+def save_institution_index() -> bool:
+    """Save this worker's institution index to its configured file.
+
+    Nothing is saved if no file is configured or the index was never
+    loaded in this worker.
+
+    Returns:
+        True if the index was saved.
+    """
+    index_path = get_settings().institution_index_path
+    if not index_path or not get_recognition_service.cache_info().currsize:
+        return False
+    Path(index_path).parent.mkdir(parents=True, exist_ok=True)
+    get_recognition_service().save_institution_index(index_path)
+    return True
+
+
+def get_enrollment_service() -> EnrollmentService:
+    """Get an EnrollmentService bound to the shared store and indexes."""
+    return EnrollmentService(get_embedding_store(), get_recognition_service())
+
+
+def face_engine_options(settings: Settings) -> dict[str, Any]:
+    """Get the options for creating the configured face engine."""
+    if settings.face_engine == "onnx":
+        return {
+            "detector_path": settings.face_detector_model_path,
+            "embedder_path": settings.face_embedder_model_path,
+            "intra_op_threads": settings.onnx_intra_op_threads,
+            "inter_op_threads": settings.onnx_inter_op_threads,
+            "detection_size": settings.face_detection_size,
+            "score_threshold": settings.face_detection_score_threshold,
+        }
+    return {"embedding_dim": settings.face_embedding_dim}
+
+
+def enrollment_engine_options(settings: Settings) -> dict[str, Any]:
+    """Get the face engine options for bulk enrollment worker processes."""
+    engine_options = face_engine_options(settings)
+    if settings.face_engine == "onnx":
+        # One worker process per core already keeps every core busy
+        engine_options.update(intra_op_threads=1, inter_op_threads=1)
+    return engine_options
+
+
+def get_enrollment_pipeline() -> BatchEnrollmentPipeline:
+    """Get a bulk enrollment pipeline configured from settings."""
+    settings = get_settings()
+    return BatchEnrollmentPipeline(
+        get_enrollment_service(),
+        checkpoint_dir=settings.enrollment_checkpoint_dir,
+        engine_name=settings.face_engine,
+        workers=settings.enrollment_workers,
+        write_batch_size=settings.enrollment_write_batch_size,
+        engine_options=enrollment_engine_options(settings),
+    )
+
+
+@lru_cache
+def get_enrollment_executor() -> Executor:
+    """Get the worker's enrollment process pool.
+
+    Created once in the lifespan and shut down with the worker; its
+    processes start on the first enrollment.
+    """
+    settings = get_settings()
+    return create_enrollment_executor(
+        settings.face_engine,
+        enrollment_engine_options(settings),
+        workers=settings.enrollment_workers,
+    )
+
+
+async def get_storage_service() -> StorageService:
+    """Get the content-addressed image storage for the configured backend."""
+    settings = get_settings()
+    backend: StorageBackend
+    if settings.storage_backend == "supabase":
+        backend = SupabaseStorageBackend(
+            await get_async_supabase_client(), settings.storage_bucket
+        )
+    else:
+        backend = LocalStorageBackend(settings.storage_root)
+    return StorageService(backend, Path(settings.storage_root) / "tmp")
+
+
+@lru_cache
+def get_face_engine() -> FaceEngine:
+    """Get the worker's face engine for recognizing uploaded photos."""
+    settings = get_settings()
+    return create_face_engine(settings.face_engine, **face_engine_options(settings))
+
+
+@lru_cache
+def get_recognition_batcher() -> MicroBatcher[ImageProbe, list[list[Match]]]:
+    """Get the worker's batcher coalescing concurrent photo recognitions."""
+    settings = get_settings()
+    return MicroBatcher(
+        partial(
+            get_recognition_service().recognize_images,
+            engine=get_face_engine(),
+            store=get_embedding_store(),
+        ),
+        max_batch_size=settings.recognition_batch_max_size,
+        max_wait_seconds=settings.recognition_batch_max_wait_ms / 1000,
+    )
+
+
+@lru_cache
+def get_attendance_writer() -> AttendanceWriter:
+    """Get the worker's write-behind attendance writer.
+
+    Uses the shared async client, opened lazily on the first flush.
+    """
+    settings = get_settings()
+    return AttendanceWriter(
+        batch_size=settings.attendance_write_batch_size,
+        flush_interval_seconds=settings.attendance_flush_interval_ms / 1000,
+        max_pending=settings.attendance_max_pending,
+        enqueue_timeout_seconds=settings.attendance_enqueue_timeout_seconds,
+    )
+
+
+@lru_cache
+def get_event_loop_monitor() -> EventLoopLagMonitor:
+    """Get the worker's event loop lag monitor."""
+    settings = get_settings()
+    return EventLoopLagMonitor(settings.event_loop_lag_threshold_ms / 1000)
+
+
+@lru_cache
+def get_sampling_profiler() -> SamplingProfiler:
+    """Get the worker's sampling profiler."""
+    settings = get_settings()
+    return SamplingProfiler(
+        interval_seconds=settings.profiler_interval_ms / 1000,
+        max_duration_seconds=settings.profiler_max_seconds,
+    )
+
+
+@lru_cache
+def get_recognition_log_store() -> RecognitionLogStore:
+    """Get the host's recognition audit log."""
+    settings = get_settings()
+    return RecognitionLogStore(
+        settings.recognition_log_dir,
+        top_k=settings.recognition_log_top_k,
+        segment_rows=settings.recognition_log_segment_rows,
+    )
+
+
+@lru_cache
+def get_recognition_log_writer() -> RecognitionLogWriter | None:
+    """Get the worker's recognition log writer, or None if logging is off."""
+    settings = get_settings()
+    if not settings.recognition_log_enabled:
+        return None
+    return RecognitionLogWriter(
+        get_recognition_log_store(),
+        batch_size=settings.recognition_log_batch_size,
+        flush_interval_seconds=settings.recognition_log_flush_interval_ms / 1000,
+        max_pending=settings.recognition_log_max_pending,
+        roll_interval_seconds=settings.recognition_log_roll_interval_seconds,
+    )
+
+
+def get_attendance_service(
+    client: AsyncClient = Depends(get_supabase),
+    writer: AttendanceWriter = Depends(get_attendance_writer),
+) -> AttendanceService:
+    """Get an AttendanceService bound to the shared client and galleries."""
+    settings = get_settings()
+    return AttendanceService(
+        get_recognition_service(),
+        get_embedding_store(),
+        get_face_engine(),
+        client=client,
+        max_side=settings.class_photo_max_side,
+        tile_size=settings.face_detection_tile_size,
+        tile_overlap=settings.face_detection_tile_overlap,
+        max_faces=settings.class_photo_max_faces,
+        latency_budget_ms=settings.class_photo_latency_budget_ms,
+        writer=writer,
+        log=get_recognition_log_writer(),
+        roster_ttl_seconds=settings.gallery_roster_ttl_seconds,
+        page_size=settings.supabase_page_size,
+    )
+
+
+def get_report_service(client: AsyncClient = Depends(get_supabase)) -> ReportService:
+    """Get a ReportService bound to the shared Supabase client."""
+    settings = get_settings()
+    return ReportService(
+        client,
+        export_page_size=settings.report_export_page_size,
+        page_size=settings.supabase_page_size,
+    )
+
+
+def get_class_service(client: AsyncClient = Depends(get_supabase)) -> ClassService:
+    """Get a ClassService bound to the shared Supabase client."""
+    return ClassService(client)
+
+
+def get_user_service(client: AsyncClient = Depends(get_supabase)) -> UserService:
+    """Get a UserService bound to the shared Supabase client."""
+    return UserService(client)
+
+
+@lru_cache
+def get_geofence_service() -> GeofenceService:
+    """Get the worker's geofence service; geofences load on first use."""
+    settings = get_settings()
+    return GeofenceService(
+        GeofenceIndex(settings.geofence_grid_cell_size_deg),
+        ttl_seconds=settings.geofence_reload_seconds,
+        page_size=settings.supabase_page_size,
+    )
+
+
+@lru_cache
+def get_token_verifier() -> TokenVerifier:
+    """Get cached token verifier configured from settings."""
+    settings = get_settings()
+    jwks = JWKSCache(
+        http_jwks_fetcher(f"{settings.supabase_auth_url}/.well-known/jwks.json"),
+        ttl_seconds=settings.jwks_cache_ttl_seconds,
+        min_refresh_interval=settings.jwks_min_refresh_seconds,
+    )
+    return TokenVerifier(
+        jwks=jwks,
+        jwt_secret=settings.supabase_jwt_secret,
+        audience=settings.jwt_audience,
+        issuer=settings.supabase_auth_url,
+        cache_size=settings.token_cache_size,
+    )
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
+    verifier: TokenVerifier = Depends(get_token_verifier),
+) -> CurrentUser:
+    """Resolve the authenticated user from the bearer access token.
+
+    The token is verified locally against the cached signing keys, so no
+    round-trip to Supabase Auth is made per request. Users whose
+    ``app_metadata.role`` is one of the configured admin roles are admins.
+    """
+    if credentials is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    try:
+        claims = await verifier.verify(credentials.credentials)
+    except TokenVerificationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    app_metadata = claims.get("app_metadata")
+    app_role = app_metadata.get("role") if isinstance(app_metadata, dict) else None
+    return CurrentUser(
+        user_id=claims["sub"],
+        email=claims.get("email"),
+        role=claims.get("role", "authenticated"),
+        expires_at=claims["exp"],
+        is_admin=app_role in get_settings().admin_roles,
+    )
+
+
+async def require_admin(
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
+    """Resolve the authenticated user, who must hold an admin role."""
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin role required",
+        )
+    return current_user
+
+
+async def require_instructor_or_admin(
+    current_user: CurrentUser = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> CurrentUser:
+    """Resolve the authenticated user, who must be an instructor or an admin.
+
+    The profile type is read through the profile cache, so this normally
+    costs no database query.
+    """
+    if current_user.is_admin:
+        return current_user
+
+    try:
+        profile = await auth_service.get_profile(current_user.user_id)
+    except ProfileNotFoundError:
+        profile = None
+    except ProfileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+    if profile is None or profile.type != ProfileType.INSTRUCTOR:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Instructor or admin role required",
+        )
+    return current_user
+
+
+async def check_class_instructor_or_admin(
+    class_id: UUID, current_user: CurrentUser, classes: ClassService
+) -> None:
+    """Check the user teaches a class or is an admin.
+
+    For routes taking the class from the request body; routes with a
+    ``class_id`` path parameter depend on
+    ``require_class_instructor_or_admin`` instead.
+
+    Raises:
+        HTTPException: 403 if not, 404 if the class does not exist.
+    """
+    if current_user.is_admin:
+        return
+
+    try:
+        instructor_id = await classes.get_instructor_id(class_id)
+    except ClassNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ClassQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+    if instructor_id != current_user.user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the class's instructor or an admin may do this",
+        )
+
+
+async def require_class_instructor_or_admin(
+    class_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user),
+    classes: ClassService = Depends(get_class_service),
+) -> CurrentUser:
+    """Resolve the authenticated user, who must teach the class or be an admin.
+
+    The class comes from the ``class_id`` path parameter.
+    """
+    await check_class_instructor_or_admin(class_id, current_user, classes)
+    return current_user
+
+
+async def require_student_or_admin(
+    student_id: UUID,
+    current_user: CurrentUser = Depends(get_current_user),
+) -> CurrentUser:
+    """Resolve the authenticated user, who must be the student or an admin.
+
+    The student comes from the ``student_id`` path parameter.
+    """
+    if current_user.is_admin or current_user.user_id == student_id:
+        return current_user
+    raise HTTPException(
+        status_code=status.HTTP_403_FORBIDDEN,
+        detail="Only the student or an admin may do this",
+    )
+
+
+async def require_classes_instructor_or_admin(
+    class_id: list[UUID] = Query(min_length=1, max_length=EXPORT_MAX_CLASSES),
+    current_user: CurrentUser = Depends(get_current_user),
+    classes: ClassService = Depends(get_class_service),
+) -> CurrentUser:
+    """Resolve the authenticated user, who must teach every class or be an admin.
+
+    The classes come from the repeated ``class_id`` query parameter and are
+    checked in one query.
+    """
+    if current_user.is_admin:
+        return current_user
+
+    try:
+        taught = await classes.get_taught_class_ids(current_user.user_id, class_id)
+    except ClassQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+    if not taught.issuperset(class_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the classes' instructor or an admin may do this",
+        )
+    return current_user
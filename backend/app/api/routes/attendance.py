@@ -0,0 +1,107 @@
+from dataclasses import asdict
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import (
+    get_attendance_service,
+    get_storage_service,
+    require_class_instructor_or_admin,
+)
+from app.schemas.attendance import (
+    AttendanceMarksRequest,
+    AttendanceMarksResponse,
+    ClassPhotoAttendanceRequest,
+    ClassPhotoAttendanceResponse,
+)
+from app.services.attendance_service import (
+    AttendanceQueueFullError,
+    AttendanceService,
+    AttendanceWriteError,
+    UnknownStudentsError,
+)
+from app.services.storage_service import ObjectNotFoundError, StorageService
+from app.utils.image_utils import ImageDecodeError
+
+router = APIRouter(prefix="/attendance", tags=["attendance"])
+
+
+@router.post(
+    "/classes/{class_id}/photo",
+    response_model=ClassPhotoAttendanceResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_class_instructor_or_admin)],
+)
+async def take_photo_attendance(
+    class_id: UUID,
+    request: ClassPhotoAttendanceRequest,
+    storage: StorageService = Depends(get_storage_service),
+    attendance: AttendanceService = Depends(get_attendance_service),
+) -> ClassPhotoAttendanceResponse:
+    """Mark the students recognized in a stored photo of the class present.
+
+    Upload the photo through ``POST /images`` first. Every face in the
+    photo is matched to at most one student and each student to at most
+    one face; faces matching nobody are counted but not recorded. Only
+    the class's instructor or an admin may take attendance.
+    """
+    try:
+        data = await storage.read(request.image_key)
+        result = await attendance.take_photo_attendance(
+            class_id, request.image_key, data, session_date=request.session_date
+        )
+    except ObjectNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ImageDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+    except (AttendanceQueueFullError, AttendanceWriteError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return ClassPhotoAttendanceResponse(**asdict(result))
+
+
+@router.post(
+    "/classes/{class_id}/marks",
+    response_model=AttendanceMarksResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(require_class_instructor_or_admin)],
+)
+async def mark_attendance(
+    class_id: UUID,
+    request: AttendanceMarksRequest,
+    attendance: AttendanceService = Depends(get_attendance_service),
+) -> AttendanceMarksResponse:
+    """Record students' attendance for a session by hand.
+
+    Marks are queued and written in bulk shortly after; marking a student
+    again for the same session replaces the earlier mark. Only the class's
+    instructor or an admin may mark attendance, and only of the class's
+    students.
+    """
+    try:
+        queued = await attendance.mark_students(
+            class_id,
+            [(mark.student_id, mark.status) for mark in request.marks],
+            session_date=request.session_date,
+        )
+    except UnknownStudentsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+    except (AttendanceQueueFullError, AttendanceWriteError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return AttendanceMarksResponse(queued=queued)
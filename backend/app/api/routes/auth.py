@@ -1,6 +1,10 @@
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
+from app.api.deps import get_auth_service, get_current_user, require_admin
+from app.core.config import get_settings
 from app.schemas.user import (
+    BulkSignupResponse,
+    CurrentUser,
     InstructorSignupRequest,
     InstructorSignupResponse,
     LoginRequest,
@@ -10,9 +14,16 @@ from app.schemas.user import (
 )
 from app.services.auth_service import (
     AuthService,
+    BulkSignupError,
     LoginError,
     RefreshError,
     SignupError,
+    parse_bulk_signup_csv,
+)
+from app.utils.validators import (
+    PayloadTooLargeError,
+    UploadValidationError,
+    validate_content_length,
 )
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -25,13 +36,12 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 )
 async def signup_instructor(
     request: InstructorSignupRequest,
+    auth_service: AuthService = Depends(get_auth_service),
 ) -> InstructorSignupResponse:
     """Sign up a new instructor.
 
     Creates an auth user, profile, and instructor record.
     """
-    auth_service = AuthService()
-
     try:
         return await auth_service.signup_instructor(request)
     except SignupError as e:
@@ -41,19 +51,73 @@ async def signup_instructor(
         )
 
 
+async def _read_csv_body(request: Request, max_bytes: int) -> str:
+    """Read a CSV request body of at most max_bytes."""
+    validate_content_length(request.headers.get("content-length"), max_bytes)
+    body = bytearray()
+    async for chunk in request.stream():
+        body += chunk
+        if len(body) > max_bytes:
+            raise PayloadTooLargeError(
+                f"Request body exceeds the limit of {max_bytes} bytes"
+            )
+    try:
+        return body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise UploadValidationError("CSV must be UTF-8 encoded") from None
+
+
+@router.post(
+    "/signup/bulk",
+    response_model=BulkSignupResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin)],
+)
+async def bulk_signup(
+    request: Request,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> BulkSignupResponse:
+    """Provision students and instructors from a CSV request body.
+
+    The header row names the columns: email, first_name, last_name and type
+    are required; password, bio, department and office_location optional.
+    Lines that fail are listed with their errors without stopping the rest.
+    Requires an admin role.
+    """
+    settings = get_settings()
+    try:
+        text = await _read_csv_body(request, settings.bulk_signup_max_bytes)
+        rows, failures = parse_bulk_signup_csv(text, settings.bulk_signup_max_rows)
+    except PayloadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=str(e),
+        )
+    except (UploadValidationError, BulkSignupError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+
+    result = await auth_service.bulk_signup(rows)
+    result.failed = sorted([*failures, *result.failed], key=lambda f: f.line)
+    return result
+
+
 @router.post(
     "/login",
     response_model=LoginResponse,
     status_code=status.HTTP_200_OK,
 )
-async def login(request: LoginRequest) -> LoginResponse:
+async def login(
+    request: LoginRequest,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> LoginResponse:
     """Log in a user with email and password.
 
     Returns access and refresh tokens along with user profile data.
     Works for both students and instructors.
     """
-    auth_service = AuthService()
-
     try:
         return await auth_service.login(request)
     except LoginError as e:
@@ -68,13 +132,14 @@ async def login(request: LoginRequest) -> LoginResponse:
     response_model=RefreshResponse,
     status_code=status.HTTP_200_OK,
 )
-async def refresh(request: RefreshRequest) -> RefreshResponse:
+async def refresh(
+    request: RefreshRequest,
+    auth_service: AuthService = Depends(get_auth_service),
+) -> RefreshResponse:
     """Refresh an access token using a refresh token.
 
     Returns new access and refresh tokens.
     """
-    auth_service = AuthService()
-
     try:
         return await auth_service.refresh_token(request)
     except RefreshError as e:
@@ -82,3 +147,13 @@ async def refresh(request: RefreshRequest) -> RefreshResponse:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=str(e),
         )
+
+
+@router.get(
+    "/me",
+    response_model=CurrentUser,
+    status_code=status.HTTP_200_OK,
+)
+async def me(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
+    """Return the user identified by the bearer access token."""
+    return current_user
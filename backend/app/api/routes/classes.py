@@ -0,0 +1,93 @@
+from dataclasses import asdict
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+
+from app.api.deps import (
+    get_class_service,
+    get_current_user,
+    require_class_instructor_or_admin,
+)
+from app.schemas.classes import ClassListResponse, RosterResponse
+from app.services.class_service import ClassQueryError, ClassService
+from app.utils.etag import json_response_with_etag
+from app.utils.pagination import PaginationError, parse_fields
+
+router = APIRouter(prefix="/classes", tags=["classes"])
+
+
+@router.get(
+    "",
+    response_model=ClassListResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_user)],
+)
+async def list_classes(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    instructor_id: UUID | None = None,
+    if_none_match: str | None = Header(None),
+    classes: ClassService = Depends(get_class_service),
+) -> Response:
+    """List classes a page at a time.
+
+    Responses carry an ETag; a request whose If-None-Match matches gets an
+    empty 304.
+    """
+    try:
+        page = await classes.list_classes(
+            limit,
+            cursor=cursor,
+            fields=parse_fields(fields),
+            instructor_id=instructor_id,
+        )
+    except PaginationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+    except ClassQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return json_response_with_etag(asdict(page), if_none_match)
+
+
+@router.get(
+    "/{class_id}/students",
+    response_model=RosterResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_class_instructor_or_admin)],
+)
+async def list_class_students(
+    class_id: UUID,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    if_none_match: str | None = Header(None),
+    classes: ClassService = Depends(get_class_service),
+) -> Response:
+    """List a class's roster a page at a time.
+
+    Only the class's instructor or an admin may read it. Responses carry
+    an ETag; a request whose If-None-Match matches gets an empty 304.
+    """
+    try:
+        page = await classes.list_students(
+            class_id, limit, cursor=cursor, fields=parse_fields(fields)
+        )
+    except PaginationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+    except ClassQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return json_response_with_etag(asdict(page), if_none_match)
@@ -0,0 +1,62 @@
+import asyncio
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import PlainTextResponse
+
+from app.api.deps import get_sampling_profiler, require_admin
+from app.core.config import get_settings
+from app.core.profiling import ProfilerBusyError, SamplingProfiler
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@router.get(
+    "/profile",
+    response_class=PlainTextResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin)],
+)
+async def profile(
+    seconds: float = Query(default=10.0, gt=0),
+    interval_ms: float | None = Query(default=None, ge=1),
+    profiler: SamplingProfiler = Depends(get_sampling_profiler),
+) -> PlainTextResponse:
+    """Sample this worker's stacks for a while and return them collapsed.
+
+    Every thread is sampled, the event loop included, while the worker
+    keeps serving. The response feeds flamegraph.pl, speedscope or inferno
+    as is. Off unless PROFILER_ENABLED is set; requires an admin role.
+    """
+    settings = get_settings()
+    if not settings.profiler_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profiler is disabled",
+        )
+    if seconds > profiler.max_duration_seconds:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=f"Profiles are limited to {profiler.max_duration_seconds:g} s",
+        )
+
+    try:
+        result = await asyncio.to_thread(
+            profiler.profile,
+            seconds,
+            interval_ms / 1000 if interval_ms is not None else None,
+        )
+    except ProfilerBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e),
+        )
+
+    taken_at = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return PlainTextResponse(
+        result.collapsed(),
+        headers={
+            "Content-Disposition": f'attachment; filename="profile-{taken_at}.txt"',
+            "X-Profile-Samples": str(result.samples),
+        },
+    )
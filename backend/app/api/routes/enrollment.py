@@ -0,0 +1,112 @@
+from collections.abc import AsyncIterator
+from concurrent.futures import Executor
+from dataclasses import asdict
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from starlette.datastructures import UploadFile
+
+from app.api.deps import (
+    get_enrollment_executor,
+    get_enrollment_pipeline,
+    require_instructor_or_admin,
+)
+from app.core.config import get_settings
+from app.schemas.enrollment import BatchEnrollmentResponse
+from app.services.enrollment_service import BatchEnrollmentPipeline, StudentPhotos
+from app.utils.validators import (
+    ImageStreamValidator,
+    PayloadTooLargeError,
+    UnsupportedMediaTypeError,
+    validate_image_content_type,
+)
+
+router = APIRouter(prefix="/enrollment", tags=["enrollment"])
+
+# Bytes of a spooled photo read at a time while validating it
+VALIDATION_CHUNK_BYTES = 64 * 1024
+
+
+async def _validate_photo(file: UploadFile, max_bytes: int) -> None:
+    """Check a spooled photo part is an accepted image within the size limit.
+
+    The part is read back in chunks, so an oversize one is rejected without
+    loading it whole, then rewound for the pipeline.
+
+    Raises:
+        PayloadTooLargeError: If the photo is over max_bytes.
+        UnsupportedMediaTypeError: If the photo is not an accepted image.
+    """
+    validate_image_content_type(file.content_type)
+    validator = ImageStreamValidator(max_bytes)
+    while chunk := await file.read(VALIDATION_CHUNK_BYTES):
+        validator.feed(chunk)
+    validator.finish()
+    await file.seek(0)
+
+
+@router.post(
+    "/batches/{batch_id}",
+    response_model=BatchEnrollmentResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_instructor_or_admin)],
+)
+async def enroll_batch(
+    batch_id: UUID,
+    request: Request,
+    pipeline: BatchEnrollmentPipeline = Depends(get_enrollment_pipeline),
+    executor: Executor = Depends(get_enrollment_executor),
+) -> BatchEnrollmentResponse:
+    """Enroll many students from a multipart upload of their photos.
+
+    Each file part is named after the student id it belongs to; a student
+    may have several parts. Posting the same batch id again resumes the
+    batch, skipping students it already enrolled. Every photo must be a
+    JPEG, PNG or WebP image within the image size limit; otherwise the
+    request is rejected before anyone is enrolled. Only instructors and
+    admins may enroll.
+    """
+    settings = get_settings()
+    form = await request.form(max_files=settings.enrollment_max_photos_per_request)
+
+    uploads: dict[UUID, list[UploadFile]] = {}
+    try:
+        for name, value in form.multi_items():
+            if not isinstance(value, UploadFile):
+                continue
+            try:
+                student_id = UUID(name)
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    detail=f"Photo field name is not a student id: {name}",
+                )
+            try:
+                await _validate_photo(value, settings.image_max_bytes)
+            except PayloadTooLargeError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                    detail=f"Photo for student {student_id}: {e}",
+                )
+            except UnsupportedMediaTypeError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                    detail=f"Photo for student {student_id}: {e}",
+                )
+            uploads.setdefault(student_id, []).append(value)
+
+        async def students() -> AsyncIterator[StudentPhotos]:
+            # Photos are read from the spooled upload only when submitted
+            for student_id, files in uploads.items():
+                photos = [await file.read() for file in files]
+                yield StudentPhotos(student_id=student_id, photos=photos)
+
+        report = await pipeline.run(batch_id, students(), executor=executor)
+    finally:
+        await form.close()
+
+    return BatchEnrollmentResponse(
+        **asdict(report),
+        photos_per_second=report.photos_per_second,
+        photos_per_second_per_core=report.photos_per_second_per_core,
+    )
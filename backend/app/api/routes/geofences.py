@@ -0,0 +1,57 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import get_current_user, get_geofence_service
+from app.schemas.geofence import (
+    CheckInVerdict,
+    GeofenceVerifyRequest,
+    GeofenceVerifyResponse,
+)
+from app.services.geofence_service import GeofenceNotFoundError, GeofenceService
+
+router = APIRouter(prefix="/geofences", tags=["geofences"])
+
+
+@router.post(
+    "/verify",
+    response_model=GeofenceVerifyResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(get_current_user)],
+)
+async def verify_check_ins(
+    request: GeofenceVerifyRequest,
+    geofences: GeofenceService = Depends(get_geofence_service),
+) -> GeofenceVerifyResponse:
+    """Check that each check-in's GPS fix is inside its class's building.
+
+    The whole batch is checked in one vectorized pass.
+    """
+    check_ins = request.check_ins
+    await geofences.ensure_loaded()
+    try:
+        verdicts = geofences.verify_check_ins(
+            [check_in.class_id for check_in in check_ins],
+            [check_in.latitude for check_in in check_ins],
+            [check_in.longitude for check_in in check_ins],
+        )
+    except GeofenceNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+
+    return GeofenceVerifyResponse(
+        results=[
+            CheckInVerdict(
+                class_id=check_in.class_id,
+                inside=inside,
+                accepted=accepted,
+                distance_m=distance,
+            )
+            for check_in, inside, accepted, distance in zip(
+                check_ins,
+                verdicts.inside.tolist(),
+                verdicts.accepted.tolist(),
+                verdicts.distance_m.tolist(),
+            )
+        ]
+    )
@@ -0,0 +1,117 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from app.api.deps import (
+    get_attendance_writer,
+    get_event_loop_monitor,
+    get_profile_cache,
+    get_recognition_service,
+)
+from app.core.profiling import EventLoopLagMonitor
+from app.db.supabase import get_supabase_pool
+from app.schemas.health import (
+    AttendanceWriterStatsResponse,
+    EventLoopLagStatsResponse,
+    PoolStatsResponse,
+    ProfileCacheStatsResponse,
+    RecognitionCacheStatsResponse,
+)
+from app.services.attendance_service import AttendanceWriter
+from app.services.profile_cache import ProfileCache
+from app.services.recognition_service import RecognitionService
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("", status_code=status.HTTP_200_OK)
+async def health() -> dict[str, str]:
+    """Liveness check."""
+    return {"status": "ok"}
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStatsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def pool_stats() -> PoolStatsResponse:
+    """Report usage of this worker's shared Supabase connection pool.
+
+    Use saturation, queued requests and connection reuse to size the
+    pool per worker.
+    """
+    pool = get_supabase_pool()
+    if pool is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Connection pool is not open",
+        )
+
+    stats = pool.stats()
+    return PoolStatsResponse(
+        **asdict(stats),
+        saturation=stats.saturation,
+        connection_reuse_ratio=stats.connection_reuse_ratio,
+    )
+
+
+@router.get(
+    "/recognition-cache",
+    response_model=RecognitionCacheStatsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def recognition_cache_stats(
+    recognition: RecognitionService = Depends(get_recognition_service),
+) -> RecognitionCacheStatsResponse:
+    """Report hits, misses and evictions of this worker's result cache."""
+    stats = recognition.results.stats()
+    return RecognitionCacheStatsResponse(**asdict(stats), hit_ratio=stats.hit_ratio)
+
+
+@router.get(
+    "/attendance-writer",
+    response_model=AttendanceWriterStatsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def attendance_writer_stats(
+    writer: AttendanceWriter = Depends(get_attendance_writer),
+) -> AttendanceWriterStatsResponse:
+    """Report the backlog and flush counters of the attendance writer.
+
+    A growing backlog or failed flushes mean marks are queued faster than
+    the database accepts them.
+    """
+    return AttendanceWriterStatsResponse(**asdict(writer.stats()))
+
+
+@router.get(
+    "/profile-cache",
+    response_model=ProfileCacheStatsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def profile_cache_stats(
+    profiles: ProfileCache = Depends(get_profile_cache),
+) -> ProfileCacheStatsResponse:
+    """Report hits and misses of this worker's profile cache.
+
+    Every miss is a profiles query made on login or profile lookup.
+    """
+    stats = profiles.stats()
+    return ProfileCacheStatsResponse(**asdict(stats), hit_ratio=stats.hit_ratio)
+
+
+@router.get(
+    "/event-loop",
+    response_model=EventLoopLagStatsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def event_loop_stats(
+    monitor: EventLoopLagMonitor = Depends(get_event_loop_monitor),
+) -> EventLoopLagStatsResponse:
+    """Report how often this worker's event loop was blocked.
+
+    Stalls are wake-ups later than the threshold; the stack of the code
+    blocking the loop is logged as it happens.
+    """
+    return EventLoopLagStatsResponse(**asdict(monitor.stats()))
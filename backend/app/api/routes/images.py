@@ -0,0 +1,218 @@
+import asyncio
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, status
+
+from app.api.deps import (
+    check_class_instructor_or_admin,
+    get_attendance_service,
+    get_class_service,
+    get_current_user,
+    get_embedding_store,
+    get_recognition_batcher,
+    get_recognition_service,
+    get_storage_service,
+)
+from app.core.config import get_settings
+from app.core.metrics import span
+from app.db.embedding_store import EmbeddingStore
+from app.schemas.image import (
+    IMAGE_KEY_PATTERN,
+    ImageRecognitionRequest,
+    ImageRecognitionResponse,
+    ImageUploadResponse,
+    MatchResponse,
+    UploadedImage,
+)
+from app.schemas.user import CurrentUser
+from app.services.attendance_service import AttendanceService
+from app.services.class_service import ClassService
+from app.services.recognition_service import (
+    GalleryNotFoundError,
+    ImageProbe,
+    Match,
+    RecognitionService,
+)
+from app.services.storage_service import (
+    ImageUpload,
+    ObjectNotFoundError,
+    StorageService,
+    StoredImage,
+)
+from app.utils.batching import MicroBatcher
+from app.utils.image_utils import WORKING_MAX_SIDE, ImageDecodeError, decode_image
+from app.utils.multipart import MultipartError, PartEvent, iter_multipart
+from app.utils.validators import (
+    ImageStreamValidator,
+    PayloadTooLargeError,
+    UnsupportedMediaTypeError,
+    UploadValidationError,
+    validate_content_length,
+    validate_image_content_type,
+)
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+
+async def _stream_images(
+    request: Request, storage: StorageService
+) -> list[UploadedImage]:
+    """Stream every file part of the request body into storage.
+
+    The batch is all or nothing: if any part is rejected, uploads already
+    written by the request are discarded.
+    """
+    settings = get_settings()
+    validate_content_length(
+        request.headers.get("content-length"),
+        settings.image_upload_max_request_bytes,
+    )
+
+    pending: list[tuple[str | None, ImageUpload, ImageStreamValidator]] = []
+    committed: list[StoredImage] = []
+    upload: ImageUpload | None = None
+    validator: ImageStreamValidator | None = None
+    received = 0
+    try:
+        async for event, part, data in iter_multipart(
+            request.headers.get("content-type"),
+            request.stream(),
+            max_parts=settings.image_upload_max_files,
+        ):
+            received += len(data)
+            if received > settings.image_upload_max_request_bytes:
+                raise PayloadTooLargeError("Request body exceeds the upload limit")
+            if part.filename is None:
+                # Non-file form fields are not used
+                continue
+
+            if event is PartEvent.START:
+                validate_image_content_type(part.content_type)
+                validator = ImageStreamValidator(settings.image_max_bytes)
+                upload = storage.open_upload()
+                pending.append((part.filename, upload, validator))
+            elif event is PartEvent.DATA:
+                validator.feed(data)
+                upload.write(data)
+            else:
+                validator.finish()
+
+        images = []
+        for filename, upload, validator in pending:
+            stored = await storage.commit(upload, validator.content_type)
+            committed.append(stored)
+            images.append(UploadedImage(filename=filename, **asdict(stored)))
+        return images
+    except BaseException:
+        for _, upload, _ in pending:
+            upload.abort()
+        for stored in committed:
+            await storage.release(stored.key)
+        raise
+
+
+@router.post(
+    "",
+    response_model=ImageUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(get_current_user)],
+)
+async def upload_images(
+    request: Request,
+    storage: StorageService = Depends(get_storage_service),
+) -> ImageUploadResponse:
+    """Upload a batch of photos as multipart/form-data file parts.
+
+    The body is streamed to storage in chunks as it arrives, hashing each
+    photo on the fly. Photos are stored by content hash, so re-uploading
+    identical bytes stores nothing new. Oversize payloads and parts that are
+    not JPEG, PNG or WebP images are rejected as soon as they are detected,
+    without reading the rest of the body.
+    """
+    try:
+        images = await _stream_images(request, storage)
+    except PayloadTooLargeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+            detail=str(e),
+        )
+    except UnsupportedMediaTypeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=str(e),
+        )
+    except (UploadValidationError, MultipartError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+
+    return ImageUploadResponse(images=images)
+
+
+@router.post(
+    "/{key}/recognition",
+    response_model=ImageRecognitionResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def recognize_image(
+    request: ImageRecognitionRequest,
+    key: str = Path(pattern=IMAGE_KEY_PATTERN),
+    current_user: CurrentUser = Depends(get_current_user),
+    classes: ClassService = Depends(get_class_service),
+    storage: StorageService = Depends(get_storage_service),
+    attendance: AttendanceService = Depends(get_attendance_service),
+    recognition: RecognitionService = Depends(get_recognition_service),
+    store: EmbeddingStore = Depends(get_embedding_store),
+    batcher: MicroBatcher[ImageProbe, list[list[Match]]] = Depends(
+        get_recognition_batcher
+    ),
+) -> ImageRecognitionResponse:
+    """Match the faces in a stored photo against a class's gallery.
+
+    A photo already recognized against the class's current gallery is
+    answered from the result cache without being read or decoded. Other
+    photos are decoded, then embedded and matched in a micro-batch with
+    concurrent requests. The class's gallery is loaded first if this
+    worker has none or the enrolled faces or roster changed since. Only
+    the class's instructor or an admin may recognize photos against it.
+    """
+    await check_class_instructor_or_admin(request.class_id, current_user, classes)
+    try:
+        await attendance.ensure_gallery(request.class_id)
+        results = recognition.cached_image_result(
+            request.class_id, key, store, request.top_k
+        )
+        cached = results is not None
+        if results is None:
+            data = await storage.read(key)
+            with span("decode"):
+                image = await asyncio.to_thread(
+                    decode_image, data, max_side=WORKING_MAX_SIDE
+                )
+            # Waiting for the batch to fill, then detecting, embedding and
+            # matching along with the rest of the batch
+            with span("batch"):
+                results = await batcher.submit(
+                    ImageProbe(request.class_id, key, image, top_k=request.top_k)
+                )
+    except (GalleryNotFoundError, ObjectNotFoundError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ImageDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+
+    return ImageRecognitionResponse(
+        key=key,
+        class_id=request.class_id,
+        faces=[
+            [MatchResponse(student_id=m.student_id, score=m.score) for m in face]
+            for face in results
+        ],
+        cached=cached,
+    )
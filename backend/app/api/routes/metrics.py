@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, status
+from fastapi.responses import Response
+
+from app.core.metrics import PROMETHEUS_CONTENT_TYPE, MetricsRegistry, get_metrics
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", status_code=status.HTTP_200_OK)
+async def metrics(registry: MetricsRegistry = Depends(get_metrics)) -> Response:
+    """Export this worker's latency histograms for Prometheus to scrape.
+
+    Each worker keeps its own histograms; scrape every worker, or sum the
+    series across them, to see the whole deployment.
+    """
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
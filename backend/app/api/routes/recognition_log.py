@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.api.deps import (
+    get_attendance_service,
+    get_recognition_log_store,
+    get_storage_service,
+    require_admin,
+)
+from app.db.recognition_log import RecognitionLogError, RecognitionLogStore
+from app.models.recognition_log import RecognitionCandidate
+from app.schemas.recognition_log import (
+    IdentifyFacesRequest,
+    IdentifyFacesResponse,
+    RecognitionLogResponse,
+)
+from app.services.attendance_service import AttendanceService
+from app.services.storage_service import ObjectNotFoundError, StorageService
+from app.utils.image_utils import ImageDecodeError
+
+router = APIRouter(prefix="/recognition-log", tags=["recognition-log"])
+
+
+@router.get(
+    "",
+    response_model=RecognitionLogResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin)],
+)
+async def read_recognition_log(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    student_id: UUID | None = None,
+    class_id: UUID | None = None,
+    limit: int = Query(default=100, ge=1, le=1000),
+    store: RecognitionLogStore = Depends(get_recognition_log_store),
+) -> RecognitionLogResponse:
+    """Read logged recognition attempts, oldest first.
+
+    A student matches the faces assigned to them and those listing them as
+    a candidate. Entries still queued in a worker's memory are not shown.
+    Requires an admin role.
+    """
+    try:
+        entries = await asyncio.to_thread(
+            store.query, start, end, student_id, class_id, limit
+        )
+    except RecognitionLogError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return RecognitionLogResponse(entries=entries)
+
+
+@router.post(
+    "/identify",
+    response_model=IdentifyFacesResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin)],
+)
+async def identify_faces(
+    request: IdentifyFacesRequest,
+    storage: StorageService = Depends(get_storage_service),
+    attendance: AttendanceService = Depends(get_attendance_service),
+) -> IdentifyFacesResponse:
+    """Find who the faces in a stored photo are across the whole campus.
+
+    Pass a logged entry's ``image_sha256`` to see who a face that matched
+    nobody in its class might be. Every enrolled student is searched
+    through the approximate institution index. Requires an admin role.
+    """
+    try:
+        data = await storage.read(request.image_key)
+        faces = await asyncio.to_thread(
+            attendance.identify_faces, data, request.top_k
+        )
+    except ObjectNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ImageDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+
+    return IdentifyFacesResponse(
+        image_sha256=request.image_key,
+        faces=[
+            [RecognitionCandidate(student_id=m.student_id, score=m.score) for m in face]
+            for face in faces
+        ],
+    )
@@ -0,0 +1,165 @@
+from dataclasses import asdict
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import (
+    get_report_service,
+    require_admin,
+    require_class_instructor_or_admin,
+    require_classes_instructor_or_admin,
+    require_student_or_admin,
+)
+from app.schemas.report import (
+    ClassAttendanceReportResponse,
+    ExportFormat,
+    RebuildTotalsResponse,
+    StudentAttendanceReportResponse,
+)
+from app.services.report_service import (
+    ATTENDANCE_EXPORT_COLUMNS,
+    EXPORT_MAX_CLASSES,
+    ReportQueryError,
+    ReportService,
+)
+from app.utils.export import (
+    CsvEncoder,
+    PageEncoder,
+    ParquetEncoder,
+    encode_pages,
+    prefetch_first_page,
+)
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+@router.get(
+    "/classes/{class_id}/attendance",
+    response_model=ClassAttendanceReportResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_class_instructor_or_admin)],
+)
+async def class_attendance_report(
+    class_id: UUID,
+    reports: ReportService = Depends(get_report_service),
+) -> ClassAttendanceReportResponse:
+    """Report the attendance of a class's students and sessions.
+
+    Only the class's instructor or an admin may read it.
+    """
+    try:
+        report = await reports.class_report(class_id)
+    except ReportQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return ClassAttendanceReportResponse(**asdict(report))
+
+
+@router.get(
+    "/students/{student_id}/attendance",
+    response_model=StudentAttendanceReportResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_student_or_admin)],
+)
+async def student_attendance_report(
+    student_id: UUID,
+    reports: ReportService = Depends(get_report_service),
+) -> StudentAttendanceReportResponse:
+    """Report a student's attendance in each of their classes.
+
+    Only the student or an admin may read it.
+    """
+    try:
+        report = await reports.student_report(student_id)
+    except ReportQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return StudentAttendanceReportResponse(**asdict(report))
+
+
+@router.post(
+    "/attendance/rebuild",
+    response_model=RebuildTotalsResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin)],
+)
+async def rebuild_attendance_totals(
+    class_id: UUID | None = None,
+    reports: ReportService = Depends(get_report_service),
+) -> RebuildTotalsResponse:
+    """Recompute attendance totals from the attendance records.
+
+    Totals are kept up to date as marks are written; use this to repair
+    them, for one class or for every class. Attendance writes wait until
+    the rebuild finishes, so only admins may start one.
+    """
+    try:
+        rebuilt = await reports.rebuild_totals(class_id)
+    except ReportQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return RebuildTotalsResponse(rebuilt=rebuilt)
+
+
+@router.get(
+    "/attendance/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_classes_instructor_or_admin)],
+)
+async def export_attendance(
+    class_id: list[UUID] = Query(min_length=1, max_length=EXPORT_MAX_CLASSES),
+    start: date | None = None,
+    end: date | None = None,
+    format: ExportFormat = ExportFormat.CSV,
+    reports: ReportService = Depends(get_report_service),
+) -> StreamingResponse:
+    """Download the attendance records of several classes as CSV or Parquet.
+
+    The file is streamed while the records are read page by page, so an
+    export of any size uses the memory of one page. Pass ``class_id`` once
+    per class, for up to ``EXPORT_MAX_CLASSES`` classes. Only an admin or
+    the instructor of every class may export.
+    """
+    encoder: PageEncoder
+    try:
+        if format is ExportFormat.PARQUET:
+            encoder = ParquetEncoder(ATTENDANCE_EXPORT_COLUMNS)
+        else:
+            encoder = CsvEncoder(ATTENDANCE_EXPORT_COLUMNS)
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=str(e),
+        )
+
+    try:
+        pages = await prefetch_first_page(
+            reports.export_attendance(class_id, start=start, end=end)
+        )
+    except ReportQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return StreamingResponse(
+        encode_pages(pages, encoder),
+        media_type=encoder.media_type,
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="attendance.{encoder.extension}"'
+            )
+        },
+    )
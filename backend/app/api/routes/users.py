@@ -0,0 +1,124 @@
+from dataclasses import asdict
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+
+from app.api.deps import (
+    get_auth_service,
+    get_current_user,
+    get_user_service,
+    require_admin,
+)
+from app.models.instructor import ProfileType
+from app.schemas.user import (
+    CurrentUser,
+    ProfileResponse,
+    ProfileUpdateRequest,
+    UserListResponse,
+)
+from app.services.auth_service import (
+    AuthService,
+    ProfileError,
+    ProfileNotFoundError,
+)
+from app.services.user_service import UserQueryError, UserService
+from app.utils.etag import json_response_with_etag
+from app.utils.pagination import PaginationError, parse_fields
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+@router.get(
+    "",
+    response_model=UserListResponse,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(require_admin)],
+)
+async def list_users(
+    limit: int = Query(100, ge=1, le=500),
+    cursor: str | None = None,
+    fields: str | None = Query(None, description="Comma-separated fields to return"),
+    type: ProfileType | None = None,
+    if_none_match: str | None = Header(None),
+    users: UserService = Depends(get_user_service),
+) -> Response:
+    """List user profiles a page at a time; ``type=student`` lists students.
+
+    Admins only. Responses carry an ETag; a request whose If-None-Match
+    matches gets an empty 304.
+    """
+    try:
+        page = await users.list_users(
+            limit, cursor=cursor, fields=parse_fields(fields), profile_type=type
+        )
+    except PaginationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail=str(e),
+        )
+    except UserQueryError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return json_response_with_etag(asdict(page), if_none_match)
+
+
+@router.get(
+    "/me",
+    response_model=ProfileResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_my_profile(
+    current_user: CurrentUser = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> ProfileResponse:
+    """Get the current user's name and profile type.
+
+    Served from the profile cache, so it normally costs no database query.
+    """
+    try:
+        profile = await auth_service.get_profile(current_user.user_id)
+    except ProfileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ProfileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return ProfileResponse(
+        user_id=current_user.user_id, email=current_user.email, **asdict(profile)
+    )
+
+
+@router.patch(
+    "/me",
+    response_model=ProfileResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def update_my_profile(
+    request: ProfileUpdateRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    auth_service: AuthService = Depends(get_auth_service),
+) -> ProfileResponse:
+    """Update the current user's name or bio."""
+    try:
+        profile = await auth_service.update_profile(current_user.user_id, request)
+    except ProfileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e),
+        )
+    except ProfileError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        )
+
+    return ProfileResponse(
+        user_id=current_user.user_id, email=current_user.email, **asdict(profile)
+    )
@@ -16,6 +16,171 @@ class Settings(BaseSettings):
     supabase_url: str
     supabase_service_key: str
 
+    # Size of the thread pool used to offload calls made with the sync
+    # Supabase client so they never block the event loop
+    supabase_sync_max_workers: int = 16
+
+    # Shared HTTP connection pool used by the async Supabase client
+    supabase_http_max_connections: int = 100
+    supabase_http_max_keepalive: int = 20
+    supabase_http_keepalive_expiry: float = 30.0
+    supabase_http2: bool = True
+    supabase_http_timeout: float = 10.0
+
+    # Reads that can return any number of rows page through PostgREST this
+    # many rows at a time; keep it at or below the max-rows limit (1000 on
+    # Supabase), which otherwise truncates the result silently
+    supabase_page_size: int = 1000
+
+    # Access token verification
+    supabase_jwt_secret: str | None = None
+    jwt_audience: str = "authenticated"
+    jwks_cache_ttl_seconds: int = 600
+    jwks_min_refresh_seconds: int = 30
+    token_cache_size: int = 1024
+
+    # Users' names and profile types cached per worker, and optionally in a
+    # store shared by every worker ("redis", needs redis installed)
+    profile_cache_size: int = 10_000
+    profile_cache_ttl_seconds: float = 300.0
+    profile_cache_shared_store: str | None = None
+    profile_cache_redis_url: str = "redis://localhost:6379/0"
+
+    # Roles allowed to use admin endpoints, read from the access token's
+    # app_metadata.role claim; app_metadata can only be set with the service
+    # key, so users cannot grant themselves a role
+    admin_roles: list[str] = ["admin"]
+
+    # Auth users of failed signups are deleted in the background, retried
+    # with exponential backoff until max_attempts
+    signup_cleanup_max_attempts: int = 10
+    signup_cleanup_base_delay_seconds: float = 1.0
+    signup_cleanup_max_delay_seconds: float = 300.0
+
+    # Bulk signup from a CSV: auth users are created this many at a time and
+    # profiles written one batch per database call
+    bulk_signup_max_rows: int = 2000
+    bulk_signup_max_bytes: int = 2 * 1024 * 1024
+    bulk_signup_batch_size: int = 200
+    bulk_signup_auth_concurrency: int = 8
+
+    # Face recognition
+    face_match_threshold: float = 0.5
+    face_embedding_dim: int = 512
+
+    # Recognition results cached for repeated photos
+    recognition_result_cache_size: int = 4096
+    recognition_result_cache_ttl_seconds: int = 3600
+    recognition_result_cache_max_bytes: int = 32 * 1024 * 1024
+
+    # Concurrent recognition requests are coalesced into batches
+    recognition_batch_max_size: int = 32
+    recognition_batch_max_wait_ms: float = 5.0
+
+    # Class galleries are reloaded once the embedding store changes, and
+    # their rosters read again after this long
+    gallery_roster_ttl_seconds: float = 300.0
+
+    # Classroom photo attendance; photos are decoded at up to class_photo_max_side
+    # and faces detected on overlapping tiles so small faces are not lost
+    class_photo_max_side: int = 4096
+    face_detection_tile_size: int = 1280
+    face_detection_tile_overlap: int = 256
+    class_photo_max_faces: int = 300
+    class_photo_latency_budget_ms: float = 2000.0
+
+    # Write-behind attendance writer: marks are queued and upserted in bulk
+    # once a batch fills up or the flush interval passes
+    attendance_write_batch_size: int = 500
+    attendance_flush_interval_ms: float = 500.0
+    attendance_max_pending: int = 10_000
+    attendance_enqueue_timeout_seconds: float = 5.0
+
+    # Audit log of every recognition attempt: appended by each worker under
+    # recognition_log_dir in batches, then rolled into compressed segments
+    # once a file holds segment_rows entries or the roll interval passes
+    recognition_log_enabled: bool = True
+    recognition_log_dir: str = "data/recognition_log"
+    recognition_log_top_k: int = 5
+    recognition_log_batch_size: int = 1000
+    recognition_log_flush_interval_ms: float = 1000.0
+    recognition_log_max_pending: int = 100_000
+    recognition_log_segment_rows: int = 100_000
+    recognition_log_roll_interval_seconds: float = 3600.0
+
+    # Report exports page through the database this many rows at a time;
+    # keep it at or below the PostgREST max-rows limit (1000 on Supabase)
+    report_export_page_size: int = 1000
+
+    # Geofences are indexed on a grid of cells this many degrees wide, and
+    # loaded again from the database after geofence_reload_seconds
+    geofence_grid_cell_size_deg: float = 0.002
+    geofence_reload_seconds: float = 300.0
+
+    # Institution-wide approximate nearest neighbour index
+    institution_index_path: str | None = None
+    institution_index_lists: int = 256
+    institution_index_probe: int = 8
+
+    # Memory-mapped embedding store shared by the workers on a host
+    embedding_store_path: str = "data/embeddings.bin"
+    embedding_store_compact_ratio: float = 0.25
+    embedding_store_compact_interval_seconds: int = 3600
+
+    # Face engine: "fake" (deterministic, no model) or "onnx" (SCRFD detector
+    # and ArcFace embedder on ONNX Runtime; needs onnxruntime installed).
+    # Intra-op threads default to one per CPU core.
+    face_engine: str = "fake"
+    face_detector_model_path: str = "models/det_10g.onnx"
+    face_embedder_model_path: str = "models/w600k_r50.onnx"
+    face_detection_size: int = 640
+    face_detection_score_threshold: float = 0.5
+    onnx_intra_op_threads: int | None = None
+    onnx_inter_op_threads: int = 1
+    face_engine_warmup: bool = True
+
+    # Opt-in pre-warm before the worker accepts traffic: build the
+    # institution index and load the galleries of the classes that met on
+    # today's weekday in the last prewarm_gallery_weeks weeks
+    prewarm_enabled: bool = False
+    prewarm_gallery_weeks: int = 4
+
+    # Bulk enrollment; workers defaults to one process per CPU core
+    enrollment_workers: int | None = None
+    enrollment_write_batch_size: int = 256
+    enrollment_checkpoint_dir: str = "data/enrollment"
+    enrollment_max_photos_per_request: int = 20000
+
+    # Content-addressed image storage: "local" (filesystem) or "supabase";
+    # uploads are staged under storage_root either way
+    storage_backend: str = "local"
+    storage_root: str = "data/storage"
+    storage_bucket: str = "images"
+
+    # Image uploads, streamed straight to storage
+    image_max_bytes: int = 20 * 1024 * 1024
+    image_upload_max_files: int = 100
+    image_upload_max_request_bytes: int = 512 * 1024 * 1024
+
+    # Request and span latency histograms are served at /metrics; the
+    # Server-Timing header exposes per-request stage timings to clients
+    server_timing_enabled: bool = False
+
+    # Event loop lag monitor: a wake-up later than the threshold counts as a
+    # stall, and the stack of the code blocking the loop is logged
+    event_loop_monitor_enabled: bool = True
+    event_loop_lag_threshold_ms: float = 100.0
+
+    # Sampling profiler for admins at /debug/profile; off unless enabled
+    profiler_enabled: bool = False
+    profiler_interval_ms: float = 10.0
+    profiler_max_seconds: float = 60.0
+
+    @property
+    def supabase_auth_url(self) -> str:
+        """Base URL of the Supabase Auth API, also the token issuer."""
+        return f"{self.supabase_url.rstrip('/')}/auth/v1"
+
 
 @lru_cache
 def get_settings() -> Settings:
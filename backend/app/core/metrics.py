@@ -0,0 +1,238 @@
+import bisect
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import get_settings
+
+# Upper bounds, in seconds, of the latency histogram buckets: fine below
+# 100 ms where most requests land, coarse up to the slowest class photos
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.075,
+    0.1,
+    0.25,
+    0.5,
+    0.75,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Spans timed while handling the current request, for its Server-Timing
+# header. Worker threads started with asyncio.to_thread share the list.
+_request_spans: ContextVar[list[tuple[str, float]] | None] = ContextVar(
+    "request_spans", default=None
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_float(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+class Histogram:
+    """Prometheus histogram of observations, one series per label set.
+
+    Safe to observe from worker threads.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...],
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: observations per bucket (the last one is +Inf), sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation.
+
+        Args:
+            value: The observed value, e.g. a duration in seconds.
+            label_values: One value per label name, in order.
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = ([0] * (len(self.buckets) + 1), [0.0])
+                self._series[label_values] = series
+            series[0][index] += 1
+            series[1][0] += value
+
+    def count(self, *label_values: str) -> int:
+        """Number of observations recorded for a label set."""
+        with self._lock:
+            series = self._series.get(label_values)
+            return sum(series[0]) if series is not None else 0
+
+    def render(self) -> list[str]:
+        """Render the histogram in the Prometheus text exposition format."""
+        with self._lock:
+            series = {
+                labels: (list(counts), total[0])
+                for labels, (counts, total) in self._series.items()
+            }
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        bounds = [*self.buckets, float("inf")]
+        for label_values, (counts, total) in sorted(series.items()):
+            labels = [
+                f'{name}="{_escape(value)}"'
+                for name, value in zip(self.label_names, label_values)
+            ]
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                bucket_labels = ",".join([*labels, f'le="{_format_float(bound)}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = "{" + ",".join(labels) + "}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {_format_float(total)}")
+            lines.append(f"{self.name}_count{suffix} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Request and span latency histograms of this worker."""
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.requests = Histogram(
+            "faceit_http_request_duration_seconds",
+            "Time spent handling HTTP requests, by route template.",
+            ("method", "route", "status"),
+            buckets,
+        )
+        self.spans = Histogram(
+            "faceit_span_duration_seconds",
+            "Time spent in instrumented stages, such as Supabase round-trips.",
+            ("span",),
+            buckets,
+        )
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = [*self.requests.render(), *self.spans.render()]
+        return "\n".join(lines) + "\n"
+
+
+@lru_cache
+def get_metrics() -> MetricsRegistry:
+    """Get this worker's metrics registry."""
+    return MetricsRegistry()
+
+
+def record_span(name: str, seconds: float) -> None:
+    """Record the duration of a stage already timed by the caller.
+
+    Args:
+        name: The stage, e.g. "detect"; a Server-Timing metric name, so
+            letters, digits, dots, dashes and underscores only.
+        seconds: How long the stage took.
+    """
+    get_metrics().spans.observe(seconds, name)
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((name, seconds))
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a block and record it as a span, whether or not it raises."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_span(name, time.perf_counter() - started)
+
+
+def server_timing(spans: list[tuple[str, float]], total_seconds: float) -> str:
+    """Format request spans as a Server-Timing header value.
+
+    Spans recorded several times, such as repeated Supabase calls, are
+    summed. Durations are in milliseconds.
+    """
+    durations: dict[str, float] = {}
+    for name, seconds in spans:
+        durations[name] = durations.get(name, 0.0) + seconds
+    durations["total"] = total_seconds
+    return ", ".join(
+        f"{name};dur={seconds * 1000:.1f}" for name, seconds in durations.items()
+    )
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording the latency of every HTTP request.
+
+    Requests are labelled with their route template rather than their path
+    so ids in paths do not create a series each; requests matching no route
+    share the "unmatched" label. When ``server_timing_enabled`` is set, the
+    spans recorded while handling a request are returned in its
+    Server-Timing header, as timed up to when the response headers are sent.
+    """
+
+    def __init__(self, app: ASGIApp, registry: MetricsRegistry | None = None):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        registry = self.registry or get_metrics()
+        started = time.perf_counter()
+        spans: list[tuple[str, float]] = []
+        add_server_timing = get_settings().server_timing_enabled
+        status_code = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if add_server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        server_timing(spans, time.perf_counter() - started),
+                    )
+            await send(message)
+
+        token = _request_spans.set(spans)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_spans.reset(token)
+            route = scope.get("route")
+            registry.requests.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                getattr(route, "path_format", "unmatched"),
+                str(status_code),
+            )
@@ -0,0 +1,236 @@
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from dataclasses import dataclass
+from types import FrameType
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilerBusyError(Exception):
+    """Exception raised when a profile is requested while one is running."""
+
+    pass
+
+
+def _path_prefixes() -> list[str]:
+    """Import roots, longest first, stripped from file names in stacks."""
+    roots = {os.path.abspath(path) for path in sys.path if path}
+    return sorted((root + os.sep for root in roots), key=len, reverse=True)
+
+
+def _frame_label(frame: FrameType, prefixes: list[str]) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    for prefix in prefixes:
+        if filename.startswith(prefix):
+            filename = filename[len(prefix) :]
+            break
+    return f"{code.co_qualname} ({filename}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame: FrameType | None, prefixes: list[str]) -> str:
+    """Format a thread's stack as one collapsed line, outermost frame first."""
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame, prefixes))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+@dataclass(frozen=True)
+class Profile:
+    """Stacks sampled from every thread of the worker."""
+
+    samples: int
+    duration_seconds: float
+    stacks: Counter[str]
+
+    def collapsed(self) -> str:
+        """Render as collapsed stacks, one ``stack count`` line each.
+
+        The format read by flamegraph.pl, speedscope and inferno; each
+        stack starts with the name of its thread.
+        """
+        return "".join(
+            f"{stack} {count}\n" for stack, count in sorted(self.stacks.items())
+        )
+
+
+class SamplingProfiler:
+    """Statistical profiler sampling the stacks of every thread in-process.
+
+    Every ``interval_seconds`` the current frame of each thread is read and
+    its stack counted, so the profiled code is not slowed down beyond the
+    sampling itself: each sample holds the GIL for the time it takes to walk
+    the stacks. Time spent in C code is attributed to the Python frame that
+    called it. Only one profile runs at a time.
+    """
+
+    def __init__(
+        self, interval_seconds: float = 0.01, max_duration_seconds: float = 60.0
+    ):
+        self.interval_seconds = interval_seconds
+        self.max_duration_seconds = max_duration_seconds
+        self._lock = threading.Lock()
+
+    def profile(
+        self, duration_seconds: float, interval_seconds: float | None = None
+    ) -> Profile:
+        """Sample every thread's stack for a while.
+
+        Blocks for ``duration_seconds``; run it in a worker thread.
+
+        Args:
+            duration_seconds: How long to sample, capped at
+                ``max_duration_seconds``.
+            interval_seconds: Time between samples; defaults to the
+                profiler's interval.
+
+        Returns:
+            The sampled stacks.
+
+        Raises:
+            ProfilerBusyError: If another profile is running.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            return self._sample(
+                min(duration_seconds, self.max_duration_seconds),
+                interval_seconds or self.interval_seconds,
+            )
+        finally:
+            self._lock.release()
+
+    def _sample(self, duration_seconds: float, interval_seconds: float) -> Profile:
+        prefixes = _path_prefixes()
+        own_thread = threading.get_ident()
+        stacks: Counter[str] = Counter()
+        samples = 0
+        started = time.monotonic()
+        deadline = started + duration_seconds
+        while time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                name = names.get(thread_id, f"thread-{thread_id}")
+                stacks[f"{name};{collapse_stack(frame, prefixes)}"] += 1
+            samples += 1
+            time.sleep(interval_seconds)
+        return Profile(
+            samples=samples,
+            duration_seconds=time.monotonic() - started,
+            stacks=stacks,
+        )
+
+
+@dataclass(frozen=True)
+class EventLoopLagStats:
+    """Snapshot of the event loop lag monitor's counters."""
+
+    threshold_ms: float
+    checks: int
+    stalls: int
+    stacks_logged: int
+    max_lag_ms: float
+
+
+class EventLoopLagMonitor:
+    """Watchdog reporting code that blocks the event loop.
+
+    A heartbeat task wakes up every quarter of ``threshold_seconds`` and
+    measures how late it was woken; a wake-up later than the threshold is
+    counted as a stall. A watchdog thread checks the heartbeat as often and,
+    while the loop is overdue by more than the threshold, logs the event
+    loop thread's stack once per stall: the blocking call, such as a sync
+    HTTP request made from a coroutine, is at the top of it.
+
+    ``start`` the monitor from the event loop on application startup and
+    ``close`` it on shutdown.
+    """
+
+    def __init__(self, threshold_seconds: float = 0.1):
+        self.threshold_seconds = threshold_seconds
+        self.interval_seconds = threshold_seconds / 4
+        self._due = 0.0
+        self._reported_due: float | None = None
+        self._loop_thread: int | None = None
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.checks = 0
+        self.stalls = 0
+        self.stacks_logged = 0
+        self.max_lag_seconds = 0.0
+
+    def start(self) -> None:
+        """Start the heartbeat task and the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop_thread = threading.get_ident()
+        self._due = time.monotonic() + self.interval_seconds
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="event-loop-monitor", daemon=True
+        )
+        self._thread.start()
+
+    async def close(self) -> None:
+        """Stop the heartbeat task and the watchdog thread."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._stop.set()
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    def stats(self) -> EventLoopLagStats:
+        """Get a snapshot of the monitor counters."""
+        return EventLoopLagStats(
+            threshold_ms=self.threshold_seconds * 1000,
+            checks=self.checks,
+            stalls=self.stalls,
+            stacks_logged=self.stacks_logged,
+            max_lag_ms=self.max_lag_seconds * 1000,
+        )
+
+    async def _heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            now = time.monotonic()
+            lag = max(now - self._due, 0.0)
+            self.checks += 1
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+            if lag > self.threshold_seconds:
+                self.stalls += 1
+            self._due = now + self.interval_seconds
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            due = self._due
+            overdue = time.monotonic() - due
+            if overdue <= self.threshold_seconds or self._reported_due == due:
+                continue
+            self._reported_due = due
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            self.stacks_logged += 1
+            logger.warning(
+                "Event loop blocked for over %.0f ms, in:\n%s",
+                overdue * 1000,
+                "".join(traceback.format_stack(frame)).rstrip(),
+            )
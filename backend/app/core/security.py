@@ -0,0 +1,211 @@
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+import httpx
+import jwt
+from cachetools import LRUCache
+
+# Algorithms accepted for keys published in the JWKS endpoint. HS256 is only
+# accepted when a shared JWT secret is configured.
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256", "EdDSA")
+
+JWKSFetcher = Callable[[], Awaitable[dict[str, Any]]]
+
+
+class TokenVerificationError(Exception):
+    """Exception raised when an access token cannot be verified."""
+
+    pass
+
+
+class JWKSCache:
+    """Cached signing key set fetched from the Supabase Auth JWKS endpoint.
+
+    Keys are refreshed once the TTL expires. A token signed with an unknown
+    key id triggers an early refresh so rotated keys are picked up without
+    waiting for the TTL. If a refresh fails the previously fetched keys keep
+    being served. Refresh attempts of either kind are rate limited by
+    ``min_refresh_interval``, so an unreachable endpoint is retried at most
+    that often rather than on every request.
+    """
+
+    def __init__(
+        self,
+        fetcher: JWKSFetcher,
+        ttl_seconds: float = 600,
+        min_refresh_interval: float = 30,
+    ):
+        self._fetcher = fetcher
+        self._ttl_seconds = ttl_seconds
+        self._min_refresh_interval = min_refresh_interval
+        self._keys: dict[str, jwt.PyJWK] = {}
+        self._fetched_at: float | None = None
+        self._last_attempt_at: float | None = None
+        self._lock = asyncio.Lock()
+
+    async def get_key(self, kid: str) -> jwt.PyJWK:
+        """Get the signing key for a key id, refreshing the set if needed.
+
+        Args:
+            kid: The key id from the token header.
+
+        Returns:
+            The matching signing key.
+
+        Raises:
+            TokenVerificationError: If no key with that id is published.
+        """
+        # An unknown key id means the signing key was probably rotated
+        if (self._is_stale() or kid not in self._keys) and self._can_refresh():
+            await self._refresh()
+
+        if not self._keys:
+            raise TokenVerificationError("Signing keys are unavailable")
+        key = self._keys.get(kid)
+        if key is None:
+            raise TokenVerificationError("Unknown token signing key")
+        return key
+
+    def _is_stale(self) -> bool:
+        if self._fetched_at is None:
+            return True
+        return time.monotonic() - self._fetched_at > self._ttl_seconds
+
+    def _can_refresh(self) -> bool:
+        if self._last_attempt_at is None:
+            return True
+        return time.monotonic() - self._last_attempt_at > self._min_refresh_interval
+
+    async def _refresh(self) -> None:
+        attempt_started = time.monotonic()
+        async with self._lock:
+            # Another coroutine refreshed while we waited for the lock
+            if self._last_attempt_at and self._last_attempt_at >= attempt_started:
+                return
+
+            self._last_attempt_at = time.monotonic()
+            try:
+                jwks = await self._fetcher()
+                key_set = jwt.PyJWKSet.from_dict(jwks)
+            except Exception as e:
+                if not self._keys:
+                    raise TokenVerificationError(
+                        f"Failed to fetch signing keys: {str(e)}"
+                    ) from e
+                # Keep serving the last known keys until the endpoint recovers
+                return
+
+            self._keys = {key.key_id: key for key in key_set.keys if key.key_id}
+            self._fetched_at = time.monotonic()
+
+
+class TokenVerifier:
+    """Verifies Supabase access tokens locally without calling Supabase Auth.
+
+    Decoded claims are kept in a small LRU keyed by the token's SHA-256
+    digest, so repeated requests with the same token skip signature
+    verification until the token expires.
+    """
+
+    def __init__(
+        self,
+        jwks: JWKSCache | None = None,
+        jwt_secret: str | None = None,
+        audience: str | None = "authenticated",
+        issuer: str | None = None,
+        cache_size: int = 1024,
+        leeway_seconds: float = 0,
+    ):
+        self._jwks = jwks
+        self._jwt_secret = jwt_secret
+        self._audience = audience
+        self._issuer = issuer
+        self._leeway_seconds = leeway_seconds
+        self._claims_cache: LRUCache[bytes, dict[str, Any]] = LRUCache(
+            maxsize=cache_size
+        )
+
+    async def verify(self, token: str) -> dict[str, Any]:
+        """Verify an access token and return its claims.
+
+        Args:
+            token: The encoded JWT access token.
+
+        Returns:
+            The decoded token claims.
+
+        Raises:
+            TokenVerificationError: If the token is invalid or expired.
+        """
+        cache_key = hashlib.sha256(token.encode()).digest()
+        claims = self._claims_cache.get(cache_key)
+        if claims is not None:
+            if claims["exp"] + self._leeway_seconds > time.time():
+                return claims
+            del self._claims_cache[cache_key]
+
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Invalid token: {str(e)}") from e
+
+        key, algorithm = await self._resolve_key(header)
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,
+                algorithms=[algorithm],
+                audience=self._audience,
+                issuer=self._issuer,
+                leeway=self._leeway_seconds,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(f"Invalid token: {str(e)}") from e
+
+        self._claims_cache[cache_key] = claims
+        return claims
+
+    async def _resolve_key(self, header: dict[str, Any]) -> tuple[Any, str]:
+        algorithm = header.get("alg")
+
+        if algorithm == "HS256":
+            if not self._jwt_secret:
+                raise TokenVerificationError("Unsupported token algorithm")
+            return self._jwt_secret, algorithm
+
+        if algorithm not in ASYMMETRIC_ALGORITHMS or self._jwks is None:
+            raise TokenVerificationError("Unsupported token algorithm")
+
+        kid = header.get("kid")
+        if not kid:
+            raise TokenVerificationError("Token is missing a key id")
+
+        signing_key = await self._jwks.get_key(kid)
+        if signing_key.algorithm_name != algorithm:
+            raise TokenVerificationError("Token algorithm does not match its key")
+        return signing_key.key, algorithm
+
+
+def http_jwks_fetcher(jwks_url: str, timeout: float = 5.0) -> JWKSFetcher:
+    """Create a fetcher that downloads a JWKS document over HTTP.
+
+    Args:
+        jwks_url: The URL of the JWKS endpoint.
+        timeout: Request timeout in seconds.
+
+    Returns:
+        An async callable returning the parsed JWKS document.
+    """
+
+    async def fetch() -> dict[str, Any]:
+        async with httpx.AsyncClient(timeout=timeout) as client:
+            response = await client.get(jwks_url)
+            response.raise_for_status()
+            return response.json()
+
+    return fetch
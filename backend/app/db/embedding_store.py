@@ -0,0 +1,336 @@
+import asyncio
+import fcntl
+import logging
+import os
+import struct
+import threading
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FACEEMB1"
+FORMAT_VERSION = 1
+
+# magic, format version, embedding dim, committed row count, generation
+# (bumped on every write), retired flag (set on a file replaced by compaction)
+_HEADER = struct.Struct("<8sIIQQI")
+_GENERATION_OFFSET = 24
+_RETIRED_OFFSET = 32
+HEADER_SIZE = 64
+
+
+class EmbeddingStoreError(Exception):
+    """Exception raised when the embedding store file is invalid."""
+
+    pass
+
+
+def row_dtype(dim: int) -> np.dtype:
+    """Fixed-width row layout: student id, tombstone flag, embedding."""
+    return np.dtype([("id", "V16"), ("deleted", "<u4"), ("vector", "<f4", (dim,))])
+
+
+class EmbeddingStore:
+    """Fixed-width binary embedding file shared by all workers on a host.
+
+    The file is memory-mapped, so every worker reads embeddings straight
+    from the shared page cache instead of loading its own copy from the
+    database, and opening the store costs the same regardless of its size.
+
+    Rows are only ever appended; replacing or deleting an embedding marks
+    the old row with a tombstone. ``compact`` rewrites the file without
+    tombstoned rows. Writers serialize on an advisory lock file, and readers
+    pick up appends and compactions from other processes on their next
+    access. Within a process, swapping the mapping and reading through it
+    hold a lock, so a compaction running in a worker thread never pairs the
+    row index of one mapping with the rows of another.
+    """
+
+    def __init__(self, path: str | Path, dim: int):
+        self.path = Path(path)
+        self.dim = dim
+        self._dtype = row_dtype(dim)
+        self._lock_path = self.path.with_name(self.path.name + ".lock")
+        self._header: np.memmap | None = None
+        self._rows: np.memmap | None = None
+        self._row_count = 0
+        self._generation = 0
+        self._index: dict[bytes, int] | None = None
+        self._map_lock = threading.RLock()
+
+        if not self.path.exists():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self._write_lock():
+                if not self.path.exists():
+                    self._write_file(self.path, np.empty(0, dtype=self._dtype))
+        self._map()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    @property
+    def vectors(self) -> np.ndarray:
+        """Zero-copy view of every row's embedding, tombstoned rows included."""
+        with self._map_lock:
+            self.refresh()
+            return self._rows["vector"]
+
+    @property
+    def row_count(self) -> int:
+        self.refresh()
+        return self._row_count
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped by every write to the store, from any process."""
+        with self._map_lock:
+            self.refresh()
+            return self._generation
+
+    def __len__(self) -> int:
+        return len(self._get_index())
+
+    def __contains__(self, student_id: UUID) -> bool:
+        return student_id.bytes in self._get_index()
+
+    def tombstone_ratio(self) -> float:
+        """Fraction of rows that are tombstoned."""
+        rows = self.row_count
+        if rows == 0:
+            return 0.0
+        return 1 - len(self) / rows
+
+    def get(self, student_id: UUID) -> np.ndarray | None:
+        """Get a student's embedding as a read-only view into the file."""
+        with self._map_lock:
+            row = self._get_index().get(student_id.bytes)
+            if row is None:
+                return None
+            vector = self._rows["vector"][row]
+        vector.flags.writeable = False
+        return vector
+
+    def get_many(self, student_ids: Sequence[UUID]) -> tuple[list[UUID], np.ndarray]:
+        """Gather embeddings for several students.
+
+        Args:
+            student_ids: The students to look up.
+
+        Returns:
+            The ids that were found and a (n_found, dim) matrix of their
+            embeddings in the same order.
+        """
+        with self._map_lock:
+            index = self._get_index()
+            found = [sid for sid in student_ids if sid.bytes in index]
+            rows = np.fromiter((index[sid.bytes] for sid in found), dtype=np.int64)
+            return found, self._rows["vector"][rows]
+
+    def live(self) -> tuple[list[UUID], np.ndarray]:
+        """Get every live student id and embedding."""
+        with self._map_lock:
+            index = self._get_index()
+            rows = np.fromiter(index.values(), dtype=np.int64, count=len(index))
+            student_ids = [UUID(bytes=key) for key in index]
+            return student_ids, self._rows["vector"][rows]
+
+    def refresh(self) -> None:
+        """Remap the file if another process appended to or compacted it.
+
+        Both are detected through the mapped header, so checking costs no
+        system call.
+        """
+        with self._map_lock:
+            header = self._header
+            generation = header[_GENERATION_OFFSET:_RETIRED_OFFSET].view("<u8")[0]
+            retired = header[_RETIRED_OFFSET : _RETIRED_OFFSET + 4].view("<u4")[0]
+            if retired or generation != self._generation:
+                self._map()
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, student_ids: Sequence[UUID], vectors: np.ndarray) -> None:
+        """Append embeddings, tombstoning any existing rows for those ids.
+
+        Args:
+            student_ids: One student id per embedding.
+            vectors: A (n, dim) array of embeddings.
+        """
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dim)
+        if len(matrix) != len(student_ids):
+            raise ValueError("Number of embeddings does not match number of ids")
+
+        rows = np.zeros(len(matrix), dtype=self._dtype)
+        rows["id"] = [sid.bytes for sid in student_ids]
+        rows["vector"] = matrix
+
+        with self._write_lock():
+            self.refresh()
+            self._tombstone(student_ids)
+            offset = HEADER_SIZE + self._row_count * self._dtype.itemsize
+            with open(self.path, "r+b") as f:
+                f.seek(offset)
+                f.write(rows.tobytes())
+                f.flush()
+                # Rows become visible only once the header count is updated
+                self._write_header(f, self._row_count + len(rows))
+                os.fsync(f.fileno())
+            self._map()
+
+    def delete(self, student_ids: Sequence[UUID]) -> int:
+        """Tombstone the embeddings of students who left.
+
+        Returns:
+            The number of rows tombstoned.
+        """
+        with self._write_lock():
+            self.refresh()
+            deleted = self._tombstone(student_ids)
+            if deleted:
+                self._rows.flush()
+                with open(self.path, "r+b") as f:
+                    self._write_header(f, self._row_count)
+                self._map()
+        return deleted
+
+    def compact(self) -> int:
+        """Rewrite the file without tombstoned rows.
+
+        The new file replaces the old one atomically; other processes remap
+        it on their next access.
+
+        Returns:
+            The number of rows removed.
+        """
+        with self._write_lock():
+            self.refresh()
+            live = self._rows[self._rows["deleted"] == 0]
+            removed = self._row_count - len(live)
+            if removed:
+                tmp_path = self.path.with_name(self.path.name + ".compact")
+                self._write_file(tmp_path, live)
+                with open(self.path, "r+b") as f:
+                    # Readers still mapping this file remap on next access
+                    self._write_header(f, self._row_count, retired=True)
+                os.replace(tmp_path, self.path)
+                self._map()
+        return removed
+
+    def compact_if_needed(self, max_tombstone_ratio: float = 0.25) -> int:
+        """Compact once tombstones exceed a fraction of the file.
+
+        Returns:
+            The number of rows removed.
+        """
+        if self.tombstone_ratio() <= max_tombstone_ratio:
+            return 0
+        return self.compact()
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _get_index(self) -> dict[bytes, int]:
+        with self._map_lock:
+            self.refresh()
+            if self._index is None:
+                live_rows = np.flatnonzero(self._rows["deleted"] == 0)
+                ids = self._rows["id"][live_rows].tolist()
+                self._index = dict(zip(ids, live_rows.tolist()))
+            return self._index
+
+    def _tombstone(self, student_ids: Sequence[UUID]) -> int:
+        with self._map_lock:
+            index = self._get_index()
+            rows = [index[sid.bytes] for sid in student_ids if sid.bytes in index]
+            if rows:
+                self._rows["deleted"][rows] = 1
+                self._index = None
+            return len(rows)
+
+    def _map(self) -> None:
+        with self._map_lock:
+            self._header = np.memmap(
+                self.path, dtype=np.uint8, mode="r", shape=(HEADER_SIZE,)
+            )
+            magic, version, dim, row_count, generation, _ = _HEADER.unpack_from(
+                self._header
+            )
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise EmbeddingStoreError(f"{self.path} is not an embedding store")
+            if dim != self.dim:
+                raise EmbeddingStoreError(
+                    f"Store dimension {dim} does not match expected {self.dim}"
+                )
+
+            self._row_count = row_count
+            self._generation = generation
+            self._index = None
+            if row_count:
+                self._rows = np.memmap(
+                    self.path,
+                    dtype=self._dtype,
+                    mode="r+",
+                    offset=HEADER_SIZE,
+                    shape=(row_count,),
+                )
+            else:
+                self._rows = np.zeros(0, dtype=self._dtype)
+
+    def _write_header(self, f, row_count: int, retired: bool = False) -> None:
+        f.seek(0)
+        f.write(
+            _HEADER.pack(
+                MAGIC,
+                FORMAT_VERSION,
+                self.dim,
+                row_count,
+                self._generation + 1,
+                retired,
+            )
+        )
+        f.flush()
+
+    def _write_file(self, path: Path, rows: np.ndarray) -> None:
+        with open(path, "wb") as f:
+            header = _HEADER.pack(
+                MAGIC, FORMAT_VERSION, self.dim, len(rows), self._generation + 1, 0
+            )
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            f.write(rows.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    @contextmanager
+    def _write_lock(self) -> Iterator[None]:
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+async def compact_periodically(
+    store: EmbeddingStore,
+    interval_seconds: float,
+    max_tombstone_ratio: float,
+) -> None:
+    """Compact the store in a worker thread whenever tombstones pile up.
+
+    Runs until cancelled; meant to be started as a lifespan background task.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(store.compact_if_needed, max_tombstone_ratio)
+        except Exception:
+            logger.exception("Embedding store compaction failed")
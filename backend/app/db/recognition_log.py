@@ -0,0 +1,531 @@
+import fcntl
+import logging
+import os
+import struct
+import time
+import zlib
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO
+from uuid import UUID, uuid4
+
+import numpy as np
+
+from app.models.recognition_log import RecognitionCandidate, RecognitionLogEntry
+
+logger = logging.getLogger(__name__)
+
+LOG_MAGIC = b"FACELOG1"
+SEGMENT_MAGIC = b"FACESEG1"
+FORMAT_VERSION = 1
+
+# magic, format version, candidates per entry
+_LOG_HEADER = struct.Struct("<8sII")
+LOG_HEADER_SIZE = 64
+
+# magic, format version, candidates per entry, row count, first and last
+# recorded_at, column count
+_SEGMENT_HEADER = struct.Struct("<8sIIQqqI")
+# column name, offset and compressed length of one column block
+_COLUMN_ENTRY = struct.Struct("<16sQQ")
+
+ACTIVE_SUFFIX = ".log"
+SEGMENT_SUFFIX = ".seg"
+
+# Sorted distinct students of a segment, read first to skip segments
+STUDENTS_COLUMN = "students"
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_NO_ID = bytes(16)
+_NO_IMAGE = bytes(32)
+
+
+class RecognitionLogError(Exception):
+    """Exception raised when a recognition log file is invalid."""
+
+    pass
+
+
+def record_dtype(top_k: int) -> np.dtype:
+    """Fixed-width entry layout, 76 bytes plus 18 per candidate.
+
+    Times are microseconds since the epoch (UTC). A face assigned to nobody
+    has a zero student id and a NaN score; candidate slots past the last
+    candidate have zero ids and NaN scores.
+    """
+    return np.dtype(
+        [
+            ("recorded_at", "<i8"),
+            ("class_id", "V16"),
+            ("image_sha256", "V32"),
+            ("student_id", "V16"),
+            ("score", "<f4"),
+            ("candidate_ids", "V16", (top_k,)),
+            ("candidate_scores", "<f2", (top_k,)),
+        ]
+    )
+
+
+def _micros(moment: datetime) -> int:
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - _EPOCH) // timedelta(microseconds=1)
+
+
+def to_records(entries: Sequence[RecognitionLogEntry], top_k: int) -> np.ndarray:
+    """Pack log entries into fixed-width records.
+
+    Candidates past the first ``top_k`` are dropped; candidate scores are
+    kept as float16.
+    """
+    records = np.zeros(len(entries), dtype=record_dtype(top_k))
+    records["score"] = np.nan
+    records["candidate_scores"] = np.nan
+    if not entries:
+        return records
+
+    records["recorded_at"] = [_micros(entry.recorded_at) for entry in entries]
+    records["class_id"] = [entry.class_id.bytes for entry in entries]
+    records["image_sha256"] = [
+        bytes.fromhex(entry.image_sha256) if entry.image_sha256 else _NO_IMAGE
+        for entry in entries
+    ]
+    records["student_id"] = [
+        entry.student_id.bytes if entry.student_id else _NO_ID for entry in entries
+    ]
+    records["score"] = [
+        np.nan if entry.score is None else entry.score for entry in entries
+    ]
+    for row, entry in enumerate(entries):
+        candidates = entry.candidates[:top_k]
+        if candidates:
+            count = len(candidates)
+            records["candidate_ids"][row, :count] = [
+                candidate.student_id.bytes for candidate in candidates
+            ]
+            records["candidate_scores"][row, :count] = [
+                candidate.score for candidate in candidates
+            ]
+    return records
+
+
+def from_records(records: np.ndarray) -> list[RecognitionLogEntry]:
+    """Unpack fixed-width records into log entries."""
+    entries = []
+    for record in records:
+        student_id = bytes(record["student_id"])
+        image = bytes(record["image_sha256"])
+        score = float(record["score"])
+        entries.append(
+            RecognitionLogEntry(
+                recorded_at=_EPOCH + timedelta(microseconds=int(record["recorded_at"])),
+                class_id=UUID(bytes=bytes(record["class_id"])),
+                image_sha256=image.hex() if image != _NO_IMAGE else None,
+                student_id=UUID(bytes=student_id) if student_id != _NO_ID else None,
+                score=None if np.isnan(score) else score,
+                candidates=[
+                    RecognitionCandidate(
+                        student_id=UUID(bytes=bytes(candidate)),
+                        score=float(candidate_score),
+                    )
+                    for candidate, candidate_score in zip(
+                        record["candidate_ids"], record["candidate_scores"]
+                    )
+                    if bytes(candidate) != _NO_ID
+                ],
+            )
+        )
+    return entries
+
+
+@dataclass(frozen=True)
+class SegmentInfo:
+    """Header of a sealed segment file."""
+
+    path: Path
+    top_k: int
+    rows: int
+    first_recorded_at: int
+    last_recorded_at: int
+
+
+class RecognitionLogStore:
+    """Append-only recognition log on local disk, rolled into segments.
+
+    Each worker process appends fixed-width records to its own active log
+    file, holding an advisory lock on it while it is open. ``roll`` seals
+    the active file into a segment: entries sorted by time and stored
+    column by column, each column zlib-compressed on its own (times as
+    deltas), after a header with the segment's time range and an index of
+    the students it mentions. A scan reads only the headers of segments
+    outside its time range or without its student, and decompresses one
+    segment at a time.
+
+    Active files left by a process that died are sealed by
+    ``seal_orphans``. A segment is named after the active file it came
+    from, so sealing is done at most once per file even if a process dies
+    halfway through.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        top_k: int = 5,
+        segment_rows: int = 100_000,
+    ):
+        self.directory = Path(directory)
+        self.top_k = top_k
+        self.segment_rows = segment_rows
+        self._dtype = record_dtype(top_k)
+        self._active: BinaryIO | None = None
+        self._active_path: Path | None = None
+        self._active_rows = 0
+        self._active_opened_at = 0.0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def active_rows(self) -> int:
+        """Entries appended to this process's active file."""
+        return self._active_rows
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, records: np.ndarray) -> None:
+        """Append records to this process's active file and sync it.
+
+        Args:
+            records: Records of this store's ``record_dtype``.
+        """
+        if records.dtype != self._dtype:
+            raise ValueError("Records do not match the log's record layout")
+        if not len(records):
+            return
+        if self._active is None:
+            self._open_active()
+        self._active.write(records.tobytes())
+        self._active.flush()
+        os.fsync(self._active.fileno())
+        self._active_rows += len(records)
+
+    def roll(self) -> Path | None:
+        """Seal this process's active file into a segment.
+
+        Returns:
+            The new segment, or None if there was nothing to seal.
+        """
+        if self._active is None:
+            return None
+        active, path = self._active, self._active_path
+        try:
+            segment = self._seal(path) if self._active_rows else None
+            path.unlink()
+        finally:
+            # Closing releases the lock
+            active.close()
+            self._active = None
+            self._active_path = None
+            self._active_rows = 0
+        return segment
+
+    def roll_if_needed(self, max_age_seconds: float) -> Path | None:
+        """Roll once the active file is full or older than max_age_seconds.
+
+        Returns:
+            The new segment, or None if the active file was not rolled.
+        """
+        if self._active is None or not self._active_rows:
+            return None
+        age = time.monotonic() - self._active_opened_at
+        if self._active_rows < self.segment_rows and age < max_age_seconds:
+            return None
+        return self.roll()
+
+    def seal_orphans(self) -> int:
+        """Seal the active files of processes that are gone.
+
+        Returns:
+            The number of files sealed.
+        """
+        sealed = 0
+        for path in sorted(self.directory.glob(f"*{ACTIVE_SUFFIX}")):
+            if path == self._active_path:
+                continue
+            try:
+                f = open(path, "rb")
+            except FileNotFoundError:
+                continue
+            with f:
+                try:
+                    fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # Still being written by a live process
+                    continue
+                if os.fstat(f.fileno()).st_nlink == 0:
+                    # Sealed by another process while we waited
+                    continue
+                if not self._segment_path(path).exists():
+                    self._seal(path)
+                path.unlink()
+                sealed += 1
+        return sealed
+
+    def close(self) -> None:
+        """Seal this process's active file."""
+        self.roll()
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def segments(self) -> list[SegmentInfo]:
+        """Headers of every sealed segment, oldest entries first."""
+        infos = []
+        for path in self.directory.glob(f"*{SEGMENT_SUFFIX}"):
+            try:
+                with open(path, "rb") as f:
+                    infos.append(self._read_segment_header(path, f)[0])
+            except FileNotFoundError:
+                continue
+        return sorted(infos, key=lambda info: info.first_recorded_at)
+
+    def scan(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        student_id: UUID | None = None,
+        class_id: UUID | None = None,
+    ) -> Iterator[np.ndarray]:
+        """Read the entries matching a time range, student and class.
+
+        A student matches entries that assigned a face to them or list them
+        as a candidate. Segments are read oldest first, then the active
+        files; each batch holds one file's matches in time order.
+
+        Args:
+            start: The earliest entry time to include.
+            end: The latest entry time to include.
+            student_id: Only entries mentioning this student.
+            class_id: Only entries of this class.
+
+        Yields:
+            Batches of matching records, one per file with any match.
+        """
+        first = _micros(start) if start is not None else np.iinfo(np.int64).min
+        last = _micros(end) if end is not None else np.iinfo(np.int64).max
+        student = np.void(student_id.bytes) if student_id else None
+        klass = np.void(class_id.bytes) if class_id else None
+
+        for info in self.segments():
+            if info.last_recorded_at < first or info.first_recorded_at > last:
+                continue
+            try:
+                records = self._scan_segment(info, first, last, student, klass)
+            except FileNotFoundError:
+                continue
+            if records is not None and len(records):
+                yield records
+
+        for path in sorted(self.directory.glob(f"*{ACTIVE_SUFFIX}")):
+            try:
+                records = self._read_active(path)
+            except FileNotFoundError:
+                continue
+            records = records[np.argsort(records["recorded_at"], kind="stable")]
+            mask = (records["recorded_at"] >= first) & (records["recorded_at"] <= last)
+            mask &= _mask(records, student, klass)
+            if mask.any():
+                yield records[mask]
+
+    def query(
+        self,
+        start: datetime | None = None,
+        end: datetime | None = None,
+        student_id: UUID | None = None,
+        class_id: UUID | None = None,
+        limit: int = 1000,
+    ) -> list[RecognitionLogEntry]:
+        """Get up to ``limit`` matching entries, in time order.
+
+        See ``scan`` for the filters; reading stops once ``limit`` entries
+        were found, so the oldest matches are the ones returned.
+        """
+        batches: list[np.ndarray] = []
+        found = 0
+        for records in self.scan(start, end, student_id, class_id):
+            batches.append(records)
+            found += len(records)
+            if found >= limit:
+                break
+        entries = [entry for records in batches for entry in from_records(records)]
+        entries.sort(key=lambda entry: entry.recorded_at)
+        return entries[:limit]
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _open_active(self) -> None:
+        path = self.directory / f"{uuid4().hex}{ACTIVE_SUFFIX}"
+        f = open(path, "xb")
+        fcntl.flock(f, fcntl.LOCK_EX)
+        header = _LOG_HEADER.pack(LOG_MAGIC, FORMAT_VERSION, self.top_k)
+        f.write(header.ljust(LOG_HEADER_SIZE, b"\0"))
+        self._active = f
+        self._active_path = path
+        self._active_rows = 0
+        self._active_opened_at = time.monotonic()
+
+    def _segment_path(self, active_path: Path) -> Path:
+        return active_path.with_suffix(SEGMENT_SUFFIX)
+
+    def _read_active(self, path: Path) -> np.ndarray:
+        with open(path, "rb") as f:
+            header = f.read(LOG_HEADER_SIZE)
+            if len(header) < LOG_HEADER_SIZE:
+                # Created but its header not written yet
+                return np.zeros(0, dtype=self._dtype)
+            magic, version, top_k = _LOG_HEADER.unpack_from(header)
+            if magic != LOG_MAGIC or version != FORMAT_VERSION:
+                raise RecognitionLogError(f"{path} is not a recognition log")
+            dtype = record_dtype(top_k)
+            # A record cut short by a crash is ignored
+            count = (os.fstat(f.fileno()).st_size - LOG_HEADER_SIZE) // dtype.itemsize
+            return np.fromfile(f, dtype=dtype, count=count)
+
+    def _seal(self, active_path: Path) -> Path | None:
+        records = self._read_active(active_path)
+        if not len(records):
+            return None
+        records = records[np.argsort(records["recorded_at"], kind="stable")]
+        times = records["recorded_at"]
+        top_k = records.dtype["candidate_ids"].shape[0]
+
+        mentioned = np.concatenate(
+            [records["student_id"], records["candidate_ids"].ravel()]
+        )
+        students = np.unique(mentioned[mentioned != np.void(_NO_ID)])
+        columns = {
+            name: np.ascontiguousarray(records[name])
+            for name in records.dtype.names
+        }
+        columns["recorded_at"] = np.diff(times, prepend=times[0])
+        columns[STUDENTS_COLUMN] = students
+        blocks = [
+            (name, zlib.compress(array.tobytes(), 6))
+            for name, array in columns.items()
+        ]
+
+        offset = _SEGMENT_HEADER.size + _COLUMN_ENTRY.size * len(blocks)
+        directory = b""
+        for name, block in blocks:
+            directory += _COLUMN_ENTRY.pack(name.encode(), offset, len(block))
+            offset += len(block)
+        header = _SEGMENT_HEADER.pack(
+            SEGMENT_MAGIC,
+            FORMAT_VERSION,
+            top_k,
+            len(records),
+            int(times[0]),
+            int(times[-1]),
+            len(blocks),
+        )
+
+        path = self._segment_path(active_path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(directory)
+            for _, block in blocks:
+                f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        logger.info("Sealed %d recognition log entries into %s", len(records), path)
+        return path
+
+    def _read_segment_header(
+        self, path: Path, f: BinaryIO
+    ) -> tuple[SegmentInfo, dict[str, tuple[int, int]]]:
+        header = f.read(_SEGMENT_HEADER.size)
+        if len(header) < _SEGMENT_HEADER.size:
+            raise RecognitionLogError(f"{path} is not a recognition log segment")
+        magic, version, top_k, rows, first, last, n_columns = (
+            _SEGMENT_HEADER.unpack(header)
+        )
+        if magic != SEGMENT_MAGIC or version != FORMAT_VERSION:
+            raise RecognitionLogError(f"{path} is not a recognition log segment")
+        directory = {}
+        for _ in range(n_columns):
+            name, offset, length = _COLUMN_ENTRY.unpack(f.read(_COLUMN_ENTRY.size))
+            directory[name.rstrip(b"\0").decode()] = (offset, length)
+        return SegmentInfo(path, top_k, rows, first, last), directory
+
+    def _scan_segment(
+        self,
+        info: SegmentInfo,
+        first: int,
+        last: int,
+        student: np.void | None,
+        klass: np.void | None,
+    ) -> np.ndarray | None:
+        dtype = record_dtype(info.top_k)
+        with open(info.path, "rb") as f:
+            _, directory = self._read_segment_header(info.path, f)
+
+            def column(name: str) -> np.ndarray:
+                offset, length = directory[name]
+                f.seek(offset)
+                data = zlib.decompress(f.read(length))
+                if name == STUDENTS_COLUMN:
+                    return np.frombuffer(data, dtype="V16")
+                field = dtype[name]
+                return np.frombuffer(data, dtype=field.base).reshape(
+                    (info.rows, *field.shape)
+                )
+
+            if student is not None and not (column(STUDENTS_COLUMN) == student).any():
+                return None
+
+            times = np.cumsum(column("recorded_at")) + info.first_recorded_at
+            lo = int(np.searchsorted(times, first, side="left"))
+            hi = int(np.searchsorted(times, last, side="right"))
+            if lo == hi:
+                return None
+
+            selected = {"recorded_at": times[lo:hi]}
+            if student is not None:
+                selected["student_id"] = column("student_id")[lo:hi]
+                selected["candidate_ids"] = column("candidate_ids")[lo:hi]
+            if klass is not None:
+                selected["class_id"] = column("class_id")[lo:hi]
+            mask = _mask(selected, student, klass)
+            if not mask.any():
+                return None
+
+            records = np.empty(int(mask.sum()), dtype=dtype)
+            for name in dtype.names:
+                values = selected.get(name)
+                if values is None:
+                    values = column(name)[lo:hi]
+                records[name] = values[mask]
+            return records
+
+
+def _mask(
+    records: np.ndarray | dict[str, np.ndarray],
+    student: np.void | None,
+    klass: np.void | None,
+) -> np.ndarray:
+    """Rows of records mentioning the student and in the class."""
+    mask = np.ones(len(records["recorded_at"]), dtype=bool)
+    if student is not None:
+        mask &= (records["student_id"] == student) | (
+            records["candidate_ids"] == student
+        ).any(axis=1)
+    if klass is not None:
+        mask &= records["class_id"] == klass
+    return mask
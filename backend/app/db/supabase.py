@@ -1,16 +1,288 @@
+import asyncio
+import weakref
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from functools import lru_cache
+from typing import Any, TypeVar
 
-from supabase import create_client, Client
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, Client, create_client
+from supabase_auth.types import AuthChangeEvent, Session
 
-from app.core.config import get_settings
+from app.core.config import Settings, get_settings
+from app.core.metrics import span
+
+T = TypeVar("T")
+
+SupabaseClient = Client | AsyncClient
+
+
+class ServiceAsyncClient(AsyncClient):
+    """Async Supabase client that always acts with the service key.
+
+    The stock client swaps its Authorization header for the user's token
+    and rebuilds its PostgREST client whenever a user signs in through it.
+    A client shared by every request must keep the service key, so auth
+    state changes are ignored.
+    """
+
+    def _listen_to_auth_events(
+        self, event: AuthChangeEvent, session: Session | None
+    ) -> None:
+        pass
+
+
+@dataclass(frozen=True)
+class PoolStats:
+    """Snapshot of the shared HTTP connection pool usage."""
+
+    max_connections: int
+    max_keepalive_connections: int
+    http2: bool
+    requests_total: int
+    requests_in_flight: int
+    peak_requests_in_flight: int
+    requests_queued: int
+    connections_opened: int
+    connections_open: int
+    connections_idle: int
+
+    @property
+    def saturation(self) -> float:
+        """Fraction of the connection limit busy serving requests.
+
+        Read from the pool's connections rather than the requests in
+        flight, which can exceed the limit when HTTP/2 multiplexes them.
+        """
+        if self.max_connections == 0:
+            return 0.0
+        return (self.connections_open - self.connections_idle) / self.max_connections
+
+    @property
+    def connection_reuse_ratio(self) -> float:
+        """Fraction of requests served by an already open connection."""
+        if self.requests_total == 0:
+            return 0.0
+        return max(0.0, 1 - self.connections_opened / self.requests_total)
+
+
+class InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Pooled HTTP transport that records pool saturation and reuse."""
+
+    def __init__(self, limits: httpx.Limits, http2: bool, **kwargs: Any):
+        super().__init__(limits=limits, http2=http2, **kwargs)
+        self.limits = limits
+        self.http2 = http2
+        self.requests_total = 0
+        self.requests_in_flight = 0
+        self.peak_requests_in_flight = 0
+        self.requests_queued = 0
+        self.connections_opened = 0
+        self._seen_connections: weakref.WeakSet[Any] = weakref.WeakSet()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests_total += 1
+        if self._pool_saturated():
+            # No connection or HTTP/2 stream is free: the pool queues this one
+            self.requests_queued += 1
+
+        # Concurrency is left to the pool's limits: under HTTP/2 one
+        # connection carries many requests at once
+        self.requests_in_flight += 1
+        self.peak_requests_in_flight = max(
+            self.peak_requests_in_flight, self.requests_in_flight
+        )
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            self.requests_in_flight -= 1
+            self._count_new_connections()
+
+    def _pool_saturated(self) -> bool:
+        """Whether every connection is busy and no more may be opened."""
+        connections = self._pool.connections
+        max_connections = self.limits.max_connections
+        return (
+            max_connections is not None
+            and len(connections) >= max_connections
+            and not any(connection.is_available() for connection in connections)
+        )
+
+    def _count_new_connections(self) -> None:
+        for connection in self._pool.connections:
+            if connection not in self._seen_connections:
+                self._seen_connections.add(connection)
+                self.connections_opened += 1
+
+    def stats(self) -> PoolStats:
+        """Get a snapshot of the pool usage counters."""
+        connections = self._pool.connections
+        return PoolStats(
+            max_connections=self.limits.max_connections or 0,
+            max_keepalive_connections=self.limits.max_keepalive_connections or 0,
+            http2=self.http2,
+            requests_total=self.requests_total,
+            requests_in_flight=self.requests_in_flight,
+            peak_requests_in_flight=self.peak_requests_in_flight,
+            requests_queued=self.requests_queued,
+            connections_opened=self.connections_opened,
+            connections_open=len(connections),
+            connections_idle=sum(1 for c in connections if c.is_idle()),
+        )
+
+
+class SupabasePool:
+    """Shared HTTP connection pool and async Supabase client for a worker.
+
+    Opened once in the application lifespan and shared by every request,
+    so connections (and HTTP/2 streams) are reused across requests instead
+    of being set up per call.
+    """
+
+    def __init__(
+        self,
+        client: AsyncClient,
+        http_client: httpx.AsyncClient,
+        transport: InstrumentedTransport,
+    ):
+        self.client = client
+        self.http_client = http_client
+        self.transport = transport
+
+    @classmethod
+    async def open(cls, settings: Settings) -> "SupabasePool":
+        """Create the pooled transport and the Supabase client using it.
+
+        Args:
+            settings: Settings with the Supabase and pool configuration.
+
+        Returns:
+            The opened pool.
+        """
+        transport = InstrumentedTransport(
+            limits=httpx.Limits(
+                max_connections=settings.supabase_http_max_connections,
+                max_keepalive_connections=settings.supabase_http_max_keepalive,
+                keepalive_expiry=settings.supabase_http_keepalive_expiry,
+            ),
+            http2=settings.supabase_http2,
+        )
+        http_client = httpx.AsyncClient(
+            transport=transport,
+            timeout=settings.supabase_http_timeout,
+            follow_redirects=True,
+        )
+        client = await ServiceAsyncClient.create(
+            settings.supabase_url,
+            settings.supabase_service_key,
+            options=AsyncClientOptions(
+                auto_refresh_token=False,
+                persist_session=False,
+                httpx_client=http_client,
+            ),
+        )
+        return cls(client, http_client, transport)
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        await self.http_client.aclose()
+
+    def stats(self) -> PoolStats:
+        """Get a snapshot of the pool usage counters."""
+        return self.transport.stats()
+
+
+_pool: SupabasePool | None = None
+_pool_lock = asyncio.Lock()
 
 
 @lru_cache
 def get_supabase_client() -> Client:
     """Get cached Supabase client instance using service key.
-    
+
     Uses the service key which bypasses Row Level Security (RLS)
     for server-side operations.
     """
     settings = get_settings()
     return create_client(settings.supabase_url, settings.supabase_service_key)
+
+
+async def open_supabase_pool() -> SupabasePool:
+    """Open the worker's shared Supabase pool if it is not open yet.
+
+    Called from the application lifespan; also opens the pool lazily for
+    code running outside the app, such as scripts.
+    """
+    global _pool
+
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await SupabasePool.open(get_settings())
+    return _pool
+
+
+async def close_supabase_pool() -> None:
+    """Close the worker's shared Supabase pool."""
+    global _pool
+
+    async with _pool_lock:
+        if _pool is not None:
+            await _pool.aclose()
+            _pool = None
+
+
+def get_supabase_pool() -> SupabasePool | None:
+    """Get the worker's shared Supabase pool, or None if it is not open."""
+    return _pool
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """Get the shared async Supabase client instance using service key.
+
+    The async client performs its network I/O on the event loop, so
+    concurrent requests overlap their round-trips instead of queueing
+    behind one another. Sessions are not persisted or auto-refreshed
+    because the client is shared across all requests.
+    """
+    pool = await open_supabase_pool()
+    return pool.client
+
+
+@lru_cache
+def get_sync_executor() -> ThreadPoolExecutor:
+    """Get the bounded thread pool used for sync Supabase calls."""
+    settings = get_settings()
+    return ThreadPoolExecutor(
+        max_workers=settings.supabase_sync_max_workers,
+        thread_name_prefix="supabase-sync",
+    )
+
+
+async def run_supabase_call(
+    client: SupabaseClient,
+    call: Callable[[Any], T | Awaitable[T]],
+    span_name: str = "supabase",
+) -> T:
+    """Run a Supabase call without blocking the event loop.
+
+    Calls made with an async client are awaited directly. Calls made with
+    a sync client are offloaded to a bounded thread pool so that a slow
+    round-trip only ties up a worker thread, not the whole event loop.
+    The round-trip, including any wait for a thread, is timed as a span.
+
+    Args:
+        client: The sync or async Supabase client to call.
+        call: A callable receiving the client and performing the request.
+        span_name: The span the round-trip is recorded as.
+
+    Returns:
+        The result of the Supabase call.
+    """
+    with span(span_name):
+        if isinstance(client, AsyncClient):
+            return await call(client)
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_sync_executor(), call, client)
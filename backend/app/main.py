@@ -1,11 +1,140 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
-from app.api.routes import auth
+from app.api.deps import (
+    get_attendance_service,
+    get_attendance_writer,
+    get_auth_user_cleanup,
+    get_embedding_store,
+    get_enrollment_executor,
+    get_event_loop_monitor,
+    get_face_engine,
+    get_recognition_log_writer,
+    get_recognition_service,
+    get_supabase,
+    save_institution_index,
+)
+from app.api.routes import (
+    attendance,
+    auth,
+    classes,
+    debug,
+    enrollment,
+    geofences,
+    health,
+    images,
+    metrics,
+    recognition_log,
+    reports,
+    users,
+)
+from app.core.config import Settings, get_settings
+from app.core.metrics import MetricsMiddleware
+from app.db.embedding_store import compact_periodically
+from app.db.supabase import close_supabase_pool, open_supabase_pool
+from app.utils.face_utils import warm_up_face_engine
+
+logger = logging.getLogger(__name__)
+
+
+async def prewarm(settings: Settings) -> None:
+    """Build what the first check-ins would otherwise wait for.
+
+    Loads the institution index and the galleries of the classes expected
+    today. A failure is logged and the worker starts cold.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.to_thread(get_recognition_service)
+        attendance_service = get_attendance_service(
+            await get_supabase(), get_attendance_writer()
+        )
+        loaded = await attendance_service.prewarm_galleries(
+            weeks=settings.prewarm_gallery_weeks
+        )
+    except Exception:
+        logger.exception("Pre-warming failed, starting cold")
+        return
+    logger.info(
+        "Pre-warmed %d class galleries in %.0f ms",
+        loaded,
+        (time.perf_counter() - started) * 1000,
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Open shared resources before serving and release them on shutdown."""
+    settings = get_settings()
+    event_loop_monitor = get_event_loop_monitor()
+    if settings.event_loop_monitor_enabled:
+        event_loop_monitor.start()
+    await open_supabase_pool()
+    if settings.face_engine_warmup:
+        # Load the models and run them once before the first request
+        await asyncio.to_thread(warm_up_face_engine, get_face_engine())
+    if settings.prewarm_enabled:
+        await prewarm(settings)
+    enrollment_executor = get_enrollment_executor()
+    attendance_writer = get_attendance_writer()
+    attendance_writer.start()
+    auth_user_cleanup = get_auth_user_cleanup()
+    auth_user_cleanup.start()
+    recognition_log_writer = get_recognition_log_writer()
+    if recognition_log_writer is not None:
+        # Seal what workers that died left in their active log files
+        await asyncio.to_thread(recognition_log_writer.store.seal_orphans)
+        recognition_log_writer.start()
+    compaction = asyncio.create_task(
+        compact_periodically(
+            get_embedding_store(),
+            settings.embedding_store_compact_interval_seconds,
+            settings.embedding_store_compact_ratio,
+        )
+    )
+    try:
+        yield
+    finally:
+        compaction.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await compaction
+        # Flush queued attendance marks before the connection pool closes
+        await attendance_writer.close()
+        await auth_user_cleanup.close()
+        if recognition_log_writer is not None:
+            await recognition_log_writer.close()
+        try:
+            # The next worker starts from this index instead of retraining
+            await asyncio.to_thread(save_institution_index)
+        except Exception:
+            logger.exception("Saving the institution index failed")
+        await close_supabase_pool()
+        await asyncio.to_thread(enrollment_executor.shutdown, cancel_futures=True)
+        await event_loop_monitor.close()
+
 
-app = FastAPI(title="FaceIT API", version="0.1.0")
+app = FastAPI(title="FaceIT API", version="0.1.0", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 # Include routers
 app.include_router(auth.router)
+app.include_router(health.router)
+app.include_router(enrollment.router)
+app.include_router(images.router)
+app.include_router(attendance.router)
+app.include_router(geofences.router)
+app.include_router(reports.router)
+app.include_router(classes.router)
+app.include_router(users.router)
+app.include_router(recognition_log.router)
+app.include_router(metrics.router)
+app.include_router(debug.router)
 
 
 @app.get("/")
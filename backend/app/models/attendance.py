@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class AttendanceStatus(str, Enum):
+    """Attendance status enum matching database constraint."""
+
+    PRESENT = "present"
+    LATE = "late"
+    ABSENT = "absent"
+
+
+class AttendanceMethod(str, Enum):
+    """How an attendance record was taken, matching database constraint."""
+
+    FACE = "face"
+    CLASS_PHOTO = "class_photo"
+    MANUAL = "manual"
+
+
+class Attendance(BaseModel):
+    """Data model representing the attendance table."""
+
+    class_id: UUID
+    student_id: UUID
+    session_date: date
+    status: AttendanceStatus
+    method: AttendanceMethod
+    confidence: float | None = None
+    image_sha256: str | None = None
+    recorded_at: datetime | None = None
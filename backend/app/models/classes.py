@@ -0,0 +1,14 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class Class(BaseModel):
+    """Data model representing the classes table."""
+
+    id: UUID
+    name: str
+    code: str | None = None
+    instructor_id: UUID | None = None
+    created_at: datetime | None = None
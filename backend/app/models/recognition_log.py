@@ -0,0 +1,27 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class RecognitionCandidate(BaseModel):
+    """A student a face was compared with and its cosine similarity."""
+
+    student_id: UUID
+    score: float
+
+
+class RecognitionLogEntry(BaseModel):
+    """Data model representing one recognition attempt in the audit log.
+
+    One entry per detected face: the best-scoring students of the class it
+    was matched against, best first, and the student the face was assigned
+    to, if any.
+    """
+
+    recorded_at: datetime
+    class_id: UUID
+    image_sha256: str | None = None
+    student_id: UUID | None = None
+    score: float | None = None
+    candidates: list[RecognitionCandidate] = []
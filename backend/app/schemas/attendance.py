@@ -0,0 +1,53 @@
+from datetime import date
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+from app.models.attendance import AttendanceStatus
+from app.schemas.image import IMAGE_KEY_PATTERN
+
+
+class ClassPhotoAttendanceRequest(BaseModel):
+    """Request schema for taking attendance from a stored class photo."""
+
+    image_key: str = Field(pattern=IMAGE_KEY_PATTERN)
+    session_date: date | None = None
+
+
+class FaceAssignmentResponse(BaseModel):
+    """A student recognized in the photo and where their face was."""
+
+    student_id: UUID
+    score: float
+    box: tuple[float, float, float, float]
+
+
+class ClassPhotoAttendanceResponse(BaseModel):
+    """Response schema for attendance taken from a class photo."""
+
+    class_id: UUID
+    session_date: date
+    present: list[FaceAssignmentResponse]
+    faces_detected: int
+    unmatched_faces: int
+    timings_ms: dict[str, float]
+
+
+class AttendanceMark(BaseModel):
+    """One student's attendance status."""
+
+    student_id: UUID
+    status: AttendanceStatus = AttendanceStatus.PRESENT
+
+
+class AttendanceMarksRequest(BaseModel):
+    """Request schema for marking the attendance of several students."""
+
+    marks: list[AttendanceMark] = Field(min_length=1, max_length=1000)
+    session_date: date | None = None
+
+
+class AttendanceMarksResponse(BaseModel):
+    """Response schema for queued attendance marks."""
+
+    queued: int
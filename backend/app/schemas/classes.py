@@ -0,0 +1,41 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class ClassItem(BaseModel):
+    """A class in a listing; fields not requested are omitted."""
+
+    id: UUID
+    name: str | None = None
+    code: str | None = None
+    instructor_id: UUID | None = None
+    created_at: datetime | None = None
+
+
+class ClassListResponse(BaseModel):
+    """Response schema for a page of classes.
+
+    Pass ``next_cursor`` as ``cursor`` to get the next page; it is null on
+    the last page.
+    """
+
+    items: list[ClassItem]
+    next_cursor: str | None
+
+
+class RosterStudent(BaseModel):
+    """A student on a class roster; fields not requested are omitted."""
+
+    student_id: UUID
+    first_name: str | None = None
+    last_name: str | None = None
+    bio: str | None = None
+
+
+class RosterResponse(BaseModel):
+    """Response schema for a page of a class roster."""
+
+    items: list[RosterStudent]
+    next_cursor: str | None
@@ -0,0 +1,17 @@
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class BatchEnrollmentResponse(BaseModel):
+    """Response schema for one run of a bulk enrollment batch."""
+
+    batch_id: UUID
+    enrolled: int
+    skipped: int
+    failed: dict[UUID, str]
+    photos_processed: int
+    elapsed_seconds: float
+    workers: int
+    photos_per_second: float
+    photos_per_second_per_core: float
@@ -0,0 +1,36 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class CheckInLocation(BaseModel):
+    """A check-in's GPS fix and the class it is for."""
+
+    class_id: UUID
+    latitude: float = Field(ge=-90, le=90)
+    longitude: float = Field(ge=-180, le=180)
+
+
+class GeofenceVerifyRequest(BaseModel):
+    """Request schema for verifying a batch of check-in locations."""
+
+    check_ins: list[CheckInLocation] = Field(min_length=1, max_length=10000)
+
+
+class CheckInVerdict(BaseModel):
+    """Whether a check-in's fix is inside its class's building.
+
+    ``accepted`` also allows fixes within the geofence's tolerance of the
+    building; ``distance_m`` is 0 inside it.
+    """
+
+    class_id: UUID
+    inside: bool
+    accepted: bool
+    distance_m: float
+
+
+class GeofenceVerifyResponse(BaseModel):
+    """Response schema with one verdict per check-in, in request order."""
+
+    results: list[CheckInVerdict]
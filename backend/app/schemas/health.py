@@ -0,0 +1,65 @@
+from pydantic import BaseModel
+
+
+class PoolStatsResponse(BaseModel):
+    """Response schema for the shared HTTP connection pool statistics."""
+
+    max_connections: int
+    max_keepalive_connections: int
+    http2: bool
+    requests_total: int
+    requests_in_flight: int
+    peak_requests_in_flight: int
+    requests_queued: int
+    connections_opened: int
+    connections_open: int
+    connections_idle: int
+    saturation: float
+    connection_reuse_ratio: float
+
+
+class RecognitionCacheStatsResponse(BaseModel):
+    """Response schema for the recognition result cache statistics."""
+
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+    hit_ratio: float
+
+
+class AttendanceWriterStatsResponse(BaseModel):
+    """Response schema for the write-behind attendance writer statistics."""
+
+    pending: int
+    submitted: int
+    coalesced: int
+    flushes: int
+    flushed_rows: int
+    failed_flushes: int
+    rejected_rows: int
+
+
+class ProfileCacheStatsResponse(BaseModel):
+    """Response schema for the profile cache statistics."""
+
+    entries: int
+    hits: int
+    shared_hits: int
+    misses: int
+    invalidations: int
+    shared_errors: int
+    hit_ratio: float
+
+
+class EventLoopLagStatsResponse(BaseModel):
+    """Response schema for the event loop lag monitor statistics."""
+
+    threshold_ms: float
+    checks: int
+    stalls: int
+    stacks_logged: int
+    max_lag_ms: float
@@ -0,0 +1,46 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+# Stored images are addressed by the hex SHA-256 of their bytes
+IMAGE_KEY_PATTERN = "^[0-9a-f]{64}$"
+
+
+class UploadedImage(BaseModel):
+    """Response schema for one stored image of an upload."""
+
+    filename: str | None
+    key: str
+    sha256: str
+    size: int
+    content_type: str
+    deduplicated: bool
+
+
+class ImageUploadResponse(BaseModel):
+    """Response schema for a batch image upload."""
+
+    images: list[UploadedImage]
+
+
+class ImageRecognitionRequest(BaseModel):
+    """Request schema for recognizing a stored photo against a class."""
+
+    class_id: UUID
+    top_k: int = Field(default=1, ge=1, le=10)
+
+
+class MatchResponse(BaseModel):
+    """A candidate student for a face with its cosine similarity."""
+
+    student_id: UUID
+    score: float
+
+
+class ImageRecognitionResponse(BaseModel):
+    """Response schema for a recognized photo, one match list per face."""
+
+    key: str
+    class_id: UUID
+    faces: list[list[MatchResponse]]
+    cached: bool
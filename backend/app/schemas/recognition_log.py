@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+from app.models.recognition_log import RecognitionCandidate, RecognitionLogEntry
+from app.schemas.image import IMAGE_KEY_PATTERN
+
+
+class RecognitionLogResponse(BaseModel):
+    """Response schema for recognition attempts read from the audit log."""
+
+    entries: list[RecognitionLogEntry]
+
+
+class IdentifyFacesRequest(BaseModel):
+    """Request schema for identifying a stored photo's faces campus-wide."""
+
+    image_key: str = Field(pattern=IMAGE_KEY_PATTERN)
+    top_k: int = Field(default=5, ge=1, le=20)
+
+
+class IdentifyFacesResponse(BaseModel):
+    """Response schema for identified faces, one candidate list per face."""
+
+    image_sha256: str
+    faces: list[list[RecognitionCandidate]]
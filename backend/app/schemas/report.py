@@ -0,0 +1,60 @@
+from datetime import date
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel
+
+
+class SessionAttendanceResponse(BaseModel):
+    """How many students were present, late and absent in one session."""
+
+    session_date: date
+    present: int
+    late: int
+    absent: int
+
+
+class AttendanceSummaryResponse(BaseModel):
+    """A student's attendance in a class.
+
+    ``attendance_rate`` is the share of the class's sessions the student
+    was present or late for.
+    """
+
+    class_id: UUID
+    student_id: UUID
+    present: int
+    late: int
+    absent: int
+    sessions: int
+    attendance_rate: float
+
+
+class ClassAttendanceReportResponse(BaseModel):
+    """Response schema for a class's attendance report."""
+
+    class_id: UUID
+    sessions: list[SessionAttendanceResponse]
+    students: list[AttendanceSummaryResponse]
+    attendance_rate: float
+
+
+class StudentAttendanceReportResponse(BaseModel):
+    """Response schema for a student's attendance report."""
+
+    student_id: UUID
+    classes: list[AttendanceSummaryResponse]
+    attendance_rate: float
+
+
+class RebuildTotalsResponse(BaseModel):
+    """Response schema for rebuilt attendance totals."""
+
+    rebuilt: int
+
+
+class ExportFormat(str, Enum):
+    """File format of a report export."""
+
+    CSV = "csv"
+    PARQUET = "parquet"
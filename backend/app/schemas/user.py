@@ -30,6 +30,47 @@ class InstructorSignupResponse(BaseModel):
     office_location: str | None
 
 
+class BulkSignupRow(BaseModel):
+    """One user to provision, read from a line of a bulk signup CSV.
+
+    Users without a password sign in after resetting it. Department and
+    office location are only kept for instructors.
+    """
+
+    email: EmailStr
+    first_name: str = Field(..., min_length=1, max_length=100)
+    last_name: str = Field(..., min_length=1, max_length=100)
+    type: ProfileType
+    password: str | None = Field(default=None, min_length=8)
+    bio: str | None = Field(default=None, max_length=500)
+    department: str | None = Field(default=None, max_length=100)
+    office_location: str | None = Field(default=None, max_length=200)
+
+
+class BulkSignupCreated(BaseModel):
+    """A user created by a bulk signup."""
+
+    line: int
+    user_id: UUID
+    email: str
+    type: ProfileType
+
+
+class BulkSignupFailure(BaseModel):
+    """A line of a bulk signup CSV whose user was not created."""
+
+    line: int
+    email: str | None
+    error: str
+
+
+class BulkSignupResponse(BaseModel):
+    """Response schema for a bulk signup; failed lines do not stop the rest."""
+
+    created: list[BulkSignupCreated]
+    failed: list[BulkSignupFailure]
+
+
 class LoginRequest(BaseModel):
     """Request schema for user login."""
 
@@ -62,3 +103,52 @@ class RefreshResponse(BaseModel):
     access_token: str
     refresh_token: str
     token_type: str = "bearer"
+
+
+class ProfileUpdateRequest(BaseModel):
+    """Request schema for updating the current user's profile."""
+
+    first_name: str | None = Field(default=None, min_length=1, max_length=100)
+    last_name: str | None = Field(default=None, min_length=1, max_length=100)
+    bio: str | None = Field(default=None, max_length=500)
+
+
+class ProfileResponse(BaseModel):
+    """Response schema for the current user's name and profile type."""
+
+    user_id: UUID
+    email: str | None
+    first_name: str
+    last_name: str
+    type: ProfileType
+
+
+class CurrentUser(BaseModel):
+    """Authenticated user resolved from a verified access token."""
+
+    user_id: UUID
+    email: str | None = None
+    role: str
+    expires_at: int
+    is_admin: bool = False
+
+
+class UserItem(BaseModel):
+    """A user profile in a listing; fields not requested are omitted."""
+
+    id: UUID
+    first_name: str | None = None
+    last_name: str | None = None
+    bio: str | None = None
+    type: ProfileType | None = None
+
+
+class UserListResponse(BaseModel):
+    """Response schema for a page of user profiles.
+
+    Pass ``next_cursor`` as ``cursor`` to get the next page; it is null on
+    the last page.
+    """
+
+    items: list[UserItem]
+    next_cursor: str | None
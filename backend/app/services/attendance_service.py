@@ -0,0 +1,776 @@
+import asyncio
+import contextlib
+import itertools
+import logging
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from app.core.metrics import record_span
+from app.db.embedding_store import EmbeddingStore
+from app.db.supabase import (
+    SupabaseClient,
+    get_async_supabase_client,
+    run_supabase_call,
+)
+from app.models.attendance import Attendance, AttendanceMethod, AttendanceStatus
+from app.models.recognition_log import RecognitionCandidate, RecognitionLogEntry
+from app.services.recognition_log_service import RecognitionLogWriter
+from app.services.recognition_service import ClassGallery, Match, RecognitionService
+from app.utils.assignment import assign_matches
+from app.utils.face_utils import DetectedFace, FaceEngine, detect_faces_tiled
+from app.utils.image_utils import decode_image
+from app.utils.pagination import keyset_pages
+
+logger = logging.getLogger(__name__)
+
+# Columns identifying one attendance record
+ATTENDANCE_CONFLICT_COLUMNS = "class_id,session_date,student_id"
+
+# Columns identifying one row of attendance_session_totals, read in order
+SESSION_KEY_COLUMNS = ("class_id", "session_date")
+
+
+class AttendanceServiceError(Exception):
+    """Base exception for attendance service errors."""
+
+    pass
+
+
+class AttendanceWriteError(AttendanceServiceError):
+    """Exception raised when attendance records cannot be written."""
+
+    pass
+
+
+class AttendanceQueueFullError(AttendanceServiceError):
+    """Exception raised when the write-behind queue stays full too long."""
+
+    pass
+
+
+class UnknownStudentsError(AttendanceServiceError):
+    """Exception raised when marked students are not in the class."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class FaceAssignment:
+    """A face in a class photo and the student it was assigned to."""
+
+    student_id: UUID
+    score: float
+    box: tuple[float, float, float, float]
+
+
+@dataclass(frozen=True)
+class FaceCandidates:
+    """A face's best-scoring students and the one it was assigned to."""
+
+    candidates: list[Match]
+    assignment: FaceAssignment | None
+
+
+@dataclass
+class ClassPhotoAttendance:
+    """Outcome of taking attendance from one class photo."""
+
+    class_id: UUID
+    session_date: date
+    present: list[FaceAssignment]
+    faces_detected: int
+    unmatched_faces: int
+    timings_ms: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class AttendanceWriterStats:
+    """Snapshot of the write-behind attendance writer's counters."""
+
+    pending: int
+    submitted: int
+    coalesced: int
+    flushes: int
+    flushed_rows: int
+    failed_flushes: int
+    rejected_rows: int
+
+
+# (class_id, session_date, student_id) of a serialized attendance row
+AttendanceKey = tuple[str, str, str]
+
+
+def _attendance_key(row: dict[str, Any]) -> AttendanceKey:
+    return (row["class_id"], row["session_date"], row["student_id"])
+
+
+def _rows_rejected(error: Exception) -> bool:
+    """Whether the database refused the rows themselves, not the request.
+
+    Data exceptions (SQLSTATE class 22) and constraint violations (class
+    23) fail the same way however often the rows are sent.
+    """
+    code = getattr(error, "code", None)
+    return isinstance(code, str) and code[:2] in ("22", "23")
+
+
+class AttendanceWriter:
+    """Write-behind buffer turning attendance marks into bulk upserts.
+
+    Marks are queued in memory and written by a background task in upserts
+    of up to ``batch_size`` rows, as soon as a full batch is queued or
+    ``flush_interval_seconds`` after the last flush. Rows are keyed by
+    class, session and student: marking a student twice before a flush
+    keeps only the latest mark, and the upsert makes re-sending a mark
+    harmless.
+
+    The queue holds at most ``max_pending`` marks. Submitting to a full
+    queue waits for a flush to make room and gives up after
+    ``enqueue_timeout_seconds``. Rows of a failed flush are queued again
+    unless a newer mark for the same key arrived meanwhile. A batch the
+    database rejects, such as one marking a student who does not exist,
+    is split in halves until the bad rows are isolated; those are logged
+    and dropped so they cannot hold up the rest.
+
+    ``start`` the writer on application startup and ``close`` it on
+    shutdown, which flushes whatever is still queued.
+    """
+
+    def __init__(
+        self,
+        client: SupabaseClient | None = None,
+        batch_size: int = 500,
+        flush_interval_seconds: float = 0.5,
+        max_pending: int = 10_000,
+        enqueue_timeout_seconds: float = 5.0,
+    ):
+        self.client = client
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.enqueue_timeout_seconds = enqueue_timeout_seconds
+        self._pending: dict[AttendanceKey, dict[str, Any]] = {}
+        self._space = asyncio.Condition()
+        self._batch_ready = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.failed_flushes = 0
+        self.rejected_rows = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def _execute(self, call: Callable[[SupabaseClient], Any]) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(self.client, call)
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        """Stop the background task and flush every queued mark."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except AttendanceWriteError:
+            logger.exception(
+                "Lost %d attendance marks on shutdown", len(self._pending)
+            )
+
+    async def submit(self, records: Sequence[Attendance]) -> None:
+        """Queue attendance marks to be written.
+
+        Args:
+            records: The marks to write.
+
+        Raises:
+            AttendanceQueueFullError: If the queue stayed full for longer
+                than the enqueue timeout.
+        """
+        rows = [record.model_dump(mode="json") for record in records]
+        async with self._space:
+            try:
+                await asyncio.wait_for(
+                    self._space.wait_for(lambda: len(self._pending) < self.max_pending),
+                    self.enqueue_timeout_seconds,
+                )
+            except TimeoutError:
+                raise AttendanceQueueFullError(
+                    "Attendance write queue is full, try again later"
+                ) from None
+
+            for row in rows:
+                key = _attendance_key(row)
+                if key in self._pending:
+                    self.coalesced += 1
+                self._pending[key] = row
+            self.submitted += len(rows)
+
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+
+    async def flush(self) -> int:
+        """Write every queued mark now, in batches.
+
+        Returns:
+            The number of rows written.
+
+        Raises:
+            AttendanceWriteError: If a batch cannot be written; its rows
+                stay queued, except rows the database rejected.
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                keys = list(itertools.islice(self._pending, self.batch_size))
+                rows = [self._pending.pop(key) for key in keys]
+                async with self._space:
+                    self._space.notify_all()
+
+                try:
+                    await self._upsert(rows)
+                except Exception as e:
+                    self.failed_flushes += 1
+                    if not _rows_rejected(e):
+                        self._requeue(rows)
+                        raise AttendanceWriteError(
+                            f"Failed to write attendance: {str(e)}"
+                        ) from e
+                    written += await self._write_accepted(rows)
+                else:
+                    written += len(rows)
+        return written
+
+    async def _upsert(self, rows: list[dict[str, Any]]) -> None:
+        await self._execute(
+            lambda client: client.table("attendance")
+            .upsert(rows, on_conflict=ATTENDANCE_CONFLICT_COLUMNS)
+            .execute()
+        )
+        self.flushes += 1
+        self.flushed_rows += len(rows)
+
+    def _requeue(self, rows: Sequence[dict[str, Any]]) -> None:
+        for row in rows:
+            self._pending.setdefault(_attendance_key(row), row)
+
+    async def _write_accepted(self, rows: list[dict[str, Any]]) -> int:
+        """Write the rows of a rejected batch, dropping the bad ones.
+
+        The batch is split in halves, and halves the database rejects are
+        split again, so k bad rows cost O(k log n) upserts.
+
+        Raises:
+            AttendanceWriteError: If an upsert fails for another reason;
+                the rows not yet written are queued again.
+        """
+        written = 0
+        rejected = [rows]
+        while rejected:
+            part = rejected.pop()
+            if len(part) == 1:
+                self.rejected_rows += 1
+                logger.warning(
+                    "Dropping attendance row the database rejected: %s", part[0]
+                )
+                continue
+            middle = len(part) // 2
+            halves = [part[:middle], part[middle:]]
+            for index, half in enumerate(halves):
+                try:
+                    await self._upsert(half)
+                except Exception as e:
+                    if _rows_rejected(e):
+                        rejected.append(half)
+                        continue
+                    self.failed_flushes += 1
+                    for unwritten in [*halves[index:], *rejected]:
+                        self._requeue(unwritten)
+                    raise AttendanceWriteError(
+                        f"Failed to write attendance: {str(e)}"
+                    ) from e
+                written += len(half)
+        return written
+
+    def stats(self) -> AttendanceWriterStats:
+        """Get a snapshot of the writer counters."""
+        return AttendanceWriterStats(
+            pending=len(self._pending),
+            submitted=self.submitted,
+            coalesced=self.coalesced,
+            flushes=self.flushes,
+            flushed_rows=self.flushed_rows,
+            failed_flushes=self.failed_flushes,
+            rejected_rows=self.rejected_rows,
+        )
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), self.flush_interval_seconds
+                )
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+            except AttendanceWriteError:
+                logger.exception("Attendance flush failed, retrying later")
+
+
+class AttendanceService:
+    """Service for taking attendance from classroom photos.
+
+    A single photo of the room marks every recognized student present: all
+    faces are detected (on tiles, so small faces in the back rows survive),
+    embedded in one batch, scored against the class gallery with one matrix
+    multiply, and paired with students one-to-one so no student is counted
+    twice. The records are written in one bulk upsert.
+
+    With a ``writer`` every record goes through its write-behind queue
+    instead, coalesced with marks from other requests. With a ``log``,
+    every face of every photo is logged for audits with its best-scoring
+    students.
+
+    Class galleries are loaded on first use, reloaded whenever the shared
+    embedding store changes, and have their rosters read again once they
+    are ``roster_ttl_seconds`` old.
+    """
+
+    def __init__(
+        self,
+        recognition: RecognitionService,
+        store: EmbeddingStore,
+        engine: FaceEngine,
+        client: SupabaseClient | None = None,
+        max_side: int = 4096,
+        tile_size: int = 1280,
+        tile_overlap: int = 256,
+        max_faces: int = 300,
+        latency_budget_ms: float = 2000.0,
+        writer: AttendanceWriter | None = None,
+        log: RecognitionLogWriter | None = None,
+        roster_ttl_seconds: float = 300.0,
+        page_size: int = 1000,
+    ):
+        self.recognition = recognition
+        self.store = store
+        self.engine = engine
+        self.client = client
+        self.max_side = max_side
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.max_faces = max_faces
+        self.latency_budget_ms = latency_budget_ms
+        self.writer = writer
+        self.log = log
+        self.roster_ttl_seconds = roster_ttl_seconds
+        self.page_size = page_size
+
+    async def _execute(self, call: Callable[[SupabaseClient], Any]) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(self.client, call)
+
+    async def _write(self, records: Sequence[Attendance]) -> None:
+        """Write attendance records, through the writer if there is one."""
+        if self.writer is not None:
+            await self.writer.submit(records)
+            return
+
+        rows = [record.model_dump(mode="json") for record in records]
+        try:
+            await self._execute(
+                lambda client: client.table("attendance")
+                .upsert(rows, on_conflict=ATTENDANCE_CONFLICT_COLUMNS)
+                .execute()
+            )
+        except Exception as e:
+            raise AttendanceWriteError(f"Failed to write attendance: {str(e)}") from e
+
+    async def mark_students(
+        self,
+        class_id: UUID,
+        marks: Sequence[tuple[UUID, AttendanceStatus]],
+        session_date: date | None = None,
+        method: AttendanceMethod = AttendanceMethod.MANUAL,
+    ) -> int:
+        """Record the attendance status of several students of a class.
+
+        Every student must be on the class roster; a roster that does not
+        list them is read again once, in case they only just joined.
+
+        Args:
+            class_id: The class.
+            marks: (student id, status) pairs.
+            session_date: The session; defaults to today (UTC).
+            method: How the attendance was taken.
+
+        Returns:
+            The number of marks recorded.
+
+        Raises:
+            UnknownStudentsError: If a student is not in the class.
+            AttendanceQueueFullError: If the write queue is full.
+            AttendanceWriteError: If the records cannot be written.
+        """
+        gallery = await self.ensure_gallery(class_id)
+        unknown = {student_id for student_id, _ in marks} - set(gallery.roster)
+        if unknown:
+            gallery = await self._load_gallery(class_id)
+            unknown -= set(gallery.roster)
+        if unknown:
+            raise UnknownStudentsError(
+                f"Not students of class {class_id}: {sorted(map(str, unknown))}"
+            )
+
+        session_date = session_date or datetime.now(timezone.utc).date()
+        recorded_at = datetime.now(timezone.utc)
+        await self._write(
+            [
+                Attendance(
+                    class_id=class_id,
+                    student_id=student_id,
+                    session_date=session_date,
+                    status=status,
+                    method=method,
+                    recorded_at=recorded_at,
+                )
+                for student_id, status in marks
+            ]
+        )
+        return len(marks)
+
+    async def ensure_gallery(self, class_id: UUID) -> ClassGallery:
+        """Get a class's gallery, loading it if it is missing or out of date.
+
+        Args:
+            class_id: The class to get.
+
+        Returns:
+            The class's gallery.
+        """
+        gallery = self.recognition.current_gallery(class_id, self.store)
+        if (
+            gallery is not None
+            and time.monotonic() - gallery.roster_fetched_at < self.roster_ttl_seconds
+        ):
+            return gallery
+        return await self._load_gallery(class_id)
+
+    async def _load_gallery(self, class_id: UUID) -> ClassGallery:
+        """Read a class's roster and load its gallery from the store."""
+        fetched_at = time.monotonic()
+        student_ids = await self._fetch_roster(class_id)
+        return self.recognition.load_class_gallery(
+            class_id, student_ids, self.store, fetched_at
+        )
+
+    async def _fetch_roster(self, class_id: UUID) -> list[UUID]:
+        """Read every student of a class, a page at a time."""
+
+        async def fetch(after: str | None, count: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = (
+                    client.table("class_students")
+                    .select("student_id")
+                    .eq("class_id", str(class_id))
+                )
+                if after is not None:
+                    query = query.or_(after)
+                return query.order("student_id").limit(count).execute()
+
+            return (await self._execute(call)).data
+
+        return [
+            UUID(row["student_id"])
+            async for page in keyset_pages(fetch, ("student_id",), self.page_size)
+            for row in page
+        ]
+
+    async def prewarm_galleries(
+        self, day: date | None = None, weeks: int = 4, concurrency: int = 8
+    ) -> int:
+        """Load the galleries of the classes likely to meet on a day.
+
+        Timetables repeat weekly, so these are the classes that held a
+        session on the same weekday in any of the previous ``weeks`` weeks.
+
+        Args:
+            day: The day to prepare for; defaults to today (UTC).
+            weeks: How many weeks back to look for sessions.
+            concurrency: Rosters fetched at a time.
+
+        Returns:
+            The number of galleries loaded.
+        """
+        day = day or datetime.now(timezone.utc).date()
+        past_days = [
+            (day - timedelta(weeks=week)).isoformat() for week in range(1, weeks + 1)
+        ]
+
+        async def fetch(after: str | None, count: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = (
+                    client.table("attendance_session_totals")
+                    .select("class_id, session_date")
+                    .in_("session_date", past_days)
+                )
+                if after is not None:
+                    query = query.or_(after)
+                for key in SESSION_KEY_COLUMNS:
+                    query = query.order(key)
+                return query.limit(count).execute()
+
+            return (await self._execute(call)).data
+
+        class_ids = {
+            UUID(row["class_id"])
+            async for page in keyset_pages(fetch, SESSION_KEY_COLUMNS, self.page_size)
+            for row in page
+        }
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def load(class_id: UUID) -> None:
+            async with semaphore:
+                await self.ensure_gallery(class_id)
+
+        await asyncio.gather(*(load(class_id) for class_id in class_ids))
+        return len(class_ids)
+
+    def analyze_class_photo(
+        self, gallery: ClassGallery, data: bytes, top_k: int = 0
+    ) -> tuple[list[FaceAssignment], int, dict[str, float], list[FaceCandidates]]:
+        """Find which of a class's students appear in a photo.
+
+        CPU bound; run it in a worker thread.
+
+        Args:
+            gallery: The class's gallery.
+            data: The encoded photo.
+            top_k: Best-scoring students to list for every face; none are
+                listed when 0.
+
+        Returns:
+            The assigned faces, the number of faces detected, the time
+            spent in each stage in milliseconds and, when ``top_k`` is set,
+            every face's candidates.
+
+        Raises:
+            ImageDecodeError: If the photo cannot be decoded.
+        """
+        timings: dict[str, float] = {}
+        started = stage_started = time.perf_counter()
+
+        def lap(stage: str) -> None:
+            nonlocal stage_started
+            now = time.perf_counter()
+            record_span(stage, now - stage_started)
+            timings[stage] = (now - stage_started) * 1000
+            stage_started = now
+
+        image = decode_image(data, max_side=self.max_side)
+        lap("decode")
+
+        faces = self._detect_faces(image)
+        lap("detect")
+
+        assignments: list[FaceAssignment] = []
+        candidates: list[list[Match]] = [[] for _ in faces] if top_k else []
+        assigned_faces: list[int] = []
+        if faces and len(gallery):
+            aligned = np.stack([self.engine.align(image, face) for face in faces])
+            embeddings = self.engine.embed(aligned)
+            lap("embed")
+
+            scores = gallery.score(embeddings)
+            rows, cols = assign_matches(scores, self.recognition.match_threshold)
+            assignments = [
+                FaceAssignment(
+                    student_id=gallery.student_ids[col],
+                    score=float(scores[row, col]),
+                    box=faces[row].box,
+                )
+                for row, col in zip(rows.tolist(), cols.tolist())
+            ]
+            assigned_faces = rows.tolist()
+            if top_k:
+                # Listed whatever their score, to show why a face matched nobody
+                candidates = gallery.top_matches(scores, top_k, threshold=-1.0)
+            lap("match")
+
+        timings["total"] = (time.perf_counter() - started) * 1000
+        if timings["total"] > self.latency_budget_ms:
+            logger.warning(
+                "Class photo with %d faces took %.0f ms, over the %.0f ms budget",
+                len(faces),
+                timings["total"],
+                self.latency_budget_ms,
+            )
+        assigned = dict(zip(assigned_faces, assignments))
+        face_candidates = [
+            FaceCandidates(candidates=matches, assignment=assigned.get(face))
+            for face, matches in enumerate(candidates)
+        ]
+        return assignments, len(faces), timings, face_candidates
+
+    def identify_faces(self, data: bytes, top_k: int = 5) -> list[list[Match]]:
+        """Find who the faces in a photo are among every enrolled student.
+
+        For audit log entries whose face matched nobody in its class.
+        Searches the institution index, so matches are approximate. CPU
+        bound; run it in a worker thread.
+
+        Args:
+            data: The encoded photo.
+            top_k: Maximum number of candidates per face.
+
+        Returns:
+            One list of matches per face detected, best first.
+
+        Raises:
+            ImageDecodeError: If the photo cannot be decoded.
+        """
+        image = decode_image(data, max_side=self.max_side)
+        faces = self._detect_faces(image)
+        if not faces:
+            return []
+        aligned = np.stack([self.engine.align(image, face) for face in faces])
+        return self.recognition.identify(self.engine.embed(aligned), top_k=top_k)
+
+    def _detect_faces(self, image: np.ndarray) -> list[DetectedFace]:
+        """Detect the faces in a photo, keeping the most confident ones."""
+        faces = detect_faces_tiled(
+            self.engine, image, tile_size=self.tile_size, overlap=self.tile_overlap
+        )
+        if len(faces) > self.max_faces:
+            faces = sorted(faces, key=lambda face: face.score, reverse=True)
+            faces = faces[: self.max_faces]
+        return faces
+
+    def _log_recognitions(
+        self, class_id: UUID, image_key: str, faces: list[FaceCandidates]
+    ) -> None:
+        """Queue one audit log entry per face of a class photo."""
+        recorded_at = datetime.now(timezone.utc)
+        self.log.submit(
+            [
+                RecognitionLogEntry(
+                    recorded_at=recorded_at,
+                    class_id=class_id,
+                    image_sha256=image_key,
+                    student_id=face.assignment.student_id if face.assignment else None,
+                    score=face.assignment.score if face.assignment else None,
+                    candidates=[
+                        RecognitionCandidate(
+                            student_id=match.student_id, score=match.score
+                        )
+                        for match in face.candidates
+                    ],
+                )
+                for face in faces
+            ]
+        )
+
+    async def take_photo_attendance(
+        self,
+        class_id: UUID,
+        image_key: str,
+        data: bytes,
+        session_date: date | None = None,
+    ) -> ClassPhotoAttendance:
+        """Mark every student recognized in a class photo present.
+
+        Students not found in the photo are left untouched, so several
+        photos of the same session add up.
+
+        Args:
+            class_id: The class the photo was taken in.
+            image_key: The stored photo's key, recorded with the attendance.
+            data: The encoded photo.
+            session_date: The session; defaults to today (UTC).
+
+        Returns:
+            The students marked present and per-stage timings.
+
+        Raises:
+            ImageDecodeError: If the photo cannot be decoded.
+            AttendanceQueueFullError: If the write queue is full.
+            AttendanceWriteError: If the records cannot be written.
+        """
+        session_date = session_date or datetime.now(timezone.utc).date()
+        gallery = await self.ensure_gallery(class_id)
+        top_k = self.log.store.top_k if self.log is not None else 0
+        assignments, faces_detected, timings, faces = await asyncio.to_thread(
+            self.analyze_class_photo, gallery, data, top_k
+        )
+        if self.log is not None:
+            self._log_recognitions(class_id, image_key, faces)
+
+        if assignments:
+            recorded_at = datetime.now(timezone.utc)
+            write_started = time.perf_counter()
+            await self._write(
+                [
+                    Attendance(
+                        class_id=class_id,
+                        student_id=assignment.student_id,
+                        session_date=session_date,
+                        status=AttendanceStatus.PRESENT,
+                        method=AttendanceMethod.CLASS_PHOTO,
+                        confidence=assignment.score,
+                        image_sha256=image_key,
+                        recorded_at=recorded_at,
+                    )
+                    for assignment in assignments
+                ]
+            )
+            write_seconds = time.perf_counter() - write_started
+            record_span("write", write_seconds)
+            timings["write"] = write_seconds * 1000
+
+        return ClassPhotoAttendance(
+            class_id=class_id,
+            session_date=session_date,
+            present=assignments,
+            faces_detected=faces_detected,
+            unmatched_faces=faces_detected - len(assignments),
+            timings_ms=timings,
+        )
@@ -1,17 +1,41 @@
+import asyncio
+import contextlib
+import csv
+import io
+import logging
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
 from uuid import UUID
 
-from supabase import Client
+from pydantic import ValidationError
+from supabase import AuthApiError
 
-from app.db.supabase import get_supabase_client
+from app.db.supabase import (
+    SupabaseClient,
+    get_async_supabase_client,
+    run_supabase_call,
+)
 from app.models.instructor import ProfileType
 from app.schemas.user import (
+    BulkSignupCreated,
+    BulkSignupFailure,
+    BulkSignupResponse,
+    BulkSignupRow,
     InstructorSignupRequest,
     InstructorSignupResponse,
     LoginRequest,
     LoginResponse,
+    ProfileUpdateRequest,
     RefreshRequest,
     RefreshResponse,
 )
+from app.services.profile_cache import CachedProfile, ProfileCache
+
+logger = logging.getLogger(__name__)
+
+BULK_SIGNUP_REQUIRED_COLUMNS = ("email", "first_name", "last_name", "type")
 
 
 class AuthServiceError(Exception):
@@ -26,6 +50,12 @@ class SignupError(AuthServiceError):
     pass
 
 
+class BulkSignupError(SignupError):
+    """Exception raised when a bulk signup CSV cannot be read."""
+
+    pass
+
+
 class LoginError(AuthServiceError):
     """Exception raised when login fails."""
 
@@ -38,20 +68,355 @@ class RefreshError(AuthServiceError):
     pass
 
 
+class ProfileError(AuthServiceError):
+    """Exception raised when a profile cannot be read or updated."""
+
+    pass
+
+
+class ProfileNotFoundError(ProfileError):
+    """Exception raised when a user has no profile."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class AuthUserCleanupStats:
+    """Snapshot of the auth user cleanup queue's counters."""
+
+    pending: int
+    deleted: int
+    retries: int
+    abandoned: int
+
+
+class AuthUserCleanup:
+    """Retry queue deleting the auth users of failed signups.
+
+    A signup whose profile rows cannot be written must not leave its auth
+    user behind, or the email stays taken by a user who cannot log in.
+    Users are deleted by a background task; a failed delete is retried
+    with exponential backoff from ``base_delay_seconds`` up to
+    ``max_delay_seconds``, and given up with an error log after
+    ``max_attempts``. A user that is already gone counts as deleted.
+
+    ``start`` the queue on application startup and ``close`` it on
+    shutdown, which makes one last attempt for every queued user.
+    """
+
+    def __init__(
+        self,
+        client: SupabaseClient | None = None,
+        max_attempts: int = 10,
+        base_delay_seconds: float = 1.0,
+        max_delay_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.client = client
+        self.max_attempts = max_attempts
+        self.base_delay_seconds = base_delay_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self._clock = clock
+        # Attempts made so far and when to try next, by user
+        self._pending: dict[UUID, tuple[int, float]] = {}
+        self._wake = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self.deleted = 0
+        self.retries = 0
+        self.abandoned = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def _execute(
+        self, call: Callable[[SupabaseClient], Any], operation: str
+    ) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+            operation: The call's name in its "supabase.<operation>" span.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(
+            self.client, call, span_name=f"supabase.{operation}"
+        )
+
+    def start(self) -> None:
+        """Start deleting queued users in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background task and try every queued user once more."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.retry_due(force=True)
+        if self._pending:
+            logger.error(
+                "Auth users of failed signups left on shutdown: %s",
+                ", ".join(str(user_id) for user_id in self._pending),
+            )
+
+    def submit(self, user_id: UUID) -> None:
+        """Queue an auth user to be deleted as soon as possible."""
+        self._pending.setdefault(user_id, (0, self._clock()))
+        self._wake.set()
+
+    async def retry_due(self, force: bool = False) -> int:
+        """Try to delete every queued user whose retry is due.
+
+        Args:
+            force: Try every queued user, due or not.
+
+        Returns:
+            The number of users deleted.
+        """
+        now = self._clock()
+        due = [
+            user_id
+            for user_id, (_, retry_at) in self._pending.items()
+            if force or retry_at <= now
+        ]
+        deleted = 0
+        for user_id in due:
+            attempts, _ = self._pending.pop(user_id)
+            try:
+                await self._delete(user_id)
+            except Exception:
+                attempts += 1
+                if attempts >= self.max_attempts:
+                    self.abandoned += 1
+                    logger.exception(
+                        "Giving up deleting auth user %s after %d attempts",
+                        user_id,
+                        attempts,
+                    )
+                    continue
+                self.retries += 1
+                delay = min(
+                    self.base_delay_seconds * 2 ** (attempts - 1),
+                    self.max_delay_seconds,
+                )
+                self._pending[user_id] = (attempts, self._clock() + delay)
+                logger.warning(
+                    "Deleting auth user %s failed, retrying in %.0fs",
+                    user_id,
+                    delay,
+                    exc_info=True,
+                )
+                continue
+            deleted += 1
+        self.deleted += deleted
+        return deleted
+
+    def stats(self) -> AuthUserCleanupStats:
+        """Get a snapshot of the queue counters."""
+        return AuthUserCleanupStats(
+            pending=len(self._pending),
+            deleted=self.deleted,
+            retries=self.retries,
+            abandoned=self.abandoned,
+        )
+
+    async def _delete(self, user_id: UUID) -> None:
+        try:
+            await self._execute(
+                lambda client: client.auth.admin.delete_user(str(user_id)),
+                "delete_user",
+            )
+        except AuthApiError as e:
+            if e.status != 404:
+                raise
+
+    def _next_retry_in(self) -> float | None:
+        if not self._pending:
+            return None
+        retry_at = min(retry_at for _, retry_at in self._pending.values())
+        return max(retry_at - self._clock(), 0.0)
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), self._next_retry_in())
+            self._wake.clear()
+            await self.retry_due()
+
+
+def _validation_message(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def parse_bulk_signup_csv(
+    text: str, max_rows: int
+) -> tuple[list[tuple[int, BulkSignupRow]], list[BulkSignupFailure]]:
+    """Read the users of a bulk signup CSV.
+
+    The header names the columns: email, first_name, last_name and type
+    (student or instructor) are required; password, bio, department and
+    office_location are optional, and empty cells count as missing. Lines
+    that fail validation or repeat an earlier email are returned as
+    failures rather than failing the whole file.
+
+    Args:
+        text: The CSV document.
+        max_rows: The most users the file may list.
+
+    Returns:
+        The valid rows with their line numbers, and the failed lines.
+
+    Raises:
+        BulkSignupError: If the file is not valid CSV, lacks a required
+            column or lists more than max_rows users.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    try:
+        header = reader.fieldnames or []
+    except csv.Error as e:
+        raise BulkSignupError(f"Invalid CSV: {str(e)}") from e
+    reader.fieldnames = [name.strip().lower() for name in header]
+    missing = [c for c in BULK_SIGNUP_REQUIRED_COLUMNS if c not in reader.fieldnames]
+    if missing:
+        raise BulkSignupError(f"Missing CSV columns: {', '.join(missing)}")
+
+    rows: list[tuple[int, BulkSignupRow]] = []
+    failures: list[BulkSignupFailure] = []
+    emails: set[str] = set()
+    try:
+        for record in reader:
+            line = reader.line_num
+            if len(rows) + len(failures) >= max_rows:
+                raise BulkSignupError(f"At most {max_rows} users per bulk signup")
+            # Cells past the header are keyed by None and ignored
+            values = {
+                name: value.strip()
+                for name, value in record.items()
+                if name is not None and value and value.strip()
+            }
+            email = values.get("email")
+            try:
+                row = BulkSignupRow(**values)
+            except ValidationError as e:
+                failures.append(
+                    BulkSignupFailure(
+                        line=line, email=email, error=_validation_message(e)
+                    )
+                )
+                continue
+            if row.email.lower() in emails:
+                failures.append(
+                    BulkSignupFailure(line=line, email=email, error="Duplicate email")
+                )
+                continue
+            emails.add(row.email.lower())
+            rows.append((line, row))
+    except csv.Error as e:
+        raise BulkSignupError(f"Invalid CSV: {str(e)}") from e
+    return rows, failures
+
+
+def _profile_row(
+    user_id: UUID,
+    profile_type: ProfileType,
+    user: InstructorSignupRequest | BulkSignupRow,
+) -> dict[str, Any]:
+    """The create_user_profiles argument for one user."""
+    return {
+        "id": str(user_id),
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "bio": user.bio,
+        "type": profile_type.value,
+        "department": user.department,
+        "office_location": user.office_location,
+    }
+
+
 class AuthService:
-    """Service for handling authentication operations."""
+    """Service for handling authentication operations.
+
+    With a ``profiles`` cache, names and profile types are read from it
+    instead of the profiles table on login; signup fills it and profile
+    updates invalidate it.
+
+    Auth users whose signup failed are deleted right away; with a
+    ``cleanup`` queue, a delete that fails is retried from there.
+    """
+
+    def __init__(
+        self,
+        client: SupabaseClient | None = None,
+        profiles: ProfileCache | None = None,
+        cleanup: AuthUserCleanup | None = None,
+        bulk_batch_size: int = 200,
+        bulk_auth_concurrency: int = 8,
+    ):
+        self.client = client
+        self.profiles = profiles
+        self.cleanup = cleanup
+        self.bulk_batch_size = bulk_batch_size
+        self.bulk_auth_concurrency = bulk_auth_concurrency
+
+    async def _execute(
+        self, call: Callable[[SupabaseClient], Any], operation: str
+    ) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+            operation: The call's name in its "supabase.<operation>" span.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(
+            self.client, call, span_name=f"supabase.{operation}"
+        )
+
+    async def _create_profiles(self, rows: list[dict[str, Any]]) -> None:
+        """Write the profile and instructor rows of new users in one call.
+
+        The rows are written in one transaction, all or none.
 
-    def __init__(self, client: Client | None = None):
-        self.client = client or get_supabase_client()
+        Raises:
+            SignupError: If the rows cannot be written.
+        """
+        try:
+            result = await self._execute(
+                lambda client: client.rpc(
+                    "create_user_profiles", {"p_users": rows}
+                ).execute(),
+                "create_profiles",
+            )
+        except Exception as e:
+            raise SignupError(f"Failed to create profile records: {str(e)}") from e
+        if result.data != len(rows):
+            raise SignupError("Failed to create profile records")
 
     async def signup_instructor(
         self, request: InstructorSignupRequest
     ) -> InstructorSignupResponse:
         """Sign up a new instructor.
 
-        Creates an auth user, then inserts profile and instructor records.
-        If any step fails after auth user creation, the auth user is deleted
-        to maintain consistency.
+        Creates an auth user, then its profile and instructor records with
+        one database call. If the records cannot be written, the auth user
+        is deleted to maintain consistency.
 
         Args:
             request: The instructor signup request data.
@@ -66,8 +431,11 @@ class AuthService:
 
         try:
             # Step 1: Create auth user via Supabase Auth
-            auth_response = self.client.auth.sign_up(
-                {"email": request.email, "password": request.password}
+            auth_response = await self._execute(
+                lambda client: client.auth.sign_up(
+                    {"email": request.email, "password": request.password}
+                ),
+                "sign_up",
             )
 
             if not auth_response.user:
@@ -75,33 +443,20 @@ class AuthService:
 
             user_id = UUID(auth_response.user.id)
 
-            # Step 2: Insert profile record
-            profile_data = {
-                "id": str(user_id),
-                "first_name": request.first_name,
-                "last_name": request.last_name,
-                "bio": request.bio,
-                "type": ProfileType.INSTRUCTOR.value,
-            }
-
-            profile_result = self.client.table("profiles").insert(profile_data).execute()
-
-            if not profile_result.data:
-                raise SignupError("Failed to create profile record")
-
-            # Step 3: Insert instructor record
-            instructor_data = {
-                "id": str(user_id),
-                "department": request.department,
-                "office_location": request.office_location,
-            }
-
-            instructor_result = (
-                self.client.table("instructors").insert(instructor_data).execute()
+            # Step 2: Insert profile and instructor records in one transaction
+            await self._create_profiles(
+                [_profile_row(user_id, ProfileType.INSTRUCTOR, request)]
             )
 
-            if not instructor_result.data:
-                raise SignupError("Failed to create instructor record")
+            if self.profiles is not None:
+                await self.profiles.put(
+                    user_id,
+                    CachedProfile(
+                        first_name=request.first_name,
+                        last_name=request.last_name,
+                        type=ProfileType.INSTRUCTOR,
+                    ),
+                )
 
             # Return successful response
             return InstructorSignupResponse(
@@ -127,18 +482,112 @@ class AuthService:
                 await self._delete_auth_user(user_id)
             raise SignupError(f"Signup failed: {str(e)}") from e
 
+    async def bulk_signup(
+        self, rows: Sequence[tuple[int, BulkSignupRow]]
+    ) -> BulkSignupResponse:
+        """Provision many students and instructors, a batch at a time.
+
+        The auth users of a batch of ``bulk_batch_size`` rows are created
+        concurrently, at most ``bulk_auth_concurrency`` at a time, then all
+        of the batch's profile and instructor records are written with one
+        call. A user whose auth user cannot be created fails alone; if a
+        batch's records cannot be written, every user of the batch fails
+        and its auth users are deleted.
+
+        Args:
+            rows: The users to create, with the CSV line each came from.
+
+        Returns:
+            The users created and the lines that failed.
+        """
+        created: list[BulkSignupCreated] = []
+        failed: list[BulkSignupFailure] = []
+        semaphore = asyncio.Semaphore(self.bulk_auth_concurrency)
+
+        async def create_auth_user(row: BulkSignupRow) -> UUID:
+            attributes: dict[str, Any] = {"email": row.email, "email_confirm": True}
+            if row.password is not None:
+                attributes["password"] = row.password
+            async with semaphore:
+                response = await self._execute(
+                    lambda client: client.auth.admin.create_user(attributes),
+                    "create_user",
+                )
+            if not response.user:
+                raise SignupError("no user returned")
+            return UUID(response.user.id)
+
+        async def discard(user_id: UUID) -> None:
+            async with semaphore:
+                await self._delete_auth_user(user_id)
+
+        for start in range(0, len(rows), self.bulk_batch_size):
+            batch = rows[start : start + self.bulk_batch_size]
+            results = await asyncio.gather(
+                *(create_auth_user(row) for _, row in batch), return_exceptions=True
+            )
+
+            users: list[tuple[int, BulkSignupRow, UUID]] = []
+            for (line, row), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    failed.append(
+                        BulkSignupFailure(
+                            line=line,
+                            email=row.email,
+                            error=f"Failed to create auth user: {str(result)}",
+                        )
+                    )
+                else:
+                    users.append((line, row, result))
+            if not users:
+                continue
+
+            try:
+                await self._create_profiles(
+                    [_profile_row(user_id, row.type, row) for _, row, user_id in users]
+                )
+            except SignupError as e:
+                await asyncio.gather(*(discard(user_id) for _, _, user_id in users))
+                failed.extend(
+                    BulkSignupFailure(line=line, email=row.email, error=str(e))
+                    for line, row, _ in users
+                )
+                continue
+
+            created.extend(
+                BulkSignupCreated(
+                    line=line, user_id=user_id, email=row.email, type=row.type
+                )
+                for line, row, user_id in users
+            )
+
+        failed.sort(key=lambda failure: failure.line)
+        return BulkSignupResponse(created=created, failed=failed)
+
     async def _delete_auth_user(self, user_id: UUID) -> None:
         """Delete an auth user for rollback purposes.
 
+        A failed delete is queued for retry when there is a cleanup queue.
+
         Args:
             user_id: The UUID of the user to delete.
         """
         try:
-            self.client.auth.admin.delete_user(str(user_id))
+            await self._execute(
+                lambda client: client.auth.admin.delete_user(str(user_id)),
+                "delete_user",
+            )
         except Exception:
-            # Log error but don't raise - this is cleanup code
-            # In production, you'd want proper logging here
-            pass
+            # Don't raise - this is cleanup code
+            if self.cleanup is not None:
+                logger.warning(
+                    "Deleting auth user %s failed, queued for retry",
+                    user_id,
+                    exc_info=True,
+                )
+                self.cleanup.submit(user_id)
+            else:
+                logger.exception("Failed to delete auth user %s", user_id)
 
     async def login(self, request: LoginRequest) -> LoginResponse:
         """Log in a user with email and password.
@@ -156,8 +605,11 @@ class AuthService:
         """
         try:
             # Authenticate with Supabase Auth
-            auth_response = self.client.auth.sign_in_with_password(
-                {"email": request.email, "password": request.password}
+            auth_response = await self._execute(
+                lambda client: client.auth.sign_in_with_password(
+                    {"email": request.email, "password": request.password}
+                ),
+                "sign_in",
             )
 
             if not auth_response.user or not auth_response.session:
@@ -165,29 +617,21 @@ class AuthService:
 
             user_id = UUID(auth_response.user.id)
 
-            # Fetch user profile
-            profile_result = (
-                self.client.table("profiles")
-                .select("first_name, last_name, type")
-                .eq("id", str(user_id))
-                .single()
-                .execute()
-            )
+            # Fetch user profile, from the cache when possible
+            profile = await self._fetch_profile(user_id)
 
-            if not profile_result.data:
+            if profile is None:
                 raise LoginError("User profile not found")
 
-            profile = profile_result.data
-
             return LoginResponse(
                 access_token=auth_response.session.access_token,
                 refresh_token=auth_response.session.refresh_token,
                 token_type="bearer",
                 user_id=user_id,
                 email=auth_response.user.email or request.email,
-                first_name=profile["first_name"],
-                last_name=profile["last_name"],
-                type=ProfileType(profile["type"]),
+                first_name=profile.first_name,
+                last_name=profile.last_name,
+                type=profile.type,
             )
 
         except LoginError:
@@ -195,6 +639,104 @@ class AuthService:
         except Exception as e:
             raise LoginError(f"Login failed: {str(e)}") from e
 
+    async def _fetch_profile(self, user_id: UUID) -> CachedProfile | None:
+        """Read a user's name and type through the profile cache.
+
+        Returns:
+            The profile, or None if the user has none.
+        """
+        if self.profiles is not None:
+            profile = await self.profiles.get(user_id)
+            if profile is not None:
+                return profile
+
+        profile_result = await self._execute(
+            lambda client: client.table("profiles")
+            .select("first_name, last_name, type")
+            .eq("id", str(user_id))
+            .single()
+            .execute(),
+            "get_profile",
+        )
+        if not profile_result.data:
+            return None
+
+        row = profile_result.data
+        profile = CachedProfile(
+            first_name=row["first_name"],
+            last_name=row["last_name"],
+            type=ProfileType(row["type"]),
+        )
+        if self.profiles is not None:
+            await self.profiles.put(user_id, profile)
+        return profile
+
+    async def get_profile(self, user_id: UUID) -> CachedProfile:
+        """Get a user's name and profile type.
+
+        Args:
+            user_id: The user.
+
+        Returns:
+            The user's profile.
+
+        Raises:
+            ProfileNotFoundError: If the user has no profile.
+            ProfileError: If the profile cannot be read.
+        """
+        try:
+            profile = await self._fetch_profile(user_id)
+        except Exception as e:
+            raise ProfileError(f"Failed to read profile: {str(e)}") from e
+
+        if profile is None:
+            raise ProfileNotFoundError(f"No profile for user {user_id}")
+        return profile
+
+    async def update_profile(
+        self, user_id: UUID, request: ProfileUpdateRequest
+    ) -> CachedProfile:
+        """Update a user's profile and drop its cached copy.
+
+        Args:
+            user_id: The user.
+            request: The fields to change; fields left out or null are kept.
+
+        Returns:
+            The updated profile.
+
+        Raises:
+            ProfileNotFoundError: If the user has no profile.
+            ProfileError: If the profile cannot be updated.
+        """
+        changes = request.model_dump(exclude_none=True)
+        if not changes:
+            return await self.get_profile(user_id)
+
+        try:
+            result = await self._execute(
+                lambda client: client.table("profiles")
+                .update(changes)
+                .eq("id", str(user_id))
+                .execute(),
+                "update_profile",
+            )
+        except Exception as e:
+            raise ProfileError(f"Failed to update profile: {str(e)}") from e
+        finally:
+            # The row may have changed even if the response was lost
+            if self.profiles is not None:
+                await self.profiles.invalidate(user_id)
+
+        if not result.data:
+            raise ProfileNotFoundError(f"No profile for user {user_id}")
+        row = result.data[0]
+        return CachedProfile(
+            first_name=row["first_name"],
+            last_name=row["last_name"],
+            type=ProfileType(row["type"]),
+        )
+
     async def refresh_token(self, request: RefreshRequest) -> RefreshResponse:
         """Refresh an access token using a refresh token.
 
@@ -208,7 +750,10 @@ class AuthService:
             RefreshError: If token refresh fails.
         """
         try:
-            auth_response = self.client.auth.refresh_session(request.refresh_token)
+            auth_response = await self._execute(
+                lambda client: client.auth.refresh_session(request.refresh_token),
+                "refresh_session",
+            )
 
             if not auth_response.session:
                 raise RefreshError("Failed to refresh token")
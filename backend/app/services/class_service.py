@@ -0,0 +1,209 @@
+from collections.abc import Callable, Sequence
+from typing import Any
+from uuid import UUID
+
+from app.db.supabase import (
+    SupabaseClient,
+    get_async_supabase_client,
+    run_supabase_call,
+)
+from app.utils.pagination import Page, fetch_keyset_page, select_fields
+
+CLASS_FIELDS = ("id", "name", "code", "instructor_id", "created_at")
+CLASS_KEY_COLUMNS = ("id",)
+
+# Roster entries are class_students rows with the student's profile fields
+ROSTER_FIELDS = ("student_id", "first_name", "last_name", "bio")
+ROSTER_KEY_COLUMNS = ("student_id",)
+
+
+class ClassServiceError(Exception):
+    """Base exception for class service errors."""
+
+    pass
+
+
+class ClassQueryError(ClassServiceError):
+    """Exception raised when classes or rosters cannot be read."""
+
+    pass
+
+
+class ClassNotFoundError(ClassServiceError):
+    """Exception raised when a class does not exist."""
+
+    pass
+
+
+class ClassService:
+    """Service for listing classes and their rosters.
+
+    Listings are keyset-paginated on the primary key, so the last page of
+    an 800-student roster costs the same as the first, and read only the
+    fields the client asks for.
+    """
+
+    def __init__(self, client: SupabaseClient | None = None):
+        self.client = client
+
+    async def _execute(self, call: Callable[[SupabaseClient], Any]) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(self.client, call)
+
+    async def _read(self, table: str, call: Callable[[SupabaseClient], Any]) -> Any:
+        try:
+            result = await self._execute(call)
+        except Exception as e:
+            raise ClassQueryError(f"Failed to read {table}: {str(e)}") from e
+        return result.data
+
+    async def get_instructor_id(self, class_id: UUID) -> UUID | None:
+        """Get the instructor who teaches a class.
+
+        Args:
+            class_id: The class.
+
+        Returns:
+            The instructor's user id, or None if the class has none.
+
+        Raises:
+            ClassNotFoundError: If the class does not exist.
+            ClassQueryError: If the class cannot be read.
+        """
+        rows = await self._read(
+            "classes",
+            lambda client: client.table("classes")
+            .select("instructor_id")
+            .eq("id", str(class_id))
+            .limit(1)
+            .execute(),
+        )
+        if not rows:
+            raise ClassNotFoundError(f"No class {class_id}")
+        instructor_id = rows[0]["instructor_id"]
+        return UUID(instructor_id) if instructor_id else None
+
+    async def get_taught_class_ids(
+        self, instructor_id: UUID, class_ids: Sequence[UUID]
+    ) -> set[UUID]:
+        """Get which of some classes an instructor teaches.
+
+        Read in one query, so keep ``class_ids`` well below the PostgREST
+        max-rows limit.
+
+        Args:
+            instructor_id: The instructor.
+            class_ids: The classes to check.
+
+        Returns:
+            The classes among ``class_ids`` the instructor teaches.
+
+        Raises:
+            ClassQueryError: If the classes cannot be read.
+        """
+        ids = [str(class_id) for class_id in class_ids]
+        rows = await self._read(
+            "classes",
+            lambda client: client.table("classes")
+            .select("id")
+            .in_("id", ids)
+            .eq("instructor_id", str(instructor_id))
+            .execute(),
+        )
+        return {UUID(row["id"]) for row in rows}
+
+    async def list_classes(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+        instructor_id: UUID | None = None,
+    ) -> Page:
+        """List classes in id order.
+
+        Args:
+            limit: The most classes to return.
+            cursor: The ``next_cursor`` of the previous page.
+            fields: The fields to return; all of ``CLASS_FIELDS`` if None.
+            instructor_id: Only list this instructor's classes.
+
+        Returns:
+            A page of classes.
+
+        Raises:
+            PaginationError: If the cursor or a field is invalid.
+            ClassQueryError: If the classes cannot be read.
+        """
+        columns = ",".join(select_fields(fields, CLASS_FIELDS, CLASS_KEY_COLUMNS))
+
+        async def fetch(after: str | None, count: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = client.table("classes").select(columns)
+                if instructor_id is not None:
+                    query = query.eq("instructor_id", str(instructor_id))
+                if after is not None:
+                    query = query.or_(after)
+                return query.order("id").limit(count).execute()
+
+            return await self._read("classes", call)
+
+        return await fetch_keyset_page(fetch, CLASS_KEY_COLUMNS, limit, cursor)
+
+    async def list_students(
+        self,
+        class_id: UUID,
+        limit: int,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> Page:
+        """List the students of a class in id order.
+
+        Args:
+            class_id: The class.
+            limit: The most students to return.
+            cursor: The ``next_cursor`` of the previous page.
+            fields: The fields to return; all of ``ROSTER_FIELDS`` if None.
+
+        Returns:
+            A page of roster entries.
+
+        Raises:
+            PaginationError: If the cursor or a field is invalid.
+            ClassQueryError: If the roster cannot be read.
+        """
+        selected = select_fields(fields, ROSTER_FIELDS, ROSTER_KEY_COLUMNS)
+        profile_columns = [column for column in selected if column != "student_id"]
+        columns = "student_id"
+        if profile_columns:
+            columns += f",profiles({','.join(profile_columns)})"
+
+        async def fetch(after: str | None, count: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = (
+                    client.table("class_students")
+                    .select(columns)
+                    .eq("class_id", str(class_id))
+                )
+                if after is not None:
+                    query = query.or_(after)
+                return query.order("student_id").limit(count).execute()
+
+            rows = await self._read("class_students", call)
+            for row in rows:
+                profile = row.pop("profiles", None) or {}
+                for column in profile_columns:
+                    row[column] = profile.get(column)
+            return rows
+
+        return await fetch_keyset_page(fetch, ROSTER_KEY_COLUMNS, limit, cursor)
@@ -0,0 +1,361 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections.abc import AsyncIterable, Iterable, Mapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from app.db.embedding_store import EmbeddingStore
+from app.services.recognition_service import RecognitionService
+from app.utils.face_utils import (
+    FaceEngine,
+    create_face_engine,
+    extract_template,
+    normalize_embeddings,
+)
+from app.utils.image_utils import ImageDecodeError, ImageDecoder
+
+
+class EnrollmentServiceError(Exception):
+    """Base exception for enrollment service errors."""
+
+    pass
+
+
+class NoFaceFoundError(EnrollmentServiceError):
+    """Exception raised when none of a student's photos contains a face."""
+
+    pass
+
+
+@dataclass
+class StudentPhotos:
+    """The enrollment photos uploaded for one student."""
+
+    student_id: UUID
+    photos: list[bytes]
+
+
+@dataclass
+class BatchEnrollmentReport:
+    """Outcome and throughput of one run of a bulk enrollment batch."""
+
+    batch_id: UUID
+    enrolled: int = 0
+    skipped: int = 0
+    failed: dict[UUID, str] = field(default_factory=dict)
+    photos_processed: int = 0
+    elapsed_seconds: float = 0.0
+    workers: int = 1
+
+    @property
+    def photos_per_second(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.photos_processed / self.elapsed_seconds
+
+    @property
+    def photos_per_second_per_core(self) -> float:
+        return self.photos_per_second / self.workers
+
+
+class EnrollmentService:
+    """Service for storing and removing students' face templates.
+
+    Templates are persisted in the shared embedding store and mirrored into
+    this worker's recognition indexes so new enrollments are matchable
+    immediately.
+    """
+
+    def __init__(self, store: EmbeddingStore, recognition: RecognitionService):
+        self.store = store
+        self.recognition = recognition
+
+    def save_templates(
+        self, student_ids: Sequence[UUID], templates: np.ndarray
+    ) -> None:
+        """Store face templates, replacing any previous template per student.
+
+        Args:
+            student_ids: One student id per template.
+            templates: A (n, dim) array of face templates.
+        """
+        self.store.append(student_ids, templates)
+        for student_id, template in zip(student_ids, templates):
+            self.recognition.index_student(student_id, template)
+        self.recognition.reload_galleries_for(student_ids, self.store)
+
+    def remove_students(self, student_ids: Sequence[UUID]) -> int:
+        """Remove the templates of students who left.
+
+        Returns:
+            The number of templates removed.
+        """
+        removed = self.store.delete(student_ids)
+        for student_id in student_ids:
+            self.recognition.unindex_student(student_id)
+        self.recognition.reload_galleries_for(student_ids, self.store)
+        return removed
+
+
+class EnrollmentCheckpoint:
+    """Append-only record of the students a batch has already enrolled.
+
+    A student is recorded only after their template has been written, so a
+    batch interrupted at any point can be resumed by skipping the recorded
+    students.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+
+    def completed(self) -> set[UUID]:
+        """Get the students enrolled by earlier runs of the batch."""
+        if not self.path.exists():
+            return set()
+        with open(self.path) as f:
+            # A torn last line from a crash mid-write is ignored
+            return {UUID(line) for line in f.read().split() if len(line) == 36}
+
+    def record(self, student_ids: Sequence[UUID]) -> None:
+        """Durably record students as enrolled."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a") as f:
+            f.write("".join(f"{student_id}\n" for student_id in student_ids))
+            f.flush()
+            os.fsync(f.fileno())
+
+
+EngineOptions = tuple[tuple[str, Any], ...]
+
+
+@lru_cache
+def _worker_engine(engine_name: str, engine_options: EngineOptions) -> FaceEngine:
+    """Load the face engine once per worker process."""
+    return create_face_engine(engine_name, **dict(engine_options))
+
+
+def create_enrollment_executor(
+    engine_name: str,
+    engine_options: Mapping[str, Any],
+    workers: int | None = None,
+) -> Executor:
+    """Create a pool of worker processes that extract templates.
+
+    Args:
+        engine_name: The face engine each worker loads.
+        engine_options: The engine's options.
+        workers: Number of processes; defaults to one per CPU core.
+
+    Returns:
+        The pool, loading the engine in each worker as it starts.
+    """
+    # Forking a threaded server process is unsafe; forkserver children
+    # start from a clean single-threaded process instead
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("forkserver"),
+        initializer=_worker_engine,
+        initargs=(engine_name, tuple(sorted(engine_options.items()))),
+    )
+
+
+_worker_state = threading.local()
+
+
+def _worker_decoder() -> ImageDecoder:
+    """Get this worker thread's decoder, reusing its buffer across photos."""
+    decoder = getattr(_worker_state, "decoder", None)
+    if decoder is None:
+        decoder = _worker_state.decoder = ImageDecoder()
+    return decoder
+
+
+def extract_student_template(
+    engine_name: str, engine_options: EngineOptions, photos: Sequence[bytes]
+) -> np.ndarray:
+    """Build one face template from a student's photos.
+
+    Runs in a worker process: every photo is decoded at working resolution,
+    its most prominent face detected, aligned and embedded, and the
+    embeddings are averaged into a single L2-normalized template. Photos
+    that cannot be decoded or contain no face are ignored.
+
+    Args:
+        engine_name: The face engine to use.
+        engine_options: The engine's options as (name, value) pairs.
+        photos: The student's encoded photos.
+
+    Returns:
+        The student's (embedding_dim,) template.
+
+    Raises:
+        NoFaceFoundError: If no photo yields a face.
+    """
+    engine = _worker_engine(engine_name, engine_options)
+    decoder = _worker_decoder()
+    embeddings = []
+    for photo in photos:
+        try:
+            image = decoder.decode(photo)
+        except ImageDecodeError:
+            continue
+        embedding = extract_template(engine, image)
+        if embedding is not None:
+            embeddings.append(embedding)
+
+    if not embeddings:
+        raise NoFaceFoundError(f"No face found in {len(photos)} photo(s)")
+    return normalize_embeddings(np.mean(embeddings, axis=0))[0]
+
+
+async def _iterate(
+    students: AsyncIterable[StudentPhotos] | Iterable[StudentPhotos],
+):
+    if isinstance(students, AsyncIterable):
+        async for student in students:
+            yield student
+    else:
+        for student in students:
+            yield student
+
+
+class BatchEnrollmentPipeline:
+    """Bulk enrollment of many students' photos at term start.
+
+    Photos are streamed through decode, face detection, alignment and
+    embedding in a pool of worker processes, since that work is CPU bound.
+    Each student's photos are aggregated into one template, and templates
+    are written to the store in batches. Progress is checkpointed per
+    batch id, so re-running a batch resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        enrollment: EnrollmentService,
+        checkpoint_dir: str | Path,
+        engine_name: str = "fake",
+        workers: int | None = None,
+        write_batch_size: int = 256,
+        engine_options: Mapping[str, Any] | None = None,
+    ):
+        self.enrollment = enrollment
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.engine_name = engine_name
+        if engine_options is None:
+            engine_options = {"embedding_dim": enrollment.store.dim}
+        self.engine_options: EngineOptions = tuple(sorted(engine_options.items()))
+        self.workers = workers or os.cpu_count() or 1
+        self.write_batch_size = write_batch_size
+
+    def checkpoint(self, batch_id: UUID) -> EnrollmentCheckpoint:
+        return EnrollmentCheckpoint(self.checkpoint_dir / f"{batch_id}.done")
+
+    def create_executor(self) -> Executor:
+        """Create a worker process pool for this pipeline's engine."""
+        return create_enrollment_executor(
+            self.engine_name, dict(self.engine_options), self.workers
+        )
+
+    async def run(
+        self,
+        batch_id: UUID,
+        students: AsyncIterable[StudentPhotos] | Iterable[StudentPhotos],
+        executor: Executor | None = None,
+    ) -> BatchEnrollmentReport:
+        """Enroll a batch of students, skipping those enrolled by earlier runs.
+
+        At most a few students per worker are in flight at once, so memory
+        stays bounded however large the batch is.
+
+        Args:
+            batch_id: Identifies the batch for resuming.
+            students: The students and their photos, in any order. A student
+                must appear only once per batch.
+            executor: Pool to extract templates in, normally the worker's
+                long-lived pool; defaults to a new process pool that is shut
+                down when the run ends.
+
+        Returns:
+            The run's report, including its throughput.
+        """
+        report = BatchEnrollmentReport(batch_id=batch_id, workers=self.workers)
+        checkpoint = self.checkpoint(batch_id)
+        completed = checkpoint.completed()
+        owns_executor = executor is None
+        if executor is None:
+            executor = self.create_executor()
+
+        loop = asyncio.get_running_loop()
+        max_in_flight = self.workers * 4
+        in_flight: dict[asyncio.Future, StudentPhotos] = {}
+        ready_ids: list[UUID] = []
+        ready_templates: list[np.ndarray] = []
+
+        def collect(done: set[asyncio.Future]) -> None:
+            for future in done:
+                student = in_flight.pop(future)
+                report.photos_processed += len(student.photos)
+                try:
+                    template = future.result()
+                except Exception as e:
+                    report.failed[student.student_id] = str(e)
+                    continue
+                ready_ids.append(student.student_id)
+                ready_templates.append(template)
+
+        def write() -> None:
+            self.enrollment.save_templates(ready_ids, np.stack(ready_templates))
+            checkpoint.record(ready_ids)
+
+        async def commit() -> None:
+            if not ready_ids:
+                return
+            # The store and checkpoint fsync, so they are written off the
+            # event loop; the recognition service locks its own indexes
+            await asyncio.to_thread(write)
+            report.enrolled += len(ready_ids)
+            ready_ids.clear()
+            ready_templates.clear()
+
+        start = time.perf_counter()
+        try:
+            async for student in _iterate(students):
+                if student.student_id in completed:
+                    report.skipped += 1
+                    continue
+
+                future = loop.run_in_executor(
+                    executor,
+                    extract_student_template,
+                    self.engine_name,
+                    self.engine_options,
+                    student.photos,
+                )
+                in_flight[future] = student
+                if len(in_flight) >= max_in_flight:
+                    done, _ = await asyncio.wait(
+                        in_flight, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    collect(done)
+                if len(ready_ids) >= self.write_batch_size:
+                    await commit()
+
+            if in_flight:
+                done, _ = await asyncio.wait(in_flight)
+                collect(done)
+            await commit()
+        finally:
+            if owns_executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+            report.elapsed_seconds = time.perf_counter() - start
+
+        return report
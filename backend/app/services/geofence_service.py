@@ -0,0 +1,501 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+
+from app.db.supabase import (
+    SupabaseClient,
+    get_async_supabase_client,
+    run_supabase_call,
+)
+from app.utils.geo import (
+    METERS_PER_DEGREE,
+    haversine_distances,
+    nearest_points_on_segments,
+    points_in_polygons,
+)
+from app.utils.pagination import keyset_pages
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOLERANCE_M = 15.0
+
+# About 220 m of latitude: a few campus buildings per cell
+DEFAULT_CELL_SIZE_DEG = 0.002
+
+
+class GeofenceServiceError(Exception):
+    """Base exception for geofence service errors."""
+
+    pass
+
+
+class InvalidGeofenceError(GeofenceServiceError):
+    """Exception raised when a geofence polygon is malformed."""
+
+    pass
+
+
+class GeofenceNotFoundError(GeofenceServiceError):
+    """Exception raised when a class has no geofence."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class Geofence:
+    """A building footprint as a ring of (longitude, latitude) vertices.
+
+    A fix up to ``tolerance_m`` outside the footprint still counts as
+    inside, to absorb GPS error near walls.
+    """
+
+    geofence_id: UUID
+    polygon: np.ndarray
+    tolerance_m: float = DEFAULT_TOLERANCE_M
+
+    @classmethod
+    def from_coordinates(
+        cls,
+        geofence_id: UUID,
+        coordinates: Sequence[Sequence[float]],
+        tolerance_m: float = DEFAULT_TOLERANCE_M,
+    ) -> "Geofence":
+        """Validate a GeoJSON-style ring of [longitude, latitude] pairs.
+
+        The ring may repeat its first vertex at the end.
+
+        Raises:
+            InvalidGeofenceError: If the ring is not a valid polygon.
+        """
+        try:
+            polygon = np.array(coordinates, dtype=np.float64)
+        except (TypeError, ValueError) as e:
+            raise InvalidGeofenceError(f"Geofence {geofence_id}: {str(e)}") from e
+        if polygon.ndim != 2 or polygon.shape[1] != 2:
+            raise InvalidGeofenceError(
+                f"Geofence {geofence_id} must be a list of [longitude, latitude]"
+            )
+        if len(polygon) > 1 and np.array_equal(polygon[0], polygon[-1]):
+            polygon = polygon[:-1]
+        if len(polygon) < 3:
+            raise InvalidGeofenceError(
+                f"Geofence {geofence_id} needs at least 3 vertices"
+            )
+        if (
+            not np.isfinite(polygon).all()
+            or (np.abs(polygon[:, 0]) > 180).any()
+            or (np.abs(polygon[:, 1]) > 90).any()
+        ):
+            raise InvalidGeofenceError(
+                f"Geofence {geofence_id} has coordinates out of range"
+            )
+        if tolerance_m < 0:
+            raise InvalidGeofenceError(
+                f"Geofence {geofence_id} has a negative tolerance"
+            )
+        return cls(geofence_id, polygon, tolerance_m)
+
+
+@dataclass(frozen=True)
+class GeofenceVerdicts:
+    """Outcome of checking a batch of GPS fixes against geofences.
+
+    ``distance_m`` is 0 inside a geofence and the distance to its boundary
+    outside. Fixes rejected by the bounding box test get the distance to
+    the box instead, a lower bound.
+    """
+
+    inside: np.ndarray
+    accepted: np.ndarray
+    distance_m: np.ndarray
+
+
+class GeofenceIndex:
+    """Polygon geofences with a uniform grid index for batch checks.
+
+    Every polygon's vertices are packed into flat edge arrays, and each
+    polygon gets a bounding box grown by its tolerance, so most fixes are
+    rejected with four comparisons. Checking a batch of fixes expands the
+    survivors into (fix, edge) pairs and runs the point-in-polygon and
+    distance tests for all of them at once.
+
+    The grid maps each cell to the geofences whose boxes overlap it. Cells
+    are stored as sorted keys with offsets into one member array, so a
+    whole batch is located with a single ``searchsorted``.
+
+    Geofences change rarely: the packed arrays are rebuilt on the next
+    query after any change. Polygons crossing the antimeridian are not
+    supported.
+    """
+
+    def __init__(self, cell_size_deg: float = DEFAULT_CELL_SIZE_DEG):
+        self.cell_size_deg = cell_size_deg
+        self._geofences: dict[UUID, Geofence] = {}
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._geofences)
+
+    def __contains__(self, geofence_id: UUID) -> bool:
+        return geofence_id in self._geofences
+
+    def add(self, geofences: Sequence[Geofence]) -> None:
+        """Insert or replace geofences."""
+        for geofence in geofences:
+            self._geofences[geofence.geofence_id] = geofence
+        self._dirty = True
+
+    def remove(self, geofence_id: UUID) -> bool:
+        """Remove a geofence.
+
+        Returns:
+            True if it was present.
+        """
+        removed = self._geofences.pop(geofence_id, None) is not None
+        self._dirty |= removed
+        return removed
+
+    def check(
+        self,
+        geofence_ids: Sequence[UUID],
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+    ) -> GeofenceVerdicts:
+        """Check each fix against its own geofence.
+
+        Args:
+            geofence_ids: The geofence each fix must be in.
+            latitudes: The fixes' latitudes, in degrees.
+            longitudes: The fixes' longitudes, in degrees.
+
+        Returns:
+            The verdict for every fix.
+
+        Raises:
+            GeofenceNotFoundError: If a geofence is not in the index.
+        """
+        self._build()
+        missing = [gid for gid in set(geofence_ids) if gid not in self._position]
+        if missing:
+            raise GeofenceNotFoundError(f"Unknown geofences: {missing}")
+        owners = np.fromiter(
+            (self._position[gid] for gid in geofence_ids),
+            dtype=np.int64,
+            count=len(geofence_ids),
+        )
+        lat = np.asarray(latitudes, dtype=np.float64)
+        lon = np.asarray(longitudes, dtype=np.float64)
+        return self._evaluate(lat, lon, owners)
+
+    def locate(
+        self, latitudes: np.ndarray, longitudes: np.ndarray
+    ) -> list[UUID | None]:
+        """Find the geofence containing each fix.
+
+        A fix inside several geofences (or within the tolerance of several)
+        is assigned the one it is deepest in, preferring ones it is inside.
+
+        Returns:
+            The geofence id for each fix, or None if it is in none.
+        """
+        self._build()
+        lat = np.asarray(latitudes, dtype=np.float64)
+        lon = np.asarray(longitudes, dtype=np.float64)
+        result: list[UUID | None] = [None] * len(lat)
+        if not self._geofences or not len(lat):
+            return result
+
+        # Candidate geofences of every fix, from the fix's grid cell
+        keys = self._cell_keys(lat, lon)
+        slots = np.searchsorted(self._grid_keys, keys)
+        slots = np.minimum(slots, len(self._grid_keys) - 1)
+        found = self._grid_keys[slots] == keys
+        starts = np.where(found, self._grid_offsets[slots], 0)
+        counts = np.where(found, self._grid_offsets[slots + 1] - starts, 0)
+        fixes = np.repeat(np.arange(len(lat)), counts)
+        if not len(fixes):
+            return result
+        members = self._grid_members[_ranges(starts, counts)]
+
+        verdicts = self._evaluate(lat[fixes], lon[fixes], members)
+        accepted = verdicts.accepted
+        if not accepted.any():
+            return result
+        # Sort accepted candidates by fix, inside first, then nearest
+        order = np.lexsort(
+            (verdicts.distance_m[accepted], ~verdicts.inside[accepted], fixes[accepted])
+        )
+        best_fix = fixes[accepted][order]
+        best_member = members[accepted][order]
+        first = np.flatnonzero(np.r_[True, best_fix[1:] != best_fix[:-1]])
+        for fix, member in zip(best_fix[first].tolist(), best_member[first].tolist()):
+            result[fix] = self._ids[member]
+        return result
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _evaluate(
+        self, lat: np.ndarray, lon: np.ndarray, owners: np.ndarray
+    ) -> GeofenceVerdicts:
+        n = len(lat)
+        inside = np.zeros(n, dtype=bool)
+        distance = np.zeros(n, dtype=np.float64)
+
+        # Fast rejection: outside the box grown by the tolerance
+        box = self._boxes[owners]
+        margin_lat = self._tolerance[owners] / METERS_PER_DEGREE
+        margin_lon = margin_lat / np.maximum(np.cos(np.radians(lat)), 1e-6)
+        near = (
+            (lon >= box[:, 0] - margin_lon)
+            & (lon <= box[:, 2] + margin_lon)
+            & (lat >= box[:, 1] - margin_lat)
+            & (lat <= box[:, 3] + margin_lat)
+        )
+        far = ~near
+        distance[far] = haversine_distances(
+            lat[far],
+            lon[far],
+            np.clip(lat[far], box[far, 1], box[far, 3]),
+            np.clip(lon[far], box[far, 0], box[far, 2]),
+        )
+
+        survivors = np.flatnonzero(near)
+        if len(survivors):
+            survivor_owners = owners[survivors]
+            counts = self._edge_counts[survivor_owners]
+            pair_point = np.repeat(np.arange(len(survivors)), counts)
+            edges = _ranges(self._edge_offsets[survivor_owners], counts)
+            start, end = self._edge_start[edges], self._edge_end[edges]
+            pair_lat, pair_lon = lat[survivors][pair_point], lon[survivors][pair_point]
+
+            survivor_inside = points_in_polygons(
+                pair_lon, pair_lat, start, end, pair_point, len(survivors)
+            )
+            nearest_lat, nearest_lon = nearest_points_on_segments(
+                pair_lat, pair_lon, start, end
+            )
+            edge_distance = haversine_distances(
+                pair_lat, pair_lon, nearest_lat, nearest_lon
+            )
+            # Pairs are grouped by fix, so each fix's edges are contiguous
+            boundary = np.minimum.reduceat(edge_distance, np.cumsum(counts) - counts)
+
+            inside[survivors] = survivor_inside
+            distance[survivors] = np.where(survivor_inside, 0.0, boundary)
+
+        accepted = inside | (near & (distance <= self._tolerance[owners]))
+        return GeofenceVerdicts(inside=inside, accepted=accepted, distance_m=distance)
+
+    def _cell_keys(self, lat: np.ndarray, lon: np.ndarray) -> np.ndarray:
+        row = np.floor((lat + 90) / self.cell_size_deg).astype(np.int64)
+        col = np.floor((lon + 180) / self.cell_size_deg).astype(np.int64)
+        return row * (1 << 32) + col
+
+    def _build(self) -> None:
+        if not self._dirty:
+            return
+
+        geofences = list(self._geofences.values())
+        self._ids = [geofence.geofence_id for geofence in geofences]
+        self._position = {gid: index for index, gid in enumerate(self._ids)}
+        polygons = [geofence.polygon for geofence in geofences]
+        self._tolerance = np.array(
+            [geofence.tolerance_m for geofence in geofences], dtype=np.float64
+        )
+        self._edge_counts = np.array([len(p) for p in polygons], dtype=np.int64)
+        self._edge_offsets = np.cumsum(self._edge_counts) - self._edge_counts
+        if polygons:
+            self._edge_start = np.concatenate(polygons)
+            self._edge_end = np.concatenate([np.roll(p, -1, axis=0) for p in polygons])
+            self._boxes = np.array(
+                [[*p.min(axis=0), *p.max(axis=0)] for p in polygons]
+            )
+        else:
+            self._edge_start = self._edge_end = np.empty((0, 2))
+            self._boxes = np.empty((0, 4))
+        self._build_grid()
+        self._dirty = False
+
+    def _build_grid(self) -> None:
+        """Register every geofence in the cells its grown box overlaps."""
+        margin_lat = self._tolerance / METERS_PER_DEGREE
+        mid_lat = (self._boxes[:, 1] + self._boxes[:, 3]) / 2
+        margin_lon = margin_lat / np.maximum(np.cos(np.radians(mid_lat)), 1e-6)
+        size = self.cell_size_deg
+        row_lo = np.floor((self._boxes[:, 1] - margin_lat + 90) / size)
+        row_hi = np.floor((self._boxes[:, 3] + margin_lat + 90) / size)
+        col_lo = np.floor((self._boxes[:, 0] - margin_lon + 180) / size)
+        col_hi = np.floor((self._boxes[:, 2] + margin_lon + 180) / size)
+
+        keys, members = [], []
+        for index, (r0, r1, c0, c1) in enumerate(
+            zip(
+                row_lo.astype(np.int64).tolist(),
+                row_hi.astype(np.int64).tolist(),
+                col_lo.astype(np.int64).tolist(),
+                col_hi.astype(np.int64).tolist(),
+            )
+        ):
+            rows, cols = np.mgrid[r0 : r1 + 1, c0 : c1 + 1]
+            cell_keys = (rows * (1 << 32) + cols).ravel()
+            keys.append(cell_keys)
+            members.append(np.full(len(cell_keys), index, dtype=np.int64))
+
+        all_keys = np.concatenate(keys) if keys else np.empty(0, dtype=np.int64)
+        all_members = (
+            np.concatenate(members) if members else np.empty(0, dtype=np.int64)
+        )
+        order = np.argsort(all_keys, kind="stable")
+        all_keys, self._grid_members = all_keys[order], all_members[order]
+        self._grid_keys, starts = np.unique(all_keys, return_index=True)
+        self._grid_offsets = np.append(starts, len(all_keys))
+
+
+def _ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Concatenate ``arange(start, start + count)`` for every pair."""
+    total = int(counts.sum())
+    group_starts = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + (np.arange(total) - group_starts)
+
+
+class GeofenceService:
+    """Service verifying that check-ins happen inside the class's building.
+
+    Geofences and the class to geofence mapping are loaded from the
+    database by each worker, then every check is answered in memory. They
+    are loaded again once ``ttl_seconds`` old, so new buildings are picked
+    up without a restart. Reads are paged, ``page_size`` rows at a time.
+    """
+
+    def __init__(
+        self,
+        index: GeofenceIndex | None = None,
+        client: SupabaseClient | None = None,
+        ttl_seconds: float = 300.0,
+        page_size: int = 1000,
+    ):
+        self.index = index or GeofenceIndex()
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.page_size = page_size
+        self.class_geofences: dict[UUID, UUID] = {}
+        self._loaded_at: float | None = None
+        self._load_lock = asyncio.Lock()
+
+    async def _execute(self, call: Callable[[SupabaseClient], Any]) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(self.client, call)
+
+    async def _read_all(
+        self, table: str, columns: str, key_column: str
+    ) -> list[dict[str, Any]]:
+        """Read every row of a table, a page at a time in key order."""
+
+        async def fetch(after: str | None, limit: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = client.table(table).select(columns)
+                if after is not None:
+                    query = query.or_(after)
+                return query.order(key_column).limit(limit).execute()
+
+            return (await self._execute(call)).data
+
+        return [
+            row
+            async for page in keyset_pages(fetch, (key_column,), self.page_size)
+            for row in page
+        ]
+
+    async def load(self) -> None:
+        """Load every geofence and class assignment from the database.
+
+        Malformed geofences are logged and skipped, along with the classes
+        assigned to them.
+        """
+        geofence_rows = await self._read_all(
+            "geofences", "id, polygon, tolerance_m", "id"
+        )
+        assignments = await self._read_all(
+            "class_geofences", "class_id, geofence_id", "class_id"
+        )
+        geofences = []
+        for row in geofence_rows:
+            try:
+                geofences.append(
+                    Geofence.from_coordinates(
+                        UUID(row["id"]), row["polygon"], row["tolerance_m"]
+                    )
+                )
+            except InvalidGeofenceError as e:
+                logger.warning("Skipping invalid geofence: %s", e)
+        index = GeofenceIndex(self.index.cell_size_deg)
+        index.add(geofences)
+        self.index = index
+        self.class_geofences = {
+            UUID(row["class_id"]): UUID(row["geofence_id"])
+            for row in assignments
+            if UUID(row["geofence_id"]) in index
+        }
+        self._loaded_at = time.monotonic()
+
+    async def ensure_loaded(self) -> None:
+        """Load the geofences unless they were loaded within the TTL."""
+        if not self._is_stale():
+            return
+        async with self._load_lock:
+            if self._is_stale():
+                await self.load()
+
+    def _is_stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        return time.monotonic() - self._loaded_at >= self.ttl_seconds
+
+    def verify_check_ins(
+        self,
+        class_ids: Sequence[UUID],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+    ) -> GeofenceVerdicts:
+        """Check that each fix is inside its class's building.
+
+        Args:
+            class_ids: The class of each check-in.
+            latitudes: The fixes' latitudes, in degrees.
+            longitudes: The fixes' longitudes, in degrees.
+
+        Returns:
+            The verdict for every check-in.
+
+        Raises:
+            GeofenceNotFoundError: If a class has no geofence.
+        """
+        missing = {cid for cid in class_ids if cid not in self.class_geofences}
+        if missing:
+            raise GeofenceNotFoundError(
+                f"No geofence for classes: {sorted(map(str, missing))}"
+            )
+        return self.index.check(
+            [self.class_geofences[cid] for cid in class_ids],
+            np.asarray(latitudes, dtype=np.float64),
+            np.asarray(longitudes, dtype=np.float64),
+        )
@@ -0,0 +1,216 @@
+import json
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Protocol
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from app.models.instructor import ProfileType
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROFILE_CACHE_SIZE = 10_000
+DEFAULT_PROFILE_CACHE_TTL_SECONDS = 300.0
+
+
+@dataclass(frozen=True)
+class CachedProfile:
+    """The profile fields needed on login and by authenticated requests."""
+
+    first_name: str
+    last_name: str
+    type: ProfileType
+
+    def to_json(self) -> str:
+        return json.dumps({**asdict(self), "type": self.type.value})
+
+    @classmethod
+    def from_json(cls, data: str | bytes) -> "CachedProfile":
+        fields = json.loads(data)
+        return cls(
+            first_name=fields["first_name"],
+            last_name=fields["last_name"],
+            type=ProfileType(fields["type"]),
+        )
+
+
+@dataclass(frozen=True)
+class ProfileCacheStats:
+    """Snapshot of the profile cache counters."""
+
+    entries: int
+    hits: int
+    shared_hits: int
+    misses: int
+    invalidations: int
+    shared_errors: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.shared_hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return (self.hits + self.shared_hits) / lookups
+
+
+class SharedProfileStore(Protocol):
+    """A profile cache shared by every worker, behind the in-process one."""
+
+    async def get(self, user_id: UUID) -> CachedProfile | None: ...
+
+    async def set(
+        self, user_id: UUID, profile: CachedProfile, ttl_seconds: float
+    ) -> None: ...
+
+    async def delete(self, user_id: UUID) -> None: ...
+
+
+class InMemoryProfileStore:
+    """Stand-in for a shared store, for tests and single-worker runs."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._entries: dict[UUID, tuple[str, float]] = {}
+
+    async def get(self, user_id: UUID) -> CachedProfile | None:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        data, expires_at = entry
+        if expires_at <= self._clock():
+            del self._entries[user_id]
+            return None
+        return CachedProfile.from_json(data)
+
+    async def set(
+        self, user_id: UUID, profile: CachedProfile, ttl_seconds: float
+    ) -> None:
+        self._entries[user_id] = (profile.to_json(), self._clock() + ttl_seconds)
+
+    async def delete(self, user_id: UUID) -> None:
+        self._entries.pop(user_id, None)
+
+
+class RedisProfileStore:
+    """Profiles shared by every worker through Redis.
+
+    Raises:
+        ImportError: If the redis package is not installed.
+    """
+
+    def __init__(self, url: str, key_prefix: str = "profile:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise ImportError(
+                "The redis profile cache requires redis: pip install redis"
+            ) from e
+
+        self._redis = redis.from_url(url)
+        self.key_prefix = key_prefix
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.key_prefix}{user_id}"
+
+    async def get(self, user_id: UUID) -> CachedProfile | None:
+        data = await self._redis.get(self._key(user_id))
+        return CachedProfile.from_json(data) if data is not None else None
+
+    async def set(
+        self, user_id: UUID, profile: CachedProfile, ttl_seconds: float
+    ) -> None:
+        await self._redis.set(
+            self._key(user_id), profile.to_json(), px=int(ttl_seconds * 1000)
+        )
+
+    async def delete(self, user_id: UUID) -> None:
+        await self._redis.delete(self._key(user_id))
+
+
+class ProfileCache:
+    """Users' names and profile types, so logins skip the profiles query.
+
+    Profiles are kept in an in-process LRU cache whose entries expire after
+    ``ttl_seconds``. With a ``shared`` store, misses are looked up there
+    before the database and updates are written through to it; another
+    worker may still serve its own copy of a changed profile until that
+    copy expires. A failing shared store is logged and skipped, never
+    failing the request.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_PROFILE_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_PROFILE_CACHE_TTL_SECONDS,
+        shared: SharedProfileStore | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.shared = shared
+        self._local: TTLCache[UUID, CachedProfile] = TTLCache(
+            maxsize=max_entries, ttl=ttl_seconds, timer=clock
+        )
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.shared_errors = 0
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    async def get(self, user_id: UUID) -> CachedProfile | None:
+        """Get a user's cached profile, or None if it must be read."""
+        profile = self._local.get(user_id)
+        if profile is not None:
+            self.hits += 1
+            return profile
+
+        if self.shared is not None:
+            try:
+                profile = await self.shared.get(user_id)
+            except Exception:
+                self.shared_errors += 1
+                logger.warning("Shared profile cache read failed", exc_info=True)
+            if profile is not None:
+                self._local[user_id] = profile
+                self.shared_hits += 1
+                return profile
+
+        self.misses += 1
+        return None
+
+    async def put(self, user_id: UUID, profile: CachedProfile) -> None:
+        """Cache a profile read from or written to the database."""
+        self._local[user_id] = profile
+        if self.shared is not None:
+            try:
+                await self.shared.set(user_id, profile, self.ttl_seconds)
+            except Exception:
+                self.shared_errors += 1
+                logger.warning("Shared profile cache write failed", exc_info=True)
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """Drop a user's cached profile after it changed."""
+        self._local.pop(user_id, None)
+        self.invalidations += 1
+        if self.shared is not None:
+            try:
+                await self.shared.delete(user_id)
+            except Exception:
+                self.shared_errors += 1
+                logger.warning("Shared profile cache delete failed", exc_info=True)
+
+    def stats(self) -> ProfileCacheStats:
+        """Get a snapshot of the cache counters."""
+        return ProfileCacheStats(
+            entries=len(self._local),
+            hits=self.hits,
+            shared_hits=self.shared_hits,
+            misses=self.misses,
+            invalidations=self.invalidations,
+            shared_errors=self.shared_errors,
+        )
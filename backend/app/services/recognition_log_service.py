@@ -0,0 +1,190 @@
+import asyncio
+import contextlib
+import logging
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+from app.db.recognition_log import RecognitionLogStore, to_records
+from app.models.recognition_log import RecognitionLogEntry
+
+logger = logging.getLogger(__name__)
+
+
+class RecognitionLogError(Exception):
+    """Base exception for recognition log errors."""
+
+    pass
+
+
+class RecognitionLogWriteError(RecognitionLogError):
+    """Exception raised when log entries cannot be written."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class RecognitionLogStats:
+    """Snapshot of the recognition log writer's counters."""
+
+    pending: int
+    submitted: int
+    dropped: int
+    flushes: int
+    written: int
+    failed_flushes: int
+    segments_rolled: int
+
+
+class RecognitionLogWriter:
+    """Write-behind buffer batching recognition attempts into the audit log.
+
+    Entries are queued in memory and appended to the store by a background
+    task, packed into fixed-width records, in batches of up to
+    ``batch_size`` as soon as a full batch is queued or
+    ``flush_interval_seconds`` after the last flush. File I/O runs in a
+    worker thread. After each flush the active file is rolled into a
+    compressed segment once it holds ``store.segment_rows`` entries or is
+    older than ``roll_interval_seconds``.
+
+    Logging never fails or slows a recognition: ``submit`` does not wait,
+    and entries submitted while ``max_pending`` are already queued are
+    dropped and counted. Entries of a failed flush are queued again.
+
+    ``start`` the writer on application startup and ``close`` it on
+    shutdown, which flushes what is still queued and seals the active file.
+    """
+
+    def __init__(
+        self,
+        store: RecognitionLogStore,
+        batch_size: int = 1000,
+        flush_interval_seconds: float = 1.0,
+        max_pending: int = 100_000,
+        roll_interval_seconds: float = 3600.0,
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.max_pending = max_pending
+        self.roll_interval_seconds = roll_interval_seconds
+        self._pending: list[RecognitionLogEntry] = []
+        self._batch_ready = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.submitted = 0
+        self.dropped = 0
+        self.flushes = 0
+        self.written = 0
+        self.failed_flushes = 0
+        self.segments_rolled = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        """Start flushing in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self) -> None:
+        """Stop the background task, flush and seal the active file."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        try:
+            await self.flush()
+        except RecognitionLogWriteError:
+            logger.exception(
+                "Lost %d recognition log entries on shutdown", len(self._pending)
+            )
+        await asyncio.to_thread(self.store.close)
+
+    def submit(self, entries: Sequence[RecognitionLogEntry]) -> int:
+        """Queue recognition attempts to be logged.
+
+        Args:
+            entries: The attempts to log.
+
+        Returns:
+            The number of entries queued; the rest were dropped because the
+            queue is full.
+        """
+        room = max(self.max_pending - len(self._pending), 0)
+        accepted = entries[:room]
+        self._pending.extend(accepted)
+        self.submitted += len(accepted)
+        if len(accepted) < len(entries):
+            self.dropped += len(entries) - len(accepted)
+            logger.warning(
+                "Recognition log queue is full, dropped %d entries",
+                len(entries) - len(accepted),
+            )
+        if len(self._pending) >= self.batch_size:
+            self._batch_ready.set()
+        return len(accepted)
+
+    async def flush(self) -> int:
+        """Write every queued entry now, in batches.
+
+        Returns:
+            The number of entries written.
+
+        Raises:
+            RecognitionLogWriteError: If a batch cannot be written; its
+                entries stay queued.
+        """
+        written = 0
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[: self.batch_size]
+                del self._pending[: self.batch_size]
+                try:
+                    await asyncio.to_thread(self._append, batch)
+                except Exception as e:
+                    self._pending[:0] = batch
+                    self.failed_flushes += 1
+                    raise RecognitionLogWriteError(
+                        f"Failed to write recognition log: {str(e)}"
+                    ) from e
+                self.flushes += 1
+                self.written += len(batch)
+                written += len(batch)
+        return written
+
+    def stats(self) -> RecognitionLogStats:
+        """Get a snapshot of the writer counters."""
+        return RecognitionLogStats(
+            pending=len(self._pending),
+            submitted=self.submitted,
+            dropped=self.dropped,
+            flushes=self.flushes,
+            written=self.written,
+            failed_flushes=self.failed_flushes,
+            segments_rolled=self.segments_rolled,
+        )
+
+    def _append(self, batch: list[RecognitionLogEntry]) -> None:
+        self.store.append(to_records(batch, self.store.top_k))
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self._batch_ready.wait(), self.flush_interval_seconds
+                )
+            self._batch_ready.clear()
+            try:
+                await self.flush()
+                segment = await asyncio.to_thread(
+                    self.store.roll_if_needed, self.roll_interval_seconds
+                )
+            except RecognitionLogWriteError:
+                logger.exception("Recognition log flush failed, retrying later")
+                continue
+            except Exception:
+                logger.exception("Rolling the recognition log failed")
+                continue
+            if segment is not None:
+                self.segments_rolled += 1
@@ -0,0 +1,710 @@
+import itertools
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+
+from app.core.metrics import span
+from app.db.embedding_store import EmbeddingStore
+from app.utils.ann_index import IVFIndex
+from app.utils.face_utils import FaceEngine, normalize_embeddings
+
+# Cosine similarity above which a probe is considered a match
+DEFAULT_MATCH_THRESHOLD = 0.5
+
+# Dimension of the face embeddings produced by the face engine
+DEFAULT_EMBEDDING_DIM = 512
+
+# Vectors per inverted list needed before the institution index is trained
+MIN_TRAINING_VECTORS_PER_LIST = 40
+
+# Bounds of the cache of recognition results for repeated photos
+DEFAULT_RESULT_CACHE_SIZE = 4096
+DEFAULT_RESULT_CACHE_TTL_SECONDS = 3600
+DEFAULT_RESULT_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Approximate memory held by a cached result and by each of its matches
+_RESULT_OVERHEAD_BYTES = 256
+_MATCH_BYTES = 160
+
+
+class RecognitionServiceError(Exception):
+    """Base exception for recognition service errors."""
+
+    pass
+
+
+class GalleryNotFoundError(RecognitionServiceError):
+    """Exception raised when a class has no loaded gallery."""
+
+    pass
+
+
+class InvalidEmbeddingError(RecognitionServiceError):
+    """Exception raised when embeddings have the wrong shape."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class Match:
+    """A candidate student for a probe face with its cosine similarity."""
+
+    student_id: UUID
+    score: float
+
+
+class ClassGallery:
+    """Enrolled face embeddings of one class held as a single matrix.
+
+    Embeddings are stored as one contiguous, L2-normalized float32 matrix so
+    that scoring any number of probes against every enrolled student is a
+    single matrix multiply. The gallery also keeps the class's full roster,
+    including students without a template yet, when that roster was read,
+    and the embedding store generation it was loaded at.
+    """
+
+    def __init__(
+        self,
+        class_id: UUID,
+        student_ids: Sequence[UUID],
+        embeddings: np.ndarray,
+        version: int = 0,
+        roster: Sequence[UUID] | None = None,
+        store_generation: int = 0,
+        roster_fetched_at: float | None = None,
+    ):
+        matrix = normalize_embeddings(embeddings)
+        if matrix.shape[0] != len(student_ids):
+            raise InvalidEmbeddingError(
+                "Number of embeddings does not match number of students"
+            )
+
+        self.class_id = class_id
+        self.student_ids = tuple(student_ids)
+        self.matrix = matrix
+        self.version = version
+        self.roster = tuple(student_ids if roster is None else roster)
+        self.store_generation = store_generation
+        self.roster_fetched_at = (
+            time.monotonic() if roster_fetched_at is None else roster_fetched_at
+        )
+
+    @property
+    def dim(self) -> int:
+        return self.matrix.shape[1]
+
+    def __len__(self) -> int:
+        return len(self.student_ids)
+
+    def score(self, probes: np.ndarray) -> np.ndarray:
+        """Score probes against every enrolled student.
+
+        Args:
+            probes: A (m, dim) or (dim,) array of probe embeddings.
+
+        Returns:
+            A (m, n_students) matrix of cosine similarities.
+        """
+        probe_matrix = normalize_embeddings(probes)
+        if probe_matrix.shape[1] != self.dim:
+            raise InvalidEmbeddingError(
+                f"Probe dimension {probe_matrix.shape[1]} does not match "
+                f"gallery dimension {self.dim}"
+            )
+        return probe_matrix @ self.matrix.T
+
+    def match(
+        self,
+        probes: np.ndarray,
+        top_k: int = 1,
+        threshold: float = DEFAULT_MATCH_THRESHOLD,
+    ) -> list[list[Match]]:
+        """Find the best matching students for a batch of probes.
+
+        Args:
+            probes: A (m, dim) or (dim,) array of probe embeddings.
+            top_k: Maximum number of candidates returned per probe.
+            threshold: Minimum cosine similarity for a candidate.
+
+        Returns:
+            One list of matches per probe, best first. A probe with no
+            candidate above the threshold gets an empty list.
+        """
+        return self.top_matches(self.score(probes), top_k, threshold)
+
+    def top_matches(
+        self,
+        scores: np.ndarray,
+        top_k: int = 1,
+        threshold: float = DEFAULT_MATCH_THRESHOLD,
+    ) -> list[list[Match]]:
+        """Pick the best matching students from already computed scores.
+
+        Args:
+            scores: An (m, n_students) matrix from ``score``.
+            top_k: Maximum number of candidates returned per probe.
+            threshold: Minimum cosine similarity for a candidate.
+
+        Returns:
+            One list of matches per probe, best first.
+        """
+        n_students = scores.shape[1]
+        k = min(top_k, n_students)
+        if k <= 0:
+            return [[] for _ in range(scores.shape[0])]
+
+        if k < n_students:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(n_students), scores.shape)
+        candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+        order = np.argsort(-candidate_scores, axis=1)
+        candidates = np.take_along_axis(candidates, order, axis=1)
+        candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+        results: list[list[Match]] = []
+        for row_candidates, row_scores in zip(
+            candidates.tolist(), candidate_scores.tolist()
+        ):
+            results.append(
+                [
+                    Match(student_id=self.student_ids[index], score=score)
+                    for index, score in zip(row_candidates, row_scores)
+                    if score >= threshold
+                ]
+            )
+        return results
+
+
+class GalleryRegistry:
+    """In-memory registry of per-class galleries for this worker."""
+
+    def __init__(self):
+        self._galleries: dict[UUID, ClassGallery] = {}
+        # Versions are never reused, even after a gallery is removed and
+        # loaded again, so they can key cached results
+        self._versions = itertools.count(1)
+
+    def get(self, class_id: UUID) -> ClassGallery | None:
+        return self._galleries.get(class_id)
+
+    def set(
+        self,
+        class_id: UUID,
+        student_ids: Sequence[UUID],
+        embeddings: np.ndarray,
+        roster: Sequence[UUID] | None = None,
+        store_generation: int = 0,
+        roster_fetched_at: float | None = None,
+    ) -> ClassGallery:
+        """Replace a class's gallery, giving it a new version.
+
+        Args:
+            class_id: The class whose gallery is replaced.
+            student_ids: Enrolled students, one per embedding row.
+            embeddings: A (n_students, dim) array of embeddings.
+            roster: Every student in the class; defaults to ``student_ids``.
+            store_generation: The embedding store generation the embeddings
+                were read at.
+            roster_fetched_at: When the roster was read, on the monotonic
+                clock; defaults to now.
+
+        Returns:
+            The new gallery.
+        """
+        gallery = ClassGallery(
+            class_id,
+            student_ids,
+            embeddings,
+            version=next(self._versions),
+            roster=roster,
+            store_generation=store_generation,
+            roster_fetched_at=roster_fetched_at,
+        )
+        self._galleries[class_id] = gallery
+        return gallery
+
+    def remove(self, class_id: UUID) -> None:
+        self._galleries.pop(class_id, None)
+
+    def classes_with_students(self, student_ids: Sequence[UUID]) -> list[UUID]:
+        """Get the loaded classes whose roster includes any of the students."""
+        wanted = set(student_ids)
+        return [
+            class_id
+            for class_id, gallery in list(self._galleries.items())
+            if not wanted.isdisjoint(gallery.roster)
+        ]
+
+    def __contains__(self, class_id: UUID) -> bool:
+        return class_id in self._galleries
+
+
+@dataclass(frozen=True)
+class ImageProbe:
+    """A decoded photo to recognize against a class's gallery."""
+
+    class_id: UUID
+    image_key: str
+    image: np.ndarray
+    top_k: int = 1
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Snapshot of the recognition result cache counters."""
+
+    entries: int
+    bytes: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        if lookups == 0:
+            return 0.0
+        return self.hits / lookups
+
+
+# (image content hash, class id, gallery version, top_k)
+ResultKey = tuple[str, UUID, int, int]
+
+
+class RecognitionResultCache:
+    """Recognition results of photos, for retried and duplicate submissions.
+
+    Entries are keyed by the photo's content hash and the version of the
+    gallery it was matched against, so a result is never served for a
+    gallery that has since changed. Entries are evicted least recently used
+    first once either the entry or byte bound is exceeded, and expire after
+    a TTL. Changing a class's gallery drops its entries right away.
+
+    Batches are recognized and galleries reloaded from worker threads, so
+    every operation holds a lock.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_RESULT_CACHE_SIZE,
+        ttl_seconds: float = DEFAULT_RESULT_CACHE_TTL_SECONDS,
+        max_bytes: int = DEFAULT_RESULT_CACHE_MAX_BYTES,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._entries: OrderedDict[
+            ResultKey, tuple[list[list[Match]], float, int]
+        ] = OrderedDict()
+        self._keys_by_class: dict[UUID, set[ResultKey]] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: ResultKey) -> list[list[Match]] | None:
+        """Get a cached result, marking it recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            results, expires_at, _ = entry
+            if expires_at <= self._clock():
+                self._discard(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return results
+
+    def put(self, key: ResultKey, results: list[list[Match]]) -> None:
+        """Cache a result, evicting least recently used entries to fit."""
+        size = _RESULT_OVERHEAD_BYTES + _MATCH_BYTES * sum(map(len, results))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+
+            self._entries[key] = (results, self._clock() + self.ttl_seconds, size)
+            self._keys_by_class.setdefault(key[1], set()).add(key)
+            self._bytes += size
+            while (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+                self.evictions += 1
+
+    def invalidate_class(self, class_id: UUID) -> int:
+        """Drop every cached result for a class.
+
+        Returns:
+            The number of entries dropped.
+        """
+        with self._lock:
+            keys = self._keys_by_class.pop(class_id, set())
+            for key in keys:
+                self._discard(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def stats(self) -> CacheStats:
+        """Get a snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                entries=len(self._entries),
+                bytes=self._bytes,
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                expirations=self.expirations,
+                invalidations=self.invalidations,
+            )
+
+    def _discard(self, key: ResultKey) -> None:
+        # Called with the lock held
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= entry[2]
+        class_keys = self._keys_by_class.get(key[1])
+        if class_keys is not None:
+            class_keys.discard(key)
+            if not class_keys:
+                del self._keys_by_class[key[1]]
+
+
+class RecognitionService:
+    """Service for matching face embeddings against class galleries.
+
+    Enrollment writes templates from a worker thread, so the institution
+    index is only read and changed under a lock.
+    """
+
+    def __init__(
+        self,
+        galleries: GalleryRegistry | None = None,
+        match_threshold: float = DEFAULT_MATCH_THRESHOLD,
+        institution_index: IVFIndex | None = None,
+        result_cache: RecognitionResultCache | None = None,
+    ):
+        self.galleries = galleries or GalleryRegistry()
+        self.match_threshold = match_threshold
+        if institution_index is None:
+            institution_index = IVFIndex(DEFAULT_EMBEDDING_DIM)
+        self.institution_index = institution_index
+        self.results = result_cache or RecognitionResultCache()
+        self._index_lock = threading.RLock()
+
+    def load_class_gallery(
+        self,
+        class_id: UUID,
+        student_ids: Sequence[UUID],
+        store: EmbeddingStore,
+        roster_fetched_at: float | None = None,
+    ) -> ClassGallery:
+        """Load a class's gallery from the embedding store.
+
+        Students without a stored template are left out of the gallery but
+        kept on its roster, so enrolling them later reloads it.
+
+        Args:
+            class_id: The class to load.
+            student_ids: The students enrolled in the class.
+            store: The embedding store holding the templates.
+            roster_fetched_at: When ``student_ids`` was read, on the
+                monotonic clock; defaults to now.
+
+        Returns:
+            The loaded gallery.
+        """
+        # Read first: a write landing during get_many leaves the gallery
+        # marked older than its contents, so it is reloaded, never missed
+        generation = store.generation
+        found, embeddings = store.get_many(student_ids)
+        gallery = self.galleries.set(
+            class_id,
+            found,
+            embeddings,
+            roster=student_ids,
+            store_generation=generation,
+            roster_fetched_at=roster_fetched_at,
+        )
+        self.results.invalidate_class(class_id)
+        return gallery
+
+    def current_gallery(
+        self, class_id: UUID, store: EmbeddingStore
+    ) -> ClassGallery | None:
+        """Get a class's loaded gallery, reloading it if the store changed.
+
+        Templates written by other workers only show up in the shared
+        store, so a gallery loaded at an older store generation is reloaded
+        from its roster.
+
+        Returns:
+            The gallery, or None if the class has none loaded.
+        """
+        gallery = self.galleries.get(class_id)
+        if gallery is None or gallery.store_generation == store.generation:
+            return gallery
+        return self.load_class_gallery(
+            class_id, gallery.roster, store, gallery.roster_fetched_at
+        )
+
+    def reload_galleries_for(
+        self, student_ids: Sequence[UUID], store: EmbeddingStore
+    ) -> list[UUID]:
+        """Reload every loaded gallery whose roster includes any of the students.
+
+        Returns:
+            The classes whose galleries were reloaded.
+        """
+        class_ids = self.galleries.classes_with_students(student_ids)
+        for class_id in class_ids:
+            gallery = self.galleries.get(class_id)
+            if gallery is not None:
+                self.load_class_gallery(
+                    class_id, gallery.roster, store, gallery.roster_fetched_at
+                )
+        return class_ids
+
+    def load_institution_index(self, store: EmbeddingStore) -> None:
+        """Bring the institution index in line with the embedding store.
+
+        An index loaded from a saved file keeps its trained centroids, but
+        students who left since it was saved are removed and every stored
+        template is added again, replacing the saved one. The index is
+        trained once it holds enough templates.
+        """
+        student_ids, embeddings = store.live()
+        index = self.institution_index
+        with self._index_lock:
+            for student_id in set(index.keys()).difference(student_ids):
+                index.remove(student_id)
+            if student_ids:
+                index.add(student_ids, embeddings)
+            self._train_index_if_ready()
+
+    def save_institution_index(self, path: str | Path) -> None:
+        """Save the institution index, e.g. for the next worker to start from."""
+        with self._index_lock:
+            self.institution_index.save(path)
+
+    def _train_index_if_ready(self) -> None:
+        index = self.institution_index
+        with self._index_lock:
+            if (
+                not index.is_trained
+                and len(index) >= MIN_TRAINING_VECTORS_PER_LIST * index.n_lists
+            ):
+                index.train()
+
+    def match_class(
+        self,
+        class_id: UUID,
+        probes: np.ndarray,
+        top_k: int = 1,
+        threshold: float | None = None,
+    ) -> list[list[Match]]:
+        """Match a batch of probe embeddings against a class's gallery.
+
+        Args:
+            class_id: The class whose enrolled students are searched.
+            probes: A (m, dim) or (dim,) array of probe embeddings, e.g. all
+                faces found in one classroom photo.
+            top_k: Maximum number of candidates returned per probe.
+            threshold: Minimum cosine similarity; defaults to the service's
+                match threshold.
+
+        Returns:
+            One list of matches per probe, best first.
+
+        Raises:
+            GalleryNotFoundError: If the class has no loaded gallery.
+            InvalidEmbeddingError: If the probes have the wrong shape.
+        """
+        gallery = self.galleries.get(class_id)
+        if gallery is None:
+            raise GalleryNotFoundError(f"No gallery loaded for class {class_id}")
+
+        return gallery.match(
+            probes,
+            top_k=top_k,
+            threshold=self.match_threshold if threshold is None else threshold,
+        )
+
+    def cached_image_result(
+        self,
+        class_id: UUID,
+        image_key: str,
+        store: EmbeddingStore,
+        top_k: int = 1,
+    ) -> list[list[Match]] | None:
+        """Get the stored result of recognizing an image in a class, if any.
+
+        Args:
+            class_id: The class the image was matched against.
+            image_key: The image's content hash.
+            store: The embedding store, to check the gallery is current.
+            top_k: Maximum number of candidates per face.
+
+        Returns:
+            One list of matches per face, or None if the image has not been
+            recognized against the class's current gallery.
+
+        Raises:
+            GalleryNotFoundError: If the class has no loaded gallery.
+        """
+        gallery = self.current_gallery(class_id, store)
+        if gallery is None:
+            raise GalleryNotFoundError(f"No gallery loaded for class {class_id}")
+        return self.results.get((image_key, class_id, gallery.version, top_k))
+
+    def recognize_images(
+        self,
+        probes: Sequence[ImageProbe],
+        engine: FaceEngine,
+        store: EmbeddingStore,
+    ) -> list[list[list[Match]] | RecognitionServiceError]:
+        """Match every face in a batch of photos against their classes.
+
+        Faces from all photos are embedded in a single engine call, and all
+        faces for the same class are scored with a single matrix multiply.
+        Results are cached by photo hash and gallery version. Galleries
+        loaded before the store last changed are reloaded first; missing
+        ones are not loaded, since that needs the class roster.
+
+        Args:
+            probes: The decoded photos and the classes to match them in.
+            engine: The face engine used to embed the faces.
+            store: The embedding store, to check the galleries are current.
+
+        Returns:
+            For each probe, one list of matches per face found, best first;
+            or a GalleryNotFoundError if its class has no loaded gallery.
+        """
+        results: list[list[list[Match]] | RecognitionServiceError] = [
+            [] for _ in probes
+        ]
+        galleries: dict[UUID, ClassGallery] = {}
+        members: dict[UUID, list[int]] = {}
+        aligned: list[np.ndarray] = []
+        owners: list[int] = []
+        with span("batch.detect"):
+            for index, probe in enumerate(probes):
+                gallery = galleries.get(probe.class_id)
+                if gallery is None:
+                    gallery = self.current_gallery(probe.class_id, store)
+                if gallery is None:
+                    results[index] = GalleryNotFoundError(
+                        f"No gallery loaded for class {probe.class_id}"
+                    )
+                    continue
+                galleries[probe.class_id] = gallery
+                members.setdefault(probe.class_id, []).append(index)
+                for face in engine.detect(probe.image):
+                    aligned.append(engine.align(probe.image, face))
+                    owners.append(index)
+
+        with span("batch.embed"):
+            if aligned:
+                embeddings = engine.embed(np.stack(aligned))
+            else:
+                embeddings = np.empty((0, engine.embedding_dim), dtype=np.float32)
+        face_owners = np.asarray(owners, dtype=np.int64)
+
+        with span("batch.match"):
+            for class_id, indexes in members.items():
+                gallery = galleries[class_id]
+                rows = np.flatnonzero(np.isin(face_owners, indexes))
+                if len(rows):
+                    top_k = max(probes[index].top_k for index in indexes)
+                    matches = gallery.match(
+                        embeddings[rows],
+                        top_k=top_k,
+                        threshold=self.match_threshold,
+                    )
+                    for row, face_matches in zip(rows.tolist(), matches):
+                        owner = owners[row]
+                        results[owner].append(face_matches[: probes[owner].top_k])
+                for index in indexes:
+                    probe = probes[index]
+                    self.results.put(
+                        (probe.image_key, class_id, gallery.version, probe.top_k),
+                        results[index],
+                    )
+        return results
+
+    def index_student(self, student_id: UUID, embedding: np.ndarray) -> None:
+        """Add or replace a student's template in the institution-wide index.
+
+        Args:
+            student_id: The enrolled student.
+            embedding: The student's face template.
+        """
+        with self._index_lock:
+            self.institution_index.add([student_id], embedding)
+            # An index that started out small is trained as soon as it can be
+            self._train_index_if_ready()
+
+    def unindex_student(self, student_id: UUID) -> None:
+        """Remove a student who left from the institution-wide index."""
+        with self._index_lock:
+            self.institution_index.remove(student_id)
+
+    def identify(
+        self,
+        probes: np.ndarray,
+        top_k: int = 5,
+        threshold: float | None = None,
+    ) -> list[list[Match]]:
+        """Search every enrolled student across the institution.
+
+        Uses the approximate nearest neighbour index, so this scales to the
+        whole campus at the cost of occasionally missing the true best
+        match; per-class matching stays exact.
+
+        Args:
+            probes: A (m, dim) or (dim,) array of probe embeddings.
+            top_k: Maximum number of candidates returned per probe.
+            threshold: Minimum cosine similarity; defaults to the service's
+                match threshold.
+
+        Returns:
+            One list of matches per probe, best first.
+        """
+        threshold = self.match_threshold if threshold is None else threshold
+        with self._index_lock:
+            neighbours_per_probe = self.institution_index.search(probes, k=top_k)
+        return [
+            [
+                Match(student_id=student_id, score=score)
+                for student_id, score in neighbours
+                if score >= threshold
+            ]
+            for neighbours in neighbours_per_probe
+        ]
@@ -0,0 +1,397 @@
+import asyncio
+from collections import Counter
+from collections.abc import AsyncIterator, Callable, Sequence
+from dataclasses import dataclass
+from datetime import date
+from typing import Any
+from uuid import UUID
+
+from app.db.supabase import (
+    SupabaseClient,
+    get_async_supabase_client,
+    run_supabase_call,
+)
+from app.utils.export import ExportColumns
+from app.utils.pagination import keyset_pages
+
+TOTAL_COLUMNS = "present,late,absent"
+
+# Primary keys of the tables reports read, which they are paged through in
+STUDENT_TOTALS_KEY_COLUMNS = ("class_id", "student_id")
+SESSION_TOTALS_KEY_COLUMNS = ("class_id", "session_date")
+ROSTER_KEY_COLUMNS = ("class_id", "student_id")
+
+# Attendance is exported in primary key order, so pages are index range scans
+ATTENDANCE_KEY_COLUMNS = ("class_id", "session_date", "student_id")
+
+# Classes per export; every id is sent in the request URL, and again in the
+# filter sent to PostgREST
+EXPORT_MAX_CLASSES = 100
+
+ATTENDANCE_EXPORT_COLUMNS: ExportColumns = (
+    ("class_id", "string"),
+    ("session_date", "date"),
+    ("student_id", "string"),
+    ("first_name", "string"),
+    ("last_name", "string"),
+    ("status", "string"),
+    ("method", "string"),
+    ("confidence", "float"),
+    ("recorded_at", "timestamp"),
+)
+
+
+class ReportServiceError(Exception):
+    """Base exception for report service errors."""
+
+    pass
+
+
+class ReportQueryError(ReportServiceError):
+    """Exception raised when report data cannot be read or rebuilt."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class SessionAttendance:
+    """How many students were present, late and absent in one session."""
+
+    session_date: date
+    present: int
+    late: int
+    absent: int
+
+
+@dataclass(frozen=True)
+class AttendanceSummary:
+    """A student's marks in a class, out of the sessions the class held.
+
+    ``attendance_rate`` counts late as attended; sessions the student has
+    no mark for count as missed.
+    """
+
+    class_id: UUID
+    student_id: UUID
+    present: int
+    late: int
+    absent: int
+    sessions: int
+    attendance_rate: float
+
+
+@dataclass
+class ClassAttendanceReport:
+    """Attendance of every student of a class and of every session."""
+
+    class_id: UUID
+    sessions: list[SessionAttendance]
+    students: list[AttendanceSummary]
+    attendance_rate: float
+
+
+@dataclass
+class StudentAttendanceReport:
+    """A student's attendance in each of their classes."""
+
+    student_id: UUID
+    classes: list[AttendanceSummary]
+    attendance_rate: float
+
+
+def _summary(
+    class_id: UUID, student_id: UUID, totals: dict[str, Any], sessions: int
+) -> AttendanceSummary:
+    present = totals.get("present", 0)
+    late = totals.get("late", 0)
+    return AttendanceSummary(
+        class_id=class_id,
+        student_id=student_id,
+        present=present,
+        late=late,
+        absent=totals.get("absent", 0),
+        sessions=sessions,
+        attendance_rate=min((present + late) / sessions, 1.0) if sessions else 0.0,
+    )
+
+
+def _mean_rate(summaries: list[AttendanceSummary]) -> float:
+    if not summaries:
+        return 0.0
+    return sum(s.attendance_rate for s in summaries) / len(summaries)
+
+
+def _held(row: dict[str, Any]) -> bool:
+    """Whether a session counter row still has any marks."""
+    return bool(row["present"] or row["late"] or row["absent"])
+
+
+class ReportService:
+    """Service for attendance reports read from precomputed totals.
+
+    Triggers on the attendance table keep one counter row per student and
+    class and one per class session (see the attendance_totals migration),
+    so a report costs a few queries of O(students + sessions) rows however
+    many marks a semester accumulates. ``rebuild_totals`` recomputes the
+    counters from the attendance rows if they ever drift.
+
+    Every read is paged with keyset pagination, ``page_size`` rows at a
+    time, since PostgREST silently truncates longer results. Exports read
+    the attendance rows themselves, ``export_page_size`` at a time.
+    """
+
+    def __init__(
+        self,
+        client: SupabaseClient | None = None,
+        export_page_size: int = 1000,
+        page_size: int = 1000,
+    ):
+        self.client = client
+        self.export_page_size = export_page_size
+        self.page_size = page_size
+
+    async def _execute(self, call: Callable[[SupabaseClient], Any]) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(self.client, call)
+
+    async def _select(
+        self,
+        table: str,
+        columns: str,
+        column: str,
+        values: list[str],
+        key_columns: Sequence[str],
+    ) -> list[dict[str, Any]]:
+        """Read every row of a table whose column is one of the values.
+
+        ``columns`` must include the ``key_columns`` the pages are read by.
+        """
+        if not values:
+            return []
+
+        async def fetch(after: str | None, limit: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = client.table(table).select(columns).in_(column, values)
+                if after is not None:
+                    query = query.or_(after)
+                for key in key_columns:
+                    query = query.order(key)
+                return query.limit(limit).execute()
+
+            try:
+                result = await self._execute(call)
+            except Exception as e:
+                raise ReportQueryError(f"Failed to read {table}: {str(e)}") from e
+            return result.data
+
+        return [
+            row
+            async for page in keyset_pages(fetch, key_columns, self.page_size)
+            for row in page
+        ]
+
+    async def class_report(self, class_id: UUID) -> ClassAttendanceReport:
+        """Get the attendance of a class's students and sessions.
+
+        Every student on the roster is listed, including those with no
+        marks yet.
+
+        Args:
+            class_id: The class.
+
+        Returns:
+            Per-session counts by date and per-student summaries.
+
+        Raises:
+            ReportQueryError: If the totals cannot be read.
+        """
+        key = [str(class_id)]
+        session_rows, student_rows, roster_rows = await asyncio.gather(
+            self._select(
+                "attendance_session_totals",
+                f"class_id,session_date,{TOTAL_COLUMNS}",
+                "class_id",
+                key,
+                SESSION_TOTALS_KEY_COLUMNS,
+            ),
+            self._select(
+                "attendance_student_totals",
+                f"class_id,student_id,{TOTAL_COLUMNS}",
+                "class_id",
+                key,
+                STUDENT_TOTALS_KEY_COLUMNS,
+            ),
+            self._select(
+                "class_students",
+                "class_id,student_id",
+                "class_id",
+                key,
+                ROSTER_KEY_COLUMNS,
+            ),
+        )
+
+        sessions = sorted(
+            (
+                SessionAttendance(
+                    session_date=date.fromisoformat(row["session_date"]),
+                    present=row["present"],
+                    late=row["late"],
+                    absent=row["absent"],
+                )
+                for row in session_rows
+                if _held(row)
+            ),
+            key=lambda session: session.session_date,
+        )
+        totals = {UUID(row["student_id"]): row for row in student_rows}
+        for row in roster_rows:
+            totals.setdefault(UUID(row["student_id"]), {})
+        students = [
+            _summary(class_id, student_id, row, len(sessions))
+            for student_id, row in totals.items()
+        ]
+
+        return ClassAttendanceReport(
+            class_id=class_id,
+            sessions=sessions,
+            students=students,
+            attendance_rate=_mean_rate(students),
+        )
+
+    async def student_report(self, student_id: UUID) -> StudentAttendanceReport:
+        """Get a student's attendance in every class they have marks in.
+
+        Args:
+            student_id: The student.
+
+        Returns:
+            One summary per class.
+
+        Raises:
+            ReportQueryError: If the totals cannot be read.
+        """
+        student_rows = await self._select(
+            "attendance_student_totals",
+            f"class_id,student_id,{TOTAL_COLUMNS}",
+            "student_id",
+            [str(student_id)],
+            STUDENT_TOTALS_KEY_COLUMNS,
+        )
+        class_ids = [row["class_id"] for row in student_rows]
+        session_rows = await self._select(
+            "attendance_session_totals",
+            f"class_id,session_date,{TOTAL_COLUMNS}",
+            "class_id",
+            class_ids,
+            SESSION_TOTALS_KEY_COLUMNS,
+        )
+        sessions = Counter(row["class_id"] for row in session_rows if _held(row))
+
+        classes = [
+            _summary(
+                UUID(row["class_id"]), student_id, row, sessions[row["class_id"]]
+            )
+            for row in student_rows
+        ]
+        return StudentAttendanceReport(
+            student_id=student_id,
+            classes=classes,
+            attendance_rate=_mean_rate(classes),
+        )
+
+    async def rebuild_totals(self, class_id: UUID | None = None) -> int:
+        """Recompute attendance totals from the attendance rows.
+
+        Args:
+            class_id: The class to rebuild; every class when omitted.
+
+        Returns:
+            The number of student totals rebuilt.
+
+        Raises:
+            ReportQueryError: If the rebuild fails.
+        """
+        params = {"p_class_id": str(class_id) if class_id else None}
+        try:
+            result = await self._execute(
+                lambda client: client.rpc("rebuild_attendance_totals", params)
+                .execute()
+            )
+        except Exception as e:
+            raise ReportQueryError(
+                f"Failed to rebuild attendance totals: {str(e)}"
+            ) from e
+        return result.data
+
+    async def export_attendance(
+        self,
+        class_ids: Sequence[UUID],
+        start: date | None = None,
+        end: date | None = None,
+    ) -> AsyncIterator[list[dict[str, Any]]]:
+        """Read the attendance records of several classes page by page.
+
+        Pages are read with keyset pagination in primary key order, so
+        each one costs the same however deep into the export it is, and
+        only one page is held at a time.
+
+        Args:
+            class_ids: The classes to export.
+            start: The first session date to include.
+            end: The last session date to include.
+
+        Yields:
+            Pages of rows with the ``ATTENDANCE_EXPORT_COLUMNS``.
+
+        Raises:
+            ReportQueryError: If a page cannot be read.
+        """
+        ids = [str(class_id) for class_id in class_ids]
+
+        async def fetch(after: str | None, limit: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = (
+                    client.table("attendance")
+                    .select(
+                        "class_id,session_date,student_id,status,method,"
+                        "confidence,recorded_at,profiles(first_name,last_name)"
+                    )
+                    .in_("class_id", ids)
+                )
+                if start is not None:
+                    query = query.gte("session_date", start.isoformat())
+                if end is not None:
+                    query = query.lte("session_date", end.isoformat())
+                if after is not None:
+                    query = query.or_(after)
+                for column in ATTENDANCE_KEY_COLUMNS:
+                    query = query.order(column)
+                return query.limit(limit).execute()
+
+            try:
+                result = await self._execute(call)
+            except Exception as e:
+                raise ReportQueryError(
+                    f"Failed to read attendance: {str(e)}"
+                ) from e
+            return result.data
+
+        async for rows in keyset_pages(
+            fetch, ATTENDANCE_KEY_COLUMNS, self.export_page_size
+        ):
+            for row in rows:
+                profile = row.pop("profiles", None) or {}
+                row["first_name"] = profile.get("first_name")
+                row["last_name"] = profile.get("last_name")
+            yield rows
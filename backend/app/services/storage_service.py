@@ -0,0 +1,305 @@
+import asyncio
+import fcntl
+import hashlib
+import os
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+from supabase import AsyncClient
+
+
+class StorageServiceError(Exception):
+    """Base exception for storage service errors."""
+
+    pass
+
+
+class ObjectNotFoundError(StorageServiceError):
+    """Exception raised when a stored image does not exist."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class StoredImage:
+    """An image persisted in storage, keyed by its SHA-256 digest."""
+
+    key: str
+    sha256: str
+    size: int
+    content_type: str
+    deduplicated: bool = False
+
+
+def object_path(key: str) -> str:
+    """Get the relative path of an object, sharded by its first hex digits."""
+    return f"objects/{key[:2]}/{key}"
+
+
+class StorageBackend(Protocol):
+    """Where image bytes and their reference counts are kept."""
+
+    async def exists(self, key: str) -> bool:
+        """Check whether an object is stored."""
+        ...
+
+    async def put(self, key: str, path: Path, content_type: str) -> None:
+        """Store the file at path as an object."""
+        ...
+
+    async def read(self, key: str) -> bytes:
+        """Read an object.
+
+        Raises:
+            ObjectNotFoundError: If the object is not stored.
+        """
+        ...
+
+    async def delete(self, key: str) -> None:
+        """Delete an object if it exists."""
+        ...
+
+    async def incref(self, key: str, size: int, content_type: str) -> int:
+        """Add a reference to an object, returning the new count."""
+        ...
+
+    async def decref(self, key: str) -> int:
+        """Drop a reference to an object, returning the remaining count."""
+        ...
+
+
+class LocalStorageBackend:
+    """Stores objects and reference counts on the local filesystem.
+
+    Used in tests and on-prem deployments. Reference counts live next to
+    the objects and are updated under an advisory lock, so every worker on
+    the host shares them.
+    """
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock_path = self.root / "refs.lock"
+
+    def path(self, key: str) -> Path:
+        return self.root / object_path(key)
+
+    async def exists(self, key: str) -> bool:
+        return self.path(key).exists()
+
+    async def put(self, key: str, path: Path, content_type: str) -> None:
+        destination = self.path(key)
+        destination.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, destination)
+
+    async def read(self, key: str) -> bytes:
+        try:
+            return self.path(key).read_bytes()
+        except FileNotFoundError:
+            raise ObjectNotFoundError(f"No stored image {key}") from None
+
+    async def delete(self, key: str) -> None:
+        self.path(key).unlink(missing_ok=True)
+
+    async def incref(self, key: str, size: int, content_type: str) -> int:
+        # Waiting for the lock blocks, so it is taken in a worker thread
+        return await asyncio.to_thread(self._update_refs, key, 1)
+
+    async def decref(self, key: str) -> int:
+        return await asyncio.to_thread(self._update_refs, key, -1)
+
+    def _update_refs(self, key: str, delta: int) -> int:
+        with self._refs_lock():
+            return self._write_refs(key, delta)
+
+    def _write_refs(self, key: str, delta: int) -> int:
+        refs_path = self.root / "refs" / key[:2] / key
+        try:
+            count = int(refs_path.read_text())
+        except FileNotFoundError:
+            count = 0
+        count = max(0, count + delta)
+        if count:
+            refs_path.parent.mkdir(parents=True, exist_ok=True)
+            refs_path.write_text(str(count))
+        else:
+            refs_path.unlink(missing_ok=True)
+        return count
+
+    @contextmanager
+    def _refs_lock(self) -> Iterator[None]:
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+class SupabaseStorageBackend:
+    """Stores objects in a Supabase Storage bucket.
+
+    Reference counts are kept in the ``image_objects`` table and changed
+    through database functions, so concurrent workers update them
+    atomically.
+    """
+
+    def __init__(self, client: AsyncClient, bucket: str):
+        self._client = client
+        self._bucket = bucket
+
+    def _files(self):
+        return self._client.storage.from_(self._bucket)
+
+    async def exists(self, key: str) -> bool:
+        return await self._files().exists(object_path(key))
+
+    async def put(self, key: str, path: Path, content_type: str) -> None:
+        # Passing the path lets the upload stream from disk
+        await self._files().upload(
+            object_path(key),
+            path,
+            {"content-type": content_type, "upsert": "true"},
+        )
+        path.unlink(missing_ok=True)
+
+    async def read(self, key: str) -> bytes:
+        try:
+            return await self._files().download(object_path(key))
+        except Exception as e:
+            raise ObjectNotFoundError(f"No stored image {key}: {str(e)}") from e
+
+    async def delete(self, key: str) -> None:
+        await self._files().remove([object_path(key)])
+
+    async def incref(self, key: str, size: int, content_type: str) -> int:
+        response = await self._client.rpc(
+            "image_object_incref",
+            {"p_sha256": key, "p_size": size, "p_content_type": content_type},
+        ).execute()
+        return response.data
+
+    async def decref(self, key: str) -> int:
+        response = await self._client.rpc(
+            "image_object_decref", {"p_sha256": key}
+        ).execute()
+        return response.data
+
+
+class ImageUpload:
+    """An image being written to a local temp file chunk by chunk.
+
+    The content hash is computed on the fly, so an upload never has to be
+    held in memory whole. Nothing is visible in storage until the upload
+    is committed with ``StorageService.commit``.
+    """
+
+    def __init__(self, tmp_dir: Path):
+        self._hash = hashlib.sha256()
+        self.size = 0
+        fd, path = tempfile.mkstemp(dir=tmp_dir, suffix=".upload")
+        self._file = os.fdopen(fd, "wb")
+        self.path = Path(path)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk to the upload."""
+        # Chunks land in the page cache; handing each one to a thread would
+        # cost more than the write itself
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def close(self) -> None:
+        self._file.close()
+
+    def abort(self) -> None:
+        """Discard the upload."""
+        self._file.close()
+        self.path.unlink(missing_ok=True)
+
+
+class StorageService:
+    """Content-addressed, deduplicated storage for uploaded images.
+
+    Images are keyed by their SHA-256 digest, so identical bytes uploaded
+    any number of times are stored once. Every upload adds a reference to
+    its object. References are only released to roll back a batch upload
+    that failed part way; committed photos are kept, since attendance
+    records and the recognition log point at them by hash.
+    """
+
+    def __init__(self, backend: StorageBackend, tmp_dir: str | Path):
+        self.backend = backend
+        self.tmp_dir = Path(tmp_dir)
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def open_upload(self) -> ImageUpload:
+        """Start streaming a new image to a local temp file."""
+        return ImageUpload(self.tmp_dir)
+
+    async def commit(self, upload: ImageUpload, content_type: str) -> StoredImage:
+        """Store a finished upload and take a reference to it.
+
+        The reference is taken first, so an object cannot be released and
+        deleted between finding it and referencing it. If an object with
+        the same content already exists, the upload is discarded instead
+        of stored again.
+
+        Args:
+            upload: The fully written upload.
+            content_type: The image's sniffed MIME type.
+
+        Returns:
+            The stored image.
+        """
+        upload.close()
+        key = upload.sha256
+        try:
+            references = await self.backend.incref(key, upload.size, content_type)
+            # A count above one means the object was stored before, unless a
+            # commit that took the first reference failed to store it
+            deduplicated = references > 1 and await self.backend.exists(key)
+            if not deduplicated:
+                try:
+                    await self.backend.put(key, upload.path, content_type)
+                except BaseException:
+                    await self.backend.decref(key)
+                    raise
+        finally:
+            upload.abort()
+        return StoredImage(
+            key=key,
+            sha256=key,
+            size=upload.size,
+            content_type=content_type,
+            deduplicated=deduplicated,
+        )
+
+    async def read(self, key: str) -> bytes:
+        """Read a stored image.
+
+        Raises:
+            ObjectNotFoundError: If no image is stored under the key.
+        """
+        return await self.backend.read(key)
+
+    async def release(self, key: str) -> int:
+        """Drop a reference to an image, deleting it with its last reference.
+
+        Used to undo the commits of a batch upload that failed part way.
+
+        Returns:
+            The number of references left.
+        """
+        remaining = await self.backend.decref(key)
+        if remaining == 0:
+            await self.backend.delete(key)
+        return remaining
@@ -0,0 +1,92 @@
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from app.db.supabase import (
+    SupabaseClient,
+    get_async_supabase_client,
+    run_supabase_call,
+)
+from app.models.instructor import ProfileType
+from app.utils.pagination import Page, fetch_keyset_page, select_fields
+
+USER_FIELDS = ("id", "first_name", "last_name", "bio", "type")
+USER_KEY_COLUMNS = ("id",)
+
+
+class UserServiceError(Exception):
+    """Base exception for user service errors."""
+
+    pass
+
+
+class UserQueryError(UserServiceError):
+    """Exception raised when user profiles cannot be read."""
+
+    pass
+
+
+class UserService:
+    """Service for listing user profiles.
+
+    Listings are keyset-paginated on the profile id and read only the
+    fields the client asks for.
+    """
+
+    def __init__(self, client: SupabaseClient | None = None):
+        self.client = client
+
+    async def _execute(self, call: Callable[[SupabaseClient], Any]) -> Any:
+        """Run a Supabase call without blocking the event loop.
+
+        Defaults to the shared async client when no client was injected.
+
+        Args:
+            call: A callable receiving the client and performing the request.
+
+        Returns:
+            The result of the Supabase call.
+        """
+        if self.client is None:
+            self.client = await get_async_supabase_client()
+        return await run_supabase_call(self.client, call)
+
+    async def list_users(
+        self,
+        limit: int,
+        cursor: str | None = None,
+        fields: Sequence[str] | None = None,
+        profile_type: ProfileType | None = None,
+    ) -> Page:
+        """List user profiles in id order.
+
+        Args:
+            limit: The most profiles to return.
+            cursor: The ``next_cursor`` of the previous page.
+            fields: The fields to return; all of ``USER_FIELDS`` if None.
+            profile_type: Only list students or only instructors.
+
+        Returns:
+            A page of profiles.
+
+        Raises:
+            PaginationError: If the cursor or a field is invalid.
+            UserQueryError: If the profiles cannot be read.
+        """
+        columns = ",".join(select_fields(fields, USER_FIELDS, USER_KEY_COLUMNS))
+
+        async def fetch(after: str | None, count: int) -> list[dict[str, Any]]:
+            def call(client: SupabaseClient) -> Any:
+                query = client.table("profiles").select(columns)
+                if profile_type is not None:
+                    query = query.eq("type", profile_type.value)
+                if after is not None:
+                    query = query.or_(after)
+                return query.order("id").limit(count).execute()
+
+            try:
+                result = await self._execute(call)
+            except Exception as e:
+                raise UserQueryError(f"Failed to read profiles: {str(e)}") from e
+            return result.data
+
+        return await fetch_keyset_page(fetch, USER_KEY_COLUMNS, limit, cursor)
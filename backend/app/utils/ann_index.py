@@ -0,0 +1,295 @@
+import os
+import tempfile
+from collections.abc import Sequence
+from pathlib import Path
+from uuid import UUID
+
+import numpy as np
+
+from app.utils.face_utils import normalize_embeddings
+
+# Inverted lists grow by doubling, starting from this many rows
+_INITIAL_LIST_CAPACITY = 64
+
+
+class _InvertedList:
+    """Growable block of vectors assigned to one coarse centroid."""
+
+    def __init__(self, dim: int):
+        self.vectors = np.empty((_INITIAL_LIST_CAPACITY, dim), dtype=np.float32)
+        self.ids = np.empty(_INITIAL_LIST_CAPACITY, dtype=np.int64)
+        self.size = 0
+
+    def append(self, slot: int, vector: np.ndarray) -> int:
+        if self.size == len(self.ids):
+            capacity = len(self.ids) * 2
+            self.vectors = np.resize(self.vectors, (capacity, self.vectors.shape[1]))
+            self.ids = np.resize(self.ids, capacity)
+        position = self.size
+        self.vectors[position] = vector
+        self.ids[position] = slot
+        self.size += 1
+        return position
+
+    def swap_remove(self, position: int) -> int | None:
+        """Remove a row by moving the last row into its place.
+
+        Returns:
+            The slot of the row that moved, or None if none moved.
+        """
+        last = self.size - 1
+        moved = None
+        if position != last:
+            self.vectors[position] = self.vectors[last]
+            self.ids[position] = self.ids[last]
+            moved = int(self.ids[position])
+        self.size -= 1
+        return moved
+
+
+class IVFIndex:
+    """Inverted-file approximate nearest neighbour index for cosine search.
+
+    Vectors are L2-normalized and bucketed by their nearest coarse centroid
+    (spherical k-means). A search only scores the vectors in the ``n_probe``
+    lists whose centroids are closest to the query, trading a little recall
+    for scanning a small fraction of the index.
+
+    Until ``train`` is called every vector lives in a single list, so the
+    index behaves as an exact brute-force search.
+    """
+
+    def __init__(self, dim: int, n_lists: int = 256, n_probe: int = 8):
+        self.dim = dim
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.centroids: np.ndarray | None = None
+        self._lists = [_InvertedList(dim)]
+        self._slot_ids: list[UUID | None] = []
+        self._free_slots: list[int] = []
+        self._locations: dict[UUID, tuple[int, int, int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def __contains__(self, key: UUID) -> bool:
+        return key in self._locations
+
+    def keys(self) -> list[UUID]:
+        """Get every stored key."""
+        return list(self._locations)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def train(
+        self,
+        sample: np.ndarray | None = None,
+        iterations: int = 10,
+        seed: int = 0,
+    ) -> None:
+        """Learn coarse centroids and re-bucket every stored vector.
+
+        Args:
+            sample: Vectors to learn centroids from; defaults to the vectors
+                already stored in the index.
+            iterations: Number of k-means iterations.
+            seed: Seed for centroid initialization.
+        """
+        keys, vectors = self._export()
+        if sample is None:
+            sample = vectors
+        else:
+            sample = normalize_embeddings(sample)
+        if len(sample) < self.n_lists:
+            raise ValueError(
+                f"Need at least {self.n_lists} vectors to train, got {len(sample)}"
+            )
+
+        rng = np.random.default_rng(seed)
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            counts = np.bincount(assignment, minlength=self.n_lists)
+            empty = counts == 0
+            # Re-seed empty clusters with random sample vectors
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = normalize_embeddings(sums)
+
+        self.centroids = centroids
+        self._reset_lists()
+        if keys:
+            self.add(keys, vectors)
+
+    def add(self, keys: Sequence[UUID], vectors: np.ndarray) -> None:
+        """Insert or replace vectors.
+
+        Args:
+            keys: One key per vector; existing keys are replaced.
+            vectors: A (n, dim) array of vectors.
+        """
+        matrix = normalize_embeddings(vectors)
+        if matrix.shape != (len(keys), self.dim):
+            raise ValueError(f"Expected {len(keys)} vectors of dimension {self.dim}")
+
+        assignment = self._assign(matrix)
+        for key, list_index, vector in zip(keys, assignment.tolist(), matrix):
+            if key in self._locations:
+                self.remove(key)
+            slot = self._allocate_slot(key)
+            position = self._lists[list_index].append(slot, vector)
+            self._locations[key] = (list_index, position, slot)
+
+    def remove(self, key: UUID) -> bool:
+        """Remove a vector.
+
+        Returns:
+            True if the key was present.
+        """
+        location = self._locations.pop(key, None)
+        if location is None:
+            return False
+
+        list_index, position, slot = location
+        moved_slot = self._lists[list_index].swap_remove(position)
+        if moved_slot is not None:
+            moved_key = self._slot_ids[moved_slot]
+            self._locations[moved_key] = (list_index, position, moved_slot)
+        self._slot_ids[slot] = None
+        self._free_slots.append(slot)
+        return True
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int = 10,
+        n_probe: int | None = None,
+    ) -> list[list[tuple[UUID, float]]]:
+        """Find the approximate k nearest vectors by cosine similarity.
+
+        Args:
+            queries: A (m, dim) or (dim,) array of query vectors.
+            k: Number of neighbours returned per query.
+            n_probe: Number of inverted lists scanned per query; defaults to
+                the index setting. Higher is slower but more accurate.
+
+        Returns:
+            One list of (key, score) pairs per query, best first.
+        """
+        query_matrix = normalize_embeddings(queries)
+        n_probe = min(n_probe or self.n_probe, len(self._lists))
+
+        if self.centroids is None:
+            probed = np.zeros((len(query_matrix), 1), dtype=np.int64)
+        else:
+            centroid_scores = query_matrix @ self.centroids.T
+            probed = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[
+                :, :n_probe
+            ]
+
+        results = []
+        for query, list_indexes in zip(query_matrix, probed):
+            scores, slots = [], []
+            for list_index in list_indexes:
+                inverted = self._lists[list_index]
+                if inverted.size:
+                    scores.append(inverted.vectors[: inverted.size] @ query)
+                    slots.append(inverted.ids[: inverted.size])
+            if not scores:
+                results.append([])
+                continue
+
+            all_scores = np.concatenate(scores)
+            all_slots = np.concatenate(slots)
+            top = min(k, len(all_scores))
+            best = np.argpartition(-all_scores, top - 1)[:top]
+            best = best[np.argsort(-all_scores[best])]
+            results.append(
+                [
+                    (self._slot_ids[slot], score)
+                    for slot, score in zip(
+                        all_slots[best].tolist(), all_scores[best].tolist()
+                    )
+                ]
+            )
+        return results
+
+    def save(self, path: str | Path) -> None:
+        """Persist the index to a single ``.npz`` file, atomically.
+
+        Args:
+            path: Destination file path.
+        """
+        path = Path(path)
+        keys, vectors = self._export()
+        key_bytes = np.frombuffer(b"".join(key.bytes for key in keys), dtype=np.uint8)
+        arrays = {
+            "params": np.array([self.dim, self.n_lists, self.n_probe], dtype=np.int64),
+            "keys": key_bytes.reshape(len(keys), 16),
+            "vectors": vectors,
+        }
+        if self.centroids is not None:
+            arrays["centroids"] = self.centroids
+
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def load(cls, path: str | Path) -> "IVFIndex":
+        """Load an index saved with ``save``.
+
+        Args:
+            path: The saved index file.
+
+        Returns:
+            The loaded index.
+        """
+        with np.load(path) as data:
+            dim, n_lists, n_probe = (int(v) for v in data["params"])
+            index = cls(dim, n_lists=n_lists, n_probe=n_probe)
+            if "centroids" in data:
+                index.centroids = data["centroids"]
+                index._reset_lists()
+            keys = [UUID(bytes=row.tobytes()) for row in data["keys"]]
+            if keys:
+                index.add(keys, data["vectors"])
+        return index
+
+    def _assign(self, matrix: np.ndarray) -> np.ndarray:
+        if self.centroids is None:
+            return np.zeros(len(matrix), dtype=np.int64)
+        return np.argmax(matrix @ self.centroids.T, axis=1)
+
+    def _allocate_slot(self, key: UUID) -> int:
+        if self._free_slots:
+            slot = self._free_slots.pop()
+            self._slot_ids[slot] = key
+        else:
+            slot = len(self._slot_ids)
+            self._slot_ids.append(key)
+        return slot
+
+    def _reset_lists(self) -> None:
+        n_lists = 1 if self.centroids is None else len(self.centroids)
+        self._lists = [_InvertedList(self.dim) for _ in range(n_lists)]
+        self._slot_ids = []
+        self._free_slots = []
+        self._locations = {}
+
+    def _export(self) -> tuple[list[UUID], np.ndarray]:
+        """Get every stored key and its vector, list by list."""
+        keys: list[UUID] = []
+        blocks = [np.empty((0, self.dim), dtype=np.float32)]
+        for inverted in self._lists:
+            keys.extend(self._slot_ids[slot] for slot in inverted.ids[: inverted.size])
+            blocks.append(inverted.vectors[: inverted.size])
+        return keys, np.concatenate(blocks)
@@ -0,0 +1,97 @@
+import numpy as np
+
+
+def linear_assignment(cost: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Solve the rectangular linear assignment problem (Hungarian method).
+
+    Finds the one-to-one pairing of rows and columns with the smallest total
+    cost, pairing every row when there are at most as many rows as columns
+    and every column otherwise. Uses shortest augmenting paths with
+    potentials, O(n^2 m), with the inner scans vectorized.
+
+    Args:
+        cost: An (n_rows, n_cols) cost matrix.
+
+    Returns:
+        Row indexes and the column index assigned to each, ordered by row.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    if cost.shape[0] > cost.shape[1]:
+        cols, rows = linear_assignment(cost.T)
+        order = np.argsort(rows)
+        return rows[order], cols[order]
+
+    n, m = cost.shape
+    if n == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    # 1-based as in the classic formulation; column 0 is a virtual source
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    owner = np.zeros(m + 1, dtype=np.int64)
+    way = np.zeros(m + 1, dtype=np.int64)
+
+    for row in range(1, n + 1):
+        owner[0] = row
+        col = 0
+        min_reduced = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[col] = True
+            current_row = owner[col]
+            reduced = cost[current_row - 1] - u[current_row] - v[1:]
+            free = ~used[1:]
+            better = free & (reduced < min_reduced[1:])
+            min_reduced[1:][better] = reduced[better]
+            way[1:][better] = col
+
+            candidates = np.where(free, min_reduced[1:], np.inf)
+            next_col = int(np.argmin(candidates)) + 1
+            delta = candidates[next_col - 1]
+
+            u[owner[used]] += delta
+            v[used] -= delta
+            min_reduced[~used] -= delta
+            col = next_col
+            if owner[col] == 0:
+                break
+
+        # Flip the augmenting path back to the virtual source
+        while col:
+            previous = way[col]
+            owner[col] = owner[previous]
+            col = previous
+
+    assigned = np.flatnonzero(owner[1:])
+    rows = owner[1:][assigned] - 1
+    order = np.argsort(rows)
+    return rows[order], assigned[order]
+
+
+def assign_matches(
+    scores: np.ndarray, threshold: float
+) -> tuple[np.ndarray, np.ndarray]:
+    """Pair probes with candidates one-to-one, maximizing total similarity.
+
+    Only pairs scoring at least the threshold are kept, so a probe with no
+    good candidate (a visitor, a poorly lit face) stays unmatched instead
+    of taking someone else's identity.
+
+    Args:
+        scores: An (n_probes, n_candidates) similarity matrix.
+        threshold: Minimum similarity for a pair.
+
+    Returns:
+        Matched probe indexes and the candidate index matched to each.
+    """
+    eligible = scores >= threshold
+    # Probes and candidates without any pair above the threshold cannot be
+    # matched; leaving them out also spares the solver long chains of ties
+    probes = np.flatnonzero(eligible.any(axis=1))
+    candidates = np.flatnonzero(eligible.any(axis=0))
+    sub_scores = scores[np.ix_(probes, candidates)]
+
+    gain = np.maximum(sub_scores - threshold, 0)
+    rows, cols = linear_assignment(-gain)
+    keep = sub_scores[rows, cols] >= threshold
+    return probes[rows[keep]], candidates[cols[keep]]
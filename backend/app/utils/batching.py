@@ -0,0 +1,101 @@
+import asyncio
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# A batch function returns one result per item; returning an exception
+# fails only that item's request
+BatchFunction = Callable[[Sequence[T]], Sequence["R | BaseException"]]
+
+
+@dataclass(frozen=True)
+class BatcherStats:
+    """Snapshot of a micro-batcher's counters."""
+
+    batches: int
+    items: int
+    full_batches: int
+
+    @property
+    def mean_batch_size(self) -> float:
+        if self.batches == 0:
+            return 0.0
+        return self.items / self.batches
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesces concurrent requests into batches for one vectorized call.
+
+    The first item of a batch starts a timer of ``max_wait_seconds``; the
+    batch is processed when the timer fires or as soon as it holds
+    ``max_batch_size`` items, whichever comes first. The batch function
+    runs in a worker thread so the event loop keeps accepting requests,
+    and its results are fanned back to the awaiting callers.
+    """
+
+    def __init__(
+        self,
+        process: BatchFunction,
+        max_batch_size: int = 32,
+        max_wait_seconds: float = 0.005,
+    ):
+        self._process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self._pending: list[tuple[T, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+        self.full_batches = 0
+
+    async def submit(self, item: T) -> R:
+        """Queue an item for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.full_batches += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_seconds, self._flush)
+        return await future
+
+    def stats(self) -> BatcherStats:
+        """Get a snapshot of the batcher counters."""
+        return BatcherStats(
+            batches=self.batches, items=self.items, full_batches=self.full_batches
+        )
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        self.batches += 1
+        self.items += len(batch)
+        task = asyncio.get_running_loop().create_task(self._run(batch))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: list[tuple[T, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        try:
+            results = await asyncio.to_thread(self._process, items)
+        except BaseException as e:
+            results = [e] * len(batch)
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                # The caller gave up waiting, e.g. its request was cancelled
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
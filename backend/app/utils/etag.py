@@ -0,0 +1,47 @@
+import hashlib
+import json
+from typing import Any
+
+from starlette.responses import Response
+
+
+def compute_etag(body: bytes) -> str:
+    """Strong entity tag for a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header matches an entity tag.
+
+    Weak comparison, as RFC 9110 requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(
+        tag.removeprefix("W/") == etag for tag in candidates
+    )
+
+
+def json_response_with_etag(
+    payload: dict[str, Any], if_none_match: str | None
+) -> Response:
+    """Serialize a JSON payload once and answer 304 if the client has it.
+
+    The payload must already be JSON types, such as rows straight from
+    PostgREST, so no response model validates it. Clients must revalidate
+    on every use.
+
+    Args:
+        payload: The response body.
+        if_none_match: The request's If-None-Match header.
+
+    Returns:
+        The JSON response, or an empty 304 response.
+    """
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    etag = compute_etag(body)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
@@ -0,0 +1,158 @@
+import asyncio
+import csv
+import io
+from collections.abc import AsyncIterator, Sequence
+from typing import Any, Protocol
+
+# (name, type) of each exported column; types are "string", "date",
+# "timestamp" and "float", and values arrive as JSON scalars with dates and
+# timestamps as ISO 8601 strings
+ExportColumns = Sequence[tuple[str, str]]
+
+
+class PageEncoder(Protocol):
+    """Encodes pages of rows into consecutive chunks of one file."""
+
+    media_type: str
+    extension: str
+
+    def encode(self, rows: Sequence[dict[str, Any]]) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class CsvEncoder:
+    """Encodes pages of rows as CSV, with a header before the first page."""
+
+    media_type = "text/csv"
+    extension = "csv"
+
+    def __init__(self, columns: ExportColumns):
+        self.fieldnames = [name for name, _ in columns]
+        self._header_written = False
+
+    def encode(self, rows: Sequence[dict[str, Any]]) -> bytes:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(
+            buffer, fieldnames=self.fieldnames, extrasaction="ignore"
+        )
+        if not self._header_written:
+            writer.writeheader()
+            self._header_written = True
+        writer.writerows(rows)
+        return buffer.getvalue().encode()
+
+    def finish(self) -> bytes:
+        return b"" if self._header_written else self.encode([])
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what is written until it is drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ParquetEncoder:
+    """Encodes pages of rows as one Parquet file, one row group per page.
+
+    Each page's bytes can be sent as soon as it is encoded; the footer
+    comes with ``finish``.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+
+    media_type = "application/vnd.apache.parquet"
+    extension = "parquet"
+
+    def __init__(self, columns: ExportColumns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError(
+                "Parquet export requires pyarrow: pip install pyarrow"
+            ) from e
+
+        types = {
+            "string": pa.string(),
+            "date": pa.date32(),
+            "timestamp": pa.timestamp("us", tz="UTC"),
+            "float": pa.float32(),
+        }
+        self._pa = pa
+        self.schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._sink = _ChunkSink()
+        self._writer = pq.ParquetWriter(self._sink, self.schema, compression="zstd")
+
+    def encode(self, rows: Sequence[dict[str, Any]]) -> bytes:
+        pa = self._pa
+        arrays = [
+            pa.array([row.get(field.name) for row in rows]).cast(field.type)
+            for field in self.schema
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        return self._sink.drain()
+
+    def finish(self) -> bytes:
+        self._writer.close()
+        return self._sink.drain()
+
+
+async def encode_pages(
+    pages: AsyncIterator[list[dict[str, Any]]], encoder: PageEncoder
+) -> AsyncIterator[bytes]:
+    """Encode pages of rows as they arrive, for a streaming response.
+
+    Encoding runs in a worker thread so large pages do not stall the event
+    loop.
+
+    Args:
+        pages: The rows, one page at a time.
+        encoder: Encodes the pages into one file.
+
+    Yields:
+        The file's bytes, one chunk per page.
+    """
+    async for rows in pages:
+        chunk = await asyncio.to_thread(encoder.encode, rows)
+        if chunk:
+            yield chunk
+    yield await asyncio.to_thread(encoder.finish)
+
+
+async def prefetch_first_page(
+    pages: AsyncIterator[list[dict[str, Any]]],
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Read the first page now and return an iterator over every page.
+
+    A query that fails on its first page then fails before a streaming
+    response has sent its status line.
+    """
+    first = await anext(pages, None)
+
+    async def chained() -> AsyncIterator[list[dict[str, Any]]]:
+        if first is not None:
+            yield first
+        async for rows in pages:
+            yield rows
+
+    return chained()
@@ -0,0 +1,529 @@
+import os
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+from PIL import Image
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """L2-normalize embeddings row-wise into a contiguous float32 matrix.
+
+    Args:
+        embeddings: A (n, dim) or (dim,) array of embeddings.
+
+    Returns:
+        A C-contiguous float32 (n, dim) array of unit-length rows.
+
+    Raises:
+        ValueError: If the embeddings are not a 1-D or 2-D array.
+    """
+    matrix = np.array(embeddings, dtype=np.float32, ndmin=2, order="C")
+    if matrix.ndim != 2:
+        raise ValueError("Embeddings must be a 1-D or 2-D array")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.maximum(norms, np.finfo(np.float32).tiny, out=norms)
+    matrix /= norms
+    return matrix
+
+
+Landmarks = tuple[tuple[float, float], ...]
+
+
+@dataclass(frozen=True)
+class DetectedFace:
+    """A face found in an image: pixel box (x1, y1, x2, y2) and confidence.
+
+    Detectors that locate facial landmarks also give the five points (eyes,
+    nose, mouth corners) used to align the face.
+    """
+
+    box: tuple[float, float, float, float]
+    score: float
+    landmarks: Landmarks | None = None
+
+    def shifted(self, dx: float, dy: float) -> "DetectedFace":
+        """Get the same face in the coordinates of an enclosing image."""
+        x1, y1, x2, y2 = self.box
+        landmarks = None
+        if self.landmarks is not None:
+            landmarks = tuple((x + dx, y + dy) for x, y in self.landmarks)
+        return DetectedFace(
+            box=(x1 + dx, y1 + dy, x2 + dx, y2 + dy),
+            score=self.score,
+            landmarks=landmarks,
+        )
+
+
+class FaceEngine(Protocol):
+    """Detects, aligns and embeds faces.
+
+    Implementations are loaded once per process and must be safe to call
+    repeatedly from that process.
+    """
+
+    embedding_dim: int
+
+    def detect(self, image: np.ndarray) -> list[DetectedFace]:
+        """Find faces in an RGB uint8 (height, width, 3) image."""
+        ...
+
+    def align(self, image: np.ndarray, face: DetectedFace) -> np.ndarray:
+        """Crop and normalize one face into the embedder's input size."""
+        ...
+
+    def embed(self, faces: np.ndarray) -> np.ndarray:
+        """Embed a (n, size, size, 3) batch of aligned faces.
+
+        Returns:
+            A (n, embedding_dim) array of L2-normalized embeddings.
+        """
+        ...
+
+
+def crop_and_resize(
+    image: np.ndarray,
+    box: tuple[float, float, float, float],
+    size: int,
+) -> np.ndarray:
+    """Crop a box out of an image and resize it with nearest-neighbour sampling.
+
+    Args:
+        image: An RGB uint8 (height, width, 3) image.
+        box: The (x1, y1, x2, y2) region to crop, clipped to the image.
+        size: Side length of the square output.
+
+    Returns:
+        A (size, size, 3) uint8 array.
+    """
+    height, width = image.shape[:2]
+    x1, y1, x2, y2 = box
+    x1, x2 = max(0.0, x1), min(float(width), x2)
+    y1, y2 = max(0.0, y1), min(float(height), y2)
+    steps = np.arange(size) + 0.5
+    xs = np.clip((x1 + steps * (x2 - x1) / size).astype(int), 0, width - 1)
+    ys = np.clip((y1 + steps * (y2 - y1) / size).astype(int), 0, height - 1)
+    return image[ys[:, None], xs[None, :]]
+
+
+# Where ArcFace-style embedders expect the five landmarks in a 112x112 crop
+ARCFACE_LANDMARKS = np.array(
+    [
+        [38.2946, 51.6963],
+        [73.5318, 51.5014],
+        [56.0252, 71.7366],
+        [41.5493, 92.3655],
+        [70.7299, 92.2041],
+    ],
+    dtype=np.float64,
+)
+
+
+def similarity_transform(src: np.ndarray, dst: np.ndarray) -> np.ndarray:
+    """Estimate the rotation, uniform scale and shift best mapping src to dst.
+
+    Least-squares fit (Umeyama) between two (n, 2) point sets.
+
+    Returns:
+        The 2x3 affine matrix of the transform.
+    """
+    src_mean, dst_mean = src.mean(axis=0), dst.mean(axis=0)
+    src_centered, dst_centered = src - src_mean, dst - dst_mean
+    u, singular, vt = np.linalg.svd(dst_centered.T @ src_centered / len(src))
+    reflection = np.diag([1.0, np.sign(np.linalg.det(u) * np.linalg.det(vt))])
+    rotation = u @ reflection @ vt
+    scale = np.trace(np.diag(singular) @ reflection) / src_centered.var(axis=0).sum()
+    shift = dst_mean - scale * rotation @ src_mean
+    return np.hstack([scale * rotation, shift[:, np.newaxis]])
+
+
+def align_face(image: np.ndarray, landmarks: Landmarks, size: int = 112) -> np.ndarray:
+    """Warp a face so its landmarks land on the ArcFace reference points.
+
+    Args:
+        image: An RGB uint8 (height, width, 3) image.
+        landmarks: The face's five landmarks in image coordinates.
+        size: Side length of the square output.
+
+    Returns:
+        A (size, size, 3) uint8 array.
+    """
+    reference = ARCFACE_LANDMARKS * (size / 112)
+    matrix = similarity_transform(np.asarray(landmarks, dtype=np.float64), reference)
+    # PIL maps output pixels back to input pixels, so it wants the inverse
+    linear_inverse = np.linalg.inv(matrix[:, :2])
+    inverse = np.hstack([linear_inverse, -linear_inverse @ matrix[:, 2:]])
+    warped = Image.fromarray(image).transform(
+        (size, size),
+        Image.Transform.AFFINE,
+        tuple(inverse.ravel()),
+        resample=Image.Resampling.BILINEAR,
+    )
+    return np.asarray(warped)
+
+
+class FakeFaceEngine:
+    """Deterministic, dependency-free face engine for tests and local runs.
+
+    Finds one face in the center of every image and embeds it with a fixed
+    random projection of its downsampled pixels, so identical images get
+    identical embeddings and similar images similar ones.
+
+    With ``blobs=True`` every bright rectangle laid out in rows on a black
+    background is a face instead, so synthetic class photos with many
+    faces can be composed for tests and benchmarks.
+    """
+
+    input_size = 112
+
+    def __init__(self, embedding_dim: int = 512, seed: int = 0, blobs: bool = False):
+        self.embedding_dim = embedding_dim
+        self.blobs = blobs
+        pooled = (self.input_size // 7) ** 2
+        rng = np.random.default_rng(seed)
+        self._projection = rng.normal(size=(pooled, embedding_dim)).astype(np.float32)
+
+    def detect(self, image: np.ndarray) -> list[DetectedFace]:
+        if self.blobs:
+            return self._detect_blobs(image)
+        height, width = image.shape[:2]
+        side = 0.6 * min(height, width)
+        x1, y1 = (width - side) / 2, (height - side) / 2
+        return [DetectedFace(box=(x1, y1, x1 + side, y1 + side), score=1.0)]
+
+    def align(self, image: np.ndarray, face: DetectedFace) -> np.ndarray:
+        return crop_and_resize(image, face.box, self.input_size)
+
+    def embed(self, faces: np.ndarray) -> np.ndarray:
+        gray = faces.astype(np.float32).mean(axis=3)
+        n, size = gray.shape[0], self.input_size
+        pooled = gray.reshape(n, size // 7, 7, size // 7, 7).mean(axis=(2, 4))
+        pooled = pooled.reshape(n, -1)
+        pooled -= pooled.mean(axis=1, keepdims=True)
+        return normalize_embeddings(pooled @ self._projection)
+
+    def _detect_blobs(self, image: np.ndarray) -> list[DetectedFace]:
+        brightest = np.maximum(np.maximum(image[..., 0], image[..., 1]), image[..., 2])
+        mask = brightest > 16
+        faces = []
+        for top, bottom in _runs(mask.any(axis=1)):
+            for left, right in _runs(mask[top:bottom].any(axis=0)):
+                faces.append(DetectedFace(box=(left, top, right, bottom), score=1.0))
+        return faces
+
+
+def _runs(flags: np.ndarray) -> list[tuple[int, int]]:
+    """Get the [start, end) ranges of consecutive True values."""
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+# SCRFD detectors predict at three strides with two anchors per location
+SCRFD_STRIDES = (8, 16, 32)
+SCRFD_ANCHORS = 2
+
+
+def decode_scrfd_outputs(
+    outputs: Sequence[np.ndarray],
+    input_size: int,
+    score_threshold: float = 0.5,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray | None]:
+    """Turn raw SCRFD detector outputs into boxes in input pixels.
+
+    Args:
+        outputs: Score, box distance and (optionally) landmark offset maps
+            for each stride, in that order, as exported by InsightFace.
+        input_size: Side length of the square detector input.
+        score_threshold: Minimum face confidence.
+
+    Returns:
+        An (n, 4) array of boxes, their (n,) scores and an (n, 5, 2) array
+        of landmarks, or None if the model does not predict landmarks.
+    """
+    n_strides = len(SCRFD_STRIDES)
+    has_landmarks = len(outputs) == 3 * n_strides
+    boxes, scores, landmarks = [], [], []
+    for level, stride in enumerate(SCRFD_STRIDES):
+        side = input_size // stride
+        ys, xs = np.mgrid[:side, :side]
+        centers = np.stack([xs, ys], axis=-1).reshape(-1, 2) * stride
+        centers = np.repeat(centers, SCRFD_ANCHORS, axis=0).astype(np.float32)
+
+        level_scores = outputs[level].reshape(-1)
+        keep = level_scores >= score_threshold
+        distances = outputs[level + n_strides].reshape(-1, 4)[keep] * stride
+        kept_centers = centers[keep]
+        boxes.append(
+            np.hstack(
+                [kept_centers - distances[:, :2], kept_centers + distances[:, 2:]]
+            )
+        )
+        scores.append(level_scores[keep])
+        if has_landmarks:
+            offsets = outputs[level + 2 * n_strides].reshape(-1, 5, 2)[keep] * stride
+            landmarks.append(kept_centers[:, np.newaxis] + offsets)
+
+    return (
+        np.concatenate(boxes),
+        np.concatenate(scores),
+        np.concatenate(landmarks) if has_landmarks else None,
+    )
+
+
+class OnnxFaceEngine:
+    """Face engine running SCRFD detection and ArcFace embedding on CPU.
+
+    Both models run in ONNX Runtime sessions created once per process with
+    all graph optimizations enabled. ``intra_op_threads`` caps the threads
+    a single model call may use; when several processes share the machine
+    (as bulk enrollment workers do) give each one thread so they do not
+    oversubscribe the cores.
+    """
+
+    def __init__(
+        self,
+        detector_path: str | Path,
+        embedder_path: str | Path,
+        intra_op_threads: int | None = None,
+        inter_op_threads: int = 1,
+        detection_size: int = 640,
+        score_threshold: float = 0.5,
+        nms_threshold: float = 0.4,
+    ):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(
+                "The onnx face engine requires onnxruntime: pip install onnxruntime"
+            ) from e
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_threads or os.cpu_count() or 1
+        options.inter_op_num_threads = inter_op_threads
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = ["CPUExecutionProvider"]
+        self._detector = ort.InferenceSession(
+            str(detector_path), options, providers=providers
+        )
+        self._embedder = ort.InferenceSession(
+            str(embedder_path), options, providers=providers
+        )
+        self._detector_input = self._detector.get_inputs()[0].name
+        embedder_input = self._embedder.get_inputs()[0]
+        self._embedder_input = embedder_input.name
+
+        self.input_size = int(embedder_input.shape[2])
+        self.embedding_dim = int(self._embedder.get_outputs()[0].shape[1])
+        self.detection_size = detection_size
+        self.score_threshold = score_threshold
+        self.nms_threshold = nms_threshold
+
+    def detect(self, image: np.ndarray) -> list[DetectedFace]:
+        height, width = image.shape[:2]
+        scale = self.detection_size / max(height, width)
+        resized_size = (round(width * scale), round(height * scale))
+        resized = Image.fromarray(image).resize(
+            resized_size, Image.Resampling.BILINEAR
+        )
+        blob = np.zeros(
+            (1, 3, self.detection_size, self.detection_size), dtype=np.float32
+        )
+        pixels = np.asarray(resized, dtype=np.float32).transpose(2, 0, 1)
+        blob[0, :, : resized_size[1], : resized_size[0]] = (pixels - 127.5) / 128
+
+        outputs = self._detector.run(None, {self._detector_input: blob})
+        boxes, scores, landmarks = decode_scrfd_outputs(
+            outputs, self.detection_size, self.score_threshold
+        )
+        keep = non_max_suppression(boxes, scores, self.nms_threshold)
+        return [
+            DetectedFace(
+                box=tuple((boxes[i] / scale).tolist()),
+                score=float(scores[i]),
+                landmarks=(
+                    None
+                    if landmarks is None
+                    else tuple(map(tuple, (landmarks[i] / scale).tolist()))
+                ),
+            )
+            for i in keep
+        ]
+
+    def align(self, image: np.ndarray, face: DetectedFace) -> np.ndarray:
+        if face.landmarks is None:
+            return crop_and_resize(image, face.box, self.input_size)
+        return align_face(image, face.landmarks, self.input_size)
+
+    def embed(self, faces: np.ndarray) -> np.ndarray:
+        blob = (faces.astype(np.float32).transpose(0, 3, 1, 2) - 127.5) / 127.5
+        [embeddings] = self._embedder.run(None, {self._embedder_input: blob})
+        return normalize_embeddings(embeddings)
+
+
+FACE_ENGINES: dict[str, Callable[..., FaceEngine]] = {
+    "fake": FakeFaceEngine,
+    "onnx": OnnxFaceEngine,
+}
+
+
+def create_face_engine(name: str, **options: Any) -> FaceEngine:
+    """Create a face engine by name.
+
+    Args:
+        name: A key of ``FACE_ENGINES``.
+        **options: Engine-specific options.
+
+    Returns:
+        The created engine.
+    """
+    try:
+        factory = FACE_ENGINES[name]
+    except KeyError:
+        raise ValueError(f"Unknown face engine: {name}") from None
+    return factory(**options)
+
+
+def warm_up_face_engine(engine: FaceEngine) -> None:
+    """Run every stage of an engine once on a blank image.
+
+    The first inference call of a model allocates its buffers and picks
+    kernels; doing it at startup keeps that cost out of the first request.
+    """
+    image = np.zeros((480, 640, 3), dtype=np.uint8)
+    engine.detect(image)
+    face = DetectedFace(box=(220.0, 140.0, 420.0, 340.0), score=1.0)
+    engine.embed(engine.align(image, face)[np.newaxis])
+
+
+def extract_template(engine: FaceEngine, image: np.ndarray) -> np.ndarray | None:
+    """Embed the most prominent face in an image.
+
+    Args:
+        engine: The face engine to use.
+        image: An RGB uint8 (height, width, 3) image.
+
+    Returns:
+        The face's embedding, or None if no face was found.
+    """
+    faces = engine.detect(image)
+    if not faces:
+        return None
+
+    def area(face: DetectedFace) -> float:
+        x1, y1, x2, y2 = face.box
+        return (x2 - x1) * (y2 - y1)
+
+    aligned = engine.align(image, max(faces, key=area))
+    return engine.embed(aligned[np.newaxis])[0]
+
+
+def embed_faces(engine: FaceEngine, image: np.ndarray) -> np.ndarray:
+    """Embed every face in an image in one batch.
+
+    Args:
+        engine: The face engine to use.
+        image: An RGB uint8 (height, width, 3) image.
+
+    Returns:
+        A (n_faces, embedding_dim) array; empty if no face was found.
+    """
+    faces = engine.detect(image)
+    if not faces:
+        return np.empty((0, engine.embedding_dim), dtype=np.float32)
+    aligned = np.stack([engine.align(image, face) for face in faces])
+    return engine.embed(aligned)
+
+
+def non_max_suppression(
+    boxes: np.ndarray, scores: np.ndarray, iou_threshold: float = 0.4
+) -> np.ndarray:
+    """Drop boxes that overlap a higher-scoring box.
+
+    Args:
+        boxes: An (n, 4) array of (x1, y1, x2, y2) boxes.
+        scores: The (n,) box scores.
+        iou_threshold: Intersection over union above which the lower
+            scoring box is dropped.
+
+    Returns:
+        Indexes of the kept boxes, best first.
+    """
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-scores)
+    keep = []
+    while order.size:
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        width = np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])
+        height = np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])
+        overlap = np.clip(width, 0, None) * np.clip(height, 0, None)
+        iou = overlap / (areas[best] + areas[rest] - overlap)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
+
+
+def _tile_starts(length: int, tile_size: int, stride: int) -> list[int]:
+    starts = list(range(0, max(length - tile_size, 0) + 1, stride))
+    if starts[-1] + tile_size < length:
+        starts.append(length - tile_size)
+    return starts
+
+
+def detect_faces_tiled(
+    engine: FaceEngine,
+    image: np.ndarray,
+    tile_size: int = 1280,
+    overlap: int = 256,
+    iou_threshold: float = 0.4,
+) -> list[DetectedFace]:
+    """Detect faces in a large image by running the detector on tiles.
+
+    Detectors run at a fixed input size, so small faces in a wide class
+    photo vanish when the whole photo is scaled down to it. Overlapping
+    tiles keep faces at full resolution. A face cut by an inner tile edge
+    is skipped there, since the overlap (which must exceed the largest face)
+    holds it whole in the neighbouring tile; duplicates found in two tiles
+    are merged with non-maximum suppression.
+
+    Args:
+        engine: The face engine to use.
+        image: An RGB uint8 (height, width, 3) image.
+        tile_size: Side length of the square tiles.
+        overlap: Pixels shared by neighbouring tiles.
+        iou_threshold: Overlap above which two detections are one face.
+
+    Returns:
+        The faces found, in image coordinates.
+    """
+    height, width = image.shape[:2]
+    if height <= tile_size and width <= tile_size:
+        return engine.detect(image)
+
+    stride = tile_size - overlap
+    found: list[DetectedFace] = []
+    for top in _tile_starts(height, tile_size, stride):
+        for left in _tile_starts(width, tile_size, stride):
+            tile = image[top : top + tile_size, left : left + tile_size]
+            tile_height, tile_width = tile.shape[:2]
+            for face in engine.detect(tile):
+                x1, y1, x2, y2 = face.box
+                cut = (
+                    (x1 <= 1 and left > 0)
+                    or (y1 <= 1 and top > 0)
+                    or (x2 >= tile_width - 1 and left + tile_width < width)
+                    or (y2 >= tile_height - 1 and top + tile_height < height)
+                )
+                if not cut:
+                    found.append(face.shifted(left, top))
+
+    if not found:
+        return []
+    boxes = np.array([face.box for face in found], dtype=np.float64)
+    scores = np.array([face.score for face in found], dtype=np.float64)
+    keep = non_max_suppression(boxes, scores, iou_threshold)
+    return [found[i] for i in keep]
@@ -0,0 +1,88 @@
+import numpy as np
+
+EARTH_RADIUS_M = 6_371_008.8
+
+# Metres per degree of latitude (and of longitude at the equator)
+METERS_PER_DEGREE = EARTH_RADIUS_M * np.pi / 180
+
+
+def haversine_distances(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Great-circle distances in metres between pairs of points.
+
+    Args:
+        lat1: Latitudes of the first points, in degrees.
+        lon1: Longitudes of the first points, in degrees.
+        lat2: Latitudes of the second points, in degrees.
+        lon2: Longitudes of the second points, in degrees.
+
+    Returns:
+        The element-wise distances, broadcast like the inputs.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(v) for v in (lat1, lon1, lat2, lon2))
+    half_dlat = (lat2 - lat1) / 2
+    half_dlon = (lon2 - lon1) / 2
+    a = np.sin(half_dlat) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(half_dlon) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def points_in_polygons(
+    x: np.ndarray,
+    y: np.ndarray,
+    edge_start: np.ndarray,
+    edge_end: np.ndarray,
+    pair_point: np.ndarray,
+    n_points: int,
+) -> np.ndarray:
+    """Even-odd point-in-polygon test over (point, edge) pairs.
+
+    Each pair tests whether a horizontal ray from a point crosses one edge
+    of the polygon the point is tested against; a point is inside when its
+    ray crosses an odd number of edges.
+
+    Args:
+        x: The x coordinate of each pair's point.
+        y: The y coordinate of each pair's point.
+        edge_start: The (n_pairs, 2) start vertex of each pair's edge.
+        edge_end: The (n_pairs, 2) end vertex of each pair's edge.
+        pair_point: The index (below ``n_points``) of each pair's point.
+        n_points: Number of points tested.
+
+    Returns:
+        An (n_points,) boolean array.
+    """
+    x1, y1 = edge_start[:, 0], edge_start[:, 1]
+    x2, y2 = edge_end[:, 0], edge_end[:, 1]
+    straddles = (y1 > y) != (y2 > y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        crossing_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+    crosses = straddles & (x < crossing_x)
+    counts = np.bincount(pair_point, weights=crosses, minlength=n_points)
+    return (counts.astype(np.int64) % 2).astype(bool)
+
+
+def nearest_points_on_segments(
+    lat: np.ndarray, lon: np.ndarray, edge_start: np.ndarray, edge_end: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Closest point on each segment to each point.
+
+    Segments are (longitude, latitude) pairs. Distances along a building
+    edge are short, so the projection is done on a plane scaled by the
+    cosine of the point's latitude.
+
+    Returns:
+        The latitudes and longitudes of the closest points.
+    """
+    scale = np.cos(np.radians(lat))
+    ax = (edge_start[:, 0] - lon) * scale
+    ay = edge_start[:, 1] - lat
+    dx = (edge_end[:, 0] - edge_start[:, 0]) * scale
+    dy = edge_end[:, 1] - edge_start[:, 1]
+    length_sq = dx * dx + dy * dy
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.clip(-(ax * dx + ay * dy) / length_sq, 0, 1)
+    t = np.nan_to_num(t)
+    nearest_lon = edge_start[:, 0] + t * (edge_end[:, 0] - edge_start[:, 0])
+    nearest_lat = edge_start[:, 1] + t * dy
+    return nearest_lat, nearest_lon
@@ -0,0 +1,129 @@
+import io
+
+import numpy as np
+from PIL import Image, ImageOps
+
+# Longest side photos are decoded to before face detection. Phone photos
+# (12MP+) carry far more detail than detection needs.
+WORKING_MAX_SIDE = 1280
+
+# Rows copied out of a decoded image at a time, bounding the temporary copy
+DECODE_STRIP_ROWS = 64
+
+
+class ImageDecodeError(Exception):
+    """Exception raised when image bytes cannot be decoded."""
+
+    pass
+
+
+def _fit(size: tuple[int, int], max_side: int) -> tuple[int, int]:
+    """Scale a (width, height) size down so its longest side is max_side."""
+    width, height = size
+    scale = max_side / max(width, height)
+    if scale >= 1:
+        return size
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def _open_working_image(data: bytes, max_side: int | None) -> Image.Image:
+    """Decode image bytes to an upright RGB image no larger than max_side.
+
+    JPEGs are decoded in draft mode, letting the decoder skip straight to
+    the smallest power-of-two reduction still at least the working size,
+    so a 12MP photo is never materialized at full resolution.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+        if max_side is not None:
+            image.draft("RGB", _fit(image.size, max_side))
+        # Phones store photos sideways and record the rotation in EXIF
+        image = ImageOps.exif_transpose(image)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        if max_side is not None:
+            size = _fit(image.size, max_side)
+            if size != image.size:
+                image = image.resize(size, Image.Resampling.BILINEAR, reducing_gap=3.0)
+        return image
+    except Exception as e:
+        raise ImageDecodeError(f"Could not decode image: {str(e)}") from e
+
+
+def decode_image(data: bytes, max_side: int | None = None) -> np.ndarray:
+    """Decode image bytes into an upright RGB uint8 (height, width, 3) array.
+
+    Args:
+        data: Encoded image bytes (JPEG, PNG, ...).
+        max_side: If set, the image is scaled down so its longest side is at
+            most this many pixels, using reduced-resolution JPEG decoding.
+
+    Returns:
+        The decoded RGB pixels.
+
+    Raises:
+        ImageDecodeError: If the bytes are not a decodable image.
+    """
+    with _open_working_image(data, max_side) as image:
+        return np.asarray(image)
+
+
+class ImageDecoder:
+    """Decodes images at working resolution into one reusable buffer.
+
+    Decoding a burst of uploads with a fresh array per photo makes RSS
+    climb with every photo in flight; this decoder copies every photo into
+    the same preallocated buffer instead. Pillow still decodes into its own
+    image, whose blocks it recycles, and the pixels are copied out a strip
+    of rows at a time, so no other full-size copy is made. Each returned
+    array is a view that is overwritten by the next ``decode`` call, so
+    copy it if it must outlive that. Not thread-safe; use one decoder per
+    thread or process.
+    """
+
+    def __init__(self, max_side: int = WORKING_MAX_SIDE):
+        self.max_side = max_side
+        self._buffer = np.empty((max_side, max_side, 3), dtype=np.uint8)
+
+    def decode(self, data: bytes) -> np.ndarray:
+        """Decode image bytes into the decoder's buffer.
+
+        Args:
+            data: Encoded image bytes (JPEG, PNG, ...).
+
+        Returns:
+            A (height, width, 3) view of the decoded RGB pixels, valid until
+            the next call.
+
+        Raises:
+            ImageDecodeError: If the bytes are not a decodable image.
+        """
+        with _open_working_image(data, self.max_side) as image:
+            width, height = image.size
+            view = self._buffer[:height, :width]
+            # Assigning the whole image would first copy it to bytes
+            for top in range(0, height, DECODE_STRIP_ROWS):
+                bottom = min(top + DECODE_STRIP_ROWS, height)
+                strip = image.crop((0, top, width, bottom)).tobytes()
+                view[top:bottom] = np.frombuffer(strip, dtype=np.uint8).reshape(
+                    bottom - top, width, 3
+                )
+        return view
+
+
+def normalize_image(image: np.ndarray, out: np.ndarray | None = None) -> np.ndarray:
+    """Scale uint8 pixels to float32 in [-1, 1] as face models expect.
+
+    Args:
+        image: A uint8 image or batch of images.
+        out: Optional float32 array of the same shape to write into, so
+            repeated calls reuse one buffer.
+
+    Returns:
+        The normalized pixels (``out`` if given).
+    """
+    if out is None:
+        out = np.empty(image.shape, dtype=np.float32)
+    np.subtract(image, 127.5, out=out, dtype=np.float32)
+    out *= 1 / 128
+    return out
@@ -0,0 +1,139 @@
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass, field
+from enum import Enum
+
+from python_multipart.exceptions import MultipartParseError
+from python_multipart.multipart import MultipartParser, parse_options_header
+
+
+class MultipartError(Exception):
+    """Exception raised when a multipart body is malformed or over its limits."""
+
+    pass
+
+
+class PartEvent(str, Enum):
+    """Kinds of events produced while streaming a multipart body."""
+
+    START = "start"
+    DATA = "data"
+    END = "end"
+
+
+@dataclass
+class MultipartPart:
+    """Headers of one part of a multipart body."""
+
+    field_name: str = ""
+    filename: str | None = None
+    content_type: str | None = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+async def iter_multipart(
+    content_type: str | None,
+    body: AsyncIterable[bytes],
+    max_parts: int,
+) -> AsyncIterator[tuple[PartEvent, MultipartPart, bytes]]:
+    """Stream the parts of a multipart/form-data body as it arrives.
+
+    Unlike ``Request.form()``, nothing is buffered or spooled: each part
+    yields a START event once its headers are parsed, DATA events for its
+    chunks as they arrive, then an END event. Consumers can reject a part
+    from its headers or first bytes before the rest of the body is read.
+
+    Args:
+        content_type: The request's Content-Type header.
+        body: The request body chunks, e.g. ``request.stream()``.
+        max_parts: Maximum number of parts accepted.
+
+    Yields:
+        (event, part, data) tuples; data is empty except for DATA events.
+
+    Raises:
+        MultipartError: If the body is malformed or has too many parts.
+    """
+    media_type, options = parse_options_header(content_type or "")
+    if media_type != b"multipart/form-data":
+        raise MultipartError("Expected a multipart/form-data body")
+    boundary = options.get(b"boundary")
+    if not boundary:
+        raise MultipartError("Missing boundary in multipart body")
+
+    events: list[tuple[PartEvent, MultipartPart, bytes]] = []
+    state = {
+        "part": MultipartPart(),
+        "name": b"",
+        "value": b"",
+        "count": 0,
+        "complete": False,
+    }
+
+    def on_part_begin() -> None:
+        state["count"] += 1
+        if state["count"] > max_parts:
+            raise MultipartError(f"Too many parts; at most {max_parts} accepted")
+        state["part"] = MultipartPart()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        state["name"] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        state["value"] += data[start:end]
+
+    def on_header_end() -> None:
+        name = state["name"].decode("latin-1").lower()
+        state["part"].headers[name] = state["value"].decode("latin-1")
+        state["name"] = state["value"] = b""
+
+    def on_headers_finished() -> None:
+        part = state["part"]
+        _, disposition = parse_options_header(
+            part.headers.get("content-disposition", "")
+        )
+        if b"name" not in disposition:
+            raise MultipartError("Part is missing a Content-Disposition name")
+        part.field_name = disposition[b"name"].decode()
+        if b"filename" in disposition:
+            part.filename = disposition[b"filename"].decode()
+        part.content_type = part.headers.get("content-type")
+        events.append((PartEvent.START, part, b""))
+
+    def on_part_data(data: bytes, start: int, end: int) -> None:
+        events.append((PartEvent.DATA, state["part"], data[start:end]))
+
+    def on_part_end() -> None:
+        events.append((PartEvent.END, state["part"], b""))
+
+    def on_end() -> None:
+        state["complete"] = True
+
+    parser = MultipartParser(
+        boundary,
+        {
+            "on_part_begin": on_part_begin,
+            "on_part_data": on_part_data,
+            "on_part_end": on_part_end,
+            "on_header_field": on_header_field,
+            "on_header_value": on_header_value,
+            "on_header_end": on_header_end,
+            "on_headers_finished": on_headers_finished,
+            "on_end": on_end,
+        },
+    )
+
+    try:
+        async for chunk in body:
+            parser.write(chunk)
+            # Events from this chunk are handed out before the next one is
+            # read, so at most one network chunk is held in memory
+            for event in events:
+                yield event
+            events.clear()
+        parser.finalize()
+    except MultipartParseError as e:
+        raise MultipartError(f"Malformed multipart body: {str(e)}") from e
+    for event in events:
+        yield event
+    if not state["complete"]:
+        raise MultipartError("Multipart body ended before its closing boundary")
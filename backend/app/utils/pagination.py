@@ -0,0 +1,180 @@
+import base64
+import binascii
+import json
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any
+
+# Fetches the rows after a keyset filter (None for the first page), in key
+# order, at most ``limit`` of them
+PageFetcher = Callable[[str | None, int], Awaitable[list[dict[str, Any]]]]
+
+
+class PaginationError(Exception):
+    """Exception raised when a page cursor or field selection is invalid."""
+
+    pass
+
+
+@dataclass
+class Page:
+    """One page of rows and the cursor of the page after it, if any."""
+
+    items: list[dict[str, Any]]
+    next_cursor: str | None
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the key of the last row of a page as an opaque cursor."""
+    data = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, n_columns: int) -> list[Any]:
+    """Decode a cursor made by ``encode_cursor``.
+
+    Raises:
+        PaginationError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError("Invalid cursor") from None
+    if not isinstance(values, list) or len(values) != n_columns:
+        raise PaginationError("Invalid cursor")
+    return values
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    """Split a comma-separated field list, as given in a query string."""
+    if fields is None:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()]
+
+
+def select_fields(
+    fields: Sequence[str] | None,
+    allowed: Sequence[str],
+    key_columns: Sequence[str],
+) -> list[str]:
+    """Resolve the columns to read for a requested field list.
+
+    The key columns are always read, since the next cursor is made from
+    them.
+
+    Args:
+        fields: The fields the client asked for; every allowed field when
+            None or empty.
+        allowed: The fields that may be requested.
+        key_columns: The columns the rows are sorted by.
+
+    Returns:
+        The columns, in ``allowed`` order.
+
+    Raises:
+        PaginationError: If a field is not allowed.
+    """
+    if not fields:
+        return list(allowed)
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise PaginationError(
+            f"Unknown fields {unknown}; choose from {list(allowed)}"
+        )
+    wanted = set(fields) | set(key_columns)
+    return [column for column in allowed if column in wanted]
+
+
+def _quote(value: Any) -> str:
+    """Quote a value for a PostgREST logical filter."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def keyset_filter(columns: Sequence[str], values: Sequence[Any]) -> str:
+    """PostgREST ``or`` filter for the rows after a key, in key order.
+
+    For columns (a, b) and values (x, y) this is ``a > x or (a = x and
+    b > y)``, which an index on the key columns answers without scanning
+    the rows before the key, unlike an offset.
+
+    Args:
+        columns: The key columns, in sort order.
+        values: The key of the last row already read.
+
+    Returns:
+        The filter, for ``query.or_()``.
+    """
+    if not columns or len(columns) != len(values):
+        raise ValueError("A keyset needs one value per key column")
+    quoted = [_quote(value) for value in values]
+    branches = []
+    for i, column in enumerate(columns):
+        terms = [f"{columns[j]}.eq.{quoted[j]}" for j in range(i)]
+        terms.append(f"{column}.gt.{quoted[i]}")
+        branches.append(terms[0] if len(terms) == 1 else f"and({','.join(terms)})")
+    return ",".join(branches)
+
+
+async def keyset_pages(
+    fetch: PageFetcher, key_columns: Sequence[str], page_size: int
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Read a whole result set one page at a time with keyset pagination.
+
+    Only the current page is held. Paging stops at the first empty page
+    rather than the first short one, since the server may cap a page
+    below ``page_size``.
+
+    Args:
+        fetch: Reads the page after a keyset filter.
+        key_columns: The columns the rows are sorted by, a unique key.
+        page_size: The most rows to request per page.
+
+    Yields:
+        Every non-empty page, in key order.
+    """
+    after: str | None = None
+    while True:
+        rows = await fetch(after, page_size)
+        if not rows:
+            return
+        yield rows
+        last = rows[-1]
+        after = keyset_filter(key_columns, [last[column] for column in key_columns])
+
+
+async def fetch_keyset_page(
+    fetch: PageFetcher,
+    key_columns: Sequence[str],
+    limit: int,
+    cursor: str | None = None,
+) -> Page:
+    """Read one page of a keyset-paginated listing.
+
+    One row more than ``limit`` is read to tell whether another page
+    follows, so the next cursor is only given when there is one.
+
+    Args:
+        fetch: Reads the rows after a keyset filter.
+        key_columns: The columns the rows are sorted by, a unique key.
+        limit: The most rows to return.
+        cursor: The ``next_cursor`` of the previous page.
+
+    Returns:
+        The page.
+
+    Raises:
+        PaginationError: If the cursor is malformed.
+    """
+    after = None
+    if cursor is not None:
+        after = keyset_filter(key_columns, decode_cursor(cursor, len(key_columns)))
+    rows = await fetch(after, limit + 1)
+    if len(rows) <= limit:
+        return Page(items=rows, next_cursor=None)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(
+        items=rows, next_cursor=encode_cursor([last[column] for column in key_columns])
+    )
@@ -0,0 +1,131 @@
+# Leading bytes of the image formats accepted for upload
+IMAGE_SIGNATURES: dict[str, tuple[bytes, ...]] = {
+    "image/jpeg": (b"\xff\xd8\xff",),
+    "image/png": (b"\x89PNG\r\n\x1a\n",),
+    "image/webp": (b"RIFF",),
+}
+
+# Bytes needed to recognize any accepted format
+SNIFF_BYTES = 12
+
+# Declared part types accepted without naming an image format
+GENERIC_CONTENT_TYPES = ("application/octet-stream",)
+
+
+class UploadValidationError(Exception):
+    """Base exception for rejected uploads."""
+
+    pass
+
+
+class PayloadTooLargeError(UploadValidationError):
+    """Exception raised when an upload exceeds its size limit."""
+
+    pass
+
+
+class UnsupportedMediaTypeError(UploadValidationError):
+    """Exception raised when an upload is not an accepted image format."""
+
+    pass
+
+
+def sniff_image_type(head: bytes) -> str | None:
+    """Identify an image format from its leading bytes.
+
+    Args:
+        head: At least the first ``SNIFF_BYTES`` bytes of the payload.
+
+    Returns:
+        The image's MIME type, or None if it is not an accepted format.
+    """
+    for content_type, signatures in IMAGE_SIGNATURES.items():
+        if head.startswith(signatures):
+            if content_type == "image/webp" and head[8:12] != b"WEBP":
+                continue
+            return content_type
+    return None
+
+
+def validate_content_length(content_length: str | None, max_bytes: int) -> None:
+    """Reject a request whose declared length is over the limit.
+
+    Checked before any of the body is read. Requests without a declared
+    length are still limited while streaming.
+
+    Raises:
+        PayloadTooLargeError: If the declared length exceeds max_bytes.
+        UploadValidationError: If the header is not a valid length.
+    """
+    if content_length is None:
+        return
+    try:
+        length = int(content_length)
+    except ValueError:
+        raise UploadValidationError("Invalid Content-Length header") from None
+    if length > max_bytes:
+        raise PayloadTooLargeError(
+            f"Request body of {length} bytes exceeds the limit of {max_bytes}"
+        )
+
+
+def validate_image_content_type(content_type: str | None) -> None:
+    """Reject a part whose declared type is not an accepted image format.
+
+    Raises:
+        UnsupportedMediaTypeError: If the declared type is not accepted.
+    """
+    if content_type is None:
+        return
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type not in IMAGE_SIGNATURES and media_type not in GENERIC_CONTENT_TYPES:
+        raise UnsupportedMediaTypeError(f"Unsupported content type: {media_type}")
+
+
+class ImageStreamValidator:
+    """Validates an image upload chunk by chunk as it streams in.
+
+    The format is sniffed from the first bytes and the size checked on
+    every chunk, so a bad upload is rejected without reading it whole.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.content_type: str | None = None
+        self._head = b""
+
+    def feed(self, chunk: bytes) -> None:
+        """Validate the next chunk of the upload.
+
+        Raises:
+            PayloadTooLargeError: If the upload grew past max_bytes.
+            UnsupportedMediaTypeError: If the upload is not an image.
+        """
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise PayloadTooLargeError(
+                f"Image exceeds the limit of {self.max_bytes} bytes"
+            )
+        if self.content_type is None and len(self._head) < SNIFF_BYTES:
+            self._head += chunk[: SNIFF_BYTES - len(self._head)]
+            if len(self._head) == SNIFF_BYTES:
+                self._sniff()
+
+    def finish(self) -> str:
+        """Complete validation once the upload has been fully read.
+
+        Returns:
+            The image's sniffed MIME type.
+
+        Raises:
+            UnsupportedMediaTypeError: If the upload is not an image.
+        """
+        if self.content_type is None:
+            self._sniff()
+        return self.content_type
+
+    def _sniff(self) -> None:
+        self.content_type = sniff_image_type(self._head)
+        if self.content_type is None:
+            raise UnsupportedMediaTypeError("Upload is not a supported image")
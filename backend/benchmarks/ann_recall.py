@@ -0,0 +1,91 @@
+"""Recall-vs-latency benchmark for the institution-wide IVF face index.
+
+Builds an index of synthetic clustered embeddings (100k by default),
+then compares IVF search at several ``n_probe`` settings against exact
+brute-force search: recall@1, recall@10 and median single-query latency.
+Queries are noisy copies of enrolled embeddings, as a new photo of an
+enrolled student would be.
+
+Usage (from the backend directory):
+    python -m benchmarks.ann_recall [--size 100000] [--dim 512] [--queries 200]
+"""
+
+import argparse
+import time
+from uuid import uuid4
+
+import numpy as np
+
+from app.utils.ann_index import IVFIndex
+from app.utils.face_utils import normalize_embeddings
+
+N_PROBES = (1, 2, 4, 8, 16, 32)
+
+
+def make_dataset(size: int, dim: int, rng: np.random.Generator) -> np.ndarray:
+    """Clustered embeddings: group centers plus per-person offsets."""
+    centers = rng.normal(size=(max(1, size // 50), dim)).astype(np.float32)
+    data = centers[rng.integers(0, len(centers), size)]
+    data += rng.normal(scale=0.6, size=(size, dim)).astype(np.float32)
+    return normalize_embeddings(data)
+
+
+def median_ms(samples: list[float]) -> float:
+    return float(np.median(samples) * 1000)
+
+
+def main(size: int, dim: int, n_queries: int) -> None:
+    rng = np.random.default_rng(0)
+    data = make_dataset(size, dim, rng)
+    keys = [uuid4() for _ in range(size)]
+    targets = rng.integers(0, size, n_queries)
+    queries = normalize_embeddings(
+        data[targets] + rng.normal(scale=0.5 / np.sqrt(dim), size=(n_queries, dim))
+    )
+
+    # Exact ground truth and brute-force latency
+    exact, brute_times = [], []
+    for query in queries:
+        start = time.perf_counter()
+        scores = data @ query
+        top = np.argpartition(-scores, 10)[:10]
+        top = top[np.argsort(-scores[top])]
+        brute_times.append(time.perf_counter() - start)
+        exact.append([keys[i] for i in top])
+
+    n_lists = int(np.sqrt(size))
+    start = time.perf_counter()
+    index = IVFIndex(dim, n_lists=n_lists)
+    index.train(data[rng.choice(size, min(size, 40 * n_lists), replace=False)])
+    index.add(keys, data)
+    build_s = time.perf_counter() - start
+
+    print(f"{size} embeddings, dim {dim}, {n_lists} lists, {n_queries} queries")
+    print(f"index build (train + insert): {build_s:.1f}s")
+    print(f"{'method':<14} {'recall@1':>9} {'recall@10':>10} {'latency ms':>11}")
+    brute_ms = median_ms(brute_times)
+    print(f"{'brute force':<14} {1.0:>9.3f} {1.0:>10.3f} {brute_ms:>11.3f}")
+
+    for n_probe in N_PROBES:
+        hits_1 = hits_10 = 0
+        times = []
+        for query, truth in zip(queries, exact):
+            start = time.perf_counter()
+            [result] = index.search(query, k=10, n_probe=n_probe)
+            times.append(time.perf_counter() - start)
+            found = [key for key, _ in result]
+            hits_1 += bool(found) and found[0] == truth[0]
+            hits_10 += len(set(found) & set(truth))
+        print(
+            f"{f'ivf probe={n_probe}':<14} {hits_1 / n_queries:>9.3f} "
+            f"{hits_10 / (10 * n_queries):>10.3f} {median_ms(times):>11.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    main(args.size, args.dim, args.queries)
@@ -0,0 +1,179 @@
+"""Load benchmark for AuthService.login against a local Supabase stub.
+
+Starts a stub server that emulates the GoTrue password grant and the
+PostgREST profiles lookup with a fixed artificial latency, then measures
+login throughput at several concurrency levels for:
+
+- blocking: the original behaviour, sync client called on the event loop
+- sync-offload: sync client offloaded to the bounded thread pool
+- async: the native async client on the shared connection pool
+
+Usage (from the backend directory):
+    python -m benchmarks.auth_login_load [--latency-ms 25] [--duration 3]
+"""
+
+import argparse
+import asyncio
+import os
+import multiprocessing
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Any
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark-service-key")
+
+import uvicorn  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+from supabase import ClientOptions, create_client  # noqa: E402
+
+from app.core.config import Settings  # noqa: E402
+from app.db.supabase import SupabasePool  # noqa: E402
+from app.schemas.user import LoginRequest  # noqa: E402
+from app.services.auth_service import AuthService  # noqa: E402
+
+USER_ID = "12345678-1234-1234-1234-123456789012"
+CONCURRENCY_LEVELS = (1, 50, 500)
+
+
+def build_stub_app(latency: float) -> Starlette:
+    """Build a Starlette app emulating the Supabase endpoints used by login."""
+
+    async def token(request: Request) -> JSONResponse:
+        body = await request.json()
+        await asyncio.sleep(latency)
+        return JSONResponse(
+            {
+                "access_token": "stub-access-token",
+                "refresh_token": "stub-refresh-token",
+                "token_type": "bearer",
+                "expires_in": 3600,
+                "expires_at": int(time.time()) + 3600,
+                "user": {
+                    "id": USER_ID,
+                    "aud": "authenticated",
+                    "email": body.get("email"),
+                    "app_metadata": {},
+                    "user_metadata": {},
+                    "created_at": datetime.now(timezone.utc).isoformat(),
+                },
+            }
+        )
+
+    async def profiles(request: Request) -> JSONResponse:
+        await asyncio.sleep(latency)
+        return JSONResponse(
+            {"first_name": "Bench", "last_name": "Mark", "type": "student"}
+        )
+
+    return Starlette(
+        routes=[
+            Route("/auth/v1/token", token, methods=["POST"]),
+            Route("/rest/v1/profiles", profiles, methods=["GET"]),
+        ]
+    )
+
+
+def serve_stub(port: int, latency: float) -> None:
+    """Serve the stub app; runs in a child process."""
+    uvicorn.run(
+        build_stub_app(latency),
+        host="127.0.0.1",
+        port=port,
+        log_level="error",
+        backlog=4096,
+    )
+
+
+def start_stub_server(latency: float) -> tuple[multiprocessing.Process, str]:
+    """Run the stub server in a separate process and return its URL.
+
+    A separate process keeps the stub from competing with the benchmarked
+    event loop for the GIL.
+    """
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    process = multiprocessing.Process(
+        target=serve_stub, args=(port, latency), daemon=True
+    )
+    process.start()
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    return process, f"http://127.0.0.1:{port}"
+
+
+class BlockingAuthService(AuthService):
+    """AuthService variant reproducing the original event-loop-blocking calls."""
+
+    async def _execute(self, call: Any) -> Any:
+        return call(self.client)
+
+
+async def run_level(service: AuthService, concurrency: int, duration: float) -> float:
+    """Run closed-loop logins at a given concurrency and return requests/sec."""
+    request = LoginRequest(email="bench@example.com", password="benchmark-pass")
+    completed = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        nonlocal completed
+        while time.perf_counter() < deadline:
+            await service.login(request)
+            completed += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return completed / (time.perf_counter() - start)
+
+
+async def main(latency_ms: float, duration: float) -> None:
+    server, url = start_stub_server(latency_ms / 1000)
+    key = "benchmark-service-key"
+
+    sync_client = create_client(
+        url, key, options=ClientOptions(auto_refresh_token=False, persist_session=False)
+    )
+    pool = await SupabasePool.open(
+        Settings(supabase_url=url, supabase_service_key=key)
+    )
+    modes = {
+        "blocking": BlockingAuthService(client=sync_client),
+        "sync-offload": AuthService(client=sync_client),
+        "async": AuthService(client=pool.client),
+    }
+
+    print(f"stub latency {latency_ms:.0f} ms per round-trip, {duration:.0f}s per run")
+    print(f"{'mode':<14}" + "".join(f"{c:>12}" for c in CONCURRENCY_LEVELS))
+    for name, service in modes.items():
+        rates = [await run_level(service, c, duration) for c in CONCURRENCY_LEVELS]
+        print(f"{name:<14}" + "".join(f"{r:>10.1f}/s" for r in rates))
+
+    stats = pool.stats()
+    print(
+        f"pool: {stats.connections_opened} connections opened for "
+        f"{stats.requests_total} requests (reuse {stats.connection_reuse_ratio:.1%}), "
+        f"peak in flight {stats.peak_requests_in_flight}, "
+        f"queued {stats.requests_queued}"
+    )
+
+    await pool.aclose()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=25.0)
+    parser.add_argument("--duration", type=float, default=3.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.duration))
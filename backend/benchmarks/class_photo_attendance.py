@@ -0,0 +1,99 @@
+"""Benchmark for classroom-photo attendance in attendance_service.
+
+Composes a synthetic class photo with one face per enrolled student in
+the front rows plus visitors, then runs the full analysis (decode, tiled
+detection, batched embedding and one-to-one assignment) and reports the
+median time of each stage and how many faces were assigned correctly.
+The fake face engine stands in for a real model, so detection and
+embedding times only show the overhead around the model.
+
+Usage (from the backend directory):
+    python -m benchmarks.class_photo_attendance [--faces 120]
+        [--students 150] [--runs 5]
+"""
+
+import argparse
+import io
+import math
+from uuid import uuid4
+
+import numpy as np
+from PIL import Image
+
+from app.services.attendance_service import AttendanceService
+from app.services.recognition_service import ClassGallery, RecognitionService
+from app.utils.face_utils import FakeFaceEngine
+from app.utils.image_utils import decode_image
+
+FACE_SIZE = 160
+GAP = 120
+DIM = 512
+
+
+def make_class_photo(n_faces: int) -> bytes:
+    """Encode a 4:3 photo of textured faces on a dark background as JPEG."""
+    cols = math.ceil(math.sqrt(n_faces * 4 / 3))
+    rows = math.ceil(n_faces / cols)
+    pitch = FACE_SIZE + GAP
+    rng = np.random.default_rng(0)
+    image = np.zeros((rows * pitch + GAP, cols * pitch + GAP, 3), dtype=np.uint8)
+    for index in range(n_faces):
+        top = GAP + (index // cols) * pitch
+        left = GAP + (index % cols) * pitch
+        coarse = rng.integers(64, 256, size=(FACE_SIZE // 8, FACE_SIZE // 8, 3))
+        image[top : top + FACE_SIZE, left : left + FACE_SIZE] = np.kron(
+            coarse, np.ones((8, 8, 1))
+        )
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def main(n_faces: int, n_students: int, runs: int) -> None:
+    engine = FakeFaceEngine(embedding_dim=DIM, blobs=True)
+    photo = make_class_photo(n_faces)
+    image = decode_image(photo, max_side=4096)
+
+    # Enroll the first 80% of the faces; the rest are visitors
+    faces = engine.detect(image)
+    aligned = np.stack([engine.align(image, face) for face in faces])
+    n_enrolled = min(int(n_faces * 0.8), n_students)
+    absent = np.random.default_rng(1).normal(size=(n_students - n_enrolled, DIM))
+    templates = np.concatenate([engine.embed(aligned)[:n_enrolled], absent])
+    student_ids = [uuid4() for _ in range(n_students)]
+    boxes = np.array([face.box for face in faces], dtype=np.float64)
+    centres = (boxes[:, :2] + boxes[:, 2:]) / 2
+    gallery = ClassGallery(uuid4(), student_ids, templates)
+
+    service = AttendanceService(RecognitionService(), None, engine)
+    samples: dict[str, list[float]] = {}
+    for _ in range(runs):
+        assignments, detected, timings, _ = service.analyze_class_photo(
+            gallery, photo
+        )
+        for stage, ms in timings.items():
+            samples.setdefault(stage, []).append(ms)
+
+    correct = 0
+    for assignment in assignments:
+        box = np.array(assignment.box)
+        offsets = centres - (box[:2] + box[2:]) / 2
+        index = int(np.argmin(np.hypot(offsets[:, 0], offsets[:, 1])))
+        correct += index < n_enrolled and student_ids[index] == assignment.student_id
+    print(
+        f"{image.shape[1]}x{image.shape[0]} photo, {detected} faces detected, "
+        f"{n_students} students enrolled, {n_enrolled} present"
+    )
+    print(f"{'stage':>8} {'median ms':>10}")
+    for stage, values in samples.items():
+        print(f"{stage:>8} {np.median(values):>10.1f}")
+    print(f"assigned {len(assignments)}, correct {correct}/{n_enrolled}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--faces", type=int, default=120)
+    parser.add_argument("--students", type=int, default=150)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    main(args.faces, args.students, args.runs)
@@ -0,0 +1,97 @@
+"""Benchmark for the bulk enrollment pipeline in enrollment_service.
+
+Enrolls synthetic students, each with several JPEG photos, through the
+process-pool pipeline and reports throughput in photos per second and
+photos per second per core, for one worker and for one worker per core.
+Uses the fake face engine unless another is given, so the numbers measure
+decode and pipeline overhead plus whatever the engine costs.
+
+Usage (from the backend directory):
+    python -m benchmarks.enrollment_throughput [--students 200] [--photos 4]
+        [--size 640x480] [--engine fake]
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import tempfile
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+from PIL import Image
+
+from app.db.embedding_store import EmbeddingStore
+from app.services.enrollment_service import (
+    BatchEnrollmentPipeline,
+    EnrollmentService,
+    StudentPhotos,
+)
+from app.services.recognition_service import RecognitionService
+from app.utils.ann_index import IVFIndex
+
+DIM = 512
+
+
+def make_photos(count: int, width: int, height: int) -> list[bytes]:
+    """Encode distinct smooth synthetic images as JPEG bytes."""
+    rng = np.random.default_rng(0)
+    photos = []
+    for _ in range(count):
+        coarse = rng.integers(0, 256, size=(height // 32, width // 32, 3))
+        pixels = np.kron(coarse, np.ones((32, 32, 1))).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+        photos.append(buffer.getvalue())
+    return photos
+
+
+async def run_once(
+    students: list[StudentPhotos], workers: int, engine: str, root: Path
+) -> None:
+    store = EmbeddingStore(root / f"embeddings-{workers}.bin", DIM)
+    recognition = RecognitionService(institution_index=IVFIndex(DIM))
+    pipeline = BatchEnrollmentPipeline(
+        EnrollmentService(store, recognition),
+        root / "checkpoints",
+        engine_name=engine,
+        workers=workers,
+    )
+    report = await pipeline.run(uuid4(), students)
+    print(
+        f"{workers:>8} {report.photos_processed:>7} "
+        f"{report.elapsed_seconds:>9.2f} {report.photos_per_second:>11.1f} "
+        f"{report.photos_per_second_per_core:>14.1f}"
+    )
+
+
+def main(n_students: int, n_photos: int, size: str, engine: str) -> None:
+    width, height = (int(v) for v in size.split("x"))
+    pool = make_photos(64, width, height)
+    students = [
+        StudentPhotos(
+            uuid4(), [pool[(i * n_photos + j) % len(pool)] for j in range(n_photos)]
+        )
+        for i in range(n_students)
+    ]
+
+    cores = os.cpu_count() or 1
+    print(f"{n_students} students x {n_photos} photos, {size}, engine {engine}")
+    print(
+        f"{'workers':>8} {'photos':>7} {'seconds':>9} {'photos/s':>11} "
+        f"{'photos/s/core':>14}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in sorted({1, cores}):
+            asyncio.run(run_once(students, workers, engine, Path(tmp)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=200)
+    parser.add_argument("--photos", type=int, default=4)
+    parser.add_argument("--size", default="640x480")
+    parser.add_argument("--engine", default="fake")
+    args = parser.parse_args()
+    main(args.students, args.photos, args.size, args.engine)
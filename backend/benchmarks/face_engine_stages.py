@@ -0,0 +1,92 @@
+"""Benchmark for the per-stage latency of each face engine in face_utils.
+
+Times model loading, the first (cold) call, and then detection, alignment
+and embedding at several batch sizes on a synthetic photo at working
+resolution, reporting the median and p95 of each stage. The ONNX engine
+is skipped unless onnxruntime is installed and both model files exist.
+
+Usage (from the backend directory):
+    python -m benchmarks.face_engine_stages [--runs 20] [--threads 4]
+        [--detector models/det_10g.onnx] [--embedder models/w600k_r50.onnx]
+"""
+
+import argparse
+import importlib.util
+import os
+import time
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+
+from app.utils.face_utils import DetectedFace, FaceEngine, create_face_engine
+from app.utils.image_utils import WORKING_MAX_SIDE
+
+BATCH_SIZES = (1, 8, 32)
+
+
+def timed(fn: Callable[[], Any], runs: int) -> list[float]:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(stage: str, samples: list[float]) -> None:
+    median, p95 = np.percentile(samples, [50, 95])
+    print(f"{stage:>12} {median:>9.2f} {p95:>9.2f}")
+
+
+def bench_engine(name: str, options: dict[str, Any], runs: int) -> None:
+    start = time.perf_counter()
+    engine: FaceEngine = create_face_engine(name, **options)
+    load_ms = (time.perf_counter() - start) * 1000
+
+    rng = np.random.default_rng(0)
+    height = WORKING_MAX_SIDE * 3 // 4
+    photo = rng.integers(0, 256, size=(height, WORKING_MAX_SIDE, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    faces = engine.detect(photo)
+    cold_ms = (time.perf_counter() - start) * 1000
+    # Random pixels hold no real face; align a fixed central box instead
+    face = faces[0] if faces else DetectedFace(box=(440, 240, 840, 720), score=1.0)
+
+    print(f"\n{name}: loaded in {load_ms:.0f} ms, first detect {cold_ms:.1f} ms")
+    print(f"{'stage':>12} {'p50 ms':>9} {'p95 ms':>9}")
+    report("detect", timed(lambda: engine.detect(photo), runs))
+    report("align", timed(lambda: engine.align(photo, face), runs))
+    aligned = engine.align(photo, face)
+    for batch_size in BATCH_SIZES:
+        batch = np.repeat(aligned[np.newaxis], batch_size, axis=0)
+        samples = timed(lambda: engine.embed(batch), runs)
+        report(f"embed x{batch_size}", samples)
+        per_face = [sample / batch_size for sample in samples]
+        report("  per face", per_face)
+
+
+def main(runs: int, threads: int | None, detector: str, embedder: str) -> None:
+    bench_engine("fake", {"embedding_dim": 512}, runs)
+
+    if importlib.util.find_spec("onnxruntime") is None:
+        print("\nonnx: skipped, onnxruntime is not installed")
+    elif not (os.path.exists(detector) and os.path.exists(embedder)):
+        print(f"\nonnx: skipped, model files not found ({detector}, {embedder})")
+    else:
+        options = {
+            "detector_path": detector,
+            "embedder_path": embedder,
+            "intra_op_threads": threads,
+        }
+        bench_engine("onnx", options, runs)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--detector", default="models/det_10g.onnx")
+    parser.add_argument("--embedder", default="models/w600k_r50.onnx")
+    args = parser.parse_args()
+    main(args.runs, args.threads, args.detector, args.embedder)
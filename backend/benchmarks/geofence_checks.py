@@ -0,0 +1,116 @@
+"""Benchmark for batch check-in verification in geofence_service.
+
+Lays out synthetic building footprints (irregular 4 to 12 sided polygons
+30 to 120 m across) over a city-sized area, then verifies check-ins
+against their class's building and locates check-ins among all
+buildings. Compares the vectorized GeofenceIndex with a scalar loop doing
+the same bounding box and ray-casting tests per check-in, and reports
+check-ins per second for several batch sizes.
+
+Usage (from the backend directory):
+    python -m benchmarks.geofence_checks [--geofences 5000]
+        [--check-ins 10000]
+"""
+
+import argparse
+import time
+from uuid import uuid4
+
+import numpy as np
+
+from app.services.geofence_service import Geofence, GeofenceIndex
+from app.utils.geo import METERS_PER_DEGREE
+
+CENTRE_LAT, CENTRE_LON = 40.0, -75.0
+AREA_DEG = 0.2
+BATCH_SIZES = (1, 100, 10_000)
+
+
+def make_geofences(count: int, rng: np.random.Generator) -> list[Geofence]:
+    lon_scale = np.cos(np.radians(CENTRE_LAT))
+    geofences = []
+    for _ in range(count):
+        sides = int(rng.integers(4, 13))
+        angles = np.sort(rng.uniform(0, 2 * np.pi, sides))
+        radius = rng.uniform(15, 60, sides) / METERS_PER_DEGREE
+        lat = CENTRE_LAT + rng.uniform(-AREA_DEG, AREA_DEG) / 2
+        lon = CENTRE_LON + rng.uniform(-AREA_DEG, AREA_DEG) / 2
+        ring = np.c_[
+            lon + radius * np.cos(angles) / lon_scale, lat + radius * np.sin(angles)
+        ]
+        geofences.append(Geofence(uuid4(), ring))
+    return geofences
+
+
+def scalar_check(geofence: Geofence, lat: float, lon: float) -> bool:
+    """Baseline: per check-in bounding box test then ray casting."""
+    ring = geofence.polygon.tolist()
+    xs, ys = [p[0] for p in ring], [p[1] for p in ring]
+    if not (min(xs) <= lon <= max(xs) and min(ys) <= lat <= max(ys)):
+        return False
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, ring[1:] + ring[:1]):
+        if (y1 > lat) != (y2 > lat) and lon < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+def rate(fn, items: int, min_seconds: float = 0.5) -> float:
+    runs, start = 0, time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return runs * items / elapsed
+
+
+def main(n_geofences: int, n_check_ins: int) -> None:
+    rng = np.random.default_rng(0)
+    geofences = make_geofences(n_geofences, rng)
+    index = GeofenceIndex()
+    start = time.perf_counter()
+    index.add(geofences)
+    index.locate([CENTRE_LAT], [CENTRE_LON])
+    build_ms = (time.perf_counter() - start) * 1000
+
+    # Most check-ins land near their building, as real ones do
+    owners = rng.integers(0, n_geofences, n_check_ins)
+    centres = np.array([g.polygon.mean(axis=0) for g in geofences])[owners]
+    points = centres + rng.normal(scale=40 / METERS_PER_DEGREE, size=centres.shape)
+    lats, lons = points[:, 1], points[:, 0]
+    owner_ids = [geofences[o].geofence_id for o in owners]
+
+    verdicts = index.check(owner_ids, lats, lons)
+    print(
+        f"{n_geofences} geofences indexed in {build_ms:.0f} ms; "
+        f"{verdicts.accepted.mean():.0%} of check-ins accepted"
+    )
+    print(f"{'operation':>10} {'batch':>7} {'check-ins/s':>13}")
+
+    subset = min(n_check_ins, 2000)
+    scalar = rate(
+        lambda: [
+            scalar_check(geofences[o], lat, lon)
+            for o, lat, lon in zip(owners[:subset], lats[:subset], lons[:subset])
+        ],
+        subset,
+    )
+    print(f"{'scalar':>10} {1:>7} {scalar:>13,.0f}")
+    for batch in BATCH_SIZES:
+        batch = min(batch, n_check_ins)
+        ids = owner_ids[:batch]
+        check = rate(lambda: index.check(ids, lats[:batch], lons[:batch]), batch)
+        print(f"{'check':>10} {batch:>7} {check:>13,.0f}")
+    for batch in BATCH_SIZES:
+        batch = min(batch, n_check_ins)
+        locate = rate(lambda: index.locate(lats[:batch], lons[:batch]), batch)
+        print(f"{'locate':>10} {batch:>7} {locate:>13,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--geofences", type=int, default=5000)
+    parser.add_argument("--check-ins", type=int, default=10_000)
+    args = parser.parse_args()
+    main(args.geofences, args.check_ins)
@@ -0,0 +1,88 @@
+"""Benchmark for decoding phone photos to working resolution in image_utils.
+
+Compares a full-resolution decode followed by a resize with the draft-mode
+decode used by ImageDecoder, on synthetic 12MP JPEGs. Each mode decodes a
+burst of photos in its own process and reports the median time per photo
+and how much the process's peak RSS grew.
+
+Usage (from the backend directory):
+    python -m benchmarks.image_decode [--photos 16] [--size 4032x3024]
+        [--max-side 1280]
+"""
+
+import argparse
+import io
+import multiprocessing
+import resource
+import time
+
+import numpy as np
+from PIL import Image, ImageOps
+
+from app.utils.image_utils import ImageDecoder
+
+
+def make_photos(count: int, width: int, height: int) -> list[bytes]:
+    """Encode distinct synthetic photos with some texture as JPEG bytes."""
+    rng = np.random.default_rng(0)
+    photos = []
+    for _ in range(count):
+        coarse = rng.integers(0, 256, size=(height // 16, width // 16, 3))
+        pixels = np.kron(coarse, np.ones((16, 16, 1))).astype(np.uint8)
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, format="JPEG", quality=90)
+        photos.append(buffer.getvalue())
+    return photos
+
+
+def full_decode(data: bytes, max_side: int) -> np.ndarray:
+    """Baseline: decode at full resolution, then resize."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        image.thumbnail((max_side, max_side), Image.Resampling.BILINEAR)
+        return np.asarray(image)
+
+
+def run_mode(mode: str, photos: list[bytes], max_side: int, results) -> None:
+    decoder = ImageDecoder(max_side)
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    samples = []
+    for data in photos:
+        start = time.perf_counter()
+        if mode == "full":
+            full_decode(data, max_side)
+        else:
+            decoder.decode(data)
+        samples.append(time.perf_counter() - start)
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results.put((float(np.median(samples) * 1000), (rss_after - rss_before) / 1024))
+
+
+def main(n_photos: int, size: str, max_side: int) -> None:
+    width, height = (int(v) for v in size.split("x"))
+    photos = make_photos(n_photos, width, height)
+    print(f"{n_photos} JPEGs of {size} decoded to max side {max_side}")
+    print(f"{'mode':>6} {'ms/photo':>9} {'peak RSS growth (MB)':>21}")
+
+    context = multiprocessing.get_context("fork")
+    timings = {}
+    for mode in ("full", "draft"):
+        results = context.Queue()
+        process = context.Process(
+            target=run_mode, args=(mode, photos, max_side, results)
+        )
+        process.start()
+        ms, rss_mb = results.get()
+        process.join()
+        timings[mode] = ms
+        print(f"{mode:>6} {ms:>9.1f} {rss_mb:>21.1f}")
+    print(f"speedup {timings['full'] / timings['draft']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--photos", type=int, default=16)
+    parser.add_argument("--size", default="4032x3024")
+    parser.add_argument("--max-side", type=int, default=1280)
+    args = parser.parse_args()
+    main(args.photos, args.size, args.max_side)
@@ -0,0 +1,103 @@
+"""Benchmark for micro-batching concurrent photo recognitions.
+
+Simulates students checking in with a selfie: requests arrive at a fixed
+average rate (Poisson arrivals) and each is matched against a 200-student
+class gallery. Compares running every request on its own (one embed and
+one match per request, each in a worker thread) with the MicroBatcher
+that coalesces requests arriving within a few milliseconds. Reports
+p50/p99 latency and throughput at several arrival rates.
+
+Usage (from the backend directory):
+    python -m benchmarks.recognition_batching [--duration 3] [--batch 32]
+        [--wait-ms 5] [--engine fake]
+"""
+
+import argparse
+import asyncio
+import time
+from functools import partial
+from uuid import uuid4
+
+import numpy as np
+
+from app.services.recognition_service import ImageProbe, RecognitionService
+from app.utils.batching import MicroBatcher
+from app.utils.face_utils import create_face_engine, embed_faces
+
+ARRIVAL_RATES = (100, 400, 1600)
+CLASS_SIZE = 200
+DIM = 512
+
+
+async def run_load(submit, probes, rate: float, duration: float, seed: int):
+    """Fire requests with Poisson arrivals and collect their latencies."""
+    rng = np.random.default_rng(seed)
+    latencies: list[float] = []
+
+    async def one(probe: ImageProbe) -> None:
+        start = time.perf_counter()
+        await submit(probe)
+        latencies.append(time.perf_counter() - start)
+
+    tasks = []
+    start = time.perf_counter()
+    next_arrival = start
+    while next_arrival - start < duration:
+        await asyncio.sleep(max(0.0, next_arrival - time.perf_counter()))
+        probe = probes[len(tasks) % len(probes)]
+        # A fresh key per request so the result cache never answers
+        probe = ImageProbe(probe.class_id, uuid4().hex, probe.image)
+        tasks.append(asyncio.create_task(one(probe)))
+        next_arrival += rng.exponential(1 / rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    return np.array(latencies) * 1000, len(tasks) / elapsed
+
+
+def main(duration: float, batch: int, wait_ms: float, engine_name: str) -> None:
+    rng = np.random.default_rng(0)
+    engine = create_face_engine(engine_name, embedding_dim=DIM)
+    class_id = uuid4()
+    photos = rng.integers(0, 256, size=(CLASS_SIZE, 160, 120, 3), dtype=np.uint8)
+    templates = np.concatenate([embed_faces(engine, photo) for photo in photos])
+    service = RecognitionService()
+    service.galleries.set(class_id, [uuid4() for _ in photos], templates)
+    probes = [ImageProbe(class_id, "", photo) for photo in photos]
+
+    async def unbatched(probe: ImageProbe):
+        return await asyncio.to_thread(service.recognize_images, [probe], engine)
+
+    print(
+        f"class of {CLASS_SIZE}, engine {engine_name}, batch <= {batch}, "
+        f"wait <= {wait_ms} ms, {duration}s per run"
+    )
+    print(
+        f"{'rate/s':>7} {'mode':>10} {'p50 ms':>8} {'p99 ms':>8} "
+        f"{'done/s':>8} {'mean batch':>11}"
+    )
+    for rate in ARRIVAL_RATES:
+        batcher = MicroBatcher(
+            partial(service.recognize_images, engine=engine),
+            max_batch_size=batch,
+            max_wait_seconds=wait_ms / 1000,
+        )
+        for mode, submit in (("unbatched", unbatched), ("batched", batcher.submit)):
+            latencies, throughput = asyncio.run(
+                run_load(submit, probes, rate, duration, seed=rate)
+            )
+            mean_batch = batcher.stats().mean_batch_size if mode == "batched" else 1
+            print(
+                f"{rate:>7} {mode:>10} {np.percentile(latencies, 50):>8.2f} "
+                f"{np.percentile(latencies, 99):>8.2f} {throughput:>8.0f} "
+                f"{mean_batch:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--duration", type=float, default=3.0)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--wait-ms", type=float, default=5.0)
+    parser.add_argument("--engine", default="fake")
+    args = parser.parse_args()
+    main(args.duration, args.batch, args.wait_ms, args.engine)
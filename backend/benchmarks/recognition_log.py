@@ -0,0 +1,105 @@
+"""Benchmark for the recognition audit log in db/recognition_log.
+
+Logs synthetic recognition attempts (a few hundred classes of 40
+students, five candidates per face) in batches to a temporary directory,
+rolls them into segments, then scans by time range and by student.
+Reports entries appended per second, bytes per entry in active files,
+segments and as JSON, and scan times.
+
+Usage (from the backend directory):
+    python -m benchmarks.recognition_log [--entries 500000]
+        [--segment-rows 100000]
+"""
+
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import numpy as np
+
+from app.db.recognition_log import RecognitionLogStore, to_records
+from app.models.recognition_log import RecognitionCandidate, RecognitionLogEntry
+
+TOP_K = 5
+BATCH = 1000
+START = datetime(2026, 9, 1, 8, tzinfo=timezone.utc)
+
+
+def make_batch(
+    rng: np.random.Generator, rosters: list[list], offset: int
+) -> list[RecognitionLogEntry]:
+    """One batch of faces from class photos taken a second apart."""
+    entries = []
+    for i in range(offset, offset + BATCH):
+        roster_index = int(rng.integers(len(rosters)))
+        class_id, roster = rosters[roster_index]
+        picks = rng.choice(len(roster), TOP_K, replace=False)
+        scores = np.sort(rng.uniform(0.2, 0.95, TOP_K))[::-1]
+        matched = scores[0] >= 0.5
+        entries.append(
+            RecognitionLogEntry(
+                recorded_at=START + timedelta(seconds=i // 20),
+                class_id=class_id,
+                image_sha256=f"{roster_index:064x}",
+                student_id=roster[picks[0]] if matched else None,
+                score=float(scores[0]) if matched else None,
+                candidates=[
+                    RecognitionCandidate(student_id=roster[p], score=float(s))
+                    for p, s in zip(picks, scores)
+                ],
+            )
+        )
+    return entries
+
+
+def main(n_entries: int, segment_rows: int) -> None:
+    rng = np.random.default_rng(0)
+    rosters = [(uuid4(), [uuid4() for _ in range(40)]) for _ in range(300)]
+    batches = [
+        make_batch(rng, rosters, offset) for offset in range(0, n_entries, BATCH)
+    ]
+    json_bytes = sum(len(e.model_dump_json()) for e in batches[0]) / BATCH
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = RecognitionLogStore(directory, TOP_K, segment_rows=segment_rows)
+        started = time.perf_counter()
+        for entries in batches:
+            store.append(to_records(entries, TOP_K))
+            store.roll_if_needed(max_age_seconds=float("inf"))
+        store.roll()
+        elapsed = time.perf_counter() - started
+
+        segments = store.segments()
+        segment_bytes = sum(info.path.stat().st_size for info in segments)
+        print(
+            f"{n_entries:,} entries in {len(segments)} segments, "
+            f"{n_entries / elapsed:,.0f} entries/s appended and sealed"
+        )
+        print(
+            f"bytes/entry: json {json_bytes:.0f}, "
+            f"active {store._dtype.itemsize}, "
+            f"segment {segment_bytes / n_entries:.1f}"
+        )
+
+        last = START + timedelta(seconds=n_entries // 20)
+        hour_start = last - timedelta(hours=1)
+        student = rosters[0][1][0]
+        for label, kwargs in (
+            ("last hour", {"start": hour_start}),
+            ("student", {"student_id": student}),
+            ("student, last hour", {"student_id": student, "start": hour_start}),
+        ):
+            started = time.perf_counter()
+            found = sum(len(records) for records in store.scan(**kwargs))
+            ms = (time.perf_counter() - started) * 1000
+            print(f"scan {label:>20}: {found:>8,} entries in {ms:7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500_000)
+    parser.add_argument("--segment-rows", type=int, default=100_000)
+    args = parser.parse_args()
+    main(args.entries, args.segment_rows)
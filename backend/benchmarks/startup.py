@@ -0,0 +1,134 @@
+"""Benchmark for worker startup: import time and what pre-warming moves.
+
+Imports app.main in fresh interpreters with -X importtime and reports the
+wall time of the import, then the slowest packages and app modules by
+import time. Then builds, against a synthetic embedding store, what the
+first check-ins of a cold worker wait for and PREWARM_ENABLED builds
+before traffic instead: the institution index and the galleries of the
+day's classes.
+
+Usage (from the backend directory):
+    python -m benchmarks.startup [--runs 3] [--top 10]
+        [--students 20000] [--classes 100]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+
+from app.db.embedding_store import EmbeddingStore
+from app.services.recognition_service import RecognitionService
+from app.utils.ann_index import IVFIndex
+
+DIM = 512
+CLASS_SIZE = 40
+
+
+def import_times() -> tuple[float, list[tuple[str, int, int]]]:
+    """Import app.main in a fresh interpreter.
+
+    Returns:
+        The wall time in seconds and (module, self us, cumulative us) for
+        every module imported.
+    """
+    env = {
+        "SUPABASE_URL": "http://localhost:54321",
+        "SUPABASE_SERVICE_KEY": "benchmark",
+        **os.environ,
+    }
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    elapsed = time.perf_counter() - started
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        modules.append((name.strip(), int(self_us), int(cumulative_us)))
+    return elapsed, modules
+
+
+def report_imports(runs: int, top: int) -> None:
+    walls = []
+    for _ in range(runs):
+        wall, modules = import_times()
+        walls.append(wall)
+    print(f"import app.main: {statistics.median(walls) * 1000:,.0f} ms (median)")
+
+    packages: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in modules:
+        packages[name.split(".")[0]] += self_us
+    total = sum(packages.values())
+    print(f"\n{'package':<24}{'ms':>8}{'share':>8}")
+    for package, self_us in sorted(packages.items(), key=lambda p: -p[1])[:top]:
+        print(f"{package:<24}{self_us / 1000:>8.1f}{self_us / total:>8.0%}")
+
+    print(f"\n{'app module':<40}{'self ms':>9}{'total ms':>10}")
+    app_modules = sorted(
+        (m for m in modules if m[0].split(".")[0] == "app"), key=lambda m: -m[2]
+    )
+    for name, self_us, cumulative_us in app_modules[:top]:
+        print(f"{name:<40}{self_us / 1000:>9.1f}{cumulative_us / 1000:>10.1f}")
+
+
+def report_prewarm(n_students: int, n_classes: int) -> None:
+    rng = np.random.default_rng(0)
+    student_ids = [uuid4() for _ in range(n_students)]
+    embeddings = rng.normal(size=(n_students, DIM)).astype(np.float32)
+    rosters = [
+        [student_ids[i] for i in rng.choice(n_students, CLASS_SIZE, replace=False)]
+        for _ in range(n_classes)
+    ]
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = EmbeddingStore(Path(directory) / "embeddings.bin", DIM)
+        store.append(student_ids, embeddings)
+        del store
+
+        started = time.perf_counter()
+        store = EmbeddingStore(Path(directory) / "embeddings.bin", DIM)
+        service = RecognitionService(
+            institution_index=IVFIndex(DIM, n_lists=256, n_probe=8)
+        )
+        service.load_institution_index(store)
+        index_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        for roster in rosters:
+            service.load_class_gallery(uuid4(), roster, store)
+        galleries_ms = (time.perf_counter() - started) * 1000
+
+    galleries = f"{n_classes} class galleries"
+    print(f"\nbuilt before traffic when pre-warming ({n_students:,} students):")
+    print(f"  {'institution index':<24}{index_ms:>8,.0f} ms")
+    print(f"  {galleries:<24}{galleries_ms:>8,.0f} ms, plus one roster query each")
+
+
+def main(runs: int, top: int, n_students: int, n_classes: int) -> None:
+    report_imports(runs, top)
+    report_prewarm(n_students, n_classes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--classes", type=int, default=100)
+    args = parser.parse_args()
+    main(args.runs, args.top, args.students, args.classes)
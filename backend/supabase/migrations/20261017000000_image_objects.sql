@@ -0,0 +1,58 @@
+-- Reference counts for content-addressed images in the "images" storage
+-- bucket. Objects are keyed by the hex SHA-256 of their bytes, so identical
+-- uploads share one object and one row here.
+
+create table if not exists public.image_objects (
+    sha256 text primary key check (sha256 ~ '^[0-9a-f]{64}$'),
+    size bigint not null,
+    content_type text not null,
+    ref_count integer not null default 0 check (ref_count >= 0),
+    created_at timestamptz not null default now()
+);
+
+alter table public.image_objects enable row level security;
+
+create or replace function public.image_object_incref(
+    p_sha256 text,
+    p_size bigint,
+    p_content_type text
+) returns integer
+language sql
+as $$
+    insert into public.image_objects (sha256, size, content_type, ref_count)
+    values (p_sha256, p_size, p_content_type, 1)
+    on conflict (sha256)
+        do update set ref_count = public.image_objects.ref_count + 1
+    returning ref_count;
+$$;
+
+-- Returns the references left; the row is removed with the last one and
+-- the caller deletes the stored object.
+create or replace function public.image_object_decref(p_sha256 text)
+returns integer
+language plpgsql
+as $$
+declare
+    remaining integer;
+begin
+    update public.image_objects
+    set ref_count = ref_count - 1
+    where sha256 = p_sha256 and ref_count > 0
+    returning ref_count into remaining;
+
+    if remaining = 0 then
+        delete from public.image_objects where sha256 = p_sha256;
+    end if;
+
+    return coalesce(remaining, 0);
+end;
+$$;
+
+-- Only the backend, with the service key, counts references
+revoke execute on function public.image_object_incref(text, bigint, text)
+    from public, anon, authenticated;
+revoke execute on function public.image_object_decref(text)
+    from public, anon, authenticated;
+grant execute on function public.image_object_incref(text, bigint, text)
+    to service_role;
+grant execute on function public.image_object_decref(text) to service_role;
@@ -0,0 +1,27 @@
+-- Class rosters and per-session attendance. One row per student, class and
+-- session date, so retaking attendance for a session upserts in place.
+
+create table if not exists public.class_students (
+    class_id uuid not null,
+    student_id uuid not null references public.profiles (id) on delete cascade,
+    primary key (class_id, student_id)
+);
+
+create index if not exists class_students_student_id_idx
+    on public.class_students (student_id);
+
+alter table public.class_students enable row level security;
+
+create table if not exists public.attendance (
+    class_id uuid not null,
+    student_id uuid not null references public.profiles (id) on delete cascade,
+    session_date date not null,
+    status text not null check (status in ('present', 'absent')),
+    method text not null check (method in ('face', 'class_photo', 'manual')),
+    confidence real,
+    image_sha256 text check (image_sha256 ~ '^[0-9a-f]{64}$'),
+    recorded_at timestamptz not null default now(),
+    primary key (class_id, session_date, student_id)
+);
+
+alter table public.attendance enable row level security;
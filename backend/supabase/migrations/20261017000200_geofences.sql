@@ -0,0 +1,20 @@
+-- Building footprints used to verify that check-ins happen on site, and
+-- the building each class meets in. Polygons are GeoJSON-style rings of
+-- [longitude, latitude] pairs.
+
+create table if not exists public.geofences (
+    id uuid primary key default gen_random_uuid(),
+    name text not null,
+    polygon jsonb not null check (jsonb_typeof(polygon) = 'array'),
+    tolerance_m real not null default 15 check (tolerance_m >= 0),
+    created_at timestamptz not null default now()
+);
+
+alter table public.geofences enable row level security;
+
+create table if not exists public.class_geofences (
+    class_id uuid primary key,
+    geofence_id uuid not null references public.geofences (id) on delete cascade
+);
+
+alter table public.class_geofences enable row level security;
@@ -0,0 +1,180 @@
+-- Attendance counters kept up to date by triggers, so reports read one row
+-- per student (or per session) instead of scanning every attendance row.
+-- Upserts that change a mark move it from one counter to another.
+
+alter table public.attendance
+    drop constraint if exists attendance_status_check;
+
+alter table public.attendance
+    add constraint attendance_status_check
+    check (status in ('present', 'late', 'absent'));
+
+create table if not exists public.attendance_student_totals (
+    class_id uuid not null,
+    student_id uuid not null references public.profiles (id) on delete cascade,
+    present integer not null default 0,
+    late integer not null default 0,
+    absent integer not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (class_id, student_id)
+);
+
+create index if not exists attendance_student_totals_student_id_idx
+    on public.attendance_student_totals (student_id);
+
+alter table public.attendance_student_totals enable row level security;
+
+create table if not exists public.attendance_session_totals (
+    class_id uuid not null,
+    session_date date not null,
+    present integer not null default 0,
+    late integer not null default 0,
+    absent integer not null default 0,
+    updated_at timestamptz not null default now(),
+    primary key (class_id, session_date)
+);
+
+alter table public.attendance_session_totals enable row level security;
+
+-- Statement-level, so a bulk upsert of a batch of marks updates each
+-- counter row once rather than once per mark.
+create or replace function public.attendance_totals_on_change()
+returns trigger
+language plpgsql
+as $$
+declare
+    added public.attendance[] := '{}';
+    removed public.attendance[] := '{}';
+begin
+    if tg_op in ('INSERT', 'UPDATE') then
+        select coalesce(array_agg(n), '{}') into added from new_rows n;
+    end if;
+    if tg_op in ('UPDATE', 'DELETE') then
+        select coalesce(array_agg(o), '{}') into removed from old_rows o;
+    end if;
+
+    with changes as (
+        select class_id, student_id, session_date, status, 1 as delta
+        from unnest(added)
+        union all
+        select class_id, student_id, session_date, status, -1 as delta
+        from unnest(removed)
+    ),
+    student_deltas as (
+        select
+            class_id,
+            student_id,
+            sum(case when status = 'present' then delta else 0 end) as present,
+            sum(case when status = 'late' then delta else 0 end) as late,
+            sum(case when status = 'absent' then delta else 0 end) as absent
+        from changes
+        group by class_id, student_id
+    ),
+    students as (
+        insert into public.attendance_student_totals as t
+            (class_id, student_id, present, late, absent)
+        select class_id, student_id, present, late, absent
+        from student_deltas
+        where present <> 0 or late <> 0 or absent <> 0
+        on conflict (class_id, student_id) do update set
+            present = t.present + excluded.present,
+            late = t.late + excluded.late,
+            absent = t.absent + excluded.absent,
+            updated_at = now()
+    ),
+    session_deltas as (
+        select
+            class_id,
+            session_date,
+            sum(case when status = 'present' then delta else 0 end) as present,
+            sum(case when status = 'late' then delta else 0 end) as late,
+            sum(case when status = 'absent' then delta else 0 end) as absent
+        from changes
+        group by class_id, session_date
+    )
+    insert into public.attendance_session_totals as t
+        (class_id, session_date, present, late, absent)
+    select class_id, session_date, present, late, absent
+    from session_deltas
+    where present <> 0 or late <> 0 or absent <> 0
+    on conflict (class_id, session_date) do update set
+        present = t.present + excluded.present,
+        late = t.late + excluded.late,
+        absent = t.absent + excluded.absent,
+        updated_at = now();
+
+    return null;
+end;
+$$;
+
+drop trigger if exists attendance_totals_insert on public.attendance;
+create trigger attendance_totals_insert
+    after insert on public.attendance
+    referencing new table as new_rows
+    for each statement execute function public.attendance_totals_on_change();
+
+drop trigger if exists attendance_totals_update on public.attendance;
+create trigger attendance_totals_update
+    after update on public.attendance
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function public.attendance_totals_on_change();
+
+drop trigger if exists attendance_totals_delete on public.attendance;
+create trigger attendance_totals_delete
+    after delete on public.attendance
+    referencing old table as old_rows
+    for each statement execute function public.attendance_totals_on_change();
+
+-- Recompute the counters of one class (or of every class when null) from
+-- the attendance rows, to repair drift. Writes to attendance wait until
+-- the rebuild commits. Returns the number of student counter rows.
+create or replace function public.rebuild_attendance_totals(
+    p_class_id uuid default null
+) returns integer
+language plpgsql
+as $$
+declare
+    rebuilt integer;
+begin
+    lock table public.attendance in share mode;
+
+    delete from public.attendance_student_totals
+    where p_class_id is null or class_id = p_class_id;
+    delete from public.attendance_session_totals
+    where p_class_id is null or class_id = p_class_id;
+
+    insert into public.attendance_student_totals
+        (class_id, student_id, present, late, absent)
+    select
+        class_id,
+        student_id,
+        count(*) filter (where status = 'present'),
+        count(*) filter (where status = 'late'),
+        count(*) filter (where status = 'absent')
+    from public.attendance
+    where p_class_id is null or class_id = p_class_id
+    group by class_id, student_id;
+    get diagnostics rebuilt = row_count;
+
+    insert into public.attendance_session_totals
+        (class_id, session_date, present, late, absent)
+    select
+        class_id,
+        session_date,
+        count(*) filter (where status = 'present'),
+        count(*) filter (where status = 'late'),
+        count(*) filter (where status = 'absent')
+    from public.attendance
+    where p_class_id is null or class_id = p_class_id
+    group by class_id, session_date;
+
+    return rebuilt;
+end;
+$$;
+
+-- Only the backend, with the service key, rebuilds the counters
+revoke execute on function public.rebuild_attendance_totals(uuid)
+    from public, anon, authenticated;
+grant execute on function public.rebuild_attendance_totals(uuid) to service_role;
+
+select public.rebuild_attendance_totals();
@@ -0,0 +1,20 @@
+-- Classes taught by instructors. Rosters live in class_students; class ids
+-- in the attendance and geofence tables refer to this table.
+
+create table if not exists public.classes (
+    id uuid primary key default gen_random_uuid(),
+    name text not null,
+    code text,
+    instructor_id uuid references public.profiles (id) on delete set null,
+    created_at timestamptz not null default now()
+);
+
+-- Listing an instructor's classes pages through this index in id order
+create index if not exists classes_instructor_id_idx
+    on public.classes (instructor_id, id);
+
+alter table public.classes enable row level security;
+
+-- Listing profiles of one type pages through this index in id order
+create index if not exists profiles_type_id_idx
+    on public.profiles (type, id);
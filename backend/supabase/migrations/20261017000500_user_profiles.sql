@@ -0,0 +1,35 @@
+-- Profile rows, plus instructor rows for instructors, for a batch of new
+-- auth users in one call and one transaction: either every row is written
+-- or none is. Signup writes a user's rows with one request this way instead
+-- of one per table, and bulk signup a whole batch of users.
+--
+-- p_users is a JSON array of objects with id, first_name, last_name, bio,
+-- type, department and office_location. Returns the number of profiles
+-- created.
+create or replace function public.create_user_profiles(p_users jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+    created integer;
+begin
+    insert into public.profiles (id, first_name, last_name, bio, type)
+    select id, first_name, last_name, bio, type
+    from jsonb_to_recordset(p_users)
+        as u(id uuid, first_name text, last_name text, bio text, type text);
+    get diagnostics created = row_count;
+
+    insert into public.instructors (id, department, office_location)
+    select id, department, office_location
+    from jsonb_to_recordset(p_users)
+        as u(id uuid, type text, department text, office_location text)
+    where type = 'instructor';
+
+    return created;
+end;
+$$;
+
+-- Only the backend, with the service key, provisions profiles
+revoke execute on function public.create_user_profiles(jsonb)
+    from public, anon, authenticated;
+grant execute on function public.create_user_profiles(jsonb) to service_role;
@@ -0,0 +1,232 @@
+"""Unit tests for attendance API routes."""
+
+import time
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import (
+    get_attendance_service,
+    get_class_service,
+    get_current_user,
+    get_storage_service,
+)
+from app.db.embedding_store import EmbeddingStore
+from app.main import app
+from app.schemas.user import CurrentUser
+from app.services.attendance_service import AttendanceService, AttendanceWriter
+from app.services.class_service import ClassNotFoundError
+from app.services.recognition_service import RecognitionService
+from app.services.storage_service import LocalStorageBackend, StorageService
+from app.utils.face_utils import FakeFaceEngine
+from tests.conftest import MockTableResponse, TEST_EMAIL, TEST_USER_ID
+from tests.services.test_attendance_service import encode_png, roster_query
+from tests.utils.test_face_utils import class_photo
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+STUDENT_IDS = [UUID(int=i + 1) for i in range(6)]
+
+
+def signed_in_as(is_admin: bool) -> None:
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+        is_admin=is_admin,
+    )
+
+
+@pytest.fixture
+def attendance(tmp_path: Path):
+    """Override storage and attendance for a class photographed whole."""
+    engine = FakeFaceEngine(embedding_dim=32, blobs=True)
+    photo = class_photo(2, 3)
+    faces = engine.detect(photo)
+    store = EmbeddingStore(tmp_path / "embeddings.bin", 32)
+    aligned = np.stack([engine.align(photo, face) for face in faces])
+    store.append(STUDENT_IDS, engine.embed(aligned))
+
+    client = MagicMock()
+    table = client.table.return_value
+    table.select = roster_query(STUDENT_IDS).select
+    table.upsert.return_value.execute.return_value = MockTableResponse([{}])
+    service = AttendanceService(RecognitionService(), store, engine, client=client)
+    storage = StorageService(LocalStorageBackend(tmp_path), tmp_path / "tmp")
+
+    classes = MagicMock()
+    classes.get_instructor_id = AsyncMock(return_value=UUID(TEST_USER_ID))
+
+    app.dependency_overrides[get_storage_service] = lambda: storage
+    app.dependency_overrides[get_attendance_service] = lambda: service
+    app.dependency_overrides[get_class_service] = lambda: classes
+    signed_in_as(is_admin=False)
+    yield encode_png(photo)
+    app.dependency_overrides.pop(get_storage_service, None)
+    app.dependency_overrides.pop(get_attendance_service, None)
+    app.dependency_overrides.pop(get_class_service, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def upload_photo(test_client: TestClient, photo: bytes) -> str:
+    return test_client.post(
+        "/images", files=[("photos", ("class.png", photo, "image/png"))]
+    ).json()["images"][0]["key"]
+
+
+class TestTakePhotoAttendance:
+    """Tests for POST /attendance/classes/{class_id}/photo endpoint."""
+
+    def test_take_photo_attendance(self, test_client: TestClient, attendance):
+        """Test an uploaded class photo marks its students present."""
+        key = test_client.post(
+            "/images", files=[("photos", ("class.png", attendance, "image/png"))]
+        ).json()["images"][0]["key"]
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/photo",
+            json={"image_key": key, "session_date": "2026-10-17"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["session_date"] == "2026-10-17"
+        assert data["faces_detected"] == 6
+        assert data["unmatched_faces"] == 0
+        assert {p["student_id"] for p in data["present"]} == {
+            str(student_id) for student_id in STUDENT_IDS
+        }
+
+    def test_unknown_image_returns_404(self, test_client: TestClient, attendance):
+        """Test a photo that was never stored returns 404."""
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/photo", json={"image_key": "0" * 64}
+        )
+
+        assert response.status_code == 404
+
+    def test_invalid_image_key_returns_422(self, test_client: TestClient, attendance):
+        """Test an image key that is not a SHA-256 digest is rejected."""
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/photo", json={"image_key": "photo.png"}
+        )
+
+        assert response.status_code == 422
+
+
+    def test_other_instructor_is_forbidden(
+        self, test_client: TestClient, attendance
+    ):
+        """Test only the class's own instructor can take its attendance."""
+        key = upload_photo(test_client, attendance)
+        classes = app.dependency_overrides[get_class_service]()
+        classes.get_instructor_id.return_value = uuid4()
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/photo", json={"image_key": key}
+        )
+
+        assert response.status_code == 403
+
+    def test_admin_can_take_attendance(self, test_client: TestClient, attendance):
+        """Test an admin can take any class's attendance."""
+        key = upload_photo(test_client, attendance)
+        classes = app.dependency_overrides[get_class_service]()
+        classes.get_instructor_id.return_value = uuid4()
+        signed_in_as(is_admin=True)
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/photo", json={"image_key": key}
+        )
+
+        assert response.status_code == 200
+        classes.get_instructor_id.assert_not_awaited()
+
+    def test_unknown_class_returns_404(self, test_client: TestClient, attendance):
+        """Test taking attendance for a class that does not exist returns 404."""
+        classes = app.dependency_overrides[get_class_service]()
+        classes.get_instructor_id.side_effect = ClassNotFoundError("No class")
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/photo", json={"image_key": "0" * 64}
+        )
+
+        assert response.status_code == 404
+
+
+class TestMarkAttendance:
+    """Tests for POST /attendance/classes/{class_id}/marks endpoint."""
+
+    def test_marks_are_queued(self, test_client: TestClient, attendance):
+        """Test manual marks are accepted and queued for writing."""
+        service = app.dependency_overrides[get_attendance_service]()
+        service.writer = AttendanceWriter(client=service.client)
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/marks",
+            json={
+                "session_date": "2026-10-17",
+                "marks": [
+                    {"student_id": str(STUDENT_IDS[0])},
+                    {"student_id": str(STUDENT_IDS[1]), "status": "absent"},
+                ],
+            },
+        )
+
+        assert response.status_code == 202
+        assert response.json() == {"queued": 2}
+        assert len(service.writer) == 2
+
+    def test_full_queue_returns_503(self, test_client: TestClient, attendance):
+        """Test marks are refused while the write queue is full."""
+        service = app.dependency_overrides[get_attendance_service]()
+        service.writer = AttendanceWriter(
+            client=service.client, max_pending=0, enqueue_timeout_seconds=0.01
+        )
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/marks",
+            json={"marks": [{"student_id": str(STUDENT_IDS[0])}]},
+        )
+
+        assert response.status_code == 503
+
+    def test_other_user_is_forbidden(self, test_client: TestClient, attendance):
+        """Test only the class's own instructor can mark its attendance."""
+        service = app.dependency_overrides[get_attendance_service]()
+        service.writer = AttendanceWriter(client=service.client)
+        classes = app.dependency_overrides[get_class_service]()
+        classes.get_instructor_id.return_value = uuid4()
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/marks",
+            json={"marks": [{"student_id": str(STUDENT_IDS[0])}]},
+        )
+
+        assert response.status_code == 403
+        assert len(service.writer) == 0
+
+    def test_unknown_student_returns_422(self, test_client: TestClient, attendance):
+        """Test marks for a student outside the class are refused."""
+        service = app.dependency_overrides[get_attendance_service]()
+        service.writer = AttendanceWriter(client=service.client)
+
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/marks",
+            json={"marks": [{"student_id": str(uuid4())}]},
+        )
+
+        assert response.status_code == 422
+        assert len(service.writer) == 0
+
+    def test_empty_marks_returns_422(self, test_client: TestClient, attendance):
+        """Test a request without marks is rejected."""
+        response = test_client.post(
+            f"/attendance/classes/{CLASS_ID}/marks", json={"marks": []}
+        )
+
+        assert response.status_code == 422
@@ -1,13 +1,22 @@
 """Unit tests for auth API routes."""
 
-from unittest.mock import AsyncMock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock
 from uuid import UUID
 
+import jwt
 import pytest
 from fastapi.testclient import TestClient
 
+from app.api.deps import get_current_user, get_token_verifier
+from app.core.config import get_settings
+from app.core.security import TokenVerifier
+from app.main import app
 from app.models.instructor import ProfileType
 from app.schemas.user import (
+    BulkSignupCreated,
+    BulkSignupResponse,
+    CurrentUser,
     InstructorSignupResponse,
     LoginResponse,
     RefreshResponse,
@@ -25,7 +34,10 @@ class TestSignupInstructorRoute:
     """Tests for POST /auth/signup/instructor endpoint."""
 
     def test_signup_instructor_success(
-        self, test_client: TestClient, sample_signup_data: dict
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_signup_data: dict,
     ):
         """Test successful signup returns 201 with user data."""
         mock_response = InstructorSignupResponse(
@@ -39,16 +51,12 @@ class TestSignupInstructorRoute:
             office_location=sample_signup_data["office_location"],
         )
 
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.signup_instructor = AsyncMock(return_value=mock_response)
+        mock_auth_service.signup_instructor = AsyncMock(return_value=mock_response)
 
-            response = test_client.post(
-                "/auth/signup/instructor",
-                json=sample_signup_data,
-            )
+        response = test_client.post(
+            "/auth/signup/instructor",
+            json=sample_signup_data,
+        )
 
         assert response.status_code == 201
         data = response.json()
@@ -59,26 +67,128 @@ class TestSignupInstructorRoute:
         assert data["type"] == "instructor"
 
     def test_signup_instructor_error_returns_400(
-        self, test_client: TestClient, sample_signup_data: dict
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_signup_data: dict,
     ):
         """Test signup error returns 400 with error message."""
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.signup_instructor = AsyncMock(
-                side_effect=SignupError("Email already registered")
-            )
+        mock_auth_service.signup_instructor = AsyncMock(
+            side_effect=SignupError("Email already registered")
+        )
 
-            response = test_client.post(
-                "/auth/signup/instructor",
-                json=sample_signup_data,
-            )
+        response = test_client.post(
+            "/auth/signup/instructor",
+            json=sample_signup_data,
+        )
 
         assert response.status_code == 400
         assert "Email already registered" in response.json()["detail"]
 
 
+# ============================================================================
+# POST /auth/signup/bulk Tests
+# ============================================================================
+
+BULK_CSV = (
+    "email,first_name,last_name,type\n"
+    "ada@example.com,Ada,Lovelace,instructor\n"
+    "not-an-email,Alan,Turing,student\n"
+)
+
+
+def signed_in_as(is_admin: bool) -> None:
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+        is_admin=is_admin,
+    )
+
+
+class TestBulkSignupRoute:
+    """Tests for POST /auth/signup/bulk endpoint."""
+
+    @pytest.fixture(autouse=True)
+    def clear_user_override(self):
+        yield
+        app.dependency_overrides.pop(get_current_user, None)
+
+    def test_bulk_signup_reports_created_and_failed_lines(
+        self, test_client: TestClient, mock_auth_service: MagicMock
+    ):
+        """Test valid lines are signed up and invalid ones reported."""
+        signed_in_as(is_admin=True)
+        mock_auth_service.bulk_signup = AsyncMock(
+            return_value=BulkSignupResponse(
+                created=[
+                    BulkSignupCreated(
+                        line=2,
+                        user_id=UUID(TEST_USER_ID),
+                        email="ada@example.com",
+                        type=ProfileType.INSTRUCTOR,
+                    )
+                ],
+                failed=[],
+            )
+        )
+
+        response = test_client.post(
+            "/auth/signup/bulk",
+            content=BULK_CSV,
+            headers={"Content-Type": "text/csv"},
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [c["line"] for c in data["created"]] == [2]
+        assert [(f["line"], f["email"]) for f in data["failed"]] == [
+            (3, "not-an-email")
+        ]
+        rows = mock_auth_service.bulk_signup.await_args.args[0]
+        assert [line for line, _ in rows] == [2]
+
+    def test_bulk_signup_requires_admin_role(
+        self, test_client: TestClient, mock_auth_service: MagicMock
+    ):
+        """Test ordinary users cannot provision accounts."""
+        signed_in_as(is_admin=False)
+        mock_auth_service.bulk_signup = AsyncMock()
+
+        response = test_client.post("/auth/signup/bulk", content=BULK_CSV)
+
+        assert response.status_code == 403
+        mock_auth_service.bulk_signup.assert_not_called()
+
+    def test_bulk_signup_missing_column_returns_422(
+        self, test_client: TestClient, mock_auth_service: MagicMock
+    ):
+        """Test a CSV without the required columns is rejected."""
+        signed_in_as(is_admin=True)
+
+        response = test_client.post(
+            "/auth/signup/bulk", content="email,first_name\nada@example.com,Ada\n"
+        )
+
+        assert response.status_code == 422
+        assert "last_name" in response.json()["detail"]
+
+    def test_bulk_signup_oversized_body_returns_413(
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        """Test a body over the size limit is rejected before parsing."""
+        signed_in_as(is_admin=True)
+        monkeypatch.setattr(get_settings(), "bulk_signup_max_bytes", 16)
+
+        response = test_client.post("/auth/signup/bulk", content=BULK_CSV)
+
+        assert response.status_code == 413
+
+
 # ============================================================================
 # POST /auth/login Tests
 # ============================================================================
@@ -87,7 +197,12 @@ class TestSignupInstructorRoute:
 class TestLoginRoute:
     """Tests for POST /auth/login endpoint."""
 
-    def test_login_success(self, test_client: TestClient, sample_login_data: dict):
+    def test_login_success(
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_login_data: dict,
+    ):
         """Test successful login returns 200 with tokens and profile."""
         mock_response = LoginResponse(
             access_token="mock-access-token",
@@ -100,16 +215,12 @@ class TestLoginRoute:
             type=ProfileType.INSTRUCTOR,
         )
 
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.login = AsyncMock(return_value=mock_response)
+        mock_auth_service.login = AsyncMock(return_value=mock_response)
 
-            response = test_client.post(
-                "/auth/login",
-                json=sample_login_data,
-            )
+        response = test_client.post(
+            "/auth/login",
+            json=sample_login_data,
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -123,41 +234,39 @@ class TestLoginRoute:
         assert data["type"] == "instructor"
 
     def test_login_invalid_credentials_returns_401(
-        self, test_client: TestClient, sample_login_data: dict
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_login_data: dict,
     ):
         """Test invalid credentials returns 401."""
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.login = AsyncMock(
-                side_effect=LoginError("Invalid email or password")
-            )
+        mock_auth_service.login = AsyncMock(
+            side_effect=LoginError("Invalid email or password")
+        )
 
-            response = test_client.post(
-                "/auth/login",
-                json=sample_login_data,
-            )
+        response = test_client.post(
+            "/auth/login",
+            json=sample_login_data,
+        )
 
         assert response.status_code == 401
         assert "Invalid email or password" in response.json()["detail"]
 
     def test_login_profile_not_found_returns_401(
-        self, test_client: TestClient, sample_login_data: dict
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_login_data: dict,
     ):
         """Test missing profile returns 401."""
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.login = AsyncMock(
-                side_effect=LoginError("User profile not found")
-            )
+        mock_auth_service.login = AsyncMock(
+            side_effect=LoginError("User profile not found")
+        )
 
-            response = test_client.post(
-                "/auth/login",
-                json=sample_login_data,
-            )
+        response = test_client.post(
+            "/auth/login",
+            json=sample_login_data,
+        )
 
         assert response.status_code == 401
         assert "User profile not found" in response.json()["detail"]
@@ -171,7 +280,12 @@ class TestLoginRoute:
 class TestRefreshRoute:
     """Tests for POST /auth/refresh endpoint."""
 
-    def test_refresh_success(self, test_client: TestClient, sample_refresh_data: dict):
+    def test_refresh_success(
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_refresh_data: dict,
+    ):
         """Test successful refresh returns 200 with new tokens."""
         mock_response = RefreshResponse(
             access_token="new-access-token",
@@ -179,16 +293,12 @@ class TestRefreshRoute:
             token_type="bearer",
         )
 
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.refresh_token = AsyncMock(return_value=mock_response)
+        mock_auth_service.refresh_token = AsyncMock(return_value=mock_response)
 
-            response = test_client.post(
-                "/auth/refresh",
-                json=sample_refresh_data,
-            )
+        response = test_client.post(
+            "/auth/refresh",
+            json=sample_refresh_data,
+        )
 
         assert response.status_code == 200
         data = response.json()
@@ -197,41 +307,181 @@ class TestRefreshRoute:
         assert data["token_type"] == "bearer"
 
     def test_refresh_invalid_token_returns_401(
-        self, test_client: TestClient, sample_refresh_data: dict
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_refresh_data: dict,
     ):
         """Test invalid refresh token returns 401."""
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.refresh_token = AsyncMock(
-                side_effect=RefreshError("Failed to refresh token")
-            )
+        mock_auth_service.refresh_token = AsyncMock(
+            side_effect=RefreshError("Failed to refresh token")
+        )
 
-            response = test_client.post(
-                "/auth/refresh",
-                json=sample_refresh_data,
-            )
+        response = test_client.post(
+            "/auth/refresh",
+            json=sample_refresh_data,
+        )
 
         assert response.status_code == 401
         assert "Failed to refresh token" in response.json()["detail"]
 
     def test_refresh_expired_token_returns_401(
-        self, test_client: TestClient, sample_refresh_data: dict
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        sample_refresh_data: dict,
     ):
         """Test expired refresh token returns 401."""
-        with patch(
-            "app.api.routes.auth.AuthService"
-        ) as MockAuthService:
-            mock_instance = MockAuthService.return_value
-            mock_instance.refresh_token = AsyncMock(
-                side_effect=RefreshError("Token refresh failed: Token expired")
-            )
+        mock_auth_service.refresh_token = AsyncMock(
+            side_effect=RefreshError("Token refresh failed: Token expired")
+        )
 
-            response = test_client.post(
-                "/auth/refresh",
-                json=sample_refresh_data,
-            )
+        response = test_client.post(
+            "/auth/refresh",
+            json=sample_refresh_data,
+        )
 
         assert response.status_code == 401
         assert "Token expired" in response.json()["detail"]
+
+
+# ============================================================================
+# GET /auth/me Tests
+# ============================================================================
+
+JWT_SECRET = "test-jwt-secret-with-enough-length"
+
+
+@pytest.fixture
+def local_token_verifier():
+    """Override the token verifier with one using a shared HS256 secret."""
+    app.dependency_overrides[get_token_verifier] = lambda: TokenVerifier(
+        jwt_secret=JWT_SECRET
+    )
+    yield
+    app.dependency_overrides.pop(get_token_verifier, None)
+
+
+class TestMeRoute:
+    """Tests for GET /auth/me endpoint."""
+
+    def test_me_returns_user_from_token(
+        self, test_client: TestClient, local_token_verifier
+    ):
+        """Test a valid bearer token resolves to the current user."""
+        token = jwt.encode(
+            {
+                "sub": TEST_USER_ID,
+                "email": TEST_EMAIL,
+                "role": "authenticated",
+                "aud": "authenticated",
+                "exp": int(time.time()) + 3600,
+            },
+            JWT_SECRET,
+            algorithm="HS256",
+        )
+
+        response = test_client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["user_id"] == TEST_USER_ID
+        assert data["email"] == TEST_EMAIL
+        assert data["role"] == "authenticated"
+
+    def test_me_without_token_returns_401(
+        self, test_client: TestClient, local_token_verifier
+    ):
+        """Test a missing bearer token returns 401."""
+        response = test_client.get("/auth/me")
+
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+
+    def test_me_with_invalid_token_returns_401(
+        self, test_client: TestClient, local_token_verifier
+    ):
+        """Test a token signed with the wrong secret returns 401."""
+        token = jwt.encode(
+            {"sub": TEST_USER_ID, "aud": "authenticated", "exp": time.time() + 60},
+            "some-other-secret-with-enough-length",
+            algorithm="HS256",
+        )
+
+        response = test_client.get(
+            "/auth/me", headers={"Authorization": f"Bearer {token}"}
+        )
+
+        assert response.status_code == 401
+        assert "Invalid token" in response.json()["detail"]
+
+
+def signed_token(**claims) -> str:
+    return jwt.encode(
+        {
+            "sub": TEST_USER_ID,
+            "email": TEST_EMAIL,
+            "role": "authenticated",
+            "aud": "authenticated",
+            "exp": int(time.time()) + 3600,
+            **claims,
+        },
+        JWT_SECRET,
+        algorithm="HS256",
+    )
+
+
+class TestAdminToken:
+    """Tests for admin status read from a verified access token."""
+
+    def test_admin_app_metadata_reaches_admin_routes(
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        local_token_verifier,
+    ):
+        """Test a token whose app_metadata role is an admin role is an admin."""
+        mock_auth_service.bulk_signup = AsyncMock(
+            return_value=BulkSignupResponse(created=[], failed=[])
+        )
+        token = signed_token(app_metadata={"provider": "email", "role": "admin"})
+
+        response = test_client.post(
+            "/auth/signup/bulk",
+            content=BULK_CSV,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 200
+        mock_auth_service.bulk_signup.assert_awaited_once()
+
+    @pytest.mark.parametrize(
+        "claims",
+        [
+            {},
+            {"app_metadata": {"provider": "email"}},
+            {"role": "admin"},
+            {"user_metadata": {"role": "admin"}},
+        ],
+    )
+    def test_other_tokens_are_forbidden(
+        self,
+        test_client: TestClient,
+        mock_auth_service: MagicMock,
+        local_token_verifier,
+        claims: dict,
+    ):
+        """Test the role claim and user-editable metadata grant no admin."""
+        mock_auth_service.bulk_signup = AsyncMock()
+        token = signed_token(**claims)
+
+        response = test_client.post(
+            "/auth/signup/bulk",
+            content=BULK_CSV,
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+        assert response.status_code == 403
+        mock_auth_service.bulk_signup.assert_not_awaited()
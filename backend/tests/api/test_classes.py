@@ -0,0 +1,164 @@
+"""Unit tests for class API routes."""
+
+import time
+from unittest.mock import AsyncMock
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_class_service, get_current_user
+from app.main import app
+from app.schemas.user import CurrentUser
+from app.services.class_service import ClassNotFoundError, ClassQueryError
+from app.utils.pagination import Page, PaginationError
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+ROSTER = Page(
+    items=[
+        {"student_id": str(UUID(int=i)), "first_name": f"Student {i}"}
+        for i in range(1, 4)
+    ],
+    next_cursor="WyIwMDAwMDAwMC0wMDAwLTAwMDAtMDAwMC0wMDAwMDAwMDAwMDMiXQ",
+)
+
+
+@pytest.fixture
+def classes():
+    """Override the class service with a mock and sign in as its instructor."""
+    service = AsyncMock()
+    service.get_instructor_id.return_value = UUID(TEST_USER_ID)
+    app.dependency_overrides[get_class_service] = lambda: service
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+    )
+    yield service
+    app.dependency_overrides.pop(get_class_service, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestListClassStudents:
+    """Tests for GET /classes/{class_id}/students endpoint."""
+
+    def test_page_with_etag(self, test_client: TestClient, classes):
+        """Test a roster page is returned with its cursor and an ETag."""
+        classes.list_students.return_value = ROSTER
+
+        response = test_client.get(
+            f"/classes/{CLASS_ID}/students",
+            params={"limit": 3, "fields": "first_name"},
+        )
+
+        assert response.status_code == 200
+        assert response.json()["items"][0] == ROSTER.items[0]
+        assert response.json()["next_cursor"] == ROSTER.next_cursor
+        assert response.headers["etag"]
+        classes.list_students.assert_awaited_once_with(
+            CLASS_ID, 3, cursor=None, fields=["first_name"]
+        )
+
+    def test_unchanged_roster_not_modified(self, test_client: TestClient, classes):
+        """Test revalidating an unchanged roster returns an empty 304."""
+        classes.list_students.return_value = ROSTER
+        etag = test_client.get(f"/classes/{CLASS_ID}/students").headers["etag"]
+
+        response = test_client.get(
+            f"/classes/{CLASS_ID}/students", headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_changed_roster_returned(self, test_client: TestClient, classes):
+        """Test a roster that changed since the ETag is sent in full."""
+        classes.list_students.return_value = ROSTER
+        etag = test_client.get(f"/classes/{CLASS_ID}/students").headers["etag"]
+        classes.list_students.return_value = Page(ROSTER.items[:2], None)
+
+        response = test_client.get(
+            f"/classes/{CLASS_ID}/students", headers={"If-None-Match": etag}
+        )
+
+        assert response.status_code == 200
+        assert len(response.json()["items"]) == 2
+
+    def test_invalid_cursor_returns_422(self, test_client: TestClient, classes):
+        """Test a malformed cursor or field returns 422."""
+        classes.list_students.side_effect = PaginationError("Invalid cursor")
+
+        response = test_client.get(
+            f"/classes/{CLASS_ID}/students", params={"cursor": "garbage"}
+        )
+
+        assert response.status_code == 422
+
+    def test_limit_bounded(self, test_client: TestClient, classes):
+        """Test pages larger than the maximum are rejected."""
+        response = test_client.get(
+            f"/classes/{CLASS_ID}/students", params={"limit": 5000}
+        )
+
+        assert response.status_code == 422
+
+    def test_other_instructor_is_forbidden(self, test_client: TestClient, classes):
+        """Test only the class's own instructor can read its roster."""
+        classes.get_instructor_id.return_value = uuid4()
+
+        response = test_client.get(f"/classes/{CLASS_ID}/students")
+
+        assert response.status_code == 403
+        classes.list_students.assert_not_awaited()
+
+    def test_admin_can_read_roster(self, test_client: TestClient, classes):
+        """Test an admin can read any class's roster."""
+        classes.list_students.return_value = ROSTER
+        classes.get_instructor_id.return_value = uuid4()
+        app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+            user_id=TEST_USER_ID,
+            email=TEST_EMAIL,
+            role="authenticated",
+            expires_at=int(time.time()) + 3600,
+            is_admin=True,
+        )
+
+        response = test_client.get(f"/classes/{CLASS_ID}/students")
+
+        assert response.status_code == 200
+
+    def test_unknown_class_returns_404(self, test_client: TestClient, classes):
+        """Test the roster of a class that does not exist returns 404."""
+        classes.get_instructor_id.side_effect = ClassNotFoundError("No class")
+
+        response = test_client.get(f"/classes/{CLASS_ID}/students")
+
+        assert response.status_code == 404
+
+
+class TestListClasses:
+    """Tests for GET /classes endpoint."""
+
+    def test_list_classes(self, test_client: TestClient, classes):
+        """Test classes are listed for an instructor."""
+        classes.list_classes.return_value = Page(
+            [{"id": str(CLASS_ID), "name": "Databases"}], None
+        )
+
+        response = test_client.get("/classes", params={"instructor_id": TEST_USER_ID})
+
+        assert response.status_code == 200
+        assert response.json()["items"][0]["name"] == "Databases"
+        assert classes.list_classes.await_args.kwargs["instructor_id"] == UUID(
+            TEST_USER_ID
+        )
+
+    def test_query_failure_returns_503(self, test_client: TestClient, classes):
+        """Test a failing query returns 503."""
+        classes.list_classes.side_effect = ClassQueryError("down")
+
+        response = test_client.get("/classes")
+
+        assert response.status_code == 503
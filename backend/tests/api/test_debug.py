@@ -0,0 +1,78 @@
+"""Unit tests for debug API routes."""
+
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user, get_sampling_profiler
+from app.core.config import get_settings
+from app.core.profiling import SamplingProfiler
+from app.main import app
+from app.schemas.user import CurrentUser
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+
+
+def signed_in_as(is_admin: bool) -> None:
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+        is_admin=is_admin,
+    )
+
+
+@pytest.fixture
+def profiler(monkeypatch):
+    """Enable the profiler and override it with a fast-sampling one."""
+    monkeypatch.setattr(get_settings(), "profiler_enabled", True)
+    profiler = SamplingProfiler(interval_seconds=0.001, max_duration_seconds=1)
+    app.dependency_overrides[get_sampling_profiler] = lambda: profiler
+    yield profiler
+    app.dependency_overrides.pop(get_sampling_profiler, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestProfileRoute:
+    """Tests for GET /debug/profile endpoint."""
+
+    def test_returns_collapsed_stacks(self, test_client: TestClient, profiler):
+        """Test an admin gets one collapsed stack per line."""
+        signed_in_as(is_admin=True)
+
+        response = test_client.get("/debug/profile", params={"seconds": 0.05})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert int(response.headers["x-profile-samples"]) > 0
+        assert all(
+            line.rsplit(" ", 1)[1].isdigit() for line in response.text.splitlines()
+        )
+
+    def test_requires_admin(self, test_client: TestClient, profiler):
+        """Test other users cannot profile the worker."""
+        signed_in_as(is_admin=False)
+
+        response = test_client.get("/debug/profile", params={"seconds": 0.05})
+
+        assert response.status_code == 403
+
+    def test_disabled_by_default(
+        self, test_client: TestClient, profiler, monkeypatch
+    ):
+        """Test the endpoint is not available unless enabled."""
+        monkeypatch.setattr(get_settings(), "profiler_enabled", False)
+        signed_in_as(is_admin=True)
+
+        response = test_client.get("/debug/profile")
+
+        assert response.status_code == 404
+
+    def test_rejects_long_profiles(self, test_client: TestClient, profiler):
+        """Test durations over the maximum are refused."""
+        signed_in_as(is_admin=True)
+
+        response = test_client.get("/debug/profile", params={"seconds": 5})
+
+        assert response.status_code == 422
@@ -0,0 +1,168 @@
+"""Unit tests for enrollment API routes."""
+
+import time
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import (
+    get_current_user,
+    get_enrollment_executor,
+    get_enrollment_pipeline,
+)
+from app.core.config import get_settings
+from app.main import app
+from app.models.instructor import ProfileType
+from app.schemas.user import CurrentUser
+from app.services.auth_service import ProfileNotFoundError
+from app.services.enrollment_service import BatchEnrollmentReport
+from app.services.profile_cache import CachedProfile
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+
+BATCH_ID = uuid4()
+EXECUTOR = MagicMock()
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x01" * 60
+
+
+def signed_in_as(is_admin: bool) -> None:
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+        is_admin=is_admin,
+    )
+
+
+def profile_of(profile_type: ProfileType) -> CachedProfile:
+    return CachedProfile(first_name="Test", last_name="User", type=profile_type)
+
+
+@pytest.fixture
+def pipeline():
+    """Override the enrollment pipeline with one that enrolls nothing."""
+    pipeline = MagicMock()
+    pipeline.run = AsyncMock(return_value=BatchEnrollmentReport(batch_id=BATCH_ID))
+    app.dependency_overrides[get_enrollment_pipeline] = lambda: pipeline
+    app.dependency_overrides[get_enrollment_executor] = lambda: EXECUTOR
+    yield pipeline
+    app.dependency_overrides.pop(get_enrollment_pipeline, None)
+    app.dependency_overrides.pop(get_enrollment_executor, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def post_batch(
+    test_client: TestClient, photo: bytes = PNG, content_type: str = "image/png"
+):
+    return test_client.post(
+        f"/enrollment/batches/{BATCH_ID}",
+        files={str(uuid4()): ("face.png", photo, content_type)},
+    )
+
+
+class TestEnrollBatch:
+    """Tests for POST /enrollment/batches/{batch_id} endpoint."""
+
+    def test_instructor_can_enroll(
+        self, test_client: TestClient, pipeline, mock_auth_service
+    ):
+        """Test an instructor's upload is run through the pipeline."""
+        signed_in_as(is_admin=False)
+        mock_auth_service.get_profile = AsyncMock(
+            return_value=profile_of(ProfileType.INSTRUCTOR)
+        )
+
+        response = post_batch(test_client)
+
+        assert response.status_code == 200
+        pipeline.run.assert_awaited_once()
+        assert pipeline.run.await_args.kwargs["executor"] is EXECUTOR
+
+    def test_admin_can_enroll(
+        self, test_client: TestClient, pipeline, mock_auth_service
+    ):
+        """Test an admin enrolls without a profile lookup."""
+        signed_in_as(is_admin=True)
+        mock_auth_service.get_profile = AsyncMock()
+
+        response = post_batch(test_client)
+
+        assert response.status_code == 200
+        mock_auth_service.get_profile.assert_not_awaited()
+
+    def test_student_cannot_enroll(
+        self, test_client: TestClient, pipeline, mock_auth_service
+    ):
+        """Test a student cannot replace anyone's face template."""
+        signed_in_as(is_admin=False)
+        mock_auth_service.get_profile = AsyncMock(
+            return_value=profile_of(ProfileType.STUDENT)
+        )
+
+        response = post_batch(test_client)
+
+        assert response.status_code == 403
+        pipeline.run.assert_not_awaited()
+
+    def test_user_without_profile_cannot_enroll(
+        self, test_client: TestClient, pipeline, mock_auth_service
+    ):
+        """Test a user with no profile is refused."""
+        signed_in_as(is_admin=False)
+        mock_auth_service.get_profile = AsyncMock(
+            side_effect=ProfileNotFoundError("No profile")
+        )
+
+        response = post_batch(test_client)
+
+        assert response.status_code == 403
+
+    def test_photos_reach_pipeline_whole(self, test_client: TestClient, pipeline):
+        """Test validated photos are rewound before the pipeline reads them."""
+        signed_in_as(is_admin=True)
+        received = []
+
+        async def run(batch_id, students, executor):
+            received.extend([photos.photos async for photos in students])
+            return BatchEnrollmentReport(batch_id=batch_id)
+
+        pipeline.run.side_effect = run
+
+        response = post_batch(test_client)
+
+        assert response.status_code == 200
+        assert received == [[PNG]]
+
+    def test_non_image_photo_returns_415(self, test_client: TestClient, pipeline):
+        """Test a part that is not an image rejects the batch upfront."""
+        signed_in_as(is_admin=True)
+
+        response = post_batch(test_client, b"#!/bin/sh\n" * 10)
+
+        assert response.status_code == 415
+        pipeline.run.assert_not_awaited()
+
+    def test_declared_non_image_type_returns_415(
+        self, test_client: TestClient, pipeline
+    ):
+        """Test a part declaring a non-image type is rejected."""
+        signed_in_as(is_admin=True)
+
+        response = post_batch(test_client, content_type="text/plain")
+
+        assert response.status_code == 415
+        pipeline.run.assert_not_awaited()
+
+    def test_oversize_photo_returns_413(
+        self, test_client: TestClient, pipeline, monkeypatch
+    ):
+        """Test a photo over the image size limit rejects the batch."""
+        signed_in_as(is_admin=True)
+        monkeypatch.setattr(get_settings(), "image_max_bytes", 32)
+
+        response = post_batch(test_client)
+
+        assert response.status_code == 413
+        pipeline.run.assert_not_awaited()
@@ -0,0 +1,84 @@
+"""Unit tests for geofence API routes."""
+
+import time
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user, get_geofence_service
+from app.main import app
+from app.schemas.user import CurrentUser
+from app.services.geofence_service import Geofence, GeofenceService
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+SQUARE = [[-75.001, 39.999], [-74.999, 39.999], [-74.999, 40.001], [-75.001, 40.001]]
+
+
+@pytest.fixture
+def geofences():
+    """Override the geofence service with one building and authenticate."""
+    service = GeofenceService()
+    building = Geofence.from_coordinates(uuid4(), SQUARE, tolerance_m=10)
+    service.index.add([building])
+    service.class_geofences = {CLASS_ID: building.geofence_id}
+    service._loaded_at = time.monotonic()
+    app.dependency_overrides[get_geofence_service] = lambda: service
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+    )
+    yield service
+    app.dependency_overrides.pop(get_geofence_service, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestVerifyCheckIns:
+    """Tests for POST /geofences/verify endpoint."""
+
+    def test_verify_check_ins(self, test_client: TestClient, geofences):
+        """Test each check-in gets a verdict in request order."""
+        response = test_client.post(
+            "/geofences/verify",
+            json={
+                "check_ins": [
+                    {"class_id": str(CLASS_ID), "latitude": 40.0, "longitude": -75.0},
+                    {"class_id": str(CLASS_ID), "latitude": 40.1, "longitude": -75.0},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["accepted"] for r in results] == [True, False]
+        assert results[0]["distance_m"] == 0
+        assert results[1]["distance_m"] > 10_000
+
+    def test_unknown_class_returns_404(self, test_client: TestClient, geofences):
+        """Test a class without a geofence returns 404."""
+        response = test_client.post(
+            "/geofences/verify",
+            json={
+                "check_ins": [
+                    {"class_id": str(uuid4()), "latitude": 40.0, "longitude": -75.0}
+                ]
+            },
+        )
+
+        assert response.status_code == 404
+
+    def test_invalid_latitude_returns_422(self, test_client: TestClient, geofences):
+        """Test a latitude out of range is rejected."""
+        response = test_client.post(
+            "/geofences/verify",
+            json={
+                "check_ins": [
+                    {"class_id": str(CLASS_ID), "latitude": 91, "longitude": 0}
+                ]
+            },
+        )
+
+        assert response.status_code == 422
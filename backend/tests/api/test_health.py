@@ -0,0 +1,171 @@
+"""Unit tests for health API routes."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+from uuid import uuid4
+
+from fastapi.testclient import TestClient
+
+from app.api.deps import (
+    get_attendance_writer,
+    get_event_loop_monitor,
+    get_profile_cache,
+    get_recognition_service,
+)
+from app.core.profiling import EventLoopLagMonitor
+from app.db.supabase import PoolStats
+from app.main import app
+from app.services.attendance_service import AttendanceWriter
+from app.services.profile_cache import ProfileCache
+from app.services.recognition_service import RecognitionService
+
+
+def make_pool_stats(**overrides) -> PoolStats:
+    values = {
+        "max_connections": 100,
+        "max_keepalive_connections": 20,
+        "http2": True,
+        "requests_total": 600,
+        "requests_in_flight": 25,
+        "peak_requests_in_flight": 80,
+        "requests_queued": 0,
+        "connections_opened": 30,
+        "connections_open": 30,
+        "connections_idle": 5,
+        **overrides,
+    }
+    return PoolStats(**values)
+
+
+class TestPoolStats:
+    """Tests for PoolStats derived metrics."""
+
+    def test_saturation_and_reuse(self):
+        """Test saturation and reuse ratio are derived from the counters."""
+        stats = make_pool_stats()
+
+        assert stats.saturation == 0.25
+        assert stats.connection_reuse_ratio == 0.95
+
+    def test_saturation_counts_connections_not_streams(self):
+        """Test HTTP/2 requests sharing connections do not inflate saturation."""
+        stats = make_pool_stats(requests_in_flight=500)
+
+        assert stats.saturation == 0.25
+
+    def test_reuse_ratio_without_requests(self):
+        """Test reuse ratio is zero before any request was made."""
+        stats = make_pool_stats(requests_total=0, connections_opened=0)
+
+        assert stats.connection_reuse_ratio == 0.0
+
+
+class TestPoolStatsRoute:
+    """Tests for GET /health/pool endpoint."""
+
+    def test_pool_stats_success(self, test_client: TestClient):
+        """Test pool statistics are reported when the pool is open."""
+        pool = MagicMock()
+        pool.stats.return_value = make_pool_stats()
+
+        with patch("app.api.routes.health.get_supabase_pool", return_value=pool):
+            response = test_client.get("/health/pool")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["max_connections"] == 100
+        assert data["saturation"] == 0.25
+        assert data["connection_reuse_ratio"] == 0.95
+
+    def test_pool_stats_closed_returns_503(self, test_client: TestClient):
+        """Test 503 is returned when the pool has not been opened."""
+        with patch("app.api.routes.health.get_supabase_pool", return_value=None):
+            response = test_client.get("/health/pool")
+
+        assert response.status_code == 503
+
+
+class TestRecognitionCacheStatsRoute:
+    """Tests for GET /health/recognition-cache endpoint."""
+
+    def test_cache_stats(self, test_client: TestClient):
+        """Test the result cache counters are reported."""
+        service = RecognitionService()
+        service.results.put(("photo", uuid4(), 1, 1), [])
+        service.results.get(("photo", uuid4(), 1, 1))
+        app.dependency_overrides[get_recognition_service] = lambda: service
+        try:
+            response = test_client.get("/health/recognition-cache")
+        finally:
+            app.dependency_overrides.pop(get_recognition_service, None)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["entries"] == 1
+        assert data["misses"] == 1
+        assert data["hit_ratio"] == 0.0
+
+
+class TestAttendanceWriterStatsRoute:
+    """Tests for GET /health/attendance-writer endpoint."""
+
+    def test_writer_stats(self, test_client: TestClient):
+        """Test the attendance writer counters are reported."""
+        writer = AttendanceWriter(client=MagicMock())
+        app.dependency_overrides[get_attendance_writer] = lambda: writer
+        try:
+            response = test_client.get("/health/attendance-writer")
+        finally:
+            app.dependency_overrides.pop(get_attendance_writer, None)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "pending": 0,
+            "submitted": 0,
+            "coalesced": 0,
+            "flushes": 0,
+            "flushed_rows": 0,
+            "failed_flushes": 0,
+            "rejected_rows": 0,
+        }
+
+
+class TestProfileCacheStatsRoute:
+    """Tests for GET /health/profile-cache endpoint."""
+
+    def test_cache_stats(self, test_client: TestClient):
+        """Test the profile cache counters are reported."""
+        cache = ProfileCache()
+        asyncio.run(cache.get(uuid4()))
+        app.dependency_overrides[get_profile_cache] = lambda: cache
+        try:
+            response = test_client.get("/health/profile-cache")
+        finally:
+            app.dependency_overrides.pop(get_profile_cache, None)
+
+        assert response.status_code == 200
+        assert response.json()["misses"] == 1
+        assert response.json()["hit_ratio"] == 0.0
+
+
+class TestEventLoopStatsRoute:
+    """Tests for GET /health/event-loop endpoint."""
+
+    def test_event_loop_stats(self, test_client: TestClient):
+        """Test the lag monitor counters are reported."""
+        monitor = EventLoopLagMonitor(threshold_seconds=0.2)
+        monitor.stalls = 2
+        app.dependency_overrides[get_event_loop_monitor] = lambda: monitor
+        try:
+            response = test_client.get("/health/event-loop")
+        finally:
+            app.dependency_overrides.pop(get_event_loop_monitor, None)
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "threshold_ms": 200.0,
+            "checks": 0,
+            "stalls": 2,
+            "stacks_logged": 0,
+            "max_lag_ms": 0.0,
+        }
@@ -0,0 +1,284 @@
+"""Unit tests for image upload API routes."""
+
+import hashlib
+import io
+import time
+from functools import partial
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import numpy as np
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.api.deps import (
+    get_attendance_service,
+    get_class_service,
+    get_current_user,
+    get_embedding_store,
+    get_recognition_batcher,
+    get_recognition_service,
+    get_storage_service,
+)
+from app.core.config import get_settings
+from app.db.embedding_store import EmbeddingStore
+from app.main import app
+from app.schemas.user import CurrentUser
+from app.services.attendance_service import AttendanceService
+from app.services.recognition_service import RecognitionService
+from app.services.storage_service import LocalStorageBackend, StorageService
+from app.utils.batching import MicroBatcher
+from app.utils.face_utils import FakeFaceEngine, embed_faces
+from app.utils.image_utils import decode_image
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+from tests.services.test_attendance_service import roster_query
+
+JPEG = b"\xff\xd8\xff\xe0" + b"\x00" * 60
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x01" * 60
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+STUDENT_ID = UUID("11111111-2222-3333-4444-555555555555")
+
+
+def encode_png(pixels: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(pixels).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+PHOTO = encode_png(
+    np.random.default_rng(0).integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+)
+
+
+@pytest.fixture
+def storage(tmp_path: Path):
+    """Override storage with a temporary directory and authenticate."""
+    service = StorageService(LocalStorageBackend(tmp_path), tmp_path / "tmp")
+    app.dependency_overrides[get_storage_service] = lambda: service
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+    )
+    yield service
+    app.dependency_overrides.pop(get_storage_service, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+def stored_files(storage: StorageService) -> list[Path]:
+    return [p for p in storage.backend.root.glob("objects/*/*") if p.is_file()]
+
+
+class TestUploadImages:
+    """Tests for POST /images endpoint."""
+
+    def test_upload_batch_success(self, test_client: TestClient, storage):
+        """Test every file part is stored under its content hash."""
+        response = test_client.post(
+            "/images",
+            files=[
+                ("photos", ("a.jpg", JPEG, "image/jpeg")),
+                ("photos", ("b.png", PNG, "image/png")),
+            ],
+        )
+
+        assert response.status_code == 201
+        images = response.json()["images"]
+        assert [image["filename"] for image in images] == ["a.jpg", "b.png"]
+        assert images[0]["sha256"] == hashlib.sha256(JPEG).hexdigest()
+        assert images[1]["content_type"] == "image/png"
+        assert storage.backend.path(images[0]["key"]).read_bytes() == JPEG
+
+    def test_upload_duplicate_is_stored_once(self, test_client: TestClient, storage):
+        """Test identical bytes uploaded twice are deduplicated."""
+        files = [("photos", ("a.jpg", JPEG, "image/jpeg"))]
+
+        first = test_client.post("/images", files=files).json()["images"][0]
+        second = test_client.post("/images", files=files).json()["images"][0]
+
+        assert first["key"] == second["key"]
+        assert (first["deduplicated"], second["deduplicated"]) == (False, True)
+        assert len(stored_files(storage)) == 1
+
+    def test_upload_non_image_returns_415(self, test_client: TestClient, storage):
+        """Test a part that is not an image rejects the whole batch."""
+        response = test_client.post(
+            "/images",
+            files=[
+                ("photos", ("a.jpg", JPEG, "image/jpeg")),
+                ("photos", ("evil.jpg", b"#!/bin/sh\n" * 10, "image/jpeg")),
+            ],
+        )
+
+        assert response.status_code == 415
+        assert stored_files(storage) == []
+
+    def test_upload_declared_non_image_type_returns_415(
+        self, test_client: TestClient, storage
+    ):
+        """Test a part declaring a non-image type is rejected from its headers."""
+        response = test_client.post(
+            "/images", files=[("photos", ("a.txt", JPEG, "text/plain"))]
+        )
+
+        assert response.status_code == 415
+
+    def test_upload_oversize_image_returns_413(
+        self, test_client: TestClient, storage, monkeypatch
+    ):
+        """Test an image over the size limit is rejected while streaming."""
+        monkeypatch.setattr(get_settings(), "image_max_bytes", 32)
+
+        response = test_client.post(
+            "/images", files=[("photos", ("a.jpg", JPEG, "image/jpeg"))]
+        )
+
+        assert response.status_code == 413
+        assert stored_files(storage) == []
+
+    def test_upload_declared_oversize_body_returns_413(
+        self, test_client: TestClient, storage, monkeypatch
+    ):
+        """Test a declared Content-Length over the limit is rejected upfront."""
+        monkeypatch.setattr(get_settings(), "image_upload_max_request_bytes", 16)
+
+        response = test_client.post(
+            "/images", files=[("photos", ("a.jpg", JPEG, "image/jpeg"))]
+        )
+
+        assert response.status_code == 413
+
+    def test_upload_not_multipart_returns_400(
+        self, test_client: TestClient, storage
+    ):
+        """Test a body that is not multipart/form-data is rejected."""
+        response = test_client.post(
+            "/images", content=JPEG, headers={"Content-Type": "image/jpeg"}
+        )
+
+        assert response.status_code == 400
+
+    def test_upload_requires_authentication(self, test_client: TestClient):
+        """Test uploading without a bearer token returns 401."""
+        response = test_client.post(
+            "/images", files=[("photos", ("a.jpg", JPEG, "image/jpeg"))]
+        )
+
+        assert response.status_code == 401
+
+
+class TestRecognizeImage:
+    """Tests for POST /images/{key}/recognition endpoint."""
+
+    @pytest.fixture
+    def recognition(self, tmp_path: Path):
+        """Override recognition for a class enrolled from one photo.
+
+        No gallery is loaded upfront, as in a freshly started worker.
+        """
+        engine = FakeFaceEngine(embedding_dim=32)
+        store = EmbeddingStore(tmp_path / "embeddings.bin", 32)
+        store.append([STUDENT_ID], embed_faces(engine, decode_image(PHOTO)))
+        service = RecognitionService()
+        client = MagicMock()
+        client.table.return_value.select = roster_query([STUDENT_ID]).select
+        attendance = AttendanceService(service, store, engine, client=client)
+        classes = MagicMock()
+        classes.get_instructor_id = AsyncMock(return_value=UUID(TEST_USER_ID))
+        batcher = MicroBatcher(
+            partial(service.recognize_images, engine=engine, store=store)
+        )
+        app.dependency_overrides[get_recognition_service] = lambda: service
+        app.dependency_overrides[get_recognition_batcher] = lambda: batcher
+        app.dependency_overrides[get_attendance_service] = lambda: attendance
+        app.dependency_overrides[get_embedding_store] = lambda: store
+        app.dependency_overrides[get_class_service] = lambda: classes
+        yield store
+        for dependency in (
+            get_recognition_service,
+            get_recognition_batcher,
+            get_attendance_service,
+            get_embedding_store,
+            get_class_service,
+        ):
+            app.dependency_overrides.pop(dependency, None)
+
+    def test_recognize_duplicate_photo_uses_cache(
+        self, test_client: TestClient, storage, recognition
+    ):
+        """Test a photo uploaded twice is only recognized once."""
+        keys = [
+            test_client.post(
+                "/images", files=[("photos", ("a.png", PHOTO, "image/png"))]
+            ).json()["images"][0]["key"]
+            for _ in range(2)
+        ]
+
+        first = test_client.post(
+            f"/images/{keys[0]}/recognition", json={"class_id": str(CLASS_ID)}
+        )
+        second = test_client.post(
+            f"/images/{keys[1]}/recognition", json={"class_id": str(CLASS_ID)}
+        )
+
+        assert first.status_code == 200
+        assert first.json()["faces"][0][0]["student_id"] == str(STUDENT_ID)
+        assert (first.json()["cached"], second.json()["cached"]) == (False, True)
+        assert second.json()["faces"] == first.json()["faces"]
+
+    def test_recognize_unknown_image_returns_404(
+        self, test_client: TestClient, storage, recognition
+    ):
+        """Test recognizing an image that was never stored returns 404."""
+        response = test_client.post(
+            f"/images/{'0' * 64}/recognition", json={"class_id": str(CLASS_ID)}
+        )
+
+        assert response.status_code == 404
+
+    def test_recognize_invalid_key_returns_422(
+        self, test_client: TestClient, storage, recognition
+    ):
+        """Test keys that are not content hashes are rejected."""
+        response = test_client.post(
+            "/images/not-a-hash/recognition", json={"class_id": str(CLASS_ID)}
+        )
+
+        assert response.status_code == 422
+
+    def test_recognize_reloads_gallery_after_enrollment(
+        self, test_client: TestClient, storage, recognition
+    ):
+        """Test a photo is recognized again once the class's faces change."""
+        key = test_client.post(
+            "/images", files=[("photos", ("a.png", PHOTO, "image/png"))]
+        ).json()["images"][0]["key"]
+        first = test_client.post(
+            f"/images/{key}/recognition", json={"class_id": str(CLASS_ID)}
+        )
+
+        recognition.append([STUDENT_ID], recognition.get_many([STUDENT_ID])[1])
+        second = test_client.post(
+            f"/images/{key}/recognition", json={"class_id": str(CLASS_ID)}
+        )
+
+        assert (first.json()["cached"], second.json()["cached"]) == (False, False)
+        assert second.json()["faces"] == first.json()["faces"]
+
+    def test_other_instructor_is_forbidden(
+        self, test_client: TestClient, storage, recognition
+    ):
+        """Test only the class's own instructor can recognize photos against it."""
+        classes = app.dependency_overrides[get_class_service]()
+        classes.get_instructor_id.return_value = uuid4()
+
+        response = test_client.post(
+            f"/images/{'0' * 64}/recognition", json={"class_id": str(CLASS_ID)}
+        )
+
+        assert response.status_code == 403
@@ -0,0 +1,21 @@
+"""Unit tests for the metrics API route."""
+
+from fastapi.testclient import TestClient
+
+
+class TestMetricsRoute:
+    """Tests for GET /metrics endpoint."""
+
+    def test_exports_request_histogram(self, test_client: TestClient):
+        """Test earlier requests show up in the Prometheus exposition."""
+        test_client.get("/health")
+
+        response = test_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert (
+            'faceit_http_request_duration_seconds_count{method="GET",'
+            'route="/health",status="200"}'
+        ) in response.text
+        assert "# TYPE faceit_span_duration_seconds histogram" in response.text
@@ -0,0 +1,161 @@
+"""Unit tests for recognition log API routes."""
+
+import time
+from datetime import timedelta
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import (
+    get_attendance_service,
+    get_current_user,
+    get_recognition_log_store,
+    get_storage_service,
+)
+from app.db.recognition_log import RecognitionLogStore, to_records
+from app.main import app
+from app.schemas.user import CurrentUser
+from app.services.recognition_service import Match
+from app.services.storage_service import ObjectNotFoundError
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+from tests.db.test_recognition_log import START, make_entries
+
+
+def signed_in_as(is_admin: bool) -> None:
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+        is_admin=is_admin,
+    )
+
+
+@pytest.fixture
+def students() -> list[UUID]:
+    return [uuid4() for _ in range(10)]
+
+
+@pytest.fixture
+def store(tmp_path: Path, students):
+    """Override the log store with one holding a segment and an active file."""
+    store = RecognitionLogStore(tmp_path / "log", top_k=3)
+    store.append(to_records(make_entries(20, students), top_k=3))
+    store.roll()
+    store.append(to_records(make_entries(20, students, offset=20), top_k=3))
+    app.dependency_overrides[get_recognition_log_store] = lambda: store
+    yield store
+    app.dependency_overrides.pop(get_recognition_log_store, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestReadRecognitionLog:
+    """Tests for GET /recognition-log endpoint."""
+
+    def test_filters_by_student_and_time(
+        self, test_client: TestClient, store, students
+    ):
+        """Test entries mentioning the student in the range are returned."""
+        signed_in_as(is_admin=True)
+
+        response = test_client.get(
+            "/recognition-log",
+            params={
+                "student_id": str(students[0]),
+                "start": (START + timedelta(seconds=15)).isoformat(),
+                "end": (START + timedelta(seconds=29)).isoformat(),
+            },
+        )
+
+        assert response.status_code == 200
+        entries = response.json()["entries"]
+        seconds = [entry["recorded_at"][17:19] for entry in entries]
+        assert seconds == ["18", "19", "20", "28", "29"]
+        assert all(len(entry["candidates"]) == 3 for entry in entries)
+
+    def test_limit(self, test_client: TestClient, store):
+        """Test at most limit entries are returned, oldest first."""
+        signed_in_as(is_admin=True)
+
+        response = test_client.get("/recognition-log", params={"limit": 5})
+
+        assert response.status_code == 200
+        entries = response.json()["entries"]
+        assert len(entries) == 5
+        assert entries[0]["recorded_at"].startswith(START.isoformat()[:19])
+
+    def test_requires_admin_role(self, test_client: TestClient, store):
+        """Test ordinary users cannot read the audit log."""
+        signed_in_as(is_admin=False)
+
+        response = test_client.get("/recognition-log")
+
+        assert response.status_code == 403
+
+
+@pytest.fixture
+def identify(students):
+    """Override storage and attendance with mocks identifying one face."""
+    storage = MagicMock()
+    storage.read = AsyncMock(return_value=b"photo")
+    attendance = MagicMock()
+    attendance.identify_faces.return_value = [
+        [Match(students[0], 0.9), Match(students[1], 0.7)]
+    ]
+    app.dependency_overrides[get_storage_service] = lambda: storage
+    app.dependency_overrides[get_attendance_service] = lambda: attendance
+    yield storage, attendance
+    app.dependency_overrides.pop(get_storage_service, None)
+    app.dependency_overrides.pop(get_attendance_service, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestIdentifyFaces:
+    """Tests for POST /recognition-log/identify endpoint."""
+
+    def test_identifies_logged_photo(self, test_client: TestClient, identify, students):
+        """Test a logged photo's faces are identified across the campus."""
+        storage, attendance = identify
+        signed_in_as(is_admin=True)
+
+        response = test_client.post(
+            "/recognition-log/identify", json={"image_key": "ab" * 32, "top_k": 2}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "image_sha256": "ab" * 32,
+            "faces": [
+                [
+                    {"student_id": str(students[0]), "score": 0.9},
+                    {"student_id": str(students[1]), "score": 0.7},
+                ]
+            ],
+        }
+        storage.read.assert_awaited_once_with("ab" * 32)
+        attendance.identify_faces.assert_called_once_with(b"photo", 2)
+
+    def test_unknown_image_returns_404(self, test_client: TestClient, identify):
+        """Test identifying a photo that was never stored returns 404."""
+        storage, _ = identify
+        storage.read.side_effect = ObjectNotFoundError("No image")
+        signed_in_as(is_admin=True)
+
+        response = test_client.post(
+            "/recognition-log/identify", json={"image_key": "ab" * 32}
+        )
+
+        assert response.status_code == 404
+
+    def test_requires_admin_role(self, test_client: TestClient, identify):
+        """Test ordinary users cannot search the whole campus."""
+        signed_in_as(is_admin=False)
+
+        response = test_client.post(
+            "/recognition-log/identify", json={"image_key": "ab" * 32}
+        )
+
+        assert response.status_code == 403
@@ -0,0 +1,276 @@
+"""Unit tests for report API routes."""
+
+import csv
+import io
+import time
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_class_service, get_current_user, get_report_service
+from app.main import app
+from app.schemas.user import CurrentUser
+from app.services.report_service import (
+    EXPORT_MAX_CLASSES,
+    AttendanceSummary,
+    ClassAttendanceReport,
+    ReportQueryError,
+    StudentAttendanceReport,
+)
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+STUDENT_ID = UUID(int=1)
+SUMMARY = AttendanceSummary(
+    class_id=CLASS_ID,
+    student_id=STUDENT_ID,
+    present=8,
+    late=1,
+    absent=1,
+    sessions=10,
+    attendance_rate=0.9,
+)
+
+
+def signed_in_as(user_id: UUID | str = TEST_USER_ID, is_admin: bool = False) -> None:
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=user_id,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+        is_admin=is_admin,
+    )
+
+
+@pytest.fixture
+def classes() -> MagicMock:
+    """Override the class service; the signed-in user teaches the class."""
+    service = MagicMock()
+    service.get_instructor_id = AsyncMock(return_value=UUID(TEST_USER_ID))
+    service.get_taught_class_ids = AsyncMock(return_value={CLASS_ID})
+    app.dependency_overrides[get_class_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_class_service, None)
+
+
+@pytest.fixture
+def reports(classes):
+    """Override the report service with a mock and authenticate."""
+    service = AsyncMock()
+    app.dependency_overrides[get_report_service] = lambda: service
+    signed_in_as()
+    yield service
+    app.dependency_overrides.pop(get_report_service, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestClassAttendanceReport:
+    """Tests for GET /reports/classes/{class_id}/attendance endpoint."""
+
+    def test_class_report(self, test_client: TestClient, reports):
+        """Test the class report is returned."""
+        reports.class_report.return_value = ClassAttendanceReport(
+            class_id=CLASS_ID, sessions=[], students=[SUMMARY], attendance_rate=0.9
+        )
+
+        response = test_client.get(f"/reports/classes/{CLASS_ID}/attendance")
+
+        assert response.status_code == 200
+        assert response.json()["students"][0]["attendance_rate"] == 0.9
+
+    def test_query_failure_returns_503(self, test_client: TestClient, reports):
+        """Test a failing totals query returns 503."""
+        reports.class_report.side_effect = ReportQueryError("down")
+
+        response = test_client.get(f"/reports/classes/{CLASS_ID}/attendance")
+
+        assert response.status_code == 503
+
+    def test_other_instructor_is_forbidden(
+        self, test_client: TestClient, reports, classes
+    ):
+        """Test only the class's own instructor can read its report."""
+        classes.get_instructor_id.return_value = uuid4()
+
+        response = test_client.get(f"/reports/classes/{CLASS_ID}/attendance")
+
+        assert response.status_code == 403
+        reports.class_report.assert_not_awaited()
+
+
+class TestStudentAttendanceReport:
+    """Tests for GET /reports/students/{student_id}/attendance endpoint."""
+
+    def test_student_report(self, test_client: TestClient, reports):
+        """Test the student report is returned to the student."""
+        signed_in_as(STUDENT_ID)
+        reports.student_report.return_value = StudentAttendanceReport(
+            student_id=STUDENT_ID, classes=[SUMMARY], attendance_rate=0.9
+        )
+
+        response = test_client.get(f"/reports/students/{STUDENT_ID}/attendance")
+
+        assert response.status_code == 200
+        assert response.json()["classes"][0]["class_id"] == str(CLASS_ID)
+
+    def test_admin_can_read_any_student(self, test_client: TestClient, reports):
+        """Test an admin can read any student's report."""
+        signed_in_as(is_admin=True)
+        reports.student_report.return_value = StudentAttendanceReport(
+            student_id=STUDENT_ID, classes=[], attendance_rate=0.0
+        )
+
+        response = test_client.get(f"/reports/students/{STUDENT_ID}/attendance")
+
+        assert response.status_code == 200
+
+    def test_other_user_is_forbidden(self, test_client: TestClient, reports):
+        """Test other users cannot read a student's report."""
+        response = test_client.get(f"/reports/students/{STUDENT_ID}/attendance")
+
+        assert response.status_code == 403
+        reports.student_report.assert_not_awaited()
+
+
+class TestRebuildAttendanceTotals:
+    """Tests for POST /reports/attendance/rebuild endpoint."""
+
+    def test_rebuild_class(self, test_client: TestClient, reports):
+        """Test the rebuild is run for the requested class."""
+        signed_in_as(is_admin=True)
+        reports.rebuild_totals.return_value = 30
+
+        response = test_client.post(
+            "/reports/attendance/rebuild", params={"class_id": str(CLASS_ID)}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"rebuilt": 30}
+        reports.rebuild_totals.assert_awaited_once_with(CLASS_ID)
+
+    def test_requires_admin(self, test_client: TestClient, reports):
+        """Test ordinary users cannot start a rebuild."""
+        response = test_client.post("/reports/attendance/rebuild")
+
+        assert response.status_code == 403
+        reports.rebuild_totals.assert_not_awaited()
+
+    def test_requires_authentication(self, test_client: TestClient):
+        """Test the rebuild requires a bearer token."""
+        response = test_client.post("/reports/attendance/rebuild")
+
+        assert response.status_code == 401
+
+
+class TestExportAttendance:
+    """Tests for GET /reports/attendance/export endpoint."""
+
+    @staticmethod
+    def pages(*pages):
+        async def export_attendance(class_ids, start=None, end=None):
+            for page in pages:
+                yield page
+
+        return export_attendance
+
+    def test_csv_export(self, test_client: TestClient, reports):
+        """Test records stream as a CSV attachment."""
+        row = {"class_id": str(CLASS_ID), "student_id": str(STUDENT_ID)}
+        reports.export_attendance = MagicMock(side_effect=self.pages([row], [row]))
+
+        response = test_client.get(
+            "/reports/attendance/export",
+            params={"class_id": [str(CLASS_ID)], "start": "2026-09-01"},
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/csv")
+        assert "attendance.csv" in response.headers["content-disposition"]
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+        assert len(rows) == 2
+        assert rows[0]["student_id"] == str(STUDENT_ID)
+        reports.export_attendance.assert_called_once_with(
+            [CLASS_ID], start=date(2026, 9, 1), end=None
+        )
+
+    def test_parquet_export(self, test_client: TestClient, reports):
+        """Test records stream as a Parquet file."""
+        import pyarrow.parquet as pq
+
+        row = {"class_id": str(CLASS_ID), "session_date": "2026-10-17"}
+        reports.export_attendance = MagicMock(side_effect=self.pages([row]))
+
+        response = test_client.get(
+            "/reports/attendance/export",
+            params={"class_id": [str(CLASS_ID)], "format": "parquet"},
+        )
+
+        assert response.status_code == 200
+        table = pq.read_table(io.BytesIO(response.content))
+        assert table.column("class_id").to_pylist() == [str(CLASS_ID)]
+
+    def test_first_page_failure_returns_503(self, test_client: TestClient, reports):
+        """Test a query failing before streaming starts returns 503."""
+
+        async def failing(class_ids, start=None, end=None):
+            raise ReportQueryError("down")
+            yield []
+
+        reports.export_attendance = MagicMock(side_effect=failing)
+
+        response = test_client.get(
+            "/reports/attendance/export", params={"class_id": [str(CLASS_ID)]}
+        )
+
+        assert response.status_code == 503
+
+    def test_untaught_class_is_forbidden(
+        self, test_client: TestClient, reports, classes
+    ):
+        """Test instructors can only export classes they all teach."""
+        other_class = uuid4()
+        reports.export_attendance = MagicMock(side_effect=self.pages([]))
+
+        response = test_client.get(
+            "/reports/attendance/export",
+            params={"class_id": [str(CLASS_ID), str(other_class)]},
+        )
+
+        assert response.status_code == 403
+        reports.export_attendance.assert_not_called()
+        classes.get_taught_class_ids.assert_awaited_once_with(
+            UUID(TEST_USER_ID), [CLASS_ID, other_class]
+        )
+
+    def test_admin_can_export_any_class(
+        self, test_client: TestClient, reports, classes
+    ):
+        """Test admins export without the classes being checked."""
+        signed_in_as(is_admin=True)
+        reports.export_attendance = MagicMock(side_effect=self.pages([]))
+
+        response = test_client.get(
+            "/reports/attendance/export", params={"class_id": [str(uuid4())]}
+        )
+
+        assert response.status_code == 200
+        classes.get_taught_class_ids.assert_not_awaited()
+
+    def test_too_many_classes_returns_422(self, test_client: TestClient, reports):
+        """Test an export of more classes than the limit is rejected."""
+        class_ids = [str(uuid4()) for _ in range(EXPORT_MAX_CLASSES + 1)]
+
+        response = test_client.get(
+            "/reports/attendance/export", params={"class_id": class_ids}
+        )
+
+        assert response.status_code == 422
+
+    def test_requires_a_class(self, test_client: TestClient, reports):
+        """Test an export without classes is rejected."""
+        response = test_client.get("/reports/attendance/export")
+
+        assert response.status_code == 422
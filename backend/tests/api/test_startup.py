@@ -0,0 +1,118 @@
+"""Unit tests for worker startup: deferred imports and pre-warming."""
+
+import logging
+import subprocess
+import sys
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app import main
+from app.api import deps
+from app.core.config import get_settings
+from app.services.recognition_service import RecognitionService
+from app.utils.ann_index import IVFIndex
+
+# Optional dependencies only some deployments use, imported on first use
+DEFERRED_MODULES = ("onnxruntime", "pyarrow", "redis")
+
+
+class TestImports:
+    """Tests for what importing the app loads."""
+
+    def test_optional_dependencies_are_deferred(self):
+        """Test importing the app does not import optional dependencies."""
+        script = (
+            "import sys, app.main; "
+            f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+        )
+
+        result = subprocess.run(
+            [sys.executable, "-c", script],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+
+        assert result.stdout.strip() == ""
+
+
+class TestPrewarm:
+    """Tests for pre-warming a worker before it accepts traffic."""
+
+    @pytest.mark.asyncio
+    async def test_loads_index_and_galleries(self, monkeypatch, caplog):
+        """Test the recognition service is built and galleries loaded."""
+        recognition = MagicMock()
+        attendance = MagicMock()
+        attendance.prewarm_galleries = AsyncMock(return_value=3)
+        monkeypatch.setattr(main, "get_recognition_service", recognition)
+        monkeypatch.setattr(main, "get_supabase", AsyncMock())
+        monkeypatch.setattr(
+            main, "get_attendance_service", MagicMock(return_value=attendance)
+        )
+
+        with caplog.at_level(logging.INFO, logger="app.main"):
+            await main.prewarm(get_settings())
+
+        recognition.assert_called_once_with()
+        attendance.prewarm_galleries.assert_awaited_once_with(
+            weeks=get_settings().prewarm_gallery_weeks
+        )
+        assert "Pre-warmed 3 class galleries" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_failure_starts_cold(self, monkeypatch, caplog):
+        """Test a failed pre-warm is logged instead of stopping startup."""
+        monkeypatch.setattr(
+            main, "get_recognition_service", MagicMock(side_effect=OSError("gone"))
+        )
+
+        with caplog.at_level(logging.ERROR, logger="app.main"):
+            await main.prewarm(get_settings())
+
+        assert "starting cold" in caplog.text
+
+
+class TestInstitutionIndexFile:
+    """Tests for saving the institution index for the next worker."""
+
+    def test_saved_on_shutdown_and_loaded(self, tmp_path, monkeypatch):
+        """Test the index a worker saves is the one the next worker loads."""
+        path = tmp_path / "index" / "institution.npz"
+        settings = get_settings()
+        monkeypatch.setattr(settings, "institution_index_path", str(path))
+        monkeypatch.setattr(settings, "face_embedding_dim", 8)
+        service = RecognitionService(institution_index=IVFIndex(8, n_lists=2))
+        getter = MagicMock(return_value=service)
+        getter.cache_info = MagicMock(return_value=MagicMock(currsize=1))
+        monkeypatch.setattr(deps, "get_recognition_service", getter)
+
+        assert deps.save_institution_index()
+
+        assert deps.load_institution_index(settings).n_lists == 2
+
+    def test_not_saved_if_never_loaded(self, tmp_path, monkeypatch):
+        """Test a worker that never built the index does not build it to save."""
+        path = tmp_path / "institution.npz"
+        monkeypatch.setattr(get_settings(), "institution_index_path", str(path))
+        getter = MagicMock()
+        getter.cache_info = MagicMock(return_value=MagicMock(currsize=0))
+        monkeypatch.setattr(deps, "get_recognition_service", getter)
+
+        assert not deps.save_institution_index()
+
+        getter.assert_not_called()
+        assert not path.exists()
+
+    def test_index_of_other_dimension_is_ignored(self, tmp_path, monkeypatch):
+        """Test a saved index built for another embedding size is rebuilt."""
+        path = tmp_path / "institution.npz"
+        IVFIndex(8, n_lists=2).save(path)
+        settings = get_settings()
+        monkeypatch.setattr(settings, "institution_index_path", str(path))
+
+        index = deps.load_institution_index(settings)
+
+        assert index.dim == settings.face_embedding_dim
+        assert len(index) == 0
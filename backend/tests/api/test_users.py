@@ -0,0 +1,148 @@
+"""Unit tests for user API routes."""
+
+import time
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_current_user, get_user_service
+from app.main import app
+from app.models.instructor import ProfileType
+from app.schemas.user import CurrentUser
+from app.services.auth_service import ProfileNotFoundError
+from app.services.profile_cache import CachedProfile
+from app.utils.pagination import Page
+from tests.conftest import TEST_EMAIL, TEST_USER_ID
+
+
+@pytest.fixture
+def users():
+    """Override the user service with a mock and authenticate as an admin."""
+    service = AsyncMock()
+    app.dependency_overrides[get_user_service] = lambda: service
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+        is_admin=True,
+    )
+    yield service
+    app.dependency_overrides.pop(get_user_service, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestListUsers:
+    """Tests for GET /users endpoint."""
+
+    def test_list_students(self, test_client: TestClient, users):
+        """Test students are listed with the requested fields."""
+        users.list_users.return_value = Page(
+            [{"id": str(UUID(int=1)), "type": "student"}], None
+        )
+
+        response = test_client.get(
+            "/users", params={"type": "student", "fields": "type"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "items": [{"id": str(UUID(int=1)), "type": "student"}],
+            "next_cursor": None,
+        }
+        users.list_users.assert_awaited_once_with(
+            100, cursor=None, fields=["type"], profile_type=ProfileType.STUDENT
+        )
+
+    def test_non_admin_is_forbidden(self, test_client: TestClient, users):
+        """Test only admins can list users."""
+        app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+            user_id=TEST_USER_ID,
+            email=TEST_EMAIL,
+            role="authenticated",
+            expires_at=int(time.time()) + 3600,
+        )
+
+        response = test_client.get("/users", params={"type": "student"})
+
+        assert response.status_code == 403
+        users.list_users.assert_not_awaited()
+
+    def test_requires_authentication(self, test_client: TestClient):
+        """Test listing users requires a bearer token."""
+        response = test_client.get("/users")
+
+        assert response.status_code == 401
+
+
+@pytest.fixture
+def current_user():
+    """Authenticate requests as the test user."""
+    app.dependency_overrides[get_current_user] = lambda: CurrentUser(
+        user_id=TEST_USER_ID,
+        email=TEST_EMAIL,
+        role="authenticated",
+        expires_at=int(time.time()) + 3600,
+    )
+    yield
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+class TestMyProfile:
+    """Tests for GET and PATCH /users/me endpoints."""
+
+    PROFILE = CachedProfile(
+        first_name="John", last_name="Doe", type=ProfileType.INSTRUCTOR
+    )
+
+    def test_get_profile(
+        self, test_client: TestClient, current_user, mock_auth_service
+    ):
+        """Test the current user's profile is returned."""
+        mock_auth_service.get_profile = AsyncMock(return_value=self.PROFILE)
+
+        response = test_client.get("/users/me")
+
+        assert response.status_code == 200
+        assert response.json() == {
+            "user_id": TEST_USER_ID,
+            "email": TEST_EMAIL,
+            "first_name": "John",
+            "last_name": "Doe",
+            "type": "instructor",
+        }
+        mock_auth_service.get_profile.assert_awaited_once_with(UUID(TEST_USER_ID))
+
+    def test_missing_profile_returns_404(
+        self, test_client: TestClient, current_user, mock_auth_service
+    ):
+        """Test a user without a profile gets 404."""
+        mock_auth_service.get_profile = AsyncMock(
+            side_effect=ProfileNotFoundError("No profile")
+        )
+
+        response = test_client.get("/users/me")
+
+        assert response.status_code == 404
+
+    def test_update_profile(
+        self, test_client: TestClient, current_user, mock_auth_service
+    ):
+        """Test the profile update is passed on and the result returned."""
+        mock_auth_service.update_profile = AsyncMock(return_value=self.PROFILE)
+
+        response = test_client.patch("/users/me", json={"bio": "Databases"})
+
+        assert response.status_code == 200
+        request = mock_auth_service.update_profile.await_args.args[1]
+        assert request.model_dump(exclude_none=True) == {"bio": "Databases"}
+
+    def test_empty_name_rejected(
+        self, test_client: TestClient, current_user, mock_auth_service
+    ):
+        """Test names cannot be blanked."""
+        response = test_client.patch("/users/me", json={"first_name": ""})
+
+        assert response.status_code == 422
@@ -1,5 +1,6 @@
 """Shared test fixtures for auth testing."""
 
+import os
 from typing import Any
 from unittest.mock import MagicMock
 from uuid import UUID
@@ -7,7 +8,12 @@ from uuid import UUID
 import pytest
 from fastapi.testclient import TestClient
 
-from app.main import app
+# Settings are required at import/call time; tests never talk to Supabase
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-service-key")
+
+from app.api.deps import get_auth_service  # noqa: E402
+from app.main import app  # noqa: E402
 
 
 # ============================================================================
@@ -127,6 +133,13 @@ def mock_supabase_client() -> MagicMock:
     # Make client.table() return appropriate mock based on table name
     client.table.side_effect = lambda name: create_table_chain(name)
 
+    # rpc("create_user_profiles").execute() returns the profiles created
+    client.rpc.side_effect = lambda name, params: MagicMock(
+        execute=MagicMock(
+            return_value=MockTableResponse(data=len(params["p_users"]))
+        )
+    )
+
     # Setup auth methods
     client.auth.sign_up.return_value = MockAuthResponse(
         user=MockUser(TEST_USER_ID, TEST_EMAIL),
@@ -160,3 +173,12 @@ def mock_supabase_client() -> MagicMock:
 def test_client() -> TestClient:
     """Create a FastAPI test client."""
     return TestClient(app)
+
+
+@pytest.fixture
+def mock_auth_service():
+    """Override the injected AuthService with a mock."""
+    service = MagicMock()
+    app.dependency_overrides[get_auth_service] = lambda: service
+    yield service
+    app.dependency_overrides.pop(get_auth_service, None)
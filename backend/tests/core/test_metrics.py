@@ -0,0 +1,156 @@
+"""Unit tests for latency histograms, spans and the metrics middleware."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.config import get_settings
+from app.core.metrics import (
+    Histogram,
+    MetricsMiddleware,
+    MetricsRegistry,
+    get_metrics,
+    server_timing,
+    span,
+)
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+@pytest.fixture
+def client(registry: MetricsRegistry) -> TestClient:
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware, registry=registry)
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: int) -> dict[str, int]:
+        with span("lookup"):
+            await asyncio.to_thread(lambda: None)
+        return {"id": item_id}
+
+    @app.get("/boom")
+    async def boom() -> None:
+        raise RuntimeError("boom")
+
+    return TestClient(app, raise_server_exceptions=False)
+
+
+# ============================================================================
+# Histogram Tests
+# ============================================================================
+
+
+class TestHistogram:
+    """Tests for Histogram observations and rendering."""
+
+    def test_render_cumulative_buckets(self):
+        """Test buckets count every observation at or below their bound."""
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, "/items")
+
+        lines = histogram.render()
+
+        assert lines == [
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{route="/items",le="0.1"} 2',
+            'latency_seconds_bucket{route="/items",le="1.0"} 3',
+            'latency_seconds_bucket{route="/items",le="+Inf"} 4',
+            'latency_seconds_sum{route="/items"} 3.65',
+            'latency_seconds_count{route="/items"} 4',
+        ]
+
+    def test_label_values_are_escaped(self):
+        """Test quotes and backslashes in label values are escaped."""
+        histogram = Histogram("latency_seconds", "Latency.", ("route",), (1.0,))
+        histogram.observe(0.5, 'a"b\\c')
+
+        assert 'route="a\\"b\\\\c"' in histogram.render()[2]
+
+    def test_count_per_label_set(self):
+        """Test each label set is its own series."""
+        histogram = Histogram("latency_seconds", "Latency.", ("span",))
+        histogram.observe(0.1, "detect")
+        histogram.observe(0.2, "detect")
+
+        assert histogram.count("detect") == 2
+        assert histogram.count("embed") == 0
+
+
+# ============================================================================
+# Span Tests
+# ============================================================================
+
+
+class TestSpans:
+    """Tests for recording spans and formatting Server-Timing."""
+
+    def test_span_records_on_error(self):
+        """Test a span is recorded even when its block raises."""
+        before = get_metrics().spans.count("test.failing")
+
+        with pytest.raises(ValueError), span("test.failing"):
+            raise ValueError("boom")
+
+        assert get_metrics().spans.count("test.failing") == before + 1
+
+    def test_server_timing_sums_repeated_spans(self):
+        """Test repeated spans are summed and the total is appended."""
+        header = server_timing(
+            [
+                ("supabase.sign_in", 0.010),
+                ("decode", 0.002),
+                ("supabase.sign_in", 0.005),
+            ],
+            0.0204,
+        )
+
+        assert header == "supabase.sign_in;dur=15.0, decode;dur=2.0, total;dur=20.4"
+
+
+# ============================================================================
+# MetricsMiddleware Tests
+# ============================================================================
+
+
+class TestMetricsMiddleware:
+    """Tests for per-request latency recording and Server-Timing headers."""
+
+    def test_records_route_template(self, client, registry):
+        """Test requests are labelled by route template, not path."""
+        client.get("/items/1")
+        client.get("/items/2")
+
+        assert registry.requests.count("GET", "/items/{item_id}", "200") == 2
+
+    def test_records_unmatched_and_failed_requests(self, client, registry):
+        """Test 404s share one label and unhandled errors count as 500."""
+        client.get("/nowhere/1")
+        client.get("/boom")
+
+        assert registry.requests.count("GET", "unmatched", "404") == 1
+        assert registry.requests.count("GET", "/boom", "500") == 1
+
+    def test_server_timing_disabled_by_default(self, client):
+        """Test no Server-Timing header is sent unless enabled."""
+        response = client.get("/items/1")
+
+        assert "server-timing" not in response.headers
+
+    def test_server_timing_lists_request_spans(self, client, monkeypatch):
+        """Test spans timed while handling the request are reported."""
+        monkeypatch.setattr(get_settings(), "server_timing_enabled", True)
+
+        response = client.get("/items/1")
+
+        names = [
+            metric.split(";")[0]
+            for metric in response.headers["server-timing"].split(", ")
+        ]
+        assert names == ["lookup", "total"]
@@ -0,0 +1,117 @@
+"""Unit tests for the sampling profiler and the event loop lag monitor."""
+
+import asyncio
+import logging
+import threading
+import time
+
+import pytest
+
+from app.core.profiling import (
+    EventLoopLagMonitor,
+    ProfilerBusyError,
+    SamplingProfiler,
+)
+
+
+def spin(stop: threading.Event) -> None:
+    """Busy loop until stopped, to be found in sampled stacks."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+# ============================================================================
+# SamplingProfiler Tests
+# ============================================================================
+
+
+class TestSamplingProfiler:
+    """Tests for sampling thread stacks into collapsed stacks."""
+
+    def test_collapsed_stacks_of_busy_thread(self):
+        """Test a busy thread shows up with its call chain, root first."""
+        stop = threading.Event()
+        worker = threading.Thread(target=spin, args=(stop,), name="spinner")
+        worker.start()
+        try:
+            profile = SamplingProfiler(interval_seconds=0.001).profile(0.1)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profile.samples > 10
+        lines = profile.collapsed().splitlines()
+        stacks = dict(line.rsplit(" ", 1) for line in lines)
+        spinning = [
+            stack.split(";")
+            for stack in stacks
+            if stack.startswith("spinner;") and "spin (" in stack.split(";")[-1]
+        ]
+        assert spinning
+        assert spinning[0][-2].startswith("Thread.run (")
+        assert "test_profiling.py:" in spinning[0][-1]
+
+    def test_duration_is_capped(self):
+        """Test a profile never runs longer than the configured maximum."""
+        profiler = SamplingProfiler(interval_seconds=0.01, max_duration_seconds=0.05)
+
+        started = time.monotonic()
+        profiler.profile(10)
+
+        assert time.monotonic() - started < 1
+
+    def test_one_profile_at_a_time(self):
+        """Test a second profile is refused while one is running."""
+        profiler = SamplingProfiler(interval_seconds=0.01)
+        running = threading.Thread(target=profiler.profile, args=(0.3,))
+        running.start()
+        time.sleep(0.05)
+        try:
+            with pytest.raises(ProfilerBusyError):
+                profiler.profile(0.01)
+        finally:
+            running.join()
+
+
+# ============================================================================
+# EventLoopLagMonitor Tests
+# ============================================================================
+
+
+class TestEventLoopLagMonitor:
+    """Tests for detecting and reporting a blocked event loop."""
+
+    @pytest.mark.asyncio
+    async def test_logs_stack_of_blocking_call(self, caplog):
+        """Test a sync call inside a coroutine is caught with its stack."""
+        monitor = EventLoopLagMonitor(threshold_seconds=0.05)
+        monitor.start()
+        await asyncio.sleep(0.05)
+
+        def blocking_call() -> None:
+            time.sleep(0.3)
+
+        with caplog.at_level(logging.WARNING, logger="app.core.profiling"):
+            blocking_call()
+            await asyncio.sleep(0.05)
+        await monitor.close()
+
+        stats = monitor.stats()
+        assert stats.stalls == 1
+        assert stats.stacks_logged == 1
+        assert stats.max_lag_ms > 200
+        assert "in blocking_call" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_idle_loop_is_not_reported(self):
+        """Test an event loop yielding regularly records no stall."""
+        monitor = EventLoopLagMonitor(threshold_seconds=0.1)
+        monitor.start()
+        for _ in range(10):
+            await asyncio.sleep(0.02)
+        await monitor.close()
+
+        stats = monitor.stats()
+        assert stats.checks > 0
+        assert stats.stalls == 0
+        assert stats.stacks_logged == 0
@@ -0,0 +1,206 @@
+"""Unit tests for local access token verification."""
+
+import time
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import jwt
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from app.core.security import JWKSCache, TokenVerificationError, TokenVerifier
+from tests.conftest import TEST_USER_ID
+
+ISSUER = "http://localhost:54321/auth/v1"
+
+
+def make_signing_key(kid: str) -> tuple[ec.EllipticCurvePrivateKey, dict[str, Any]]:
+    """Create an ES256 private key and its public JWK."""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    jwk = jwt.algorithms.ECAlgorithm.to_jwk(private_key.public_key(), as_dict=True)
+    jwk.update({"kid": kid, "alg": "ES256", "use": "sig"})
+    return private_key, jwk
+
+
+def make_token(private_key: Any, kid: str, **overrides: Any) -> str:
+    """Encode an ES256 access token with Supabase-style claims."""
+    claims = {
+        "sub": TEST_USER_ID,
+        "email": "test@example.com",
+        "role": "authenticated",
+        "aud": "authenticated",
+        "iss": ISSUER,
+        "exp": int(time.time()) + 3600,
+        **overrides,
+    }
+    return jwt.encode(claims, private_key, algorithm="ES256", headers={"kid": kid})
+
+
+@pytest.fixture
+def signing_key() -> tuple[ec.EllipticCurvePrivateKey, dict[str, Any]]:
+    return make_signing_key("key-1")
+
+
+# ============================================================================
+# TokenVerifier Tests
+# ============================================================================
+
+
+class TestTokenVerifier:
+    """Tests for TokenVerifier.verify()."""
+
+    @pytest.mark.asyncio
+    async def test_verify_valid_token(self, signing_key):
+        """Test a valid token verifies against the fetched key set."""
+        private_key, jwk = signing_key
+        fetcher = AsyncMock(return_value={"keys": [jwk]})
+        verifier = TokenVerifier(jwks=JWKSCache(fetcher), issuer=ISSUER)
+
+        claims = await verifier.verify(make_token(private_key, "key-1"))
+
+        assert claims["sub"] == TEST_USER_ID
+        fetcher.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_verify_caches_decoded_claims(self, signing_key, monkeypatch):
+        """Test repeated verification of a token skips decoding."""
+        private_key, jwk = signing_key
+        verifier = TokenVerifier(
+            jwks=JWKSCache(AsyncMock(return_value={"keys": [jwk]})), issuer=ISSUER
+        )
+        token = make_token(private_key, "key-1")
+        await verifier.verify(token)
+
+        decode = MagicMock(side_effect=AssertionError("decoded twice"))
+        monkeypatch.setattr(jwt, "decode", decode)
+        claims = await verifier.verify(token)
+
+        assert claims["sub"] == TEST_USER_ID
+
+    @pytest.mark.asyncio
+    async def test_verify_expired_token(self, signing_key):
+        """Test an expired token is rejected."""
+        private_key, jwk = signing_key
+        verifier = TokenVerifier(
+            jwks=JWKSCache(AsyncMock(return_value={"keys": [jwk]})), issuer=ISSUER
+        )
+
+        with pytest.raises(TokenVerificationError, match="expired"):
+            await verifier.verify(
+                make_token(private_key, "key-1", exp=int(time.time()) - 10)
+            )
+
+    @pytest.mark.asyncio
+    async def test_verify_wrong_issuer(self, signing_key):
+        """Test a token from another issuer is rejected."""
+        private_key, jwk = signing_key
+        verifier = TokenVerifier(
+            jwks=JWKSCache(AsyncMock(return_value={"keys": [jwk]})), issuer=ISSUER
+        )
+
+        with pytest.raises(TokenVerificationError, match="Invalid token"):
+            await verifier.verify(
+                make_token(private_key, "key-1", iss="https://evil.example.com")
+            )
+
+    @pytest.mark.asyncio
+    async def test_verify_hs256_requires_secret(self, signing_key):
+        """Test HS256 tokens are rejected unless a shared secret is configured."""
+        _, jwk = signing_key
+        token = jwt.encode(
+            {"sub": TEST_USER_ID, "aud": "authenticated", "exp": time.time() + 60},
+            "shared-secret-of-sufficient-length!",
+            algorithm="HS256",
+        )
+
+        jwks_only = TokenVerifier(jwks=JWKSCache(AsyncMock(return_value={"keys": [jwk]})))
+        with pytest.raises(TokenVerificationError, match="Unsupported"):
+            await jwks_only.verify(token)
+
+        with_secret = TokenVerifier(jwt_secret="shared-secret-of-sufficient-length!")
+        claims = await with_secret.verify(token)
+        assert claims["sub"] == TEST_USER_ID
+
+
+# ============================================================================
+# JWKSCache Tests
+# ============================================================================
+
+
+class TestJWKSCache:
+    """Tests for JWKSCache key refresh and rotation."""
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_triggers_refresh(self, signing_key):
+        """Test a rotated signing key is fetched on first sight of its kid."""
+        old_private_key, old_jwk = signing_key
+        new_private_key, new_jwk = make_signing_key("key-2")
+        fetcher = AsyncMock(
+            side_effect=[{"keys": [old_jwk]}, {"keys": [old_jwk, new_jwk]}]
+        )
+        verifier = TokenVerifier(
+            jwks=JWKSCache(fetcher, min_refresh_interval=0), issuer=ISSUER
+        )
+
+        await verifier.verify(make_token(old_private_key, "key-1"))
+        claims = await verifier.verify(make_token(new_private_key, "key-2"))
+
+        assert claims["sub"] == TEST_USER_ID
+        assert fetcher.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_kid_refresh_is_rate_limited(self, signing_key):
+        """Test unknown key ids do not refetch the key set on every request."""
+        _, jwk = signing_key
+        fetcher = AsyncMock(return_value={"keys": [jwk]})
+        cache = JWKSCache(fetcher, min_refresh_interval=60)
+
+        for _ in range(3):
+            with pytest.raises(TokenVerificationError, match="Unknown"):
+                await cache.get_key("missing")
+
+        fetcher.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_stale_keys_served_when_refresh_fails(self, signing_key):
+        """Test the last known keys are kept if the JWKS endpoint fails."""
+        _, jwk = signing_key
+        fetcher = AsyncMock(side_effect=[{"keys": [jwk]}, Exception("down")])
+        cache = JWKSCache(fetcher, ttl_seconds=0, min_refresh_interval=0)
+
+        await cache.get_key("key-1")
+        key = await cache.get_key("key-1")
+
+        assert key.key_id == "key-1"
+        assert fetcher.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_backs_off(self, signing_key, monkeypatch):
+        """Test a failing endpoint is not retried on every stale request."""
+        _, jwk = signing_key
+        now = [0.0]
+        monkeypatch.setattr(time, "monotonic", lambda: now[0])
+        fetcher = AsyncMock(side_effect=[{"keys": [jwk]}, Exception("down")])
+        cache = JWKSCache(fetcher, ttl_seconds=600, min_refresh_interval=30)
+
+        await cache.get_key("key-1")
+        now[0] = 700.0
+        for _ in range(3):
+            key = await cache.get_key("key-1")
+            now[0] += 1
+
+        assert key.key_id == "key-1"
+        assert fetcher.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_first_fetch_backs_off(self):
+        """Test requests fail fast while the first key fetch keeps failing."""
+        fetcher = AsyncMock(side_effect=Exception("down"))
+        cache = JWKSCache(fetcher, min_refresh_interval=60)
+
+        with pytest.raises(TokenVerificationError, match="Failed to fetch"):
+            await cache.get_key("key-1")
+        with pytest.raises(TokenVerificationError, match="unavailable"):
+            await cache.get_key("key-1")
+
+        fetcher.assert_awaited_once()
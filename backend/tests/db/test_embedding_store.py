@@ -0,0 +1,133 @@
+"""Unit tests for the memory-mapped embedding store."""
+
+import threading
+from pathlib import Path
+from uuid import uuid4
+
+import numpy as np
+import pytest
+
+from app.db.embedding_store import EmbeddingStore, EmbeddingStoreError
+
+DIM = 16
+
+
+@pytest.fixture
+def store_path(tmp_path: Path) -> Path:
+    return tmp_path / "embeddings.bin"
+
+
+@pytest.fixture
+def vectors() -> np.ndarray:
+    return np.random.default_rng(3).normal(size=(10, DIM)).astype(np.float32)
+
+
+class TestEmbeddingStore:
+    """Tests for EmbeddingStore append, delete, compaction and sharing."""
+
+    def test_append_and_get(self, store_path, vectors):
+        """Test appended embeddings are readable by student id."""
+        store = EmbeddingStore(store_path, DIM)
+        ids = [uuid4() for _ in range(10)]
+
+        store.append(ids, vectors)
+
+        assert len(store) == 10
+        np.testing.assert_array_equal(store.get(ids[4]), vectors[4])
+        assert store.get(uuid4()) is None
+
+    def test_get_returns_read_only_view(self, store_path, vectors):
+        """Test lookups return views into the mapped file, not copies."""
+        store = EmbeddingStore(store_path, DIM)
+        ids = [uuid4() for _ in range(10)]
+        store.append(ids, vectors)
+
+        vector = store.get(ids[0])
+
+        assert np.shares_memory(vector, store.vectors)
+        assert not vector.flags.writeable
+
+    def test_append_replaces_existing_embedding(self, store_path, vectors):
+        """Test re-appending an id tombstones its previous row."""
+        store = EmbeddingStore(store_path, DIM)
+        ids = [uuid4() for _ in range(10)]
+        store.append(ids, vectors)
+
+        store.append([ids[0]], vectors[9])
+
+        assert len(store) == 10
+        assert store.row_count == 11
+        np.testing.assert_array_equal(store.get(ids[0]), vectors[9])
+
+    def test_delete_and_compact(self, store_path, vectors):
+        """Test tombstoned rows disappear and compaction drops them."""
+        store = EmbeddingStore(store_path, DIM)
+        ids = [uuid4() for _ in range(10)]
+        store.append(ids, vectors)
+
+        assert store.delete(ids[:4]) == 4
+        assert store.tombstone_ratio() == pytest.approx(0.4)
+        assert store.compact_if_needed(0.5) == 0
+        assert store.compact_if_needed(0.25) == 4
+
+        assert store.row_count == 6
+        assert ids[0] not in store
+        found, matrix = store.get_many(ids)
+        assert found == ids[4:]
+        np.testing.assert_array_equal(matrix, vectors[4:])
+
+    def test_reopen_persists(self, store_path, vectors):
+        """Test a reopened store sees previously written rows."""
+        ids = [uuid4() for _ in range(10)]
+        EmbeddingStore(store_path, DIM).append(ids, vectors)
+
+        student_ids, matrix = EmbeddingStore(store_path, DIM).live()
+
+        assert student_ids == ids
+        np.testing.assert_array_equal(matrix, vectors)
+
+    def test_other_instance_sees_appends_and_compaction(self, store_path, vectors):
+        """Test a second mapping (another worker) picks up writes."""
+        writer = EmbeddingStore(store_path, DIM)
+        reader = EmbeddingStore(store_path, DIM)
+        ids = [uuid4() for _ in range(10)]
+
+        writer.append(ids, vectors)
+        assert len(reader) == 10
+
+        writer.delete(ids[:5])
+        assert len(reader) == 5
+
+        writer.compact()
+        assert reader.row_count == 5
+        np.testing.assert_array_equal(reader.get(ids[7]), vectors[7])
+
+    def test_reads_during_compaction_in_thread(self, store_path, vectors):
+        """Test reads racing a compaction in another thread stay consistent."""
+        store = EmbeddingStore(store_path, DIM)
+        ids = [uuid4() for _ in range(10)]
+        store.append(ids, vectors)
+        done = threading.Event()
+
+        def churn() -> None:
+            # Delete and re-add half the students, compacting each time
+            for _ in range(50):
+                store.delete(ids[5:])
+                store.compact()
+                store.append(ids[5:], vectors[5:])
+            done.set()
+
+        thread = threading.Thread(target=churn)
+        thread.start()
+        while not done.is_set():
+            found, matrix = store.get_many(ids[:5])
+            assert found == ids[:5]
+            np.testing.assert_array_equal(matrix, vectors[:5])
+        thread.join()
+
+    def test_dimension_mismatch_raises(self, store_path):
+        """Test opening a store with the wrong dimension fails."""
+        EmbeddingStore(store_path, DIM)
+
+        with pytest.raises(EmbeddingStoreError, match="dimension"):
+            EmbeddingStore(store_path, DIM * 2)
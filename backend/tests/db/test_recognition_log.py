@@ -0,0 +1,243 @@
+"""Unit tests for the on-disk recognition log."""
+
+import fcntl
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.db.recognition_log import (
+    RecognitionLogError,
+    RecognitionLogStore,
+    from_records,
+    record_dtype,
+    to_records,
+)
+from app.models.recognition_log import RecognitionCandidate, RecognitionLogEntry
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+START = datetime(2026, 10, 17, 9, tzinfo=timezone.utc)
+
+
+def make_entries(
+    count: int, students: list[UUID], offset: int = 0
+) -> list[RecognitionLogEntry]:
+    """One entry per second, assigning every other face to a student."""
+    entries = []
+    for i in range(offset, offset + count):
+        ranked = [students[(i + j) % len(students)] for j in range(3)]
+        entries.append(
+            RecognitionLogEntry(
+                recorded_at=START + timedelta(seconds=i),
+                class_id=CLASS_ID,
+                image_sha256="ab" * 32,
+                student_id=ranked[0] if i % 2 == 0 else None,
+                score=0.8 if i % 2 == 0 else None,
+                candidates=[
+                    RecognitionCandidate(student_id=student, score=0.8 - j / 10)
+                    for j, student in enumerate(ranked)
+                ],
+            )
+        )
+    return entries
+
+
+@pytest.fixture
+def students() -> list[UUID]:
+    return [uuid4() for _ in range(10)]
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> RecognitionLogStore:
+    return RecognitionLogStore(tmp_path / "log", top_k=3)
+
+
+# ============================================================================
+# Record Packing Tests
+# ============================================================================
+
+
+class TestRecords:
+    """Tests for packing log entries into fixed-width records."""
+
+    def test_round_trip(self, students):
+        """Test entries survive packing, scores to float16 precision."""
+        entries = make_entries(4, students)
+
+        unpacked = from_records(to_records(entries, top_k=3))
+
+        assert [e.recorded_at for e in unpacked] == [e.recorded_at for e in entries]
+        assert unpacked[0].student_id == entries[0].student_id
+        assert unpacked[1].student_id is None and unpacked[1].score is None
+        assert [c.student_id for c in unpacked[2].candidates] == [
+            c.student_id for c in entries[2].candidates
+        ]
+        assert unpacked[2].candidates[1].score == pytest.approx(0.7, abs=1e-3)
+        assert unpacked[0].image_sha256 == "ab" * 32
+
+    def test_short_candidate_lists_are_padded(self, students):
+        """Test entries with fewer candidates than slots keep only theirs."""
+        entry = make_entries(1, students)[0]
+        entry.candidates = entry.candidates[:1]
+
+        (unpacked,) = from_records(to_records([entry], top_k=3))
+
+        assert len(unpacked.candidates) == 1
+
+    def test_records_are_smaller_than_json(self, students):
+        """Test a packed entry takes a fraction of its JSON size."""
+        entry = make_entries(1, students)[0]
+
+        assert record_dtype(3).itemsize * 3 < len(entry.model_dump_json())
+
+
+# ============================================================================
+# RecognitionLogStore Tests
+# ============================================================================
+
+
+class TestRecognitionLogStore:
+    """Tests for RecognitionLogStore appends, segments and scans."""
+
+    def test_scan_reads_active_file(self, store, students):
+        """Test entries are readable as soon as they are appended."""
+        store.append(to_records(make_entries(5, students), top_k=3))
+
+        entries = store.query()
+
+        assert len(entries) == 5
+        assert store.active_rows == 5
+
+    def test_roll_writes_compressed_segment(self, store, students):
+        """Test rolling moves the active file into a smaller segment."""
+        store.append(to_records(make_entries(1000, students), top_k=3))
+        active_size = sum(p.stat().st_size for p in store.directory.glob("*.log"))
+
+        segment = store.roll()
+
+        assert segment is not None and segment.exists()
+        assert list(store.directory.glob("*.log")) == []
+        assert segment.stat().st_size < active_size / 4
+        (info,) = store.segments()
+        assert info.rows == 1000
+        assert info.first_recorded_at < info.last_recorded_at
+        assert len(store.query(limit=5000)) == 1000
+
+    def test_scan_by_time_range(self, store, students):
+        """Test only entries inside the range are returned, in order."""
+        store.append(to_records(make_entries(100, students), top_k=3))
+        store.roll()
+        store.append(to_records(make_entries(100, students, offset=100), top_k=3))
+
+        entries = store.query(
+            start=START + timedelta(seconds=90), end=START + timedelta(seconds=109)
+        )
+
+        assert [e.recorded_at for e in entries] == [
+            START + timedelta(seconds=i) for i in range(90, 110)
+        ]
+
+    def test_scan_by_student(self, store, students):
+        """Test a student matches entries assigning or listing them."""
+        store.append(to_records(make_entries(100, students), top_k=3))
+        store.roll()
+
+        entries = store.query(student_id=students[0])
+
+        assert entries
+        assert all(
+            entry.student_id == students[0]
+            or students[0] in {c.student_id for c in entry.candidates}
+            for entry in entries
+        )
+        assert len(entries) == 30
+
+    def test_scan_skips_segments_without_student(self, store, students, monkeypatch):
+        """Test a segment not mentioning the student is not decompressed."""
+        store.append(to_records(make_entries(50, students[:5]), top_k=3))
+        store.roll()
+        decompressed = []
+        real_decompress = zlib.decompress
+        monkeypatch.setattr(
+            zlib,
+            "decompress",
+            lambda data: decompressed.append(len(data)) or real_decompress(data),
+        )
+
+        assert store.query(student_id=students[9]) == []
+        assert len(decompressed) == 1
+
+    def test_scan_skips_segments_outside_range(self, store, students, monkeypatch):
+        """Test segments outside the time range are not read past the header."""
+        store.append(to_records(make_entries(50, students), top_k=3))
+        store.roll()
+        monkeypatch.setattr(zlib, "decompress", None)
+
+        assert store.query(start=START + timedelta(days=1)) == []
+
+    def test_roll_if_needed(self, tmp_path, students):
+        """Test the active file is rolled once it holds segment_rows entries."""
+        store = RecognitionLogStore(tmp_path / "log", top_k=3, segment_rows=10)
+        store.append(to_records(make_entries(5, students), top_k=3))
+        assert store.roll_if_needed(max_age_seconds=3600) is None
+
+        store.append(to_records(make_entries(5, students, offset=5), top_k=3))
+
+        assert store.roll_if_needed(max_age_seconds=3600) is not None
+        assert store.active_rows == 0
+
+    def test_seal_orphans_skips_live_writers(self, store, students):
+        """Test another process's locked active file is left alone."""
+        store.append(to_records(make_entries(5, students), top_k=3))
+
+        other = RecognitionLogStore(store.directory, top_k=3)
+
+        assert other.seal_orphans() == 0
+        assert len(list(store.directory.glob("*.log"))) == 1
+
+    def test_seal_orphans_seals_abandoned_files(self, store, students):
+        """Test an unlocked active file left by a dead process is sealed."""
+        store.append(to_records(make_entries(5, students), top_k=3))
+        # Simulate the writer dying: its lock goes with its file handle
+        fcntl.flock(store._active, fcntl.LOCK_UN)
+
+        other = RecognitionLogStore(store.directory, top_k=3)
+
+        assert other.seal_orphans() == 1
+        assert len(other.segments()) == 1
+        assert len(other.query()) == 5
+
+    def test_partial_record_is_ignored(self, store, students):
+        """Test a record cut short by a crash does not break reads."""
+        store.append(to_records(make_entries(3, students), top_k=3))
+        store._active.write(b"\x01" * 10)
+        store._active.flush()
+
+        assert len(store.query()) == 3
+
+    def test_invalid_segment(self, store):
+        """Test a file that is not a segment is reported."""
+        (store.directory / "bogus.seg").write_bytes(b"not a segment" * 10)
+
+        with pytest.raises(RecognitionLogError):
+            store.segments()
+
+    def test_rejects_records_of_another_layout(self, store, students):
+        """Test records packed with a different top_k are refused."""
+        with pytest.raises(ValueError):
+            store.append(to_records(make_entries(1, students), top_k=5))
+
+    def test_segments_mixing_top_k_are_readable(self, tmp_path, students):
+        """Test a store reads segments written with another candidate count."""
+        directory = tmp_path / "log"
+        old = RecognitionLogStore(directory, top_k=2)
+        old.append(to_records(make_entries(3, students), top_k=2))
+        old.roll()
+
+        store = RecognitionLogStore(directory, top_k=3)
+        store.append(to_records(make_entries(3, students, offset=3), top_k=3))
+
+        entries = store.query()
+        assert [len(e.candidates) for e in entries] == [2, 2, 2, 3, 3, 3]
@@ -0,0 +1,66 @@
+"""Unit tests for the pooled Supabase HTTP transport."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from app.db.supabase import InstrumentedTransport
+
+
+def busy_connection() -> MagicMock:
+    connection = MagicMock()
+    connection.is_available.return_value = False
+    connection.is_idle.return_value = False
+    return connection
+
+
+@pytest.fixture
+def transport(monkeypatch) -> InstrumentedTransport:
+    """Transport whose requests wait until released, without any network."""
+    release = asyncio.Event()
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200)
+
+    monkeypatch.setattr(httpx.AsyncHTTPTransport, "handle_async_request", handle)
+    transport = InstrumentedTransport(
+        limits=httpx.Limits(max_connections=1), http2=True
+    )
+    transport.release = release
+    return transport
+
+
+class TestInstrumentedTransport:
+    """Tests for InstrumentedTransport."""
+
+    @pytest.mark.asyncio
+    async def test_requests_not_capped_at_max_connections(self, transport):
+        """Test concurrent requests reach the pool, which multiplexes HTTP/2."""
+        request = httpx.Request("GET", "https://example.supabase.co/rest/v1/x")
+        tasks = [
+            asyncio.create_task(transport.handle_async_request(request))
+            for _ in range(5)
+        ]
+        await asyncio.sleep(0)
+
+        assert transport.stats().requests_in_flight == 5
+        transport.release.set()
+        await asyncio.gather(*tasks)
+        stats = transport.stats()
+        assert (stats.requests_in_flight, stats.peak_requests_in_flight) == (0, 5)
+        assert stats.requests_queued == 0
+
+    @pytest.mark.asyncio
+    async def test_saturation_read_from_pool(self, transport):
+        """Test a request is counted as queued when no connection is free."""
+        transport._pool._connections = [busy_connection()]
+        transport.release.set()
+
+        await transport.handle_async_request(
+            httpx.Request("GET", "https://example.supabase.co/rest/v1/x")
+        )
+
+        assert transport.stats().requests_queued == 1
@@ -0,0 +1,619 @@
+"""Unit tests for AttendanceService and AttendanceWriter."""
+
+import asyncio
+import io
+from datetime import date
+from pathlib import Path
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+from PIL import Image
+from postgrest.exceptions import APIError
+
+from app.db.embedding_store import EmbeddingStore
+from app.db.recognition_log import RecognitionLogStore
+from app.models.attendance import Attendance, AttendanceMethod, AttendanceStatus
+from app.services.attendance_service import (
+    ATTENDANCE_CONFLICT_COLUMNS,
+    SESSION_KEY_COLUMNS,
+    AttendanceQueueFullError,
+    AttendanceService,
+    AttendanceWriteError,
+    AttendanceWriter,
+    UnknownStudentsError,
+)
+from app.services.recognition_log_service import RecognitionLogWriter
+from app.services.recognition_service import RecognitionService
+from app.utils.ann_index import IVFIndex
+from app.utils.face_utils import FakeFaceEngine
+from app.utils.pagination import keyset_filter
+from tests.conftest import MockTableResponse
+from tests.utils.test_face_utils import class_photo
+
+DIM = 64
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+IMAGE_KEY = "ab" * 32
+SESSION = date(2026, 10, 17)
+
+
+def roster_query(student_ids: list[UUID]) -> MagicMock:
+    """Chainable class_students query returning the roster as one page."""
+    query = MagicMock()
+    rest = MagicMock()
+    for chained in (query, rest):
+        for method in ("select", "eq", "order", "limit"):
+            getattr(chained, method).return_value = chained
+    query.or_.return_value = rest
+    query.execute.return_value = MockTableResponse(
+        [{"student_id": str(student_id)} for student_id in student_ids]
+    )
+    rest.execute.return_value = MockTableResponse([])
+    return query
+
+
+def encode_png(image: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    Image.fromarray(image).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def engine() -> FakeFaceEngine:
+    return FakeFaceEngine(embedding_dim=DIM, blobs=True)
+
+
+@pytest.fixture
+def photo() -> np.ndarray:
+    return class_photo(4, 5)
+
+
+@pytest.fixture
+def roster(
+    tmp_path: Path, engine: FakeFaceEngine, photo: np.ndarray
+) -> tuple[list[UUID], EmbeddingStore]:
+    """A class of 20 students: 15 of the 20 faces in the photo, 5 absent."""
+    faces = engine.detect(photo)
+    aligned = np.stack([engine.align(photo, face) for face in faces])
+    present = engine.embed(aligned)[:15]
+    absent = np.random.default_rng(3).normal(size=(5, DIM)).astype(np.float32)
+
+    student_ids = [uuid4() for _ in range(20)]
+    store = EmbeddingStore(tmp_path / "embeddings.bin", DIM)
+    store.append(student_ids, np.concatenate([present, absent]))
+    return student_ids, store
+
+
+@pytest.fixture
+def client(roster) -> MagicMock:
+    """Supabase client returning the roster and accepting upserts."""
+    student_ids, _ = roster
+    client = MagicMock()
+    query = roster_query(student_ids)
+    client.table.return_value.select = query.select
+    upsert = client.table.return_value.upsert.return_value
+    upsert.execute.return_value = MockTableResponse([{}])
+    return client
+
+
+@pytest.fixture
+def service(roster, engine, client) -> AttendanceService:
+    _, store = roster
+    recognition = RecognitionService(institution_index=IVFIndex(DIM, n_lists=4))
+    return AttendanceService(
+        recognition, store, engine, client=client, tile_size=400, tile_overlap=200
+    )
+
+
+# ============================================================================
+# take_photo_attendance Tests
+# ============================================================================
+
+
+class TestTakePhotoAttendance:
+    """Tests for AttendanceService.take_photo_attendance()."""
+
+    @pytest.mark.asyncio
+    async def test_marks_recognized_students_present(
+        self, service, client, roster, photo
+    ):
+        """Test every enrolled face is assigned its student in one write."""
+        student_ids, _ = roster
+
+        result = await service.take_photo_attendance(
+            CLASS_ID, IMAGE_KEY, encode_png(photo), session_date=SESSION
+        )
+
+        assert result.faces_detected == 20
+        assert result.unmatched_faces == 5
+        assert {a.student_id for a in result.present} == set(student_ids[:15])
+        assert all(a.score > 0.99 for a in result.present)
+        assert {"decode", "detect", "embed", "match", "write"} <= set(
+            result.timings_ms
+        )
+
+        client.table.return_value.upsert.assert_called_once()
+        rows = client.table.return_value.upsert.call_args.args[0]
+        assert len(rows) == 15
+        assert rows[0]["class_id"] == str(CLASS_ID)
+        assert rows[0]["session_date"] == "2026-10-17"
+        assert rows[0]["status"] == AttendanceStatus.PRESENT.value
+        assert rows[0]["method"] == AttendanceMethod.CLASS_PHOTO.value
+        assert rows[0]["image_sha256"] == IMAGE_KEY
+        assert client.table.return_value.upsert.call_args.kwargs == {
+            "on_conflict": ATTENDANCE_CONFLICT_COLUMNS
+        }
+
+    @pytest.mark.asyncio
+    async def test_loaded_gallery_skips_roster_query(self, service, client, photo):
+        """Test the roster is fetched only when the gallery is not loaded."""
+        select = client.table.return_value.select
+        await service.take_photo_attendance(CLASS_ID, IMAGE_KEY, encode_png(photo))
+        roster_reads = select.call_count
+        await service.take_photo_attendance(CLASS_ID, IMAGE_KEY, encode_png(photo))
+
+        select.assert_called_with("student_id")
+        assert select.call_count == roster_reads
+
+    @pytest.mark.asyncio
+    async def test_stale_roster_is_read_again(self, service, client, photo):
+        """Test the roster is fetched again once it is older than the TTL."""
+        select = client.table.return_value.select
+        service.roster_ttl_seconds = 0.0
+        await service.take_photo_attendance(CLASS_ID, IMAGE_KEY, encode_png(photo))
+        roster_reads = select.call_count
+        await service.take_photo_attendance(CLASS_ID, IMAGE_KEY, encode_png(photo))
+
+        assert select.call_count == 2 * roster_reads
+
+    @pytest.mark.asyncio
+    async def test_roster_is_read_in_pages(self, service, roster):
+        """Test a roster longer than one page is read in full."""
+        student_ids, _ = roster
+        ordered = sorted(student_ids, key=str)
+        pages = [ordered[:8], ordered[8:16], ordered[16:], []]
+        query = roster_query([])
+        query.execute.side_effect = [
+            MockTableResponse([{"student_id": str(s)} for s in page])
+            for page in pages
+        ]
+        query.or_.return_value = query
+        service.client = MagicMock()
+        service.client.table.return_value = query
+        service.page_size = 8
+
+        gallery = await service.ensure_gallery(CLASS_ID)
+
+        assert set(gallery.roster) == set(student_ids)
+        assert query.or_.call_count == 3
+        query.limit.assert_called_with(8)
+
+    @pytest.mark.asyncio
+    async def test_no_match_writes_nothing(self, service, client):
+        """Test a photo of strangers records no attendance."""
+        strangers = class_photo(2, 2, face=100)
+
+        result = await service.take_photo_attendance(
+            CLASS_ID, IMAGE_KEY, encode_png(strangers)
+        )
+
+        assert result.present == []
+        assert result.unmatched_faces == 4
+        client.table.return_value.upsert.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_caps_faces_per_photo(self, service, photo):
+        """Test detections beyond the face limit are ignored."""
+        service.max_faces = 8
+
+        result = await service.take_photo_attendance(
+            CLASS_ID, IMAGE_KEY, encode_png(photo)
+        )
+
+        assert result.faces_detected == 8
+
+    @pytest.mark.asyncio
+    async def test_write_failure(self, service, client, photo):
+        """Test a failed upsert raises AttendanceWriteError."""
+        upsert = client.table.return_value.upsert.return_value
+        upsert.execute.side_effect = RuntimeError("connection reset")
+
+        with pytest.raises(AttendanceWriteError, match="connection reset"):
+            await service.take_photo_attendance(CLASS_ID, IMAGE_KEY, encode_png(photo))
+
+    @pytest.mark.asyncio
+    async def test_writes_through_writer(self, service, client, photo):
+        """Test records go to the write-behind queue when there is a writer."""
+        service.writer = AttendanceWriter(client=client)
+
+        result = await service.take_photo_attendance(
+            CLASS_ID, IMAGE_KEY, encode_png(photo)
+        )
+
+        assert len(service.writer) == len(result.present) == 15
+        client.table.return_value.upsert.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_logs_every_face(self, service, roster, photo, tmp_path):
+        """Test each face is logged with its candidates, matched or not."""
+        student_ids, _ = roster
+        service.log = RecognitionLogWriter(
+            RecognitionLogStore(tmp_path / "log", top_k=3)
+        )
+
+        await service.take_photo_attendance(CLASS_ID, IMAGE_KEY, encode_png(photo))
+
+        await service.log.flush()
+        entries = service.log.store.query()
+        assert len(entries) == 20
+        assigned = [entry for entry in entries if entry.student_id is not None]
+        assert {entry.student_id for entry in assigned} == set(student_ids[:15])
+        assert all(
+            entry.candidates[0].student_id == entry.student_id for entry in assigned
+        )
+        assert all(len(entry.candidates) == 3 for entry in entries)
+        assert all(entry.image_sha256 == IMAGE_KEY for entry in entries)
+
+
+# ============================================================================
+# identify_faces Tests
+# ============================================================================
+
+
+class TestIdentifyFaces:
+    """Tests for AttendanceService.identify_faces()."""
+
+    def test_faces_identified_across_institution(self, service, roster, photo):
+        """Test enrolled faces are found without knowing their class."""
+        student_ids, store = roster
+        service.recognition.load_institution_index(store)
+
+        faces = service.identify_faces(encode_png(photo), top_k=3)
+
+        assert len(faces) == 20
+        best = {face[0].student_id for face in faces if face}
+        assert set(student_ids[:15]) <= best
+
+    def test_no_faces(self, service):
+        """Test a photo without faces identifies nobody."""
+        blank = np.zeros((64, 64, 3), dtype=np.uint8)
+
+        assert service.identify_faces(encode_png(blank)) == []
+
+
+# ============================================================================
+# mark_students Tests
+# ============================================================================
+
+
+class TestMarkStudents:
+    """Tests for AttendanceService.mark_students()."""
+
+    @pytest.mark.asyncio
+    async def test_marks_are_queued(self, service, client, roster):
+        """Test manual marks are queued on the writer with their status."""
+        service.writer = AttendanceWriter(client=client)
+        student_ids, _ = roster
+
+        queued = await service.mark_students(
+            CLASS_ID,
+            [
+                (student_ids[0], AttendanceStatus.PRESENT),
+                (student_ids[1], AttendanceStatus.ABSENT),
+            ],
+            session_date=SESSION,
+        )
+        await service.writer.flush()
+
+        assert queued == 2
+        rows = client.table.return_value.upsert.call_args.args[0]
+        assert [row["status"] for row in rows] == ["present", "absent"]
+        assert {row["method"] for row in rows} == {"manual"}
+
+    @pytest.mark.asyncio
+    async def test_unknown_student_is_refused(self, service, client, roster):
+        """Test marks for students outside the class are not queued."""
+        service.writer = AttendanceWriter(client=client)
+        student_ids, _ = roster
+        select = client.table.return_value.select
+        await service.ensure_gallery(CLASS_ID)
+        roster_reads = select.call_count
+
+        with pytest.raises(UnknownStudentsError):
+            await service.mark_students(
+                CLASS_ID,
+                [
+                    (student_ids[0], AttendanceStatus.PRESENT),
+                    (uuid4(), AttendanceStatus.PRESENT),
+                ],
+            )
+
+        assert len(service.writer) == 0
+        assert select.call_count == 2 * roster_reads
+
+
+# ============================================================================
+# prewarm_galleries Tests
+# ============================================================================
+
+
+class TestPrewarmGalleries:
+    """Tests for AttendanceService.prewarm_galleries()."""
+
+    @pytest.mark.asyncio
+    async def test_loads_classes_met_on_same_weekday(self, service, roster):
+        """Test classes with a session on this weekday in past weeks load."""
+        student_ids, _ = roster
+        other_class = uuid4()
+        sessions = SessionTotalsQuery(
+            [
+                [
+                    {"class_id": str(CLASS_ID), "session_date": "2026-10-03"},
+                    {"class_id": str(CLASS_ID), "session_date": "2026-10-10"},
+                ],
+                [{"class_id": str(other_class), "session_date": "2026-10-03"}],
+            ]
+        )
+
+        def table(name: str) -> MagicMock:
+            if name != "attendance_session_totals":
+                return roster_query(student_ids)
+            return sessions
+
+        service.client = MagicMock()
+        service.client.table.side_effect = table
+
+        loaded = await service.prewarm_galleries(day=SESSION, weeks=2)
+
+        assert loaded == 2
+        assert sessions.session_dates == ["2026-10-10", "2026-10-03"]
+        assert CLASS_ID in service.recognition.galleries
+        assert other_class in service.recognition.galleries
+        assert len(service.recognition.galleries.get(CLASS_ID)) == 20
+
+
+class SessionTotalsQuery:
+    """attendance_session_totals query serving the page after its keyset."""
+
+    def __init__(self, pages: list[list[dict]]):
+        self.pages = pages
+
+    def select(self, columns: str) -> "SessionTotalsQuery":
+        self.after: str | None = None
+        return self
+
+    def in_(self, column: str, values: list[str]) -> "SessionTotalsQuery":
+        self.session_dates = values
+        return self
+
+    def or_(self, keyset: str) -> "SessionTotalsQuery":
+        self.after = keyset
+        return self
+
+    def order(self, column: str) -> "SessionTotalsQuery":
+        return self
+
+    def limit(self, count: int) -> "SessionTotalsQuery":
+        return self
+
+    def execute(self) -> MockTableResponse:
+        page = 0
+        if self.after is not None:
+            page = 1 + next(
+                i
+                for i, rows in enumerate(self.pages)
+                if keyset_filter(
+                    SESSION_KEY_COLUMNS,
+                    [rows[-1][column] for column in SESSION_KEY_COLUMNS],
+                )
+                == self.after
+            )
+        rows = self.pages[page] if page < len(self.pages) else []
+        return MockTableResponse(rows)
+
+
+# ============================================================================
+# AttendanceWriter Tests
+# ============================================================================
+
+
+def make_marks(count: int, status=AttendanceStatus.PRESENT) -> list[Attendance]:
+    return [
+        Attendance(
+            class_id=CLASS_ID,
+            student_id=UUID(int=index + 1),
+            session_date=SESSION,
+            status=status,
+            method=AttendanceMethod.MANUAL,
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.fixture
+def upserted() -> list[list[dict]]:
+    return []
+
+
+@pytest.fixture
+def writer_client(upserted) -> MagicMock:
+    """Supabase client recording the rows of every upsert."""
+    client = MagicMock()
+
+    def upsert(rows, on_conflict):
+        assert on_conflict == ATTENDANCE_CONFLICT_COLUMNS
+        query = MagicMock()
+        query.execute.side_effect = lambda: upserted.append(rows)
+        return query
+
+    client.table.return_value.upsert.side_effect = upsert
+    return client
+
+
+class TestAttendanceWriter:
+    """Tests for AttendanceWriter."""
+
+    @pytest.mark.asyncio
+    async def test_flush_writes_in_batches(self, writer_client, upserted):
+        """Test queued marks are written in upserts of at most batch_size."""
+        writer = AttendanceWriter(client=writer_client, batch_size=4)
+        await writer.submit(make_marks(10))
+
+        written = await writer.flush()
+
+        assert written == 10
+        assert [len(rows) for rows in upserted] == [4, 4, 2]
+        assert len(writer) == 0
+
+    @pytest.mark.asyncio
+    async def test_duplicate_marks_are_coalesced(self, writer_client, upserted):
+        """Test only the latest mark per student and session is written."""
+        writer = AttendanceWriter(client=writer_client)
+        await writer.submit(make_marks(3))
+        await writer.submit(make_marks(2, status=AttendanceStatus.ABSENT))
+
+        await writer.flush()
+
+        [rows] = upserted
+        assert [row["status"] for row in rows] == ["absent", "absent", "present"]
+        assert writer.stats().coalesced == 2
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_in_background(self, writer_client, upserted):
+        """Test a full batch is written without waiting for the interval."""
+        writer = AttendanceWriter(
+            client=writer_client, batch_size=5, flush_interval_seconds=60
+        )
+        writer.start()
+        try:
+            await writer.submit(make_marks(5))
+            for _ in range(100):
+                if upserted:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await writer.close()
+
+        assert [len(rows) for rows in upserted] == [5]
+
+    @pytest.mark.asyncio
+    async def test_interval_flushes_partial_batch(self, writer_client, upserted):
+        """Test a partial batch is written once the interval passes."""
+        writer = AttendanceWriter(
+            client=writer_client, batch_size=100, flush_interval_seconds=0.02
+        )
+        writer.start()
+        try:
+            await writer.submit(make_marks(3))
+            await asyncio.sleep(0.2)
+            assert [len(rows) for rows in upserted] == [3]
+        finally:
+            await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_full_queue_applies_back_pressure(self, writer_client, upserted):
+        """Test submitting to a full queue waits for a flush to make room."""
+        writer = AttendanceWriter(
+            client=writer_client, max_pending=2, enqueue_timeout_seconds=1
+        )
+        await writer.submit(make_marks(2))
+
+        blocked = asyncio.create_task(writer.submit(make_marks(3)[2:]))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+
+        await writer.flush()
+        await blocked
+        await writer.flush()
+        assert sum(len(rows) for rows in upserted) == 3
+
+    @pytest.mark.asyncio
+    async def test_full_queue_times_out(self, writer_client):
+        """Test a queue that stays full rejects new marks."""
+        writer = AttendanceWriter(
+            client=writer_client, max_pending=2, enqueue_timeout_seconds=0.05
+        )
+        await writer.submit(make_marks(2))
+
+        with pytest.raises(AttendanceQueueFullError):
+            await writer.submit(make_marks(1))
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_marks(self, writer_client, upserted):
+        """Test marks of a failed upsert are retried on the next flush."""
+        writer = AttendanceWriter(client=writer_client)
+        await writer.submit(make_marks(3))
+        upsert = writer_client.table.return_value.upsert
+        original = upsert.side_effect
+        upsert.side_effect = RuntimeError("connection reset")
+
+        with pytest.raises(AttendanceWriteError):
+            await writer.flush()
+        assert len(writer) == 3
+        assert writer.stats().failed_flushes == 1
+
+        upsert.side_effect = original
+        await writer.flush()
+        assert [len(rows) for rows in upserted] == [3]
+
+    @pytest.mark.asyncio
+    async def test_rejected_rows_are_dropped(self, writer_client, upserted):
+        """Test rows the database refuses do not hold up the rest."""
+        writer = AttendanceWriter(client=writer_client, batch_size=8)
+        marks = make_marks(10)
+        bad = {str(marks[2].student_id), str(marks[9].student_id)}
+        upsert = writer_client.table.return_value.upsert
+        accept = upsert.side_effect
+
+        def upsert_checked(rows, on_conflict):
+            if bad & {row["student_id"] for row in rows}:
+                raise APIError({"message": "violates foreign key", "code": "23503"})
+            return accept(rows, on_conflict)
+
+        upsert.side_effect = upsert_checked
+        await writer.submit(marks)
+
+        written = await writer.flush()
+
+        assert written == 8
+        assert {row["student_id"] for rows in upserted for row in rows} == {
+            str(mark.student_id) for mark in marks
+        } - bad
+        assert len(writer) == 0
+        assert writer.stats().rejected_rows == 2
+        assert await writer.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_outage_while_isolating_rejected_rows(self, writer_client, upserted):
+        """Test rows not yet written stay queued if the database goes down."""
+        writer = AttendanceWriter(client=writer_client)
+        await writer.submit(make_marks(4))
+        upsert = writer_client.table.return_value.upsert
+        accept = upsert.side_effect
+        failures = iter(
+            [APIError({"message": "violates foreign key", "code": "23503"})]
+        )
+
+        def upsert_then_fail(rows, on_conflict):
+            raise next(failures, RuntimeError("connection reset"))
+
+        upsert.side_effect = upsert_then_fail
+        with pytest.raises(AttendanceWriteError):
+            await writer.flush()
+        assert len(writer) == 4
+
+        upsert.side_effect = accept
+        assert await writer.flush() == 4
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_marks(self, writer_client, upserted):
+        """Test shutting down writes every queued mark."""
+        writer = AttendanceWriter(client=writer_client, flush_interval_seconds=60)
+        writer.start()
+        await writer.submit(make_marks(7))
+
+        await writer.close()
+
+        assert sum(len(rows) for rows in upserted) == 7
+        assert writer.stats().pending == 0
@@ -1,22 +1,33 @@
 """Unit tests for AuthService."""
 
-from unittest.mock import MagicMock
-from uuid import UUID
+import asyncio
+import threading
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
 
 import pytest
+from supabase import AsyncClient, AuthApiError
 
+from app.core.metrics import get_metrics
 from app.models.instructor import ProfileType
 from app.schemas.user import (
     InstructorSignupRequest,
     LoginRequest,
+    ProfileUpdateRequest,
     RefreshRequest,
 )
 from app.services.auth_service import (
     AuthService,
+    AuthUserCleanup,
+    AuthUserCleanupStats,
+    BulkSignupError,
     LoginError,
+    ProfileNotFoundError,
     RefreshError,
     SignupError,
+    parse_bulk_signup_csv,
 )
+from app.services.profile_cache import ProfileCache
 from tests.conftest import (
     MockAuthResponse,
     MockSession,
@@ -80,64 +91,61 @@ class TestSignupInstructor:
         mock_supabase_client.auth.admin.delete_user.assert_not_called()
 
     @pytest.mark.asyncio
-    async def test_signup_instructor_profile_failure_triggers_rollback(
+    async def test_signup_instructor_writes_records_in_one_call(
         self, mock_supabase_client: MagicMock, sample_signup_data: dict
     ):
-        """Test that profile insert failure triggers auth user deletion."""
-        # Configure profile insert to fail
-        profiles_table = MagicMock()
-        profiles_table.insert.return_value.execute.return_value = MockTableResponse(
-            data=None
-        )
-
-        instructors_table = MagicMock()
-        instructors_table.insert.return_value.execute.return_value = MockTableResponse(
-            data=[{"id": TEST_USER_ID}]
-        )
+        """Test profile and instructor records are written with one RPC."""
+        auth_service = AuthService(client=mock_supabase_client)
+        request = InstructorSignupRequest(**sample_signup_data)
 
-        def table_router(name: str) -> MagicMock:
-            if name == "profiles":
-                return profiles_table
-            return instructors_table
+        await auth_service.signup_instructor(request)
+
+        mock_supabase_client.rpc.assert_called_once()
+        name, params = mock_supabase_client.rpc.call_args.args
+        assert name == "create_user_profiles"
+        assert params["p_users"] == [
+            {
+                "id": TEST_USER_ID,
+                "first_name": "John",
+                "last_name": "Doe",
+                "bio": sample_signup_data["bio"],
+                "type": "instructor",
+                "department": sample_signup_data["department"],
+                "office_location": sample_signup_data["office_location"],
+            }
+        ]
+        mock_supabase_client.table.assert_not_called()
 
-        mock_supabase_client.table.side_effect = table_router
+    @pytest.mark.asyncio
+    async def test_signup_instructor_profile_failure_triggers_rollback(
+        self, mock_supabase_client: MagicMock, sample_signup_data: dict
+    ):
+        """Test that a profile write creating no rows deletes the auth user."""
+        mock_supabase_client.rpc.side_effect = None
+        mock_supabase_client.rpc.return_value.execute.return_value = (
+            MockTableResponse(data=0)
+        )
 
         auth_service = AuthService(client=mock_supabase_client)
         request = InstructorSignupRequest(**sample_signup_data)
 
-        with pytest.raises(SignupError, match="Failed to create profile record"):
+        with pytest.raises(SignupError, match="Failed to create profile records"):
             await auth_service.signup_instructor(request)
 
         # Verify auth user was deleted for rollback
         mock_supabase_client.auth.admin.delete_user.assert_called_once_with(TEST_USER_ID)
 
     @pytest.mark.asyncio
-    async def test_signup_instructor_instructor_failure_triggers_rollback(
+    async def test_signup_instructor_database_error_triggers_rollback(
         self, mock_supabase_client: MagicMock, sample_signup_data: dict
     ):
-        """Test that instructor insert failure triggers auth user deletion."""
-        # Configure instructor insert to fail
-        profiles_table = MagicMock()
-        profiles_table.insert.return_value.execute.return_value = MockTableResponse(
-            data=[{"id": TEST_USER_ID}]
-        )
-
-        instructors_table = MagicMock()
-        instructors_table.insert.return_value.execute.return_value = MockTableResponse(
-            data=None
-        )
-
-        def table_router(name: str) -> MagicMock:
-            if name == "profiles":
-                return profiles_table
-            return instructors_table
-
-        mock_supabase_client.table.side_effect = table_router
+        """Test that a failing profile write deletes the auth user."""
+        mock_supabase_client.rpc.side_effect = Exception("Database connection lost")
 
         auth_service = AuthService(client=mock_supabase_client)
         request = InstructorSignupRequest(**sample_signup_data)
 
-        with pytest.raises(SignupError, match="Failed to create instructor record"):
+        with pytest.raises(SignupError, match="Database connection lost"):
             await auth_service.signup_instructor(request)
 
         # Verify auth user was deleted for rollback
@@ -148,18 +156,37 @@ class TestSignupInstructor:
         self, mock_supabase_client: MagicMock, sample_signup_data: dict
     ):
         """Test that unexpected exceptions still trigger rollback."""
-        # Configure table insert to raise an unexpected exception
-        mock_supabase_client.table.side_effect = Exception("Database connection lost")
+        mock_supabase_client.rpc.side_effect = None
+        mock_supabase_client.rpc.return_value.execute.return_value = None
 
         auth_service = AuthService(client=mock_supabase_client)
         request = InstructorSignupRequest(**sample_signup_data)
 
-        with pytest.raises(SignupError, match="Signup failed"):
+        with pytest.raises(SignupError):
             await auth_service.signup_instructor(request)
 
         # Verify auth user was deleted for rollback
         mock_supabase_client.auth.admin.delete_user.assert_called_once_with(TEST_USER_ID)
 
+    @pytest.mark.asyncio
+    async def test_failed_rollback_is_queued_for_retry(
+        self, mock_supabase_client: MagicMock, sample_signup_data: dict
+    ):
+        """Test an auth user that cannot be deleted goes to the cleanup queue."""
+        mock_supabase_client.rpc.side_effect = Exception("Database connection lost")
+        mock_supabase_client.auth.admin.delete_user.side_effect = Exception(
+            "Auth unavailable"
+        )
+        cleanup = AuthUserCleanup(mock_supabase_client)
+
+        auth_service = AuthService(client=mock_supabase_client, cleanup=cleanup)
+        with pytest.raises(SignupError):
+            await auth_service.signup_instructor(
+                InstructorSignupRequest(**sample_signup_data)
+            )
+
+        assert cleanup.stats().pending == 1
+
 
 # ============================================================================
 # login Tests
@@ -194,6 +221,20 @@ class TestLogin:
         assert result.last_name == "Doe"
         assert result.type == ProfileType.INSTRUCTOR
 
+    @pytest.mark.asyncio
+    async def test_login_times_supabase_round_trips(
+        self, mock_supabase_client: MagicMock, sample_login_data: dict
+    ):
+        """Test the sign-in and profile lookups are recorded as spans."""
+        spans = get_metrics().spans
+        before = [spans.count(f"supabase.{op}") for op in ("sign_in", "get_profile")]
+        auth_service = AuthService(client=mock_supabase_client)
+
+        await auth_service.login(LoginRequest(**sample_login_data))
+
+        after = [spans.count(f"supabase.{op}") for op in ("sign_in", "get_profile")]
+        assert after == [before[0] + 1, before[1] + 1]
+
     @pytest.mark.asyncio
     async def test_login_invalid_credentials(
         self, mock_supabase_client: MagicMock, sample_login_data: dict
@@ -247,6 +288,88 @@ class TestLogin:
             await auth_service.login(request)
 
 
+# ============================================================================
+# Profile Cache Tests
+# ============================================================================
+
+
+def profile_table_calls(client: MagicMock) -> int:
+    return [call.args[0] for call in client.table.call_args_list].count("profiles")
+
+
+class TestProfileCaching:
+    """Tests for AuthService with a profile cache."""
+
+    @pytest.mark.asyncio
+    async def test_repeat_login_skips_profile_query(
+        self, mock_supabase_client: MagicMock, sample_login_data: dict
+    ):
+        """Test only the first login reads the profiles table."""
+        auth_service = AuthService(mock_supabase_client, profiles=ProfileCache())
+        request = LoginRequest(**sample_login_data)
+
+        first = await auth_service.login(request)
+        second = await auth_service.login(request)
+
+        assert profile_table_calls(mock_supabase_client) == 1
+        assert (second.first_name, second.type) == (first.first_name, first.type)
+
+    @pytest.mark.asyncio
+    async def test_signup_fills_cache(
+        self,
+        mock_supabase_client: MagicMock,
+        sample_signup_data: dict,
+        sample_login_data: dict,
+    ):
+        """Test logging in right after signup needs no profile query."""
+        auth_service = AuthService(mock_supabase_client, profiles=ProfileCache())
+        await auth_service.signup_instructor(
+            InstructorSignupRequest(**sample_signup_data)
+        )
+        inserts = profile_table_calls(mock_supabase_client)
+
+        result = await auth_service.login(LoginRequest(**sample_login_data))
+
+        assert profile_table_calls(mock_supabase_client) == inserts
+        assert result.first_name == sample_signup_data["first_name"]
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_cache(self, mock_supabase_client: MagicMock):
+        """Test a profile update drops the cached copy."""
+        profiles = ProfileCache()
+        auth_service = AuthService(mock_supabase_client, profiles=profiles)
+        user_id = UUID(TEST_USER_ID)
+        await auth_service.get_profile(user_id)
+        table = MagicMock()
+        table.update.return_value.eq.return_value.execute.return_value = (
+            MockTableResponse(
+                [{"first_name": "Jane", "last_name": "Doe", "type": "instructor"}]
+            )
+        )
+        mock_supabase_client.table.side_effect = lambda name: table
+
+        updated = await auth_service.update_profile(
+            user_id, ProfileUpdateRequest(first_name="Jane")
+        )
+
+        table.update.assert_called_once_with({"first_name": "Jane"})
+        assert updated.first_name == "Jane"
+        assert await profiles.get(user_id) is None
+
+    @pytest.mark.asyncio
+    async def test_missing_profile(self, mock_supabase_client: MagicMock):
+        """Test a user without a profile raises ProfileNotFoundError."""
+        select_chain = mock_supabase_client.table("profiles").select.return_value
+        select_chain.execute.return_value = MockTableResponse(data=None)
+        mock_supabase_client.table.side_effect = None
+        mock_supabase_client.table.return_value.select.return_value = select_chain
+
+        auth_service = AuthService(mock_supabase_client, profiles=ProfileCache())
+
+        with pytest.raises(ProfileNotFoundError):
+            await auth_service.get_profile(UUID(TEST_USER_ID))
+
+
 # ============================================================================
 # refresh_token Tests
 # ============================================================================
@@ -305,3 +428,323 @@ class TestRefreshToken:
 
         with pytest.raises(RefreshError, match="Token refresh failed"):
             await auth_service.refresh_token(request)
+
+
+# ============================================================================
+# Auth User Cleanup Tests
+# ============================================================================
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestAuthUserCleanup:
+    """Tests for the AuthUserCleanup retry queue."""
+
+    @pytest.mark.asyncio
+    async def test_retries_with_backoff_until_deleted(
+        self, mock_supabase_client: MagicMock
+    ):
+        """Test a failed delete waits out its backoff before the next try."""
+        delete_user = mock_supabase_client.auth.admin.delete_user
+        delete_user.side_effect = [Exception("down"), Exception("down"), None]
+        clock = FakeClock()
+        cleanup = AuthUserCleanup(
+            mock_supabase_client, base_delay_seconds=1.0, clock=clock
+        )
+        cleanup.submit(UUID(TEST_USER_ID))
+
+        assert await cleanup.retry_due() == 0
+        clock.now = 0.5
+        assert await cleanup.retry_due() == 0
+        assert delete_user.call_count == 1
+
+        clock.now = 1.0
+        assert await cleanup.retry_due() == 0
+        clock.now = 2.5
+        assert await cleanup.retry_due() == 0
+        assert delete_user.call_count == 2
+
+        clock.now = 3.0
+        assert await cleanup.retry_due() == 1
+        assert cleanup.stats() == AuthUserCleanupStats(
+            pending=0, deleted=1, retries=2, abandoned=0
+        )
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self, mock_supabase_client: MagicMock):
+        """Test a user that can never be deleted is dropped from the queue."""
+        mock_supabase_client.auth.admin.delete_user.side_effect = Exception("down")
+        cleanup = AuthUserCleanup(mock_supabase_client, max_attempts=3)
+        cleanup.submit(UUID(TEST_USER_ID))
+
+        for _ in range(3):
+            await cleanup.retry_due(force=True)
+
+        assert cleanup.stats() == AuthUserCleanupStats(
+            pending=0, deleted=0, retries=2, abandoned=1
+        )
+
+    @pytest.mark.asyncio
+    async def test_already_deleted_user_counts_as_deleted(
+        self, mock_supabase_client: MagicMock
+    ):
+        """Test a user the auth server no longer has leaves the queue."""
+        mock_supabase_client.auth.admin.delete_user.side_effect = AuthApiError(
+            "User not found", 404, "user_not_found"
+        )
+        cleanup = AuthUserCleanup(mock_supabase_client)
+        cleanup.submit(UUID(TEST_USER_ID))
+
+        assert await cleanup.retry_due() == 1
+        assert len(cleanup) == 0
+
+    @pytest.mark.asyncio
+    async def test_background_task_deletes_submitted_users(
+        self, mock_supabase_client: MagicMock
+    ):
+        """Test a started queue deletes users without being polled."""
+        cleanup = AuthUserCleanup(mock_supabase_client)
+        cleanup.start()
+        try:
+            cleanup.submit(UUID(TEST_USER_ID))
+            for _ in range(100):
+                if cleanup.deleted:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await cleanup.close()
+
+        mock_supabase_client.auth.admin.delete_user.assert_called_once_with(
+            TEST_USER_ID
+        )
+
+    @pytest.mark.asyncio
+    async def test_close_tries_pending_users_once_more(
+        self, mock_supabase_client: MagicMock
+    ):
+        """Test shutdown retries users whose backoff has not passed yet."""
+        delete_user = mock_supabase_client.auth.admin.delete_user
+        delete_user.side_effect = [Exception("down"), None]
+        cleanup = AuthUserCleanup(mock_supabase_client, base_delay_seconds=60.0)
+        cleanup.submit(UUID(TEST_USER_ID))
+        await cleanup.retry_due()
+
+        await cleanup.close()
+
+        assert delete_user.call_count == 2
+        assert len(cleanup) == 0
+
+
+# ============================================================================
+# Bulk Signup Tests
+# ============================================================================
+
+BULK_CSV = """email,first_name,last_name,type,department
+ada@example.com,Ada,Lovelace,instructor,Mathematics
+alan@example.com,Alan,Turing,student,
+"""
+
+
+def created_users(client: MagicMock) -> None:
+    """Make admin.create_user return a fresh user id for every call."""
+    client.auth.admin.create_user.side_effect = lambda attributes: MockAuthResponse(
+        user=MockUser(str(uuid4()), attributes["email"])
+    )
+
+
+class TestParseBulkSignupCsv:
+    """Tests for parse_bulk_signup_csv()."""
+
+    def test_reads_rows_with_line_numbers(self):
+        """Test every valid line becomes a row tagged with its line."""
+        rows, failures = parse_bulk_signup_csv(BULK_CSV, max_rows=10)
+
+        assert failures == []
+        assert [line for line, _ in rows] == [2, 3]
+        assert rows[0][1].type == ProfileType.INSTRUCTOR
+        assert rows[0][1].department == "Mathematics"
+        assert rows[1][1].department is None
+
+    def test_invalid_and_duplicate_lines_fail_alone(self):
+        """Test bad lines are reported without rejecting the file."""
+        text = BULK_CSV + (
+            "not-an-email,Grace,Hopper,instructor,\n"
+            "ADA@example.com,Ada,King,student,\n"
+            "kat@example.com,Katherine,Johnson,admin,\n"
+        )
+
+        rows, failures = parse_bulk_signup_csv(text, max_rows=10)
+
+        assert len(rows) == 2
+        assert [(f.line, f.email) for f in failures] == [
+            (4, "not-an-email"),
+            (5, "ADA@example.com"),
+            (6, "kat@example.com"),
+        ]
+        assert failures[1].error == "Duplicate email"
+        assert failures[2].error.startswith("type:")
+
+    def test_missing_required_column(self):
+        """Test a header without a required column rejects the file."""
+        with pytest.raises(BulkSignupError, match="type"):
+            parse_bulk_signup_csv("email,first_name,last_name\n", max_rows=10)
+
+    def test_too_many_rows(self):
+        """Test a file over the row limit is rejected."""
+        with pytest.raises(BulkSignupError, match="At most 1 users"):
+            parse_bulk_signup_csv(BULK_CSV, max_rows=1)
+
+
+class TestBulkSignup:
+    """Tests for AuthService.bulk_signup()."""
+
+    @pytest.mark.asyncio
+    async def test_writes_one_profile_call_per_batch(
+        self, mock_supabase_client: MagicMock
+    ):
+        """Test profiles are written in batches, not one call per user."""
+        created_users(mock_supabase_client)
+        text = "email,first_name,last_name,type\n" + "".join(
+            f"user{i}@example.com,First,Last,student\n" for i in range(5)
+        )
+        rows, _ = parse_bulk_signup_csv(text, max_rows=10)
+        auth_service = AuthService(mock_supabase_client, bulk_batch_size=2)
+
+        result = await auth_service.bulk_signup(rows)
+
+        assert [c.line for c in result.created] == [2, 3, 4, 5, 6]
+        assert result.failed == []
+        batches = [
+            len(call.args[1]["p_users"])
+            for call in mock_supabase_client.rpc.call_args_list
+        ]
+        assert batches == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_auth_failure_fails_only_its_line(
+        self, mock_supabase_client: MagicMock
+    ):
+        """Test a user the auth server rejects does not stop its batch."""
+
+        def create_user(attributes: dict) -> MockAuthResponse:
+            if attributes["email"] == "ada@example.com":
+                raise Exception("User already registered")
+            return MockAuthResponse(user=MockUser(str(uuid4()), attributes["email"]))
+
+        mock_supabase_client.auth.admin.create_user.side_effect = create_user
+        rows, _ = parse_bulk_signup_csv(BULK_CSV, max_rows=10)
+
+        result = await AuthService(mock_supabase_client).bulk_signup(rows)
+
+        assert [c.email for c in result.created] == ["alan@example.com"]
+        assert [(f.line, f.email) for f in result.failed] == [(2, "ada@example.com")]
+        assert "already registered" in result.failed[0].error
+
+    @pytest.mark.asyncio
+    async def test_profile_failure_fails_and_deletes_batch(
+        self, mock_supabase_client: MagicMock
+    ):
+        """Test a failed profile write rolls back every user of the batch."""
+        created_users(mock_supabase_client)
+        mock_supabase_client.rpc.side_effect = Exception("Database connection lost")
+        rows, _ = parse_bulk_signup_csv(BULK_CSV, max_rows=10)
+
+        result = await AuthService(mock_supabase_client).bulk_signup(rows)
+
+        assert result.created == []
+        assert [f.line for f in result.failed] == [2, 3]
+        assert mock_supabase_client.auth.admin.delete_user.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_password_is_optional(self, mock_supabase_client: MagicMock):
+        """Test users are created confirmed, with a password only if given."""
+        created_users(mock_supabase_client)
+        text = (
+            "email,first_name,last_name,type,password\n"
+            "ada@example.com,Ada,Lovelace,student,\n"
+            "alan@example.com,Alan,Turing,student,enigma-1912\n"
+        )
+        rows, _ = parse_bulk_signup_csv(text, max_rows=10)
+
+        await AuthService(mock_supabase_client).bulk_signup(rows)
+
+        attributes = [
+            call.args[0]
+            for call in mock_supabase_client.auth.admin.create_user.call_args_list
+        ]
+        assert attributes == [
+            {"email": "ada@example.com", "email_confirm": True},
+            {
+                "email": "alan@example.com",
+                "email_confirm": True,
+                "password": "enigma-1912",
+            },
+        ]
+
+
+# ============================================================================
+# Event Loop Offloading Tests
+# ============================================================================
+
+
+class TestClientOffloading:
+    """Tests for how AuthService dispatches sync and async client calls."""
+
+    @pytest.mark.asyncio
+    async def test_sync_client_calls_run_off_event_loop_thread(
+        self, mock_supabase_client: MagicMock, sample_login_data: dict
+    ):
+        """Test sync client calls are offloaded to the worker thread pool."""
+        loop_thread = threading.get_ident()
+        call_threads: list[int] = []
+
+        def sign_in(credentials: dict) -> MockAuthResponse:
+            call_threads.append(threading.get_ident())
+            return MockAuthResponse(
+                user=MockUser(TEST_USER_ID, TEST_EMAIL),
+                session=MockSession(),
+            )
+
+        mock_supabase_client.auth.sign_in_with_password.side_effect = sign_in
+
+        auth_service = AuthService(client=mock_supabase_client)
+        await auth_service.login(LoginRequest(**sample_login_data))
+
+        assert call_threads and call_threads[0] != loop_thread
+
+    @pytest.mark.asyncio
+    async def test_login_with_async_client(self, sample_login_data: dict):
+        """Test login awaits the async client natively."""
+        client = MagicMock(spec=AsyncClient)
+        client.auth = MagicMock()
+        client.auth.sign_in_with_password = AsyncMock(
+            return_value=MockAuthResponse(
+                user=MockUser(TEST_USER_ID, TEST_EMAIL),
+                session=MockSession(),
+            )
+        )
+        select_chain = MagicMock()
+        select_chain.eq.return_value = select_chain
+        select_chain.single.return_value = select_chain
+        select_chain.execute = AsyncMock(
+            return_value=MockTableResponse(
+                data={"first_name": "John", "last_name": "Doe", "type": "instructor"}
+            )
+        )
+        client.table.return_value.select.return_value = select_chain
+
+        auth_service = AuthService(client=client)
+        result = await auth_service.login(LoginRequest(**sample_login_data))
+
+        client.auth.sign_in_with_password.assert_awaited_once_with(
+            {"email": TEST_EMAIL, "password": sample_login_data["password"]}
+        )
+        select_chain.execute.assert_awaited_once()
+        assert result.user_id == UUID(TEST_USER_ID)
+        assert result.type == ProfileType.INSTRUCTOR
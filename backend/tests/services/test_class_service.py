@@ -0,0 +1,153 @@
+"""Unit tests for ClassService."""
+
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import pytest
+
+from app.services.class_service import (
+    ClassNotFoundError,
+    ClassQueryError,
+    ClassService,
+)
+from app.utils.pagination import PaginationError
+from tests.conftest import MockTableResponse
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+INSTRUCTOR_ID = UUID("12345678-1234-1234-1234-123456789012")
+
+
+def chain(rows: list[dict]) -> MagicMock:
+    """Chainable query returning rows."""
+    query = MagicMock()
+    for method in ("select", "eq", "in_", "or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.return_value = MockTableResponse(rows)
+    return query
+
+
+def roster_row(i: int) -> dict:
+    return {
+        "student_id": str(UUID(int=i)),
+        "profiles": {"first_name": f"Student {i}", "last_name": "Doe"},
+    }
+
+
+class TestGetInstructorId:
+    """Tests for ClassService.get_instructor_id()."""
+
+    @pytest.mark.asyncio
+    async def test_returns_instructor(self):
+        """Test the class's instructor id is read by the class id."""
+        query = chain([{"instructor_id": str(INSTRUCTOR_ID)}])
+        client = MagicMock()
+        client.table.return_value = query
+
+        instructor_id = await ClassService(client).get_instructor_id(CLASS_ID)
+
+        assert instructor_id == INSTRUCTOR_ID
+        query.eq.assert_called_once_with("id", str(CLASS_ID))
+
+    @pytest.mark.asyncio
+    async def test_unknown_class_raises(self):
+        """Test a class that does not exist raises ClassNotFoundError."""
+        client = MagicMock()
+        client.table.return_value = chain([])
+
+        with pytest.raises(ClassNotFoundError):
+            await ClassService(client).get_instructor_id(CLASS_ID)
+
+
+class TestGetTaughtClassIds:
+    """Tests for ClassService.get_taught_class_ids()."""
+
+    @pytest.mark.asyncio
+    async def test_filters_by_instructor(self):
+        """Test only the classes the instructor teaches are returned."""
+        other_class = UUID(int=7)
+        query = chain([{"id": str(CLASS_ID)}])
+        client = MagicMock()
+        client.table.return_value = query
+
+        taught = await ClassService(client).get_taught_class_ids(
+            INSTRUCTOR_ID, [CLASS_ID, other_class]
+        )
+
+        assert taught == {CLASS_ID}
+        query.in_.assert_called_once_with("id", [str(CLASS_ID), str(other_class)])
+        query.eq.assert_called_once_with("instructor_id", str(INSTRUCTOR_ID))
+
+
+class TestListStudents:
+    """Tests for ClassService.list_students()."""
+
+    @pytest.mark.asyncio
+    async def test_projects_profile_fields(self):
+        """Test only requested profile fields are read and flattened."""
+        query = chain([roster_row(1), roster_row(2)])
+        client = MagicMock()
+        client.table.return_value = query
+
+        page = await ClassService(client).list_students(
+            CLASS_ID, limit=10, fields=["first_name"]
+        )
+
+        query.select.assert_called_once_with("student_id,profiles(first_name)")
+        query.eq.assert_called_once_with("class_id", str(CLASS_ID))
+        assert page.items[0] == {
+            "student_id": str(UUID(int=1)),
+            "first_name": "Student 1",
+        }
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_next_page_after_cursor(self):
+        """Test a full page gives a cursor that reads after its last row."""
+        query = chain([roster_row(i) for i in range(1, 4)])
+        client = MagicMock()
+        client.table.return_value = query
+        service = ClassService(client)
+
+        page = await service.list_students(CLASS_ID, limit=2, fields=["student_id"])
+        query.execute.return_value = MockTableResponse([roster_row(3)])
+        await service.list_students(CLASS_ID, limit=2, cursor=page.next_cursor)
+
+        assert len(page.items) == 2
+        query.limit.assert_called_with(3)
+        query.or_.assert_called_once_with(f'student_id.gt."{UUID(int=2)}"')
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor(self):
+        """Test a malformed cursor raises PaginationError."""
+        with pytest.raises(PaginationError):
+            await ClassService(MagicMock()).list_students(
+                CLASS_ID, limit=10, cursor="garbage"
+            )
+
+
+class TestListClasses:
+    """Tests for ClassService.list_classes()."""
+
+    @pytest.mark.asyncio
+    async def test_instructor_filter(self):
+        """Test classes can be listed for one instructor."""
+        query = chain([{"id": str(CLASS_ID), "name": "Databases"}])
+        client = MagicMock()
+        client.table.return_value = query
+
+        page = await ClassService(client).list_classes(
+            limit=10, fields=["name"], instructor_id=INSTRUCTOR_ID
+        )
+
+        query.select.assert_called_once_with("id,name")
+        query.eq.assert_called_once_with("instructor_id", str(INSTRUCTOR_ID))
+        assert page.items == [{"id": str(CLASS_ID), "name": "Databases"}]
+
+    @pytest.mark.asyncio
+    async def test_read_failure(self):
+        """Test a failing query raises ClassQueryError."""
+        client = MagicMock()
+        client.table.side_effect = RuntimeError("timeout")
+
+        with pytest.raises(ClassQueryError):
+            await ClassService(client).list_classes(limit=10)
@@ -0,0 +1,227 @@
+"""Unit tests for EnrollmentService."""
+
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.db.embedding_store import EmbeddingStore
+from app.services.enrollment_service import (
+    BatchEnrollmentPipeline,
+    EnrollmentService,
+    StudentPhotos,
+)
+from app.services.recognition_service import RecognitionService
+from app.utils.ann_index import IVFIndex
+
+DIM = 32
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+
+
+@pytest.fixture
+def enrollment(tmp_path: Path) -> EnrollmentService:
+    store = EmbeddingStore(tmp_path / "embeddings.bin", DIM)
+    recognition = RecognitionService(institution_index=IVFIndex(DIM, n_lists=4))
+    return EnrollmentService(store, recognition)
+
+
+@pytest.fixture
+def templates() -> np.ndarray:
+    return np.random.default_rng(5).normal(size=(6, DIM)).astype(np.float32)
+
+
+# ============================================================================
+# Template Storage Tests
+# ============================================================================
+
+
+class TestSaveTemplates:
+    """Tests for EnrollmentService.save_templates() and remove_students()."""
+
+    def test_save_templates_makes_students_matchable(self, enrollment, templates):
+        """Test saved templates are stored and indexed institution-wide."""
+        ids = [uuid4() for _ in range(6)]
+
+        enrollment.save_templates(ids, templates)
+
+        assert len(enrollment.store) == 6
+        [matches] = enrollment.recognition.identify(templates[2])
+        assert matches[0].student_id == ids[2]
+
+    def test_save_templates_reloads_class_gallery(self, enrollment, templates):
+        """Test re-enrolling a student refreshes galleries containing them."""
+        ids = [uuid4() for _ in range(6)]
+        enrollment.save_templates(ids, templates)
+        enrollment.recognition.load_class_gallery(CLASS_ID, ids, enrollment.store)
+
+        enrollment.save_templates([ids[0]], templates[5:6] * -1)
+
+        gallery = enrollment.recognition.galleries.get(CLASS_ID)
+        assert gallery.version == 2
+        [matches] = enrollment.recognition.match_class(CLASS_ID, templates[5] * -1)
+        assert matches[0].student_id == ids[0]
+
+    def test_save_templates_invalidates_cached_results(self, enrollment, templates):
+        """Test re-enrollment drops cached results for affected classes."""
+        ids = [uuid4() for _ in range(6)]
+        enrollment.save_templates(ids, templates)
+        recognition = enrollment.recognition
+        gallery = recognition.load_class_gallery(CLASS_ID, ids, enrollment.store)
+        recognition.results.put(("photo", CLASS_ID, gallery.version, 1), [])
+
+        enrollment.save_templates([ids[0]], templates[5:6])
+
+        assert len(recognition.results) == 0
+        assert recognition.results.stats().invalidations == 1
+
+    def test_late_enrollee_joins_class_gallery(self, enrollment, templates):
+        """Test a rostered student enrolled after the gallery loaded is added."""
+        ids = [uuid4() for _ in range(6)]
+        enrollment.save_templates(ids[:5], templates[:5])
+        enrollment.recognition.load_class_gallery(CLASS_ID, ids, enrollment.store)
+
+        enrollment.save_templates([ids[5]], templates[5:])
+
+        assert len(enrollment.recognition.galleries.get(CLASS_ID)) == 6
+        [matches] = enrollment.recognition.match_class(CLASS_ID, templates[5])
+        assert matches[0].student_id == ids[5]
+
+    def test_enrollment_by_other_worker_reloads_gallery(
+        self, enrollment, templates, tmp_path
+    ):
+        """Test a gallery is reloaded once another process writes the store."""
+        ids = [uuid4() for _ in range(6)]
+        enrollment.save_templates(ids[:5], templates[:5])
+        recognition = enrollment.recognition
+        loaded = recognition.load_class_gallery(CLASS_ID, ids, enrollment.store)
+        other_worker = EmbeddingStore(tmp_path / "embeddings.bin", DIM)
+
+        assert recognition.current_gallery(CLASS_ID, enrollment.store) is loaded
+        other_worker.append([ids[5]], templates[5:])
+        gallery = recognition.current_gallery(CLASS_ID, enrollment.store)
+
+        assert gallery.version > loaded.version
+        assert ids[5] in gallery.student_ids
+
+    def test_remove_students(self, enrollment, templates):
+        """Test removed students leave the store, index and galleries."""
+        ids = [uuid4() for _ in range(6)]
+        enrollment.save_templates(ids, templates)
+        enrollment.recognition.load_class_gallery(CLASS_ID, ids, enrollment.store)
+
+        assert enrollment.remove_students(ids[:2]) == 2
+
+        assert ids[0] not in enrollment.store
+        assert len(enrollment.recognition.galleries.get(CLASS_ID)) == 4
+        [matches] = enrollment.recognition.identify(templates[0], top_k=6)
+        assert ids[0] not in [m.student_id for m in matches]
+
+
+# ============================================================================
+# Batch Enrollment Tests
+# ============================================================================
+
+
+def make_photo(seed: int, noise: float = 0.0) -> bytes:
+    """Encode a deterministic synthetic photo as PNG bytes."""
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 256, size=(16, 16, 3)).astype(np.float32)
+    pixels = np.kron(pixels, np.ones((8, 8, 1)))
+    pixels += rng.normal(scale=noise, size=pixels.shape)
+    image = Image.fromarray(pixels.clip(0, 255).astype(np.uint8))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pipeline(enrollment: EnrollmentService, tmp_path: Path) -> BatchEnrollmentPipeline:
+    return BatchEnrollmentPipeline(
+        enrollment, tmp_path / "checkpoints", workers=2, write_batch_size=2
+    )
+
+
+class TestBatchEnrollmentPipeline:
+    """Tests for BatchEnrollmentPipeline.run()."""
+
+    @pytest.mark.asyncio
+    async def test_run_enrolls_one_template_per_student(self, pipeline):
+        """Test several photos per student become one matchable template."""
+        students = [
+            StudentPhotos(uuid4(), [make_photo(i), make_photo(i, noise=5)])
+            for i in range(5)
+        ]
+
+        with ThreadPoolExecutor(2) as executor:
+            report = await pipeline.run(uuid4(), students, executor=executor)
+
+        assert report.enrolled == 5
+        assert report.photos_processed == 10
+        assert report.photos_per_second_per_core > 0
+        assert len(pipeline.enrollment.store) == 5
+        probe = pipeline.enrollment.store.get(students[3].student_id)
+        [matches] = pipeline.enrollment.recognition.identify(probe)
+        assert matches[0].student_id == students[3].student_id
+
+    @pytest.mark.asyncio
+    async def test_run_reports_students_without_faces(self, pipeline):
+        """Test a student whose photos cannot be decoded is reported failed."""
+        bad = StudentPhotos(uuid4(), [b"not an image"])
+        good = StudentPhotos(uuid4(), [make_photo(1)])
+
+        with ThreadPoolExecutor(2) as executor:
+            report = await pipeline.run(uuid4(), [bad, good], executor=executor)
+
+        assert report.enrolled == 1
+        assert list(report.failed) == [bad.student_id]
+        assert bad.student_id not in pipeline.enrollment.store
+
+    @pytest.mark.asyncio
+    async def test_run_resumes_completed_batch(self, pipeline):
+        """Test re-running a batch skips students it already enrolled."""
+        batch_id = uuid4()
+        students = [StudentPhotos(uuid4(), [make_photo(i)]) for i in range(3)]
+
+        with ThreadPoolExecutor(2) as executor:
+            await pipeline.run(batch_id, students[:2], executor=executor)
+            report = await pipeline.run(batch_id, students, executor=executor)
+
+        assert report.skipped == 2
+        assert report.enrolled == 1
+        assert pipeline.checkpoint(batch_id).completed() == {
+            s.student_id for s in students
+        }
+
+    @pytest.mark.asyncio
+    async def test_run_in_process_pool(self, pipeline):
+        """Test templates are extracted in worker processes by default."""
+        students = [StudentPhotos(uuid4(), [make_photo(i)]) for i in range(2)]
+
+        report = await pipeline.run(uuid4(), students)
+
+        assert report.enrolled == 2
+        assert report.workers == 2
+
+    @pytest.mark.asyncio
+    async def test_run_writes_templates_off_event_loop(self, pipeline, monkeypatch):
+        """Test the fsyncing store and checkpoint writes run in a thread."""
+        students = [StudentPhotos(uuid4(), [make_photo(i)]) for i in range(2)]
+        save_templates = pipeline.enrollment.save_templates
+        threads = []
+
+        def recording_save(student_ids, templates):
+            threads.append(threading.current_thread())
+            save_templates(student_ids, templates)
+
+        monkeypatch.setattr(pipeline.enrollment, "save_templates", recording_save)
+        with ThreadPoolExecutor(2) as executor:
+            report = await pipeline.run(uuid4(), students, executor=executor)
+
+        assert report.enrolled == 2
+        assert threads
+        assert threading.main_thread() not in threads
@@ -0,0 +1,347 @@
+"""Unit tests for GeofenceService and GeofenceIndex."""
+
+from unittest.mock import MagicMock
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from app.services.geofence_service import (
+    Geofence,
+    GeofenceIndex,
+    GeofenceNotFoundError,
+    GeofenceService,
+    InvalidGeofenceError,
+)
+from app.utils.geo import METERS_PER_DEGREE
+from tests.conftest import MockTableResponse
+
+LAT, LON = 40.0, -75.0
+LON_SCALE = np.cos(np.radians(LAT))
+
+
+def square(lat: float, lon: float, half_side_m: float) -> list[list[float]]:
+    """A square footprint centred on a point, as [longitude, latitude]."""
+    dlat = half_side_m / METERS_PER_DEGREE
+    dlon = dlat / LON_SCALE
+    return [
+        [lon - dlon, lat - dlat],
+        [lon + dlon, lat - dlat],
+        [lon + dlon, lat + dlat],
+        [lon - dlon, lat + dlat],
+        [lon - dlon, lat - dlat],
+    ]
+
+
+def north_of(lat: float, meters: float) -> float:
+    return lat + meters / METERS_PER_DEGREE
+
+
+def pip(x: float, y: float, ring: np.ndarray) -> bool:
+    """Reference even-odd point-in-polygon test."""
+    inside = False
+    for (x1, y1), (x2, y2) in zip(ring, np.roll(ring, -1, axis=0)):
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
+@pytest.fixture
+def building() -> Geofence:
+    return Geofence.from_coordinates(uuid4(), square(LAT, LON, 50), tolerance_m=10)
+
+
+# ============================================================================
+# Geofence Tests
+# ============================================================================
+
+
+class TestGeofence:
+    """Tests for Geofence.from_coordinates() validation."""
+
+    def test_closing_vertex_is_dropped(self, building):
+        """Test a closed GeoJSON ring is stored without its repeated vertex."""
+        assert building.polygon.shape == (4, 2)
+
+    @pytest.mark.parametrize(
+        "coordinates",
+        [
+            [[0, 0], [1, 1]],
+            [[0, 0, 0], [1, 1, 1], [2, 2, 2]],
+            [[0, 0], [200, 0], [0, 1]],
+            [[0, 0], [float("nan"), 0], [0, 1]],
+            "not a ring",
+        ],
+    )
+    def test_invalid_rings_rejected(self, coordinates):
+        """Test malformed polygons raise InvalidGeofenceError."""
+        with pytest.raises(InvalidGeofenceError):
+            Geofence.from_coordinates(uuid4(), coordinates)
+
+
+# ============================================================================
+# GeofenceIndex Tests
+# ============================================================================
+
+
+class TestGeofenceIndexCheck:
+    """Tests for GeofenceIndex.check()."""
+
+    def test_inside_tolerance_and_outside(self, building):
+        """Test fixes inside, just outside and far outside the building."""
+        index = GeofenceIndex()
+        index.add([building])
+        latitudes = [LAT, north_of(LAT, 55), north_of(LAT, 70), north_of(LAT, 5000)]
+
+        verdicts = index.check([building.geofence_id] * 4, latitudes, [LON] * 4)
+
+        assert verdicts.inside.tolist() == [True, False, False, False]
+        assert verdicts.accepted.tolist() == [True, True, False, False]
+        np.testing.assert_allclose(
+            verdicts.distance_m[:3], [0, 5, 20], atol=0.05
+        )
+        assert verdicts.distance_m[3] == pytest.approx(4950, rel=1e-3)
+
+    def test_matches_reference_on_random_polygons(self):
+        """Test batch results agree with a scalar point-in-polygon test."""
+        rng = np.random.default_rng(7)
+        geofences = []
+        for _ in range(50):
+            k = int(rng.integers(3, 10))
+            angles = np.sort(rng.uniform(0, 2 * np.pi, k))
+            radius = rng.uniform(0.0002, 0.0008, k)
+            centre = rng.uniform(-0.01, 0.01, 2) + (LON, LAT)
+            ring = np.c_[
+                centre[0] + radius * np.cos(angles) / LON_SCALE,
+                centre[1] + radius * np.sin(angles),
+            ]
+            geofences.append(Geofence(uuid4(), ring, tolerance_m=0))
+        index = GeofenceIndex()
+        index.add(geofences)
+
+        owners = rng.integers(0, 50, 2000)
+        centres = np.array([g.polygon.mean(axis=0) for g in geofences])[owners]
+        points = centres + rng.normal(scale=0.0004, size=(2000, 2))
+        verdicts = index.check(
+            [geofences[o].geofence_id for o in owners], points[:, 1], points[:, 0]
+        )
+
+        expected = [
+            pip(x, y, geofences[o].polygon) for (x, y), o in zip(points, owners)
+        ]
+        assert verdicts.inside.tolist() == expected
+        assert 0 < sum(expected) < 2000
+
+    def test_unknown_geofence(self, building):
+        """Test checking against a missing geofence raises."""
+        index = GeofenceIndex()
+        index.add([building])
+
+        with pytest.raises(GeofenceNotFoundError):
+            index.check([uuid4()], [LAT], [LON])
+
+
+class TestGeofenceIndexLocate:
+    """Tests for GeofenceIndex.locate()."""
+
+    def test_locates_containing_building(self):
+        """Test fixes are matched to the building they are in."""
+        west = Geofence.from_coordinates(uuid4(), square(LAT, LON, 50))
+        east_lon = LON + 0.01 / LON_SCALE
+        east = Geofence.from_coordinates(uuid4(), square(LAT, east_lon, 50))
+        index = GeofenceIndex()
+        index.add([west, east])
+
+        lats = [LAT, LAT, LAT, 10.0]
+        lons = [LON, east_lon, LON + 0.005, 10.0]
+
+        located = index.locate(lats, lons)
+
+        assert located == [west.geofence_id, east.geofence_id, None, None]
+
+    def test_near_but_outside_every_building(self, building):
+        """Test a fix sharing a grid cell with a building but not in it."""
+        index = GeofenceIndex(cell_size_deg=0.01)
+        index.add([building])
+
+        assert index.locate([north_of(LAT, 100)], [LON]) == [None]
+
+    def test_prefers_building_fix_is_inside(self):
+        """Test a fix inside one building and near another picks the first."""
+        inner = Geofence.from_coordinates(uuid4(), square(LAT, LON, 50), 30)
+        neighbour_lat = north_of(LAT, 110)
+        neighbour = Geofence.from_coordinates(
+            uuid4(), square(neighbour_lat, LON, 50), 30
+        )
+        index = GeofenceIndex()
+        index.add([inner, neighbour])
+
+        [located] = index.locate([north_of(LAT, 45)], [LON])
+
+        assert located == inner.geofence_id
+
+    def test_remove(self, building):
+        """Test removed geofences are no longer found."""
+        index = GeofenceIndex()
+        index.add([building])
+
+        assert index.remove(building.geofence_id)
+        assert index.locate([LAT], [LON]) == [None]
+        assert not index.remove(building.geofence_id)
+
+
+# ============================================================================
+# GeofenceService Tests
+# ============================================================================
+
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+
+
+class PagedQuery:
+    """Query serving the page after the one its keyset filter ends at."""
+
+    def __init__(self, pages: list[list[dict]]):
+        self.pages = pages
+
+    def select(self, columns: str) -> "PagedQuery":
+        self.after: str | None = None
+        return self
+
+    def or_(self, keyset: str) -> "PagedQuery":
+        self.after = keyset
+        return self
+
+    def order(self, column: str) -> "PagedQuery":
+        self.key = column
+        return self
+
+    def limit(self, count: int) -> "PagedQuery":
+        return self
+
+    def execute(self) -> MockTableResponse:
+        page = 0
+        if self.after is not None:
+            page = 1 + next(
+                i
+                for i, rows in enumerate(self.pages)
+                if rows and f'"{rows[-1][self.key]}"' in self.after
+            )
+        rows = self.pages[page] if page < len(self.pages) else []
+        return MockTableResponse(rows)
+
+
+def geofence_row(geofence: Geofence) -> dict:
+    return {
+        "id": str(geofence.geofence_id),
+        "polygon": geofence.polygon.tolist(),
+        "tolerance_m": geofence.tolerance_m,
+    }
+
+
+@pytest.fixture
+def tables(building) -> dict[str, list[list[dict]]]:
+    """Pages of one building and one class assigned to it."""
+    return {
+        "geofences": [[geofence_row(building)]],
+        "class_geofences": [
+            [{"class_id": str(CLASS_ID), "geofence_id": str(building.geofence_id)}]
+        ],
+    }
+
+
+@pytest.fixture
+def client(tables) -> MagicMock:
+    """Supabase client serving the pages of each table on every load."""
+    queries = {name: PagedQuery(pages) for name, pages in tables.items()}
+    client = MagicMock()
+    client.table.side_effect = lambda name: queries[name]
+    return client
+
+
+class TestGeofenceService:
+    """Tests for GeofenceService."""
+
+    @pytest.mark.asyncio
+    async def test_verify_check_ins(self, client):
+        """Test fixes are checked against their class's building."""
+        service = GeofenceService(client=client)
+        await service.ensure_loaded()
+
+        verdicts = service.verify_check_ins(
+            [CLASS_ID, CLASS_ID], [LAT, north_of(LAT, 500)], [LON, LON]
+        )
+
+        assert verdicts.accepted.tolist() == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_loads_once(self, client):
+        """Test geofences are only read from the database once."""
+        service = GeofenceService(client=client)
+
+        await service.ensure_loaded()
+        await service.ensure_loaded()
+
+        assert client.table.call_count == 4
+
+    @pytest.mark.asyncio
+    async def test_reloads_after_ttl(self, client, tables):
+        """Test geofences added since the last load are picked up."""
+        service = GeofenceService(client=client, ttl_seconds=0)
+        await service.ensure_loaded()
+        added = Geofence.from_coordinates(uuid4(), square(10.0, 10.0, 50))
+        other_class = uuid4()
+        tables["geofences"].append([geofence_row(added)])
+        tables["class_geofences"].append(
+            [{"class_id": str(other_class), "geofence_id": str(added.geofence_id)}]
+        )
+
+        await service.ensure_loaded()
+
+        assert len(service.index) == 2
+        assert service.verify_check_ins([other_class], [10.0], [10.0]).inside[0]
+
+    @pytest.mark.asyncio
+    async def test_reads_every_page(self, client, tables, building):
+        """Test geofences beyond the first page are loaded."""
+        buildings = [
+            Geofence.from_coordinates(uuid4(), square(LAT, LON + i * 0.01, 50))
+            for i in range(1, 4)
+        ]
+        tables["geofences"] += [[geofence_row(b)] for b in buildings]
+        service = GeofenceService(client=client, page_size=1)
+
+        await service.ensure_loaded()
+
+        assert len(service.index) == 4
+        assert all(b.geofence_id in service.index for b in buildings)
+
+    @pytest.mark.asyncio
+    async def test_invalid_geofence_is_skipped(self, client, tables, building):
+        """Test a malformed polygon does not stop the others loading."""
+        broken = uuid4()
+        broken_class = uuid4()
+        tables["geofences"][0].append(
+            {"id": str(broken), "polygon": [[0, 0]], "tolerance_m": 10}
+        )
+        tables["class_geofences"][0].append(
+            {"class_id": str(broken_class), "geofence_id": str(broken)}
+        )
+        service = GeofenceService(client=client)
+
+        await service.ensure_loaded()
+
+        assert building.geofence_id in service.index
+        assert broken not in service.index
+        assert service.verify_check_ins([CLASS_ID], [LAT], [LON]).accepted[0]
+        with pytest.raises(GeofenceNotFoundError):
+            service.verify_check_ins([broken_class], [LAT], [LON])
+
+    @pytest.mark.asyncio
+    async def test_class_without_geofence(self, client):
+        """Test a class without a building raises GeofenceNotFoundError."""
+        service = GeofenceService(client=client)
+        await service.ensure_loaded()
+
+        with pytest.raises(GeofenceNotFoundError):
+            service.verify_check_ins([uuid4()], [LAT], [LON])
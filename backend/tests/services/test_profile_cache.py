@@ -0,0 +1,114 @@
+"""Unit tests for the profile cache."""
+
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+import pytest
+
+from app.models.instructor import ProfileType
+from app.services.profile_cache import (
+    CachedProfile,
+    InMemoryProfileStore,
+    ProfileCache,
+)
+
+USER_ID = UUID("12345678-1234-1234-1234-123456789012")
+PROFILE = CachedProfile(first_name="John", last_name="Doe", type=ProfileType.STUDENT)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestProfileCache:
+    """Tests for ProfileCache."""
+
+    @pytest.mark.asyncio
+    async def test_hit_after_put(self):
+        """Test a cached profile is served until it is invalidated."""
+        cache = ProfileCache()
+
+        assert await cache.get(USER_ID) is None
+        await cache.put(USER_ID, PROFILE)
+        assert await cache.get(USER_ID) == PROFILE
+        await cache.invalidate(USER_ID)
+        assert await cache.get(USER_ID) is None
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.invalidations) == (1, 2, 1)
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self):
+        """Test entries are dropped after the TTL."""
+        clock = FakeClock()
+        cache = ProfileCache(ttl_seconds=60, clock=clock)
+        await cache.put(USER_ID, PROFILE)
+
+        clock.now = 61
+
+        assert await cache.get(USER_ID) is None
+
+    @pytest.mark.asyncio
+    async def test_least_recently_used_evicted(self):
+        """Test the cache holds at most max_entries profiles."""
+        cache = ProfileCache(max_entries=2)
+        for i in range(3):
+            await cache.put(UUID(int=i), PROFILE)
+
+        assert len(cache) == 2
+        assert await cache.get(UUID(int=0)) is None
+
+
+class TestSharedStore:
+    """Tests for ProfileCache with a shared store."""
+
+    @pytest.mark.asyncio
+    async def test_other_worker_reads_shared_copy(self):
+        """Test a profile cached by one worker is found by another."""
+        shared = InMemoryProfileStore()
+        await ProfileCache(shared=shared).put(USER_ID, PROFILE)
+        other = ProfileCache(shared=shared)
+
+        assert await other.get(USER_ID) == PROFILE
+        assert await other.get(USER_ID) == PROFILE
+        assert (other.stats().shared_hits, other.stats().hits) == (1, 1)
+
+    @pytest.mark.asyncio
+    async def test_invalidation_reaches_shared_store(self):
+        """Test invalidating drops the shared copy too."""
+        shared = InMemoryProfileStore()
+        cache = ProfileCache(shared=shared)
+        await cache.put(USER_ID, PROFILE)
+
+        await cache.invalidate(USER_ID)
+
+        assert await shared.get(USER_ID) is None
+
+    @pytest.mark.asyncio
+    async def test_shared_store_failure_is_a_miss(self):
+        """Test a failing shared store does not fail the lookup."""
+        shared = AsyncMock()
+        shared.get.side_effect = ConnectionError("redis down")
+        shared.set.side_effect = ConnectionError("redis down")
+        cache = ProfileCache(shared=shared)
+
+        assert await cache.get(USER_ID) is None
+        await cache.put(USER_ID, PROFILE)
+
+        assert await cache.get(USER_ID) == PROFILE
+        assert cache.stats().shared_errors == 2
+
+    @pytest.mark.asyncio
+    async def test_shared_entries_expire(self):
+        """Test the in-memory stand-in honours the TTL."""
+        clock = FakeClock()
+        shared = InMemoryProfileStore(clock=clock)
+        await shared.set(USER_ID, PROFILE, ttl_seconds=10)
+
+        clock.now = 11
+
+        assert await shared.get(USER_ID) is None
@@ -0,0 +1,117 @@
+"""Unit tests for RecognitionLogWriter."""
+
+import asyncio
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+
+from app.db.recognition_log import RecognitionLogStore
+from app.services.recognition_log_service import (
+    RecognitionLogWriteError,
+    RecognitionLogWriter,
+)
+from tests.db.test_recognition_log import make_entries
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> RecognitionLogStore:
+    return RecognitionLogStore(tmp_path / "log", top_k=3)
+
+
+@pytest.fixture
+def students() -> list[UUID]:
+    return [uuid4() for _ in range(10)]
+
+
+class TestRecognitionLogWriter:
+    """Tests for batching recognition attempts into the log."""
+
+    @pytest.mark.asyncio
+    async def test_flush_appends_in_batches(self, store, students):
+        """Test queued entries are appended batch_size at a time."""
+        writer = RecognitionLogWriter(store, batch_size=4)
+        writer.submit(make_entries(10, students))
+
+        written = await writer.flush()
+
+        assert written == 10
+        assert writer.stats().flushes == 3
+        assert len(store.query()) == 10
+
+    @pytest.mark.asyncio
+    async def test_full_batch_flushes_in_background(self, store, students):
+        """Test a full batch is written without waiting for the interval."""
+        writer = RecognitionLogWriter(store, batch_size=5, flush_interval_seconds=60)
+        writer.start()
+        try:
+            writer.submit(make_entries(5, students))
+            for _ in range(100):
+                if writer.written:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await writer.close()
+
+        assert writer.written == 5
+
+    def test_full_queue_drops_entries(self, store, students):
+        """Test submitting never waits, dropping what does not fit."""
+        writer = RecognitionLogWriter(store, max_pending=3)
+
+        queued = writer.submit(make_entries(5, students))
+
+        assert queued == 3
+        assert writer.stats().dropped == 2
+        assert len(writer) == 3
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_keeps_entries(self, store, students, monkeypatch):
+        """Test entries of a failed append stay queued, in order."""
+        writer = RecognitionLogWriter(store, batch_size=2)
+        entries = make_entries(3, students)
+        writer.submit(entries)
+
+        def fail(records):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(store, "append", fail)
+        with pytest.raises(RecognitionLogWriteError, match="disk full"):
+            await writer.flush()
+
+        assert writer.stats().failed_flushes == 1
+        monkeypatch.undo()
+        await writer.flush()
+        logged = store.query()
+        assert [e.recorded_at for e in logged] == [e.recorded_at for e in entries]
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_and_seals(self, store, students):
+        """Test shutdown writes queued entries and rolls the active file."""
+        writer = RecognitionLogWriter(store)
+        writer.start()
+        writer.submit(make_entries(7, students))
+
+        await writer.close()
+
+        assert len(store.segments()) == 1
+        assert list(store.directory.glob("*.log")) == []
+        assert len(store.query()) == 7
+
+    @pytest.mark.asyncio
+    async def test_rolls_old_active_file(self, store, students):
+        """Test the background task seals an active file past its age."""
+        writer = RecognitionLogWriter(
+            store, flush_interval_seconds=0.01, roll_interval_seconds=0
+        )
+        writer.start()
+        try:
+            writer.submit(make_entries(3, students))
+            for _ in range(100):
+                if writer.segments_rolled:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await writer.close()
+
+        assert writer.stats().segments_rolled == 1
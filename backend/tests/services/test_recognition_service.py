@@ -0,0 +1,378 @@
+"""Unit tests for RecognitionService."""
+
+import threading
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from app.db.embedding_store import EmbeddingStore
+from app.services.recognition_service import (
+    ClassGallery,
+    GalleryNotFoundError,
+    GalleryRegistry,
+    ImageProbe,
+    InvalidEmbeddingError,
+    Match,
+    RecognitionResultCache,
+    RecognitionService,
+)
+from app.utils.ann_index import IVFIndex
+from app.utils.face_utils import FakeFaceEngine, embed_faces
+
+DIM = 64
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+
+
+@pytest.fixture
+def rng() -> np.random.Generator:
+    return np.random.default_rng(1234)
+
+
+@pytest.fixture
+def enrolled(rng: np.random.Generator) -> tuple[list[UUID], np.ndarray]:
+    """Random enrolled students with one embedding each."""
+    student_ids = [uuid4() for _ in range(40)]
+    return student_ids, rng.normal(size=(40, DIM)).astype(np.float32)
+
+
+# ============================================================================
+# ClassGallery Tests
+# ============================================================================
+
+
+class TestClassGallery:
+    """Tests for ClassGallery storage and matching."""
+
+    def test_matrix_is_contiguous_normalized_float32(self, enrolled):
+        """Test embeddings are stored as one normalized float32 matrix."""
+        student_ids, embeddings = enrolled
+        gallery = ClassGallery(CLASS_ID, student_ids, embeddings.astype(np.float64))
+
+        assert gallery.matrix.dtype == np.float32
+        assert gallery.matrix.flags["C_CONTIGUOUS"]
+        np.testing.assert_allclose(np.linalg.norm(gallery.matrix, axis=1), 1, rtol=1e-5)
+
+    def test_match_single_probe(self, enrolled, rng):
+        """Test a noisy copy of an enrolled embedding matches that student."""
+        student_ids, embeddings = enrolled
+        gallery = ClassGallery(CLASS_ID, student_ids, embeddings)
+        probe = embeddings[7] + rng.normal(scale=0.1, size=DIM)
+
+        [matches] = gallery.match(probe)
+
+        assert len(matches) == 1
+        assert matches[0].student_id == student_ids[7]
+        assert matches[0].score > 0.9
+
+    def test_match_batch_top_k_sorted(self, enrolled):
+        """Test a batch of probes returns top-k candidates best first."""
+        student_ids, embeddings = enrolled
+        gallery = ClassGallery(CLASS_ID, student_ids, embeddings)
+
+        results = gallery.match(embeddings[[3, 11, 25]], top_k=5, threshold=-1.0)
+
+        assert [r[0].student_id for r in results] == [
+            student_ids[3],
+            student_ids[11],
+            student_ids[25],
+        ]
+        for matches in results:
+            assert len(matches) == 5
+            scores = [m.score for m in matches]
+            assert scores == sorted(scores, reverse=True)
+
+    def test_match_threshold_filters_unknown_faces(self, enrolled, rng):
+        """Test a probe unlike every enrolled face returns no match."""
+        student_ids, embeddings = enrolled
+        gallery = ClassGallery(CLASS_ID, student_ids, embeddings)
+
+        [matches] = gallery.match(rng.normal(size=DIM), top_k=3, threshold=0.9)
+
+        assert matches == []
+
+    def test_top_k_larger_than_gallery(self, enrolled):
+        """Test top_k above the gallery size returns every student."""
+        student_ids, embeddings = enrolled
+        gallery = ClassGallery(CLASS_ID, student_ids[:3], embeddings[:3])
+
+        [matches] = gallery.match(embeddings[0], top_k=10, threshold=-1.0)
+
+        assert len(matches) == 3
+
+    def test_dimension_mismatch_raises(self, enrolled):
+        """Test probes with the wrong dimension are rejected."""
+        student_ids, embeddings = enrolled
+        gallery = ClassGallery(CLASS_ID, student_ids, embeddings)
+
+        with pytest.raises(InvalidEmbeddingError, match="dimension"):
+            gallery.match(np.ones(DIM + 1))
+
+
+# ============================================================================
+# RecognitionService Tests
+# ============================================================================
+
+
+class TestRecognitionService:
+    """Tests for RecognitionService.match_class()."""
+
+    def test_match_class(self, enrolled):
+        """Test matching uses the registered class gallery."""
+        student_ids, embeddings = enrolled
+        service = RecognitionService()
+        service.galleries.set(CLASS_ID, student_ids, embeddings)
+
+        [matches] = service.match_class(CLASS_ID, embeddings[5])
+
+        assert matches[0].student_id == student_ids[5]
+
+    def test_match_class_without_gallery_raises(self):
+        """Test matching an unknown class raises GalleryNotFoundError."""
+        service = RecognitionService()
+
+        with pytest.raises(GalleryNotFoundError):
+            service.match_class(CLASS_ID, np.ones(DIM))
+
+    def test_replacing_gallery_bumps_version(self, enrolled):
+        """Test replacing a class gallery increments its version."""
+        student_ids, embeddings = enrolled
+        registry = GalleryRegistry()
+
+        first = registry.set(CLASS_ID, student_ids, embeddings)
+        second = registry.set(CLASS_ID, student_ids[:10], embeddings[:10])
+
+        assert (first.version, second.version) == (1, 2)
+        assert len(registry.get(CLASS_ID)) == 10
+
+
+# ============================================================================
+# Institution-wide Search Tests
+# ============================================================================
+
+
+class TestIdentify:
+    """Tests for RecognitionService.identify()."""
+
+    def test_identify_across_institution(self, enrolled, rng):
+        """Test indexed students are found without a class gallery."""
+        student_ids, embeddings = enrolled
+        service = RecognitionService(institution_index=IVFIndex(DIM, n_lists=4))
+        for student_id, embedding in zip(student_ids, embeddings):
+            service.index_student(student_id, embedding)
+
+        [matches] = service.identify(embeddings[9] + rng.normal(scale=0.1, size=DIM))
+
+        assert matches[0].student_id == student_ids[9]
+
+    def test_unindexed_student_is_not_identified(self, enrolled):
+        """Test a student removed from the index is no longer returned."""
+        student_ids, embeddings = enrolled
+        service = RecognitionService(institution_index=IVFIndex(DIM, n_lists=4))
+        for student_id, embedding in zip(student_ids, embeddings):
+            service.index_student(student_id, embedding)
+
+        service.unindex_student(student_ids[9])
+        [matches] = service.identify(embeddings[9], top_k=3)
+
+        assert student_ids[9] not in [m.student_id for m in matches]
+
+
+class TestInstitutionIndex:
+    """Tests for keeping the institution index in line with the store."""
+
+    def test_saved_index_is_reconciled_with_store(self, enrolled, tmp_path: Path):
+        """Test students who left or enrolled since the save are accounted for."""
+        student_ids, embeddings = enrolled
+        store = EmbeddingStore(tmp_path / "embeddings.bin", DIM)
+        store.append(student_ids[:30], embeddings[:30])
+        saved = RecognitionService(institution_index=IVFIndex(DIM, n_lists=4))
+        saved.load_institution_index(store)
+        saved.institution_index.save(tmp_path / "index.npz")
+
+        store.delete(student_ids[:5])
+        store.append(student_ids[30:], embeddings[30:])
+        service = RecognitionService(
+            institution_index=IVFIndex.load(tmp_path / "index.npz")
+        )
+        service.load_institution_index(store)
+
+        assert sorted(service.institution_index.keys()) == sorted(student_ids[5:])
+
+    def test_index_trains_once_it_grows_large_enough(self, rng):
+        """Test an index too small to train at startup is trained on growth."""
+        service = RecognitionService(institution_index=IVFIndex(DIM, n_lists=2))
+        embeddings = rng.normal(size=(80, DIM)).astype(np.float32)
+
+        for embedding in embeddings[:79]:
+            service.index_student(uuid4(), embedding)
+        assert not service.institution_index.is_trained
+
+        service.index_student(uuid4(), embeddings[79])
+        assert service.institution_index.is_trained
+        assert len(service.institution_index) == 80
+
+
+# ============================================================================
+# Result Cache Tests
+# ============================================================================
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def result_key(image: str, version: int = 1, class_id: UUID = CLASS_ID):
+    return (image, class_id, version, 1)
+
+
+RESULT = [[Match(student_id=uuid4(), score=0.9)]]
+
+
+class TestRecognitionResultCache:
+    """Tests for RecognitionResultCache eviction and counters."""
+
+    def test_hit_and_miss_counters(self):
+        """Test lookups are counted as hits or misses."""
+        cache = RecognitionResultCache()
+        cache.put(result_key("a"), RESULT)
+
+        assert cache.get(result_key("a")) == RESULT
+        assert cache.get(result_key("a", version=2)) is None
+
+        stats = cache.stats()
+        assert (stats.hits, stats.misses, stats.hit_ratio) == (1, 1, 0.5)
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = RecognitionResultCache(max_entries=2)
+        cache.put(result_key("a"), RESULT)
+        cache.put(result_key("b"), RESULT)
+        cache.get(result_key("a"))
+
+        cache.put(result_key("c"), RESULT)
+
+        assert cache.get(result_key("b")) is None
+        assert cache.get(result_key("a")) == RESULT
+        assert cache.stats().evictions == 1
+
+    def test_evicts_to_stay_within_byte_bound(self):
+        """Test entries are evicted once the byte bound is exceeded."""
+        cache = RecognitionResultCache(max_bytes=1000)
+        for name in "abcdef":
+            cache.put(result_key(name), RESULT)
+
+        stats = cache.stats()
+        assert stats.bytes <= 1000
+        assert stats.entries < 6
+        assert cache.get(result_key("f")) == RESULT
+
+    def test_entries_expire_after_ttl(self):
+        """Test an entry older than the TTL is a miss."""
+        clock = FakeClock()
+        cache = RecognitionResultCache(ttl_seconds=10, clock=clock)
+        cache.put(result_key("a"), RESULT)
+
+        clock.now = 11
+
+        assert cache.get(result_key("a")) is None
+        assert cache.stats().expirations == 1
+        assert len(cache) == 0
+
+    def test_invalidate_class(self):
+        """Test invalidating a class drops only that class's entries."""
+        other_class = uuid4()
+        cache = RecognitionResultCache()
+        cache.put(result_key("a"), RESULT)
+        cache.put(result_key("b", class_id=other_class), RESULT)
+
+        assert cache.invalidate_class(CLASS_ID) == 1
+
+        assert cache.get(result_key("a")) is None
+        assert cache.get(result_key("b", class_id=other_class)) == RESULT
+        assert cache.stats().invalidations == 1
+
+
+    def test_concurrent_use_keeps_accounting_consistent(self):
+        """Test threads sharing the cache leave its byte count exact."""
+        cache = RecognitionResultCache(max_entries=50)
+        classes = [uuid4() for _ in range(4)]
+
+        def work(worker: int) -> None:
+            for i in range(2000):
+                class_id = classes[i % len(classes)]
+                key = result_key(f"{worker}-{i % 80}", class_id=class_id)
+                cache.put(key, RESULT)
+                cache.get(key)
+                if i % 97 == 0:
+                    cache.invalidate_class(class_id)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        assert stats.entries <= 50
+        assert stats.bytes == sum(size for _, _, size in cache._entries.values())
+
+
+# ============================================================================
+# Batched Photo Recognition Tests
+# ============================================================================
+
+
+class TestRecognizeImages:
+    """Tests for RecognitionService.recognize_images()."""
+
+    def test_batch_matches_each_photo_in_its_class(self, rng, tmp_path):
+        """Test photos for different classes are matched in one batch."""
+        engine = FakeFaceEngine(embedding_dim=DIM)
+        photos = rng.integers(0, 256, size=(3, 120, 160, 3), dtype=np.uint8)
+        student_ids = [uuid4() for _ in range(3)]
+        templates = np.concatenate([embed_faces(engine, p) for p in photos])
+        store = EmbeddingStore(tmp_path / "embeddings.bin", DIM)
+        store.append(student_ids, templates)
+        other_class = uuid4()
+        service = RecognitionService()
+        service.load_class_gallery(CLASS_ID, student_ids[:2], store)
+        service.load_class_gallery(other_class, student_ids[2:], store)
+
+        results = service.recognize_images(
+            [
+                ImageProbe(CLASS_ID, "a", photos[1]),
+                ImageProbe(other_class, "b", photos[2]),
+                ImageProbe(uuid4(), "c", photos[0]),
+            ],
+            engine,
+            store,
+        )
+
+        assert results[0][0][0].student_id == student_ids[1]
+        assert results[1][0][0].student_id == student_ids[2]
+        assert isinstance(results[2], GalleryNotFoundError)
+        assert service.cached_image_result(CLASS_ID, "a", store) == results[0]
+
+    def test_stale_gallery_is_reloaded(self, rng, tmp_path):
+        """Test a gallery loaded before the store changed is reloaded first."""
+        engine = FakeFaceEngine(embedding_dim=DIM)
+        photos = rng.integers(0, 256, size=(2, 120, 160, 3), dtype=np.uint8)
+        student_ids = [uuid4() for _ in range(2)]
+        store = EmbeddingStore(tmp_path / "embeddings.bin", DIM)
+        store.append(student_ids[:1], embed_faces(engine, photos[0]))
+        service = RecognitionService()
+        service.load_class_gallery(CLASS_ID, student_ids, store)
+
+        # Another worker enrolls the second student
+        store.append(student_ids[1:], embed_faces(engine, photos[1]))
+        results = service.recognize_images(
+            [ImageProbe(CLASS_ID, "a", photos[1])], engine, store
+        )
+
+        assert results[0][0][0].student_id == student_ids[1]
@@ -0,0 +1,281 @@
+"""Unit tests for ReportService."""
+
+import re
+from datetime import date
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import pytest
+
+from app.services.report_service import ReportQueryError, ReportService
+from tests.conftest import MockTableResponse
+
+CLASS_ID = UUID("87654321-4321-4321-4321-210987654321")
+OTHER_CLASS_ID = UUID("11111111-2222-3333-4444-555555555555")
+STUDENT_IDS = [UUID(int=i + 1) for i in range(3)]
+
+
+def totals(present: int, late: int, absent: int, **key) -> dict:
+    return {**key, "present": present, "late": late, "absent": absent}
+
+
+class TableQuery:
+    """Query over in-memory rows supporting the filters keyset paging uses."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.keys: list[str] = []
+        self.after: list[str] | None = None
+        self.limit_count: int | None = None
+
+    def select(self, columns: str) -> "TableQuery":
+        return self
+
+    def in_(self, column: str, values: list[str]) -> "TableQuery":
+        self.rows = [row for row in self.rows if row[column] in values]
+        return self
+
+    def or_(self, keyset: str) -> "TableQuery":
+        # The last branch of a keyset filter holds every key value
+        self.after = re.findall(r'"([^"]*)"', keyset.rsplit("and(", 1)[-1])
+        return self
+
+    def order(self, column: str) -> "TableQuery":
+        self.keys.append(column)
+        return self
+
+    def limit(self, count: int) -> "TableQuery":
+        self.limit_count = count
+        return self
+
+    def execute(self) -> MockTableResponse:
+        def key(row: dict) -> list[str]:
+            return [row[column] for column in self.keys]
+
+        rows = sorted(self.rows, key=key)
+        if self.after is not None:
+            rows = [row for row in rows if key(row) > self.after]
+        return MockTableResponse(rows[: self.limit_count])
+
+
+@pytest.fixture
+def client() -> MagicMock:
+    """Supabase client holding the totals of two classes.
+
+    The class held four sessions, one of which has had all its marks
+    removed; the other class held two.
+    """
+    tables = {
+        "attendance_session_totals": [
+            totals(2, 0, 1, class_id=str(CLASS_ID), session_date="2026-10-14"),
+            totals(1, 1, 1, class_id=str(CLASS_ID), session_date="2026-10-07"),
+            totals(3, 0, 0, class_id=str(CLASS_ID), session_date="2026-10-09"),
+            totals(0, 0, 0, class_id=str(CLASS_ID), session_date="2026-10-16"),
+            totals(1, 0, 0, class_id=str(OTHER_CLASS_ID), session_date="2026-10-08"),
+            totals(0, 0, 1, class_id=str(OTHER_CLASS_ID), session_date="2026-10-15"),
+        ],
+        "attendance_student_totals": [
+            totals(3, 0, 0, class_id=str(CLASS_ID), student_id=str(STUDENT_IDS[0])),
+            totals(2, 1, 0, class_id=str(CLASS_ID), student_id=str(STUDENT_IDS[1])),
+            totals(
+                1, 0, 1, class_id=str(OTHER_CLASS_ID), student_id=str(STUDENT_IDS[0])
+            ),
+        ],
+        "class_students": [
+            {"class_id": str(CLASS_ID), "student_id": str(sid)} for sid in STUDENT_IDS
+        ],
+    }
+    client = MagicMock()
+
+    def table(name):
+        return TableQuery(tables[name])
+
+    client.table.side_effect = table
+    client.rpc.return_value.execute.return_value = MockTableResponse(2)
+    return client
+
+
+# ============================================================================
+# Report Tests
+# ============================================================================
+
+
+class TestClassReport:
+    """Tests for ReportService.class_report()."""
+
+    @pytest.mark.asyncio
+    async def test_sessions_in_date_order(self, client):
+        """Test sessions are sorted by date and emptied ones are skipped."""
+        report = await ReportService(client).class_report(CLASS_ID)
+
+        assert [s.session_date for s in report.sessions] == [
+            date(2026, 10, 7),
+            date(2026, 10, 9),
+            date(2026, 10, 14),
+        ]
+        assert report.sessions[0].late == 1
+
+    @pytest.mark.asyncio
+    async def test_student_rates(self, client):
+        """Test late counts as attended and unmarked students are listed."""
+        report = await ReportService(client).class_report(CLASS_ID)
+
+        rates = {s.student_id: s.attendance_rate for s in report.students}
+        assert rates == {STUDENT_IDS[0]: 1.0, STUDENT_IDS[1]: 1.0, STUDENT_IDS[2]: 0}
+        assert all(s.sessions == 3 for s in report.students)
+        assert report.attendance_rate == pytest.approx(2 / 3)
+
+    @pytest.mark.asyncio
+    async def test_reads_every_page(self, client):
+        """Test results longer than a page are read in full."""
+        report = await ReportService(client, page_size=1).class_report(CLASS_ID)
+
+        assert len(report.sessions) == 3
+        assert len(report.students) == 3
+        assert report.attendance_rate == pytest.approx(2 / 3)
+
+    @pytest.mark.asyncio
+    async def test_read_failure(self, client):
+        """Test a failing query raises ReportQueryError."""
+        client.table.side_effect = RuntimeError("connection reset")
+
+        with pytest.raises(ReportQueryError):
+            await ReportService(client).class_report(CLASS_ID)
+
+
+class TestStudentReport:
+    """Tests for ReportService.student_report()."""
+
+    @pytest.mark.asyncio
+    async def test_one_summary_per_class(self, client):
+        """Test each class's rate is out of the sessions that class held."""
+        report = await ReportService(client).student_report(STUDENT_IDS[0])
+
+        rates = {s.class_id: (s.sessions, s.attendance_rate) for s in report.classes}
+        assert rates == {CLASS_ID: (3, 1.0), OTHER_CLASS_ID: (2, 0.5)}
+        assert report.attendance_rate == pytest.approx(0.75)
+
+    @pytest.mark.asyncio
+    async def test_reads_every_page(self, client):
+        """Test results longer than a page are read in full."""
+        service = ReportService(client, page_size=2)
+
+        report = await service.student_report(STUDENT_IDS[0])
+
+        rates = {s.class_id: (s.sessions, s.attendance_rate) for s in report.classes}
+        assert rates == {CLASS_ID: (3, 1.0), OTHER_CLASS_ID: (2, 0.5)}
+
+    @pytest.mark.asyncio
+    async def test_student_without_marks(self, client):
+        """Test a student with no marks gets an empty report."""
+        report = await ReportService(client).student_report(UUID(int=99))
+
+        assert report.classes == []
+        assert report.attendance_rate == 0
+
+
+class TestRebuildTotals:
+    """Tests for ReportService.rebuild_totals()."""
+
+    @pytest.mark.asyncio
+    async def test_rebuild_one_class(self, client):
+        """Test the rebuild function is called for the class."""
+        rebuilt = await ReportService(client).rebuild_totals(CLASS_ID)
+
+        assert rebuilt == 2
+        client.rpc.assert_called_once_with(
+            "rebuild_attendance_totals", {"p_class_id": str(CLASS_ID)}
+        )
+
+    @pytest.mark.asyncio
+    async def test_rebuild_every_class(self, client):
+        """Test omitting the class rebuilds every class."""
+        await ReportService(client).rebuild_totals()
+
+        client.rpc.assert_called_once_with(
+            "rebuild_attendance_totals", {"p_class_id": None}
+        )
+
+
+# ============================================================================
+# Export Tests
+# ============================================================================
+
+
+def attendance_row(class_id: UUID, student_id: UUID, session_date: str) -> dict:
+    return {
+        "class_id": str(class_id),
+        "session_date": session_date,
+        "student_id": str(student_id),
+        "status": "present",
+        "method": "class_photo",
+        "confidence": 0.9,
+        "recorded_at": f"{session_date}T08:00:00+00:00",
+        "profiles": {"first_name": "Ada", "last_name": "Lovelace"},
+    }
+
+
+@pytest.fixture
+def attendance_query() -> MagicMock:
+    """Chainable attendance query returning two pages, then none."""
+    query = MagicMock()
+    for method in ("select", "in_", "gte", "lte", "or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.side_effect = [
+        MockTableResponse(
+            [
+                attendance_row(CLASS_ID, STUDENT_IDS[0], "2026-10-07"),
+                attendance_row(CLASS_ID, STUDENT_IDS[1], "2026-10-07"),
+            ]
+        ),
+        MockTableResponse([attendance_row(CLASS_ID, STUDENT_IDS[0], "2026-10-14")]),
+        MockTableResponse([]),
+    ]
+    return query
+
+
+class TestExportAttendance:
+    """Tests for ReportService.export_attendance()."""
+
+    @pytest.mark.asyncio
+    async def test_pages_after_last_key(self, attendance_query):
+        """Test each page is read after the last row of the previous one."""
+        client = MagicMock()
+        client.table.return_value = attendance_query
+        service = ReportService(client, export_page_size=2)
+
+        pages = [
+            page
+            async for page in service.export_attendance(
+                [CLASS_ID], start=date(2026, 9, 1), end=date(2026, 12, 20)
+            )
+        ]
+
+        assert [len(page) for page in pages] == [2, 1]
+        assert attendance_query.or_.call_count == 2
+        after = attendance_query.or_.call_args_list[0].args[0]
+        assert after.endswith(f'student_id.gt."{STUDENT_IDS[1]}")')
+        attendance_query.gte.assert_called_with("session_date", "2026-09-01")
+        attendance_query.limit.assert_called_with(2)
+
+    @pytest.mark.asyncio
+    async def test_names_flattened(self, attendance_query):
+        """Test the embedded profile becomes name columns."""
+        client = MagicMock()
+        client.table.return_value = attendance_query
+
+        pages = ReportService(client).export_attendance([CLASS_ID])
+        row = (await anext(pages))[0]
+
+        assert "profiles" not in row
+        assert (row["first_name"], row["last_name"]) == ("Ada", "Lovelace")
+
+    @pytest.mark.asyncio
+    async def test_read_failure(self, attendance_query):
+        """Test a failing page raises ReportQueryError."""
+        client = MagicMock()
+        client.table.return_value = attendance_query
+        attendance_query.execute.side_effect = RuntimeError("timeout")
+
+        with pytest.raises(ReportQueryError):
+            await anext(ReportService(client).export_attendance([CLASS_ID]))
@@ -0,0 +1,91 @@
+"""Unit tests for StorageService."""
+
+import hashlib
+from pathlib import Path
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.storage_service import (
+    LocalStorageBackend,
+    ObjectNotFoundError,
+    StorageService,
+)
+
+
+@pytest.fixture
+def storage(tmp_path: Path) -> StorageService:
+    return StorageService(LocalStorageBackend(tmp_path), tmp_path / "tmp")
+
+
+async def upload(storage: StorageService, data: bytes):
+    pending = storage.open_upload()
+    pending.write(data)
+    return await storage.commit(pending, "image/jpeg")
+
+
+# ============================================================================
+# Content-addressed Storage Tests
+# ============================================================================
+
+
+class TestStorageService:
+    """Tests for StorageService deduplication and reference counting."""
+
+    @pytest.mark.asyncio
+    async def test_identical_uploads_share_one_object(self, storage):
+        """Test identical bytes are stored once and counted twice."""
+        first = await upload(storage, b"photo-bytes")
+        second = await upload(storage, b"photo-bytes")
+
+        assert first.key == second.key
+        assert second.deduplicated
+        assert await storage.read(first.key) == b"photo-bytes"
+        assert list(storage.tmp_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_release_deletes_with_last_reference(self, storage):
+        """Test an object is deleted only when its last reference is released."""
+        stored = await upload(storage, b"photo-bytes")
+        await upload(storage, b"photo-bytes")
+
+        assert await storage.release(stored.key) == 1
+        assert await storage.read(stored.key) == b"photo-bytes"
+        assert await storage.release(stored.key) == 0
+        with pytest.raises(ObjectNotFoundError):
+            await storage.read(stored.key)
+
+    @pytest.mark.asyncio
+    async def test_abort_discards_upload(self, storage):
+        """Test an aborted upload leaves nothing behind."""
+        pending = storage.open_upload()
+        pending.write(b"partial")
+
+        pending.abort()
+
+        assert list(storage.tmp_dir.iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_referenced_but_missing_object_is_stored(self, storage):
+        """Test an upload restores an object whose first commit failed."""
+        stored = await upload(storage, b"photo-bytes")
+        await storage.backend.delete(stored.key)
+
+        again = await upload(storage, b"photo-bytes")
+
+        assert not again.deduplicated
+        assert await storage.read(stored.key) == b"photo-bytes"
+
+    @pytest.mark.asyncio
+    async def test_failed_put_drops_its_reference(self, storage, monkeypatch):
+        """Test a reference is not left behind for an object never stored."""
+        monkeypatch.setattr(
+            storage.backend, "put", AsyncMock(side_effect=OSError("disk full"))
+        )
+
+        with pytest.raises(OSError):
+            await upload(storage, b"photo-bytes")
+
+        key = hashlib.sha256(b"photo-bytes").hexdigest()
+        assert await storage.backend.incref(key, 0, "image/jpeg") == 1
+        assert list(storage.tmp_dir.iterdir()) == []
@@ -0,0 +1,40 @@
+"""Unit tests for UserService."""
+
+from unittest.mock import MagicMock
+from uuid import UUID
+
+import pytest
+
+from app.models.instructor import ProfileType
+from app.services.user_service import UserQueryError, UserService
+from tests.services.test_class_service import chain
+
+
+class TestListUsers:
+    """Tests for UserService.list_users()."""
+
+    @pytest.mark.asyncio
+    async def test_students_only(self):
+        """Test profiles can be filtered by type and projected."""
+        query = chain([{"id": str(UUID(int=1)), "last_name": "Doe"}])
+        client = MagicMock()
+        client.table.return_value = query
+
+        page = await UserService(client).list_users(
+            limit=50, fields=["last_name"], profile_type=ProfileType.STUDENT
+        )
+
+        client.table.assert_called_once_with("profiles")
+        query.select.assert_called_once_with("id,last_name")
+        query.eq.assert_called_once_with("type", "student")
+        query.limit.assert_called_once_with(51)
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_read_failure(self):
+        """Test a failing query raises UserQueryError."""
+        client = MagicMock()
+        client.table.side_effect = RuntimeError("timeout")
+
+        with pytest.raises(UserQueryError):
+            await UserService(client).list_users(limit=10)
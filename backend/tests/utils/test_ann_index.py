@@ -0,0 +1,105 @@
+"""Unit tests for the IVF approximate nearest neighbour index."""
+
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import numpy as np
+import pytest
+
+from app.utils.ann_index import IVFIndex
+
+DIM = 32
+
+
+@pytest.fixture
+def dataset() -> tuple[list[UUID], np.ndarray]:
+    """Clustered embeddings resembling several samples per identity."""
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(20, DIM))
+    vectors = centers[rng.integers(0, 20, 500)] + rng.normal(scale=0.3, size=(500, DIM))
+    return [uuid4() for _ in range(500)], vectors.astype(np.float32)
+
+
+class TestIVFIndex:
+    """Tests for IVFIndex insert, delete, search and persistence."""
+
+    def test_untrained_index_is_exact(self, dataset):
+        """Test an untrained index returns the exact nearest neighbour."""
+        keys, vectors = dataset
+        index = IVFIndex(DIM, n_lists=8)
+        index.add(keys, vectors)
+
+        results = index.search(vectors[:10], k=1)
+
+        assert [r[0][0] for r in results] == keys[:10]
+        assert results[0][0][1] == pytest.approx(1.0, abs=1e-5)
+
+    def test_trained_index_finds_stored_vectors(self, dataset):
+        """Test searching for stored vectors after training finds them."""
+        keys, vectors = dataset
+        index = IVFIndex(DIM, n_lists=8, n_probe=2)
+        index.add(keys, vectors)
+        index.train()
+
+        results = index.search(vectors, k=1)
+
+        assert index.is_trained
+        assert len(index) == len(keys)
+        assert [r[0][0] for r in results] == keys
+
+    def test_remove_and_replace(self, dataset):
+        """Test deleted keys disappear and replaced keys move."""
+        keys, vectors = dataset
+        index = IVFIndex(DIM, n_lists=8, n_probe=8)
+        index.add(keys, vectors)
+        index.train()
+
+        assert index.remove(keys[0])
+        assert not index.remove(keys[0])
+        index.add([keys[1]], vectors[2])
+
+        found = {key for key, _ in index.search(vectors[0], k=len(keys))[0]}
+        assert keys[0] not in found
+        assert len(index) == len(keys) - 1
+        [top] = index.search(vectors[2], k=2)
+        assert {key for key, _ in top} == {keys[1], keys[2]}
+
+    def test_remove_keeps_moved_rows_searchable(self, dataset):
+        """Test swap-removal keeps every remaining key addressable."""
+        keys, vectors = dataset
+        index = IVFIndex(DIM)
+        index.add(keys, vectors)
+
+        for key in keys[::2]:
+            index.remove(key)
+
+        results = index.search(vectors[1::2], k=1)
+        assert [r[0][0] for r in results] == keys[1::2]
+
+    def test_save_and_load(self, dataset, tmp_path: Path):
+        """Test a saved index loads with the same contents and results."""
+        keys, vectors = dataset
+        index = IVFIndex(DIM, n_lists=8, n_probe=3)
+        index.add(keys, vectors)
+        index.train()
+        path = tmp_path / "index.npz"
+
+        index.save(path)
+        loaded = IVFIndex.load(path)
+
+        assert len(loaded) == len(index)
+        assert loaded.n_probe == 3
+        np.testing.assert_array_equal(loaded.centroids, index.centroids)
+        for before, after in zip(
+            index.search(vectors[:20], k=3), loaded.search(vectors[:20], k=3)
+        ):
+            assert [key for key, _ in after] == [key for key, _ in before]
+            assert [s for _, s in after] == pytest.approx([s for _, s in before])
+
+    def test_train_needs_enough_vectors(self):
+        """Test training with fewer vectors than lists is rejected."""
+        index = IVFIndex(DIM, n_lists=8)
+        index.add([uuid4()], np.ones(DIM))
+
+        with pytest.raises(ValueError, match="at least 8"):
+            index.train()
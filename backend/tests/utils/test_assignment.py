@@ -0,0 +1,88 @@
+"""Unit tests for the linear assignment solver."""
+
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from app.utils.assignment import assign_matches, linear_assignment
+
+
+def brute_force_cost(cost: np.ndarray) -> float:
+    """Smallest total cost over every one-to-one pairing."""
+    n, m = cost.shape
+    if n <= m:
+        return min(
+            sum(cost[row, col] for row, col in enumerate(cols))
+            for cols in permutations(range(m), n)
+        )
+    return brute_force_cost(cost.T)
+
+
+# ============================================================================
+# linear_assignment Tests
+# ============================================================================
+
+
+class TestLinearAssignment:
+    """Tests for linear_assignment()."""
+
+    @pytest.mark.parametrize("shape", [(1, 1), (3, 3), (4, 6), (6, 4), (5, 5)])
+    def test_matches_brute_force(self, shape):
+        """Test the solution has the optimal total cost."""
+        rng = np.random.default_rng(sum(shape))
+        for _ in range(20):
+            cost = rng.normal(size=shape)
+            rows, cols = linear_assignment(cost)
+
+            assert len(rows) == min(shape)
+            assert len(set(rows.tolist())) == len(rows)
+            assert len(set(cols.tolist())) == len(cols)
+            assert cost[rows, cols].sum() == pytest.approx(brute_force_cost(cost))
+
+    def test_rows_are_sorted(self):
+        """Test pairs are returned ordered by row."""
+        cost = np.random.default_rng(0).normal(size=(7, 3))
+
+        rows, _ = linear_assignment(cost)
+
+        assert rows.tolist() == sorted(rows.tolist())
+
+    def test_empty(self):
+        """Test an empty matrix has no pairs."""
+        rows, cols = linear_assignment(np.empty((0, 5)))
+
+        assert rows.size == 0 and cols.size == 0
+
+
+# ============================================================================
+# assign_matches Tests
+# ============================================================================
+
+
+class TestAssignMatches:
+    """Tests for assign_matches()."""
+
+    def test_resolves_conflicts_one_to_one(self):
+        """Test two probes preferring the same candidate are split up."""
+        scores = np.array([[0.9, 0.8], [0.85, 0.3]])
+
+        rows, cols = assign_matches(scores, threshold=0.5)
+
+        assert rows.tolist() == [0, 1]
+        assert cols.tolist() == [1, 0]
+
+    def test_drops_pairs_below_threshold(self):
+        """Test a probe without a good candidate stays unmatched."""
+        scores = np.array([[0.9, 0.1], [0.2, 0.3]])
+
+        rows, cols = assign_matches(scores, threshold=0.5)
+
+        assert rows.tolist() == [0]
+        assert cols.tolist() == [0]
+
+    def test_no_candidates(self):
+        """Test probes against an empty gallery match nothing."""
+        rows, cols = assign_matches(np.empty((3, 0)), threshold=0.5)
+
+        assert rows.size == 0 and cols.size == 0
@@ -0,0 +1,74 @@
+"""Unit tests for the asyncio micro-batcher."""
+
+import asyncio
+
+import pytest
+
+from app.utils.batching import MicroBatcher
+
+
+class TestMicroBatcher:
+    """Tests for MicroBatcher."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_submissions_share_a_batch(self):
+        """Test requests arriving together are processed in one call."""
+        calls = []
+
+        def double(items):
+            calls.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(double, max_batch_size=8, max_wait_seconds=0.01)
+
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+
+        assert results == [0, 2, 4, 6, 8]
+        assert calls == [[0, 1, 2, 3, 4]]
+        assert batcher.stats().mean_batch_size == 5
+
+    @pytest.mark.asyncio
+    async def test_full_batch_is_processed_without_waiting(self):
+        """Test a batch is flushed as soon as it reaches the size limit."""
+        batcher = MicroBatcher(
+            lambda items: list(items), max_batch_size=2, max_wait_seconds=60
+        )
+
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(4))), timeout=5
+        )
+
+        assert results == [0, 1, 2, 3]
+        stats = batcher.stats()
+        assert (stats.batches, stats.full_batches) == (2, 2)
+
+    @pytest.mark.asyncio
+    async def test_item_errors_fail_only_their_request(self):
+        """Test an exception returned for one item is raised to its caller."""
+
+        def process(items):
+            return [ValueError("bad") if item < 0 else item for item in items]
+
+        batcher = MicroBatcher(process)
+
+        good, bad = await asyncio.gather(
+            batcher.submit(1), batcher.submit(-1), return_exceptions=True
+        )
+
+        assert good == 1
+        assert isinstance(bad, ValueError)
+
+    @pytest.mark.asyncio
+    async def test_batch_failure_fails_every_request(self):
+        """Test an exception from the batch function reaches all callers."""
+
+        def process(items):
+            raise RuntimeError("engine crashed")
+
+        batcher = MicroBatcher(process)
+
+        results = await asyncio.gather(
+            batcher.submit(1), batcher.submit(2), return_exceptions=True
+        )
+
+        assert all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,47 @@
+"""Unit tests for ETag helpers."""
+
+import json
+
+from app.utils.etag import compute_etag, etag_matches, json_response_with_etag
+
+
+class TestEtagMatches:
+    """Tests for etag_matches()."""
+
+    def test_matches(self):
+        """Test exact, weak, listed and wildcard tags match."""
+        etag = compute_etag(b"body")
+
+        assert etag_matches(etag, etag)
+        assert etag_matches(f"W/{etag}", etag)
+        assert etag_matches(f'"other", {etag}', etag)
+        assert etag_matches("*", etag)
+
+    def test_no_match(self):
+        """Test a missing header or another tag does not match."""
+        etag = compute_etag(b"body")
+
+        assert not etag_matches(None, etag)
+        assert not etag_matches(compute_etag(b"other"), etag)
+
+
+class TestJsonResponseWithEtag:
+    """Tests for json_response_with_etag()."""
+
+    def test_full_response(self):
+        """Test a new client gets the body and its ETag."""
+        response = json_response_with_etag({"items": [1, 2]}, None)
+
+        assert response.status_code == 200
+        assert json.loads(response.body) == {"items": [1, 2]}
+        assert response.headers["etag"] == compute_etag(response.body)
+
+    def test_not_modified(self):
+        """Test a client holding the same payload gets an empty 304."""
+        etag = json_response_with_etag({"items": [1, 2]}, None).headers["etag"]
+
+        response = json_response_with_etag({"items": [1, 2]}, etag)
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
@@ -0,0 +1,122 @@
+"""Unit tests for streaming export encoders."""
+
+import csv
+import io
+import sys
+
+import pytest
+
+from app.utils.export import (
+    CsvEncoder,
+    ParquetEncoder,
+    encode_pages,
+    prefetch_first_page,
+)
+
+COLUMNS = (
+    ("name", "string"),
+    ("session_date", "date"),
+    ("score", "float"),
+    ("recorded_at", "timestamp"),
+)
+
+
+def make_page(start: int, count: int) -> list[dict]:
+    return [
+        {
+            "name": f"student {i}",
+            "session_date": "2026-10-17",
+            "score": i / 10 if i % 2 else None,
+            "recorded_at": "2026-10-17T08:30:00.123456+00:00",
+        }
+        for i in range(start, start + count)
+    ]
+
+
+async def as_pages(pages):
+    for page in pages:
+        yield page
+
+
+async def collect(chunks) -> list[bytes]:
+    return [chunk async for chunk in chunks]
+
+
+class TestCsvEncoder:
+    """Tests for CsvEncoder."""
+
+    @pytest.mark.asyncio
+    async def test_header_once(self):
+        """Test the header precedes the first page only."""
+        chunks = await collect(
+            encode_pages(
+                as_pages([make_page(0, 2), make_page(2, 3)]), CsvEncoder(COLUMNS)
+            )
+        )
+
+        rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+        assert len(chunks) == 3
+        assert [row["name"] for row in rows] == [f"student {i}" for i in range(5)]
+        assert rows[0]["score"] == ""
+
+    @pytest.mark.asyncio
+    async def test_empty_export_has_header(self):
+        """Test an export without rows is still a valid CSV file."""
+        chunks = await collect(encode_pages(as_pages([]), CsvEncoder(COLUMNS)))
+
+        assert b"".join(chunks) == b"name,session_date,score,recorded_at\r\n"
+
+
+class TestParquetEncoder:
+    """Tests for ParquetEncoder."""
+
+    @pytest.mark.asyncio
+    async def test_one_row_group_per_page(self):
+        """Test pages stream as row groups of one typed Parquet file."""
+        import pyarrow.parquet as pq
+
+        chunks = await collect(
+            encode_pages(
+                as_pages([make_page(0, 4), make_page(4, 4), make_page(8, 2)]),
+                ParquetEncoder(COLUMNS),
+            )
+        )
+
+        parquet = pq.ParquetFile(io.BytesIO(b"".join(chunks)))
+        table = parquet.read()
+        assert parquet.metadata.num_row_groups == 3
+        assert table.num_rows == 10
+        assert str(table.schema.field("session_date").type) == "date32[day]"
+        assert table.column("score").null_count == 5
+        assert table.column("recorded_at")[0].as_py().microsecond == 123456
+
+
+def test_parquet_requires_pyarrow(monkeypatch):
+    """Test a clear error is raised when pyarrow is missing."""
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+
+    with pytest.raises(ImportError, match="pip install pyarrow"):
+        ParquetEncoder(COLUMNS)
+
+
+class TestPrefetchFirstPage:
+    """Tests for prefetch_first_page()."""
+
+    @pytest.mark.asyncio
+    async def test_first_page_error_raised_early(self):
+        """Test a failing first page raises before iteration starts."""
+
+        async def failing():
+            raise RuntimeError("database down")
+            yield []
+
+        with pytest.raises(RuntimeError):
+            await prefetch_first_page(failing())
+
+    @pytest.mark.asyncio
+    async def test_pages_kept_in_order(self):
+        """Test the prefetched page is yielded before the rest."""
+        pages = await prefetch_first_page(as_pages([[1], [2], [3]]))
+
+        assert [page async for page in pages] == [[1], [2], [3]]
@@ -0,0 +1,213 @@
+"""Unit tests for face engines and detection helpers."""
+
+import importlib.util
+
+import numpy as np
+import pytest
+
+from app.utils.face_utils import (
+    ARCFACE_LANDMARKS,
+    SCRFD_ANCHORS,
+    SCRFD_STRIDES,
+    DetectedFace,
+    FakeFaceEngine,
+    align_face,
+    create_face_engine,
+    decode_scrfd_outputs,
+    detect_faces_tiled,
+    non_max_suppression,
+    similarity_transform,
+    warm_up_face_engine,
+)
+
+
+def class_photo(rows: int, cols: int, face: int = 120, gap: int = 60) -> np.ndarray:
+    """Synthetic class photo: a grid of textured faces on a black background."""
+    rng = np.random.default_rng(rows * cols)
+    pitch = face + gap
+    image = np.zeros((rows * pitch + gap, cols * pitch + gap, 3), dtype=np.uint8)
+    for row in range(rows):
+        for col in range(cols):
+            top, left = gap + row * pitch, gap + col * pitch
+            image[top : top + face, left : left + face] = rng.integers(
+                40, 256, size=(face, face, 3)
+            )
+    return image
+
+
+# ============================================================================
+# non_max_suppression Tests
+# ============================================================================
+
+
+class TestNonMaxSuppression:
+    """Tests for non_max_suppression()."""
+
+    def test_drops_overlapping_lower_score(self):
+        """Test the weaker of two overlapping boxes is dropped."""
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [20, 20, 30, 30]])
+        scores = np.array([0.8, 0.9, 0.5])
+
+        keep = non_max_suppression(boxes, scores, iou_threshold=0.4)
+
+        assert keep.tolist() == [1, 2]
+
+    def test_keeps_disjoint_boxes(self):
+        """Test boxes that do not overlap are all kept."""
+        boxes = np.array([[0, 0, 10, 10], [10, 0, 20, 10]])
+
+        keep = non_max_suppression(boxes, np.array([0.5, 0.6]))
+
+        assert sorted(keep.tolist()) == [0, 1]
+
+
+# ============================================================================
+# detect_faces_tiled Tests
+# ============================================================================
+
+
+class TestDetectFacesTiled:
+    """Tests for detect_faces_tiled()."""
+
+    def test_small_image_is_one_tile(self):
+        """Test an image within one tile is detected directly."""
+        engine = FakeFaceEngine(blobs=True)
+        image = class_photo(2, 3)
+
+        assert detect_faces_tiled(engine, image, tile_size=2048) == engine.detect(
+            image
+        )
+
+    @pytest.mark.parametrize("tile_size,overlap", [(400, 200), (512, 160)])
+    def test_finds_every_face_once(self, tile_size, overlap):
+        """Test faces straddling tile edges are found exactly once."""
+        engine = FakeFaceEngine(blobs=True)
+        image = class_photo(6, 9)
+
+        faces = detect_faces_tiled(engine, image, tile_size, overlap)
+
+        expected = sorted(face.box for face in engine.detect(image))
+        assert len(expected) == 54
+        assert sorted(tuple(map(int, face.box)) for face in faces) == expected
+
+
+# ============================================================================
+# Alignment Tests
+# ============================================================================
+
+
+class TestAlignFace:
+    """Tests for similarity_transform() and align_face()."""
+
+    def test_similarity_transform_recovers_transform(self):
+        """Test a rotated, scaled and shifted point set maps back exactly."""
+        angle, scale, shift = 0.3, 1.7, np.array([12.0, -4.0])
+        rotation = np.array(
+            [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]
+        )
+        dst = scale * ARCFACE_LANDMARKS @ rotation.T + shift
+
+        matrix = similarity_transform(ARCFACE_LANDMARKS, dst)
+
+        np.testing.assert_allclose(matrix[:, :2], scale * rotation, atol=1e-9)
+        np.testing.assert_allclose(matrix[:, 2], shift, atol=1e-9)
+
+    def test_align_face_moves_landmarks_to_reference(self):
+        """Test a landmark pixel lands on its reference point in the crop."""
+        image = np.zeros((400, 400, 3), dtype=np.uint8)
+        landmarks = ARCFACE_LANDMARKS * 2 + 100
+        x, y = np.round(landmarks[0]).astype(int)
+        image[y - 2 : y + 3, x - 2 : x + 3] = 255
+
+        aligned = align_face(image, tuple(map(tuple, landmarks)))
+
+        assert aligned.shape == (112, 112, 3)
+        peak_y, peak_x = np.unravel_index(aligned[..., 0].argmax(), (112, 112))
+        assert abs(peak_x - ARCFACE_LANDMARKS[0, 0]) <= 1.5
+        assert abs(peak_y - ARCFACE_LANDMARKS[0, 1]) <= 1.5
+
+    def test_shifted_moves_box_and_landmarks(self):
+        """Test a face found in a tile is moved into image coordinates."""
+        face = DetectedFace(box=(1, 2, 3, 4), score=0.9, landmarks=((1, 1),) * 5)
+
+        moved = face.shifted(10, 20)
+
+        assert moved.box == (11, 22, 13, 24)
+        assert moved.landmarks == ((11, 21),) * 5
+        assert moved.score == 0.9
+
+
+# ============================================================================
+# ONNX Engine Tests
+# ============================================================================
+
+
+def scrfd_outputs(input_size: int) -> list[np.ndarray]:
+    """Empty SCRFD outputs with one confident face at stride 16."""
+    scores, boxes, points = [], [], []
+    for stride in SCRFD_STRIDES:
+        count = (input_size // stride) ** 2 * SCRFD_ANCHORS
+        scores.append(np.zeros((count, 1), dtype=np.float32))
+        boxes.append(np.ones((count, 4), dtype=np.float32))
+        points.append(np.zeros((count, 10), dtype=np.float32))
+    # Anchor at grid (x=3, y=2) of stride 16, centre (48, 32)
+    anchor = (2 * (input_size // 16) + 3) * SCRFD_ANCHORS
+    scores[1][anchor] = 0.9
+    boxes[1][anchor] = [1, 1, 2, 3]
+    points[1][anchor] = [0, 0, 1, 1, 0.5, 0.5, -1, 1, 1, 1]
+    return scores + boxes + points
+
+
+class TestOnnxFaceEngine:
+    """Tests for the ONNX Runtime engine's model-independent parts."""
+
+    def test_decode_scrfd_outputs(self):
+        """Test distances and offsets are decoded around the anchor centre."""
+        boxes, scores, landmarks = decode_scrfd_outputs(scrfd_outputs(64), 64)
+
+        np.testing.assert_allclose(boxes, [[32, 16, 80, 80]])
+        np.testing.assert_allclose(scores, [0.9])
+        np.testing.assert_allclose(landmarks[0, :2], [[48, 32], [64, 48]])
+
+    def test_decode_scrfd_outputs_without_landmarks(self):
+        """Test models without a landmark head decode boxes only."""
+        boxes, _, landmarks = decode_scrfd_outputs(scrfd_outputs(64)[:6], 64)
+
+        assert len(boxes) == 1
+        assert landmarks is None
+
+    @pytest.mark.skipif(
+        importlib.util.find_spec("onnxruntime") is not None,
+        reason="onnxruntime is installed",
+    )
+    def test_requires_onnxruntime(self):
+        """Test a clear error is raised when onnxruntime is missing."""
+        with pytest.raises(ImportError, match="pip install onnxruntime"):
+            create_face_engine(
+                "onnx", detector_path="det.onnx", embedder_path="rec.onnx"
+            )
+
+
+class TestWarmUpFaceEngine:
+    """Tests for warm_up_face_engine()."""
+
+    def test_runs_every_stage(self):
+        """Test warm-up detects, aligns and embeds once."""
+        calls = []
+
+        class RecordingEngine(FakeFaceEngine):
+            def detect(self, image):
+                calls.append("detect")
+                return super().detect(image)
+
+            def align(self, image, face):
+                calls.append("align")
+                return super().align(image, face)
+
+            def embed(self, faces):
+                calls.append("embed")
+                return super().embed(faces)
+
+        warm_up_face_engine(RecordingEngine(embedding_dim=16))
+
+        assert calls == ["detect", "align", "embed"]
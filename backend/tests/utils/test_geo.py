@@ -0,0 +1,75 @@
+"""Unit tests for geographic helpers."""
+
+import numpy as np
+import pytest
+
+from app.utils.geo import (
+    METERS_PER_DEGREE,
+    haversine_distances,
+    nearest_points_on_segments,
+    points_in_polygons,
+)
+
+
+class TestHaversineDistances:
+    """Tests for haversine_distances()."""
+
+    def test_one_degree_of_latitude(self):
+        """Test a degree along a meridian is about 111.2 km."""
+        distance = haversine_distances(np.array([0.0]), 0.0, np.array([1.0]), 0.0)
+
+        assert distance[0] == pytest.approx(METERS_PER_DEGREE)
+
+    def test_known_city_distance(self):
+        """Test London to Paris is about 343.5 km."""
+        distance = haversine_distances(51.5074, -0.1278, 48.8566, 2.3522)
+
+        assert distance == pytest.approx(343_500, rel=0.005)
+
+    def test_broadcasts(self):
+        """Test one point against many."""
+        distances = haversine_distances(0.0, 0.0, np.zeros(3), np.array([0, 1, 2]))
+
+        np.testing.assert_allclose(distances / METERS_PER_DEGREE, [0, 1, 2])
+
+
+class TestPointsInPolygons:
+    """Tests for points_in_polygons()."""
+
+    def test_concave_polygon(self):
+        """Test the notch of a U-shaped polygon is outside."""
+        ring = np.array(
+            [[0, 0], [3, 0], [3, 3], [2, 3], [2, 1], [1, 1], [1, 3], [0, 3]]
+        )
+        points = np.array([[0.5, 2], [1.5, 2], [2.5, 2], [1.5, 0.5], [4, 1]])
+        n_edges = len(ring)
+        pair_point = np.repeat(np.arange(len(points)), n_edges)
+        start = np.tile(ring, (len(points), 1))
+        end = np.tile(np.roll(ring, -1, axis=0), (len(points), 1))
+
+        inside = points_in_polygons(
+            points[pair_point, 0],
+            points[pair_point, 1],
+            start,
+            end,
+            pair_point,
+            len(points),
+        )
+
+        assert inside.tolist() == [True, False, True, True, False]
+
+
+class TestNearestPointsOnSegments:
+    """Tests for nearest_points_on_segments()."""
+
+    def test_clamps_to_segment_ends(self):
+        """Test the closest point never leaves the segment."""
+        start = np.array([[0.0, 0.0], [0.0, 0.0]])
+        end = np.array([[0.0, 1.0], [0.0, 1.0]])
+
+        lat, lon = nearest_points_on_segments(
+            np.array([0.5, 2.0]), np.array([1.0, 0.0]), start, end
+        )
+
+        np.testing.assert_allclose(lat, [0.5, 1.0])
+        np.testing.assert_allclose(lon, [0.0, 0.0])
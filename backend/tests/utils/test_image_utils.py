@@ -0,0 +1,108 @@
+"""Unit tests for image decoding utilities."""
+
+import io
+import tracemalloc
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from app.utils.image_utils import (
+    ImageDecodeError,
+    ImageDecoder,
+    decode_image,
+    normalize_image,
+)
+
+
+def make_jpeg(width: int, height: int, orientation: int | None = None) -> bytes:
+    """Encode a smooth synthetic photo, optionally with an EXIF orientation."""
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)
+    pixels = np.stack(np.broadcast_arrays(x[None, :], y[:, None], 128.0), axis=2)
+    image = Image.fromarray(pixels.astype(np.uint8))
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[0x0112] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, format="JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+class TestDecodeImage:
+    """Tests for decode_image()."""
+
+    def test_decode_full_resolution(self):
+        """Test decoding without a size limit keeps the original size."""
+        image = decode_image(make_jpeg(400, 300))
+
+        assert image.shape == (300, 400, 3)
+        assert image.dtype == np.uint8
+
+    def test_decode_scales_to_max_side(self):
+        """Test large photos are reduced to the working resolution."""
+        image = decode_image(make_jpeg(4000, 3000), max_side=1000)
+
+        assert image.shape == (750, 1000, 3)
+
+    def test_decode_applies_exif_orientation(self):
+        """Test a photo stored sideways is returned upright."""
+        image = decode_image(make_jpeg(400, 300, orientation=6), max_side=200)
+
+        assert image.shape == (200, 150, 3)
+
+    def test_decode_invalid_bytes_raises(self):
+        """Test undecodable bytes raise ImageDecodeError."""
+        with pytest.raises(ImageDecodeError):
+            decode_image(b"not an image")
+
+
+class TestImageDecoder:
+    """Tests for ImageDecoder."""
+
+    def test_decode_reuses_buffer(self):
+        """Test consecutive decodes write into the same buffer."""
+        decoder = ImageDecoder(max_side=256)
+
+        first = decoder.decode(make_jpeg(1024, 768))
+        second = decoder.decode(make_jpeg(600, 800))
+
+        assert first.shape == (192, 256, 3)
+        assert second.shape == (256, 192, 3)
+        assert np.shares_memory(first, second)
+
+    def test_decode_matches_decode_image(self):
+        """Test the buffered decoder yields the same pixels."""
+        data = make_jpeg(1200, 900)
+
+        decoded = ImageDecoder(max_side=300).decode(data)
+
+        np.testing.assert_array_equal(decoded, decode_image(data, max_side=300))
+
+    def test_decode_copies_in_strips(self):
+        """Test no full-size temporary is made while filling the buffer."""
+        data = make_jpeg(1200, 900)
+        decoder = ImageDecoder(max_side=300)
+
+        tracemalloc.start()
+        try:
+            decoded = decoder.decode(data)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < decoded.nbytes
+
+
+class TestNormalizeImage:
+    """Tests for normalize_image()."""
+
+    def test_normalize_into_buffer(self):
+        """Test pixels are scaled to [-1, 1] into the given buffer."""
+        image = np.array([[[0, 128, 255]]], dtype=np.uint8)
+        out = np.empty(image.shape, dtype=np.float32)
+
+        result = normalize_image(image, out=out)
+
+        assert result is out
+        np.testing.assert_allclose(out[0, 0], [-0.99609375, 0.00390625, 0.99609375])
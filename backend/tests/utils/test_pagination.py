@@ -0,0 +1,155 @@
+"""Unit tests for keyset pagination helpers."""
+
+import pytest
+
+from app.utils.pagination import (
+    PaginationError,
+    decode_cursor,
+    encode_cursor,
+    fetch_keyset_page,
+    keyset_filter,
+    keyset_pages,
+    parse_fields,
+    select_fields,
+)
+
+KEY = ("class_id", "session_date", "student_id")
+
+
+def make_rows() -> list[dict]:
+    return [
+        {"class_id": c, "session_date": d, "student_id": s}
+        for c in ("a", "b")
+        for d in ("2026-10-07", "2026-10-14")
+        for s in ("x", "y", "z")
+    ]
+
+
+class TestKeysetFilter:
+    """Tests for keyset_filter()."""
+
+    def test_single_column(self):
+        """Test a one-column key is a plain comparison."""
+        assert keyset_filter(["id"], [7]) == 'id.gt."7"'
+
+    def test_composite_key(self):
+        """Test each later column is compared under equal earlier columns."""
+        assert keyset_filter(KEY, ["a", "2026-10-07", "x"]) == (
+            'class_id.gt."a",'
+            'and(class_id.eq."a",session_date.gt."2026-10-07"),'
+            'and(class_id.eq."a",session_date.eq."2026-10-07",student_id.gt."x")'
+        )
+
+    def test_reserved_characters_are_quoted(self):
+        """Test commas and quotes in values cannot break the filter."""
+        assert keyset_filter(["name"], ['a,b"c']) == 'name.gt."a,b\\"c"'
+
+    def test_mismatched_key(self):
+        """Test a key with the wrong number of values is rejected."""
+        with pytest.raises(ValueError):
+            keyset_filter(KEY, ["a"])
+
+
+class TestKeysetPages:
+    """Tests for keyset_pages()."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("server_cap", [5, 100])
+    async def test_reads_every_row_once(self, server_cap):
+        """Test every row is read once, even when the server caps pages."""
+        rows = make_rows()
+        # The filter selecting the rows after each row
+        starts = {
+            keyset_filter(KEY, [row[c] for c in KEY]): i + 1
+            for i, row in enumerate(rows)
+        }
+        requests = []
+
+        async def fetch(after, limit):
+            requests.append(after)
+            start = 0 if after is None else starts[after]
+            return rows[start : start + min(limit, server_cap)]
+
+        pages = [page async for page in keyset_pages(fetch, KEY, page_size=8)]
+
+        assert [row for page in pages for row in page] == rows
+        assert all(len(page) <= 8 for page in pages)
+        assert requests[0] is None
+        assert len(requests) == len(pages) + 1
+
+    @pytest.mark.asyncio
+    async def test_empty_result(self):
+        """Test an empty result set yields no pages."""
+
+        async def fetch(after, limit):
+            return []
+
+        assert [page async for page in keyset_pages(fetch, KEY, 10)] == []
+
+
+class TestCursor:
+    """Tests for encode_cursor() and decode_cursor()."""
+
+    def test_round_trip(self):
+        """Test a cursor decodes to the key it was made from."""
+        key = ["a", "2026-10-07", "x"]
+
+        assert decode_cursor(encode_cursor(key), 3) == key
+
+    @pytest.mark.parametrize("cursor", ["not base64!", "bm90IGpzb24", "WyJhIl0"])
+    def test_invalid_cursor(self, cursor):
+        """Test garbage and keys of the wrong length are rejected."""
+        with pytest.raises(PaginationError):
+            decode_cursor(cursor, 3)
+
+
+class TestSelectFields:
+    """Tests for parse_fields() and select_fields()."""
+
+    ALLOWED = ("id", "name", "code", "created_at")
+
+    def test_all_fields_by_default(self):
+        """Test no field list selects every allowed field."""
+        assert select_fields(parse_fields(None), self.ALLOWED, ["id"]) == list(
+            self.ALLOWED
+        )
+
+    def test_key_always_selected(self):
+        """Test the key column is read even when not requested."""
+        fields = parse_fields(" code, name ,")
+
+        assert select_fields(fields, self.ALLOWED, ["id"]) == ["id", "name", "code"]
+
+    def test_unknown_field(self):
+        """Test a field outside the allowed set is rejected."""
+        with pytest.raises(PaginationError, match="password"):
+            select_fields(["name", "password"], self.ALLOWED, ["id"])
+
+
+class TestFetchKeysetPage:
+    """Tests for fetch_keyset_page()."""
+
+    @pytest.mark.asyncio
+    async def test_walks_every_page(self):
+        """Test following next cursors reads every row once."""
+        rows = make_rows()
+        starts = {
+            keyset_filter(KEY, [row[c] for c in KEY]): i + 1
+            for i, row in enumerate(rows)
+        }
+
+        async def fetch(after, limit):
+            start = 0 if after is None else starts[after]
+            return rows[start : start + limit]
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page = await fetch_keyset_page(fetch, KEY, 5, cursor)
+            seen.extend(page.items)
+            pages += 1
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        assert seen == rows
+        assert pages == 3
@@ -0,0 +1,61 @@
+"""Unit tests for upload validators."""
+
+import pytest
+
+from app.utils.validators import (
+    ImageStreamValidator,
+    PayloadTooLargeError,
+    UnsupportedMediaTypeError,
+    sniff_image_type,
+    validate_content_length,
+)
+
+
+class TestSniffImageType:
+    """Tests for sniff_image_type()."""
+
+    @pytest.mark.parametrize(
+        ("head", "expected"),
+        [
+            (b"\xff\xd8\xff\xe0\x00\x10JFIF\x00\x01", "image/jpeg"),
+            (b"\x89PNG\r\n\x1a\n\x00\x00\x00\r", "image/png"),
+            (b"RIFF\x24\x00\x00\x00WEBP", "image/webp"),
+            (b"RIFF\x24\x00\x00\x00WAVE", None),
+            (b"GIF89a\x01\x00\x01\x00\x00\x00", None),
+        ],
+    )
+    def test_sniff(self, head, expected):
+        """Test formats are recognized from their leading bytes."""
+        assert sniff_image_type(head) == expected
+
+
+class TestImageStreamValidator:
+    """Tests for ImageStreamValidator."""
+
+    def test_rejects_non_image_on_first_chunk(self):
+        """Test a non-image is rejected as soon as its header arrives."""
+        validator = ImageStreamValidator(max_bytes=1024)
+
+        with pytest.raises(UnsupportedMediaTypeError):
+            validator.feed(b"%PDF-1.7 not an image")
+
+    def test_sniffs_across_small_chunks(self):
+        """Test the format is sniffed even when the header is split."""
+        validator = ImageStreamValidator(max_bytes=1024)
+        for byte in b"\x89PNG\r\n\x1a\n\x00\x00\x00\r":
+            validator.feed(bytes([byte]))
+
+        assert validator.finish() == "image/png"
+
+    def test_rejects_oversize_stream(self):
+        """Test the size limit is enforced chunk by chunk."""
+        validator = ImageStreamValidator(max_bytes=16)
+        validator.feed(b"\xff\xd8\xff" + b"\x00" * 13)
+
+        with pytest.raises(PayloadTooLargeError):
+            validator.feed(b"\x00")
+
+    def test_declared_length_over_limit(self):
+        """Test a declared Content-Length over the limit is rejected."""
+        with pytest.raises(PayloadTooLargeError):
+            validate_content_length("2048", max_bytes=1024)